@@ -8,7 +8,10 @@ logger = logging.getLogger(__name__)
 class NameExtractor:
     """Ekstrakcja nazwisk z tekstu"""
     
-    def __init__(self):
+    def __init__(self, text_store=None):
+        # Magazyn tekstów dla wierszy raportów kompaktowych (Description_Hash / Tags_Hash)
+        self.text_store = text_store
+        
         # Polskie nazwiska - wzorce
         self.name_patterns = [
             r'\b[A-ZĄĆĘŁŃÓŚŹŻ][a-ząćęłńóśźż]+ [A-ZĄĆĘŁŃÓŚŹŻ][a-ząćęłńóśźż]+\b',
@@ -65,10 +68,27 @@ class NameExtractor:
         """Sprawdza czy tekst powinien być ignorowany"""
         return text in self.ignore_words or len(text.split()) < 2
     
+    def _stored_text(self, video_data: dict, key: str) -> str:
+        """Tekst z magazynu dla skrótu z wiersza raportu kompaktowego (pobierany dopiero tutaj)"""
+        text_hash = video_data.get(key) or video_data.get(key.lower())
+        if not text_hash:
+            return ''
+        if self.text_store is None:
+            from ..storage.text_store import get_text_store
+            self.text_store = get_text_store()
+        return self.text_store.get(text_hash) or ''
+    
     def extract_from_video_data(self, video_data: dict) -> List[str]:
-        """Wyciąga nazwiska z danych filmu"""
+        """Wyciąga nazwiska z danych filmu (także z wiersza raportu kompaktowego)"""
         names = set()
         
+        # Wiersz raportu kompaktowego - teksty pobierane z magazynu po skrócie
+        if 'description' not in video_data:
+            video_data = dict(video_data, description=self._stored_text(video_data, 'Description_Hash'))
+        if 'tags' not in video_data:
+            tags = self._stored_text(video_data, 'Tags_Hash')
+            video_data = dict(video_data, tags=tags.split(', ') if tags else [])
+        
         # Z tytułu
         if 'title' in video_data:
             names.update(self.extract_names(video_data['title']))
@@ -1,14 +1,17 @@
 try:
-    from fastapi import APIRouter, HTTPException, File, UploadFile
-    from fastapi.responses import FileResponse
+    from fastapi import APIRouter, HTTPException, File, UploadFile, Request
+    from fastapi.responses import FileResponse, StreamingResponse
     from pydantic import BaseModel
     from typing import Dict, List, Optional
     import logging
-    from ..config import settings
+    from ..config import settings, storage_locations
     from ..storage.csv_generator import CSVGenerator
+    from ..storage.report_files import (
+        accepts_encoding, find_report, glob_reports, is_report_file, iter_report_bytes,
+        report_compression, report_stem, split_report_name
+    )
     from pathlib import Path
-    
-    print("✅ Wszystkie importy w API routes udane")
+    from ..workers import WorkerPoolFull, run_cpu, run_io
 except ImportError as e:
     print(f"❌ Błąd importu w API routes: {e}")
     import traceback
@@ -88,11 +91,11 @@ async def add_channel(channel_request: ChannelRequest):
         # Dodaj kategorię do odpowiedzi
         channel_info['category'] = channel_request.category
         
-        logger.info(f"Dodano kanał: {channel_info['title']} do kategorii {channel_request.category}")
+        logger.info("Dodano kanał: %s do kategorii %s", channel_info['title'], channel_request.category)
         return channel_info
         
     except Exception as e:
-        logger.error(f"Błąd podczas dodawania kanału: {e}")
+        logger.error("Błąd podczas dodawania kanału: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
 
@@ -100,29 +103,27 @@ async def add_channel(channel_request: ChannelRequest):
 async def get_channels():
     """Zwraca listę wszystkich kanałów"""
     try:
-        print("🔍 Pobieranie kanałów...")
-        logger.info("Pobieranie kanałów...")
+        logger.debug("Pobieranie kanałów...")
         
         if not task_scheduler:
-            print("❌ Task scheduler nie jest dostępny")
+            logger.error("Task scheduler nie jest dostępny")
             return {}
         
-        print("✅ Task scheduler dostępny, pobieram kanały...")
+        logger.debug("✅ Task scheduler dostępny, pobieram kanały...")
         channels = task_scheduler.get_channels()
         
         # Dodaj szczegółowe logowanie
         total_channels = sum(len(channel_list) for channel_list in channels.values())
-        print(f"📊 Pobrano {total_channels} kanałów z {len(channels)} kategorii:")
+        logger.debug("📊 Pobrano %s kanałów z %s kategorii:", total_channels, len(channels))
         for category, channel_list in channels.items():
-            print(f"   📺 {category}: {len(channel_list)} kanałów")
+            logger.debug("   📺 %s: %s kanałów", category, len(channel_list))
             for channel in channel_list:
-                print(f"      - {channel.get('title', 'Brak tytułu')} ({channel.get('subscriber_count', 0)} subskrybentów)")
+                logger.debug("      - %s (%s subskrybentów)", channel.get('title', 'Brak tytułu'), channel.get('subscriber_count', 0))
         
         return channels
         
     except Exception as e:
-        print(f"❌ Błąd podczas pobierania kanałów: {e}")
-        logger.error(f"Błąd podczas pobierania kanałów: {e}")
+        logger.error("Błąd podczas pobierania kanałów: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -135,7 +136,7 @@ async def remove_channel(channel_id: str, category: str = "general"):
         task_scheduler.remove_channel(channel_id, category)
         return {"message": f"Kanał {channel_id} został usunięty z kategorii {category}"}
     except Exception as e:
-        logger.error(f"Błąd podczas usuwania kanału: {e}")
+        logger.error("Błąd podczas usuwania kanału: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -147,11 +148,11 @@ async def add_category(category_request: CategoryRequest):
             raise HTTPException(status_code=500, detail="Scheduler nie jest dostępny")
         
         result = task_scheduler.add_category(category_request.name)
-        logger.info(f"Dodano kategorię: {category_request.name}")
+        logger.info("Dodano kategorię: %s", category_request.name)
         return result
         
     except Exception as e:
-        logger.error(f"Błąd podczas dodawania kategorii: {e}")
+        logger.error("Błąd podczas dodawania kategorii: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
 
@@ -163,11 +164,11 @@ async def remove_category(category_name: str, force: bool = False):
             raise HTTPException(status_code=500, detail="Scheduler nie jest dostępny")
         
         result = task_scheduler.remove_category(category_name, force)
-        logger.info(f"Usunięto kategorię: {category_name} (force={force})")
+        logger.info("Usunięto kategorię: %s (force=%s)", category_name, force)
         return result
         
     except Exception as e:
-        logger.error(f"Błąd podczas usuwania kategorii: {e}")
+        logger.error("Błąd podczas usuwania kategorii: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
 
@@ -175,142 +176,133 @@ async def remove_category(category_name: str, force: bool = False):
 async def get_categories():
     """Zwraca listę wszystkich kategorii z liczbą kanałów"""
     try:
-        print("🔍 Pobieranie kategorii...")
-        logger.info("Pobieranie kategorii...")
+        logger.debug("Pobieranie kategorii...")
         
         if not task_scheduler:
-            print("❌ Task scheduler nie jest dostępny")
+            logger.error("Task scheduler nie jest dostępny")
             return []
         
-        print("✅ Task scheduler dostępny, pobieram kategorie...")
+        logger.debug("✅ Task scheduler dostępny, pobieram kategorie...")
         categories = task_scheduler.get_categories()
-        print(f"📊 Pobrano {len(categories)} kategorii: {[cat['name'] for cat in categories]}")
+        logger.debug("📊 Pobrano %s kategorii: %s", len(categories), [cat['name'] for cat in categories])
         
         # Dodaj szczegółowe logowanie dla każdej kategorii
         for cat in categories:
-            print(f"   📺 {cat['name']}: {cat['channels_count']} kanałów, raporty: {'✅' if cat['has_reports'] else '❌'}")
+            logger.debug("   📺 %s: %s kanałów, raporty: %s", cat['name'], cat['channels_count'], '✅' if cat['has_reports'] else '❌')
         
         return categories
         
     except Exception as e:
-        print(f"❌ Błąd podczas pobierania kategorii: {e}")
-        logger.error(f"Błąd podczas pobierania kategorii: {e}")
+        logger.error("Błąd podczas pobierania kategorii: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _report_response(file_path: Path, accept_encoding: str):
+    """
+    Odpowiedź z plikiem raportu - klient zawsze dostaje report_X_DATA.csv.
+
+    Raport skompresowany (.csv.gz / .csv.zst) idzie strumieniem bez dekompresji
+    z Content-Encoding, gdy klient je akceptuje; inaczej jest rozpakowywany w locie.
+    """
+    download_name = f"{report_stem(file_path)}.csv"
+    compression = report_compression(file_path)
+    if not compression:
+        return FileResponse(path=str(file_path), filename=download_name, media_type='text/csv')
+
+    headers = {
+        'Content-Disposition': f'attachment; filename="{download_name}"',
+        'Vary': 'Accept-Encoding',
+    }
+    if accepts_encoding(accept_encoding, compression):
+        headers['Content-Encoding'] = compression
+        headers['Content-Length'] = str(file_path.stat().st_size)
+        body = iter_report_bytes(file_path, decompress=False)
+    else:
+        body = iter_report_bytes(file_path, decompress=True)
+    # Iterator synchroniczny - Starlette czyta go w puli wątków
+    return StreamingResponse(body, media_type='text/csv', headers=headers)
+
+
 @router.post("/reports/generate")
-async def generate_report(report_request: ReportRequest):
+async def generate_report(report_request: ReportRequest, request: Request):
     """Generuje raport CSV dla określonej kategorii"""
     try:
-        print(f"🚀 Generowanie raportu: kategoria={report_request.category}, dni wstecz={report_request.days_back}")
-        logger.info(f"Generowanie raportu: kategoria={report_request.category}, dni wstecz={report_request.days_back}")
+        logger.info("Generowanie raportu: kategoria=%s, dni wstecz=%s", report_request.category, report_request.days_back)
         
         if not task_scheduler:
-            print("❌ Scheduler nie jest dostępny")
+            logger.error("Scheduler nie jest dostępny")
             raise HTTPException(status_code=500, detail="Scheduler nie jest dostępny")
             
         channels = task_scheduler.get_channels()
-        print(f"📺 Dostępne kategorie: {list(channels.keys())}")
-        print(f"📺 Kanały w kategorii {report_request.category}: {len(channels.get(report_request.category, [])) if report_request.category else 'wszystkie'}")
+        logger.debug("📺 Dostępne kategorie: %s", list(channels.keys()))
+        logger.debug("📺 Kanały w kategorii %s: %s", report_request.category, len(channels.get(report_request.category, [])) if report_request.category else 'wszystkie')
         
         if report_request.category and report_request.category not in channels:
-            print(f"❌ Kategoria {report_request.category} nie istnieje")
+            logger.error("Kategoria %s nie istnieje", report_request.category)
             raise HTTPException(status_code=404, detail=f"Kategoria {report_request.category} nie istnieje")
         
-        all_videos = {}
-        
         # Pobierz dane z kanałów
         target_categories = [report_request.category] if report_request.category else channels.keys()
-        print(f"🎯 Generuję raport dla kategorii: {target_categories}")
+        logger.debug("🎯 Generuję raport dla kategorii: %s", target_categories)
         
-        for category in target_categories:
-            if category in channels:
-                category_videos = []
-                print(f"📊 Pobieranie filmów dla kategorii: {category} ({len(channels[category])} kanałów)")
-                
-                for channel in channels[category]:
-                    try:
-                        print(f"   📺 Pobieranie filmów z kanału: {channel['title']}")
-                        videos = await task_scheduler.get_channel_videos(
-                            channel['id'], 
-                            report_request.days_back
-                        )
-                        print(f"   ✅ Pobrano {len(videos)} filmów z kanału {channel['title']}")
-                        
-                        # Dodaj informacje o kanale
-                        for video in videos:
-                            video['channel_title'] = channel['title']
-                            video['channel_id'] = channel['id']
-                        
-                        category_videos.extend(videos)
-                        
-                    except Exception as e:
-                        print(f"   ❌ Błąd podczas pobierania filmów z kanału {channel['title']}: {e}")
-                        logger.error(f"Błąd podczas pobierania filmów z kanału {channel['title']}: {e}")
-                
-                if category_videos:
-                    all_videos[category] = category_videos
-                    print(f"📊 Kategoria {category}: {len(category_videos)} filmów")
-                else:
-                    print(f"⚠️ Kategoria {category}: brak filmów")
+        all_videos = await task_scheduler.collect_category_videos(
+            {category: channels[category] for category in target_categories if category in channels},
+            report_request.days_back
+        )
+        for category, category_videos in all_videos.items():
+            logger.debug("📊 Kategoria %s: %s filmów", category, len(category_videos))
         
         if not all_videos:
-            print("❌ Brak danych do wygenerowania raportu")
+            logger.error("Brak danych do wygenerowania raportu")
             raise HTTPException(status_code=404, detail="Brak danych do wygenerowania raportu")
         
-        print(f"📊 Łącznie filmów do raportu: {sum(len(videos) for videos in all_videos.values())}")
+        logger.debug("📊 Łącznie filmów do raportu: %s", sum(len(videos) for videos in all_videos.values()))
         
         # Generuj CSV
-        print("🔄 Generowanie pliku CSV...")
+        logger.debug("🔄 Generowanie pliku CSV...")
         try:
             csv_generator = CSVGenerator()
-            print("✅ CSVGenerator zaimportowany pomyślnie")
+            logger.debug("✅ CSVGenerator zaimportowany pomyślnie")
         except Exception as e:
-            print(f"❌ Błąd importu CSVGenerator: {e}")
-            logger.error(f"Błąd importu CSVGenerator: {e}")
+            logger.error("Błąd importu CSVGenerator: %s", e)
             raise HTTPException(status_code=500, detail=f"Błąd importu CSVGenerator: {e}")
         
         if report_request.category:
             # Raport dla jednej kategorii
-            print(f"📄 Generowanie raportu dla kategorii: {report_request.category}")
+            logger.debug("📄 Generowanie raportu dla kategorii: %s", report_request.category)
             try:
-                csv_path = csv_generator.generate_csv(all_videos[report_request.category], report_request.category)
-                print(f"✅ Raport CSV wygenerowany: {csv_path}")
+                csv_path = await run_io(csv_generator.generate_csv, all_videos[report_request.category], report_request.category)
+                logger.debug("✅ Raport CSV wygenerowany: %s", csv_path)
+            except WorkerPoolFull:
+                raise
             except Exception as e:
-                print(f"❌ Błąd generowania CSV dla kategorii {report_request.category}: {e}")
-                logger.error(f"Błąd generowania CSV dla kategorii {report_request.category}: {e}")
+                logger.error("Błąd generowania CSV dla kategorii %s: %s", report_request.category, e)
                 raise HTTPException(status_code=500, detail=f"Błąd generowania CSV: {e}")
         else:
             # Raport podsumowujący
-            print("📄 Generowanie raportu podsumowującego")
+            logger.debug("📄 Generowanie raportu podsumowującego")
             try:
-                csv_path = csv_generator.generate_summary_csv(all_videos)
-                print(f"✅ Raport podsumowujący CSV wygenerowany: {csv_path}")
+                csv_path = await run_io(csv_generator.generate_summary_csv, all_videos)
+                logger.debug("✅ Raport podsumowujący CSV wygenerowany: %s", csv_path)
+            except WorkerPoolFull:
+                raise
             except Exception as e:
-                print(f"❌ Błąd generowania CSV podsumowującego: {e}")
-                logger.error(f"Błąd generowania CSV podsumowującego: {e}")
+                logger.error("Błąd generowania CSV podsumowującego: %s", e)
                 raise HTTPException(status_code=500, detail=f"Błąd generowania CSV podsumowującego: {e}")
         
-        print(f"✅ Raport wygenerowany: {csv_path}")
-        logger.info(f"Raport wygenerowany: {csv_path}")
+        logger.info("Raport wygenerowany: %s", csv_path)
         
-        return FileResponse(
-            path=csv_path,
-            filename=csv_path.split('/')[-1],
-            media_type='text/csv'
-        )
+        return _report_response(Path(csv_path), request.headers.get('accept-encoding', ''))
         
-    except HTTPException:
+    except (HTTPException, WorkerPoolFull):
         raise
     except Exception as e:
-        print(f"❌ Błąd podczas generowania raportu: {e}")
-        logger.error(f"Błąd podczas generowania raportu: {e}")
+        logger.error("Błąd podczas generowania raportu: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/reports/list")
-async def list_reports():
-    """Zwraca listę dostępnych raportów"""
+def _list_reports() -> Dict:
+    """Skanuje katalog raportów (praca plikowa - w puli io)"""
     try:
         import os
         from datetime import datetime
@@ -318,41 +310,25 @@ async def list_reports():
         reports = []
         reports_dir = settings.reports_path
         
-        print(f"📂 Szukanie raportów w: {reports_dir.absolute()}")
-        logger.info(f"Szukanie raportów w: {reports_dir.absolute()}")
+        logger.debug("Szukanie raportów w: %s", reports_dir.absolute())
         
-        # Sprawdź czy katalog istnieje
+        # Katalog zniknął od rozstrzygnięcia (np. odmontowany wolumen) - sprawdź lokalizacje od nowa
         if not reports_dir.exists():
-            print(f"⚠️ Katalog raportów nie istnieje: {reports_dir.absolute()}")
-            logger.warning(f"Katalog raportów nie istnieje: {reports_dir.absolute()}")
-            # Utwórz katalog
-            try:
-                reports_dir.mkdir(parents=True, exist_ok=True)
-                print(f"✅ Utworzono katalog raportów: {reports_dir.absolute()}")
-                logger.info(f"Utworzono katalog raportów: {reports_dir.absolute()}")
-            except Exception as e:
-                print(f"❌ Nie można utworzyć katalogu raportów: {e}")
-                logger.error(f"Nie można utworzyć katalogu raportów: {e}")
-                # Fallback do lokalnego katalogu
-                fallback_dir = Path("reports")
-                if fallback_dir.exists():
-                    reports_dir = fallback_dir
-                    print(f"🔄 Używam fallback katalogu: {fallback_dir.absolute()}")
-                    logger.info(f"Używam fallback katalogu: {fallback_dir.absolute()}")
-                else:
-                    print(f"❌ Brak dostępnego katalogu raportów")
-                    logger.error(f"Brak dostępnego katalogu raportów")
-                    return {
-                        "reports": [],
-                        "total_count": 0,
-                        "reports_directory": "brak dostępu",
-                        "error": "Nie można uzyskać dostępu do katalogu raportów"
-                    }
-        
-        # Listuj pliki CSV
-        csv_files = list(reports_dir.glob("*.csv"))
-        print(f"📄 Znaleziono {len(csv_files)} plików CSV")
-        logger.info(f"📄 Znaleziono {len(csv_files)} plików CSV")
+            logger.warning("Katalog raportów nie istnieje: %s", reports_dir.absolute())
+            storage_locations.invalidate('reports')
+            reports_dir = settings.reports_path
+            if not reports_dir.exists():
+                logger.error("Brak dostępnego katalogu raportów")
+                return {
+                    "reports": [],
+                    "total_count": 0,
+                    "reports_directory": "brak dostępu",
+                    "error": "Nie można uzyskać dostępu do katalogu raportów"
+                }
+        
+        # Listuj pliki CSV (także skompresowane .csv.gz / .csv.zst)
+        csv_files = glob_reports(reports_dir)
+        logger.info("📄 Znaleziono %s plików CSV", len(csv_files))
         
         for file_path in csv_files:
             try:
@@ -366,10 +342,10 @@ async def list_reports():
                 if 'report_' in filename and '.csv' in filename:
                     try:
                         # Wyciągnij datę z nazwy pliku
-                        date_part = filename.split('_')[-1].replace('.csv', '')
+                        date_part = report_stem(filename).split('_')[-1]
                         if len(date_part) == 10 and date_part.count('-') == 2:  # format YYYY-MM-DD
                             file_date = datetime.strptime(date_part, '%Y-%m-%d')
-                            print(f"   📅 Data z nazwy pliku {filename}: {file_date.strftime('%Y-%m-%d')}")
+                            logger.debug("   📅 Data z nazwy pliku %s: %s", filename, file_date.strftime('%Y-%m-%d'))
                     except ValueError:
                         pass
                 
@@ -377,11 +353,11 @@ async def list_reports():
                 if file_date:
                     created_time = file_date.timestamp()
                     created_date = file_date.isoformat()
-                    print(f"   📄 {filename} - data z nazwy: {file_date.strftime('%Y-%m-%d')}")
+                    logger.debug("   📄 %s - data z nazwy: %s", filename, file_date.strftime('%Y-%m-%d'))
                 else:
                     created_time = stats.st_ctime
                     created_date = datetime.fromtimestamp(stats.st_ctime).isoformat()
-                    print(f"   📄 {filename} - data systemowa: {datetime.fromtimestamp(stats.st_ctime).strftime('%Y-%m-%d %H:%M:%S')}")
+                    logger.debug("   📄 %s - data systemowa: %s", filename, datetime.fromtimestamp(stats.st_ctime).strftime('%Y-%m-%d %H:%M:%S'))
                 
                 reports.append({
                     'filename': filename,
@@ -392,14 +368,12 @@ async def list_reports():
                 })
                 
             except Exception as e:
-                print(f"   ❌ Błąd podczas czytania {file_path.name}: {e}")
-                logger.error(f"Błąd podczas czytania {file_path.name}: {e}")
+                logger.error("Błąd podczas czytania %s: %s", file_path.name, e)
         
         # Sortuj po dacie utworzenia (najnowsze pierwsze)
         sorted_reports = sorted(reports, key=lambda x: x['created'], reverse=True)
         
-        print(f"✅ Zwracam {len(sorted_reports)} raportów")
-        logger.info(f"✅ Zwracam {len(sorted_reports)} raportów")
+        logger.info("✅ Zwracam %s raportów", len(sorted_reports))
         
         return {
             "reports": sorted_reports,
@@ -408,30 +382,35 @@ async def list_reports():
         }
         
     except Exception as e:
-        print(f"❌ Błąd podczas listowania raportów: {e}")
-        logger.error(f"❌ Błąd podczas listowania raportów: {e}")
+        logger.error("❌ Błąd podczas listowania raportów: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/reports/list")
+async def list_reports():
+    """Zwraca listę dostępnych raportów"""
+    return await run_io(_list_reports)
+
+
 @router.get("/reports/download/{filename}")
-async def download_report(filename: str):
-    """Pobiera konkretny raport"""
+async def download_report(filename: str, request: Request):
+    """Pobiera konkretny raport (report_X_DATA.csv także wtedy, gdy jest zapisany jako .csv.gz / .csv.zst)"""
     try:
-        file_path = settings.reports_path / filename
+        stem, suffix = split_report_name(filename)
+        if suffix:
+            file_path = await run_io(find_report, settings.reports_path, stem)
+        else:
+            file_path = settings.reports_path / filename
         
-        if not file_path.exists():
+        if file_path is None or not file_path.exists():
             raise HTTPException(status_code=404, detail="Raport nie istnieje")
         
-        return FileResponse(
-            path=str(file_path),
-            filename=filename,
-            media_type='text/csv'
-        )
+        return _report_response(file_path, request.headers.get('accept-encoding', ''))
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Błąd podczas pobierania raportu: {e}")
+        logger.error("Błąd podczas pobierania raportu: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -444,7 +423,7 @@ async def get_status():
                 scheduler_running=False,
                 channels_count=0,
                 categories=[],
-                quota_usage={"used": 0, "limit": 10000, "percentage": 0.0},
+                quota_usage={"used": 0, "limit": 10000, "percentage": 0.0, "keys": []},
                 next_report=None
             )
             
@@ -464,7 +443,30 @@ async def get_status():
         )
         
     except Exception as e:
-        logger.error(f"Błąd podczas pobierania statusu: {e}")
+        logger.error("Błąd podczas pobierania statusu: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/quota/plan")
+async def get_quota_plan(days_back: Optional[int] = None, nightly: bool = True):
+    """
+    Zwraca plan quota dla przebiegu raportowania (nic nie jest pobierane).
+    
+    nightly=True zakłada pełny dzienny limit (nocne zadanie resetuje quota),
+    nightly=False - pozostałą dziś quota (ręczne generowanie raportu).
+    """
+    try:
+        if not task_scheduler:
+            raise HTTPException(status_code=500, detail="Scheduler nie jest dostępny")
+        
+        available = None
+        if nightly:
+            available = task_scheduler.youtube_client.quota_limit - settings.quota_reserve
+        return task_scheduler.plan_run(days_back or settings.days_back, available)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Błąd podczas planowania quota: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -477,7 +479,7 @@ async def start_scheduler():
         task_scheduler.start()
         return {"message": "Scheduler uruchomiony"}
     except Exception as e:
-        logger.error(f"Błąd podczas uruchamiania schedulera: {e}")
+        logger.error("Błąd podczas uruchamiania schedulera: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -490,7 +492,7 @@ async def stop_scheduler():
         task_scheduler.stop()
         return {"message": "Scheduler zatrzymany"}
     except Exception as e:
-        logger.error(f"Błąd podczas zatrzymywania schedulera: {e}")
+        logger.error("Błąd podczas zatrzymywania schedulera: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/scheduler/run-ranking-analysis")
@@ -504,7 +506,7 @@ async def run_ranking_analysis():
         await task_scheduler.daily_ranking_analysis_task()
         return {"message": "Analiza rankingowa uruchomiona pomyślnie"}
     except Exception as e:
-        logger.error(f"Błąd podczas uruchamiania analizy rankingowej: {e}")
+        logger.error("Błąd podczas uruchamiania analizy rankingowej: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -515,7 +517,7 @@ async def get_cache_stats():
         cache_stats = task_scheduler.get_cache_stats()
         return cache_stats
     except Exception as e:
-        logger.error(f"Błąd podczas pobierania statystyk cache: {e}")
+        logger.error("Błąd podczas pobierania statystyk cache: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -526,7 +528,7 @@ async def cleanup_cache():
         cleaned_count = task_scheduler.cleanup_cache()
         return {"message": f"Usunięto {cleaned_count} przestarzałych wpisów z cache"}
     except Exception as e:
-        logger.error(f"Błąd podczas czyszczenia cache: {e}")
+        logger.error("Błąd podczas czyszczenia cache: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -540,7 +542,7 @@ async def clear_all_data():
         task_scheduler.state_manager.clear_all_data()
         return {"message": "Wszystkie dane zostały wyczyszczone"}
     except Exception as e:
-        logger.error(f"Błąd podczas czyszczenia danych: {e}")
+        logger.error("Błąd podczas czyszczenia danych: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -554,7 +556,7 @@ async def get_data_stats():
         stats = task_scheduler.state_manager.get_data_stats()
         return stats
     except Exception as e:
-        logger.error(f"Błąd podczas pobierania statystyk danych: {e}")
+        logger.error("Błąd podczas pobierania statystyk danych: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -624,7 +626,7 @@ async def debug_json_files():
             }
         }
     except Exception as e:
-        logger.error(f"Błąd podczas debugowania plików JSON: {e}")
+        logger.error("Błąd podczas debugowania plików JSON: %s", e)
         raise HTTPException(status_code=500, detail=str(e)) 
 
 
@@ -662,7 +664,7 @@ async def debug_reports():
         # Listuj pliki
         csv_files = []
         if exists and can_read:
-            for file_path in reports_dir.glob("*.csv"):
+            for file_path in glob_reports(reports_dir):
                 try:
                     stats = os.stat(file_path)
                     csv_files.append({
@@ -687,11 +689,12 @@ async def debug_reports():
             },
             "csv_files": csv_files,
             "total_csv_files": len(csv_files),
-            "railway_volume_path": os.getenv("RAILWAY_VOLUME_PATH", "Not set")
+            "railway_volume_path": os.getenv("RAILWAY_VOLUME_PATH", "Not set"),
+            "storage_locations": storage_locations.status()
         }
         
     except Exception as e:
-        logger.error(f"Błąd podczas debugowania raportów: {e}")
+        logger.error("Błąd podczas debugowania raportów: %s", e)
         raise HTTPException(status_code=500, detail=str(e)) 
 
 
@@ -721,7 +724,7 @@ async def debug_environment():
         }
         
     except Exception as e:
-        logger.error(f"Błąd podczas debugowania zmiennych środowiskowych: {e}")
+        logger.error("Błąd podczas debugowania zmiennych środowiskowych: %s", e)
         raise HTTPException(status_code=500, detail=str(e)) 
 
 
@@ -766,7 +769,7 @@ async def test_data_persistence():
         }
         
     except Exception as e:
-        logger.error(f"Błąd podczas testowania trwałości danych: {e}")
+        logger.error("Błąd podczas testowania trwałości danych: %s", e)
         raise HTTPException(status_code=500, detail=str(e)) 
 
 
@@ -815,7 +818,7 @@ async def check_data_persistence():
         }
         
     except Exception as e:
-        logger.error(f"Błąd podczas sprawdzania trwałości danych: {e}")
+        logger.error("Błąd podczas sprawdzania trwałości danych: %s", e)
         raise HTTPException(status_code=500, detail=str(e)) 
 
 
@@ -888,7 +891,7 @@ async def debug_persistent_storage():
         }
         
     except Exception as e:
-        logger.error(f"Błąd podczas debugowania trwałego katalogu: {e}")
+        logger.error("Błąd podczas debugowania trwałego katalogu: %s", e)
         raise HTTPException(status_code=500, detail=str(e)) 
 
 
@@ -982,7 +985,7 @@ async def debug_channel_validation():
         }
         
     except Exception as e:
-        logger.error(f"Błąd podczas debugowania walidacji kanałów: {e}")
+        logger.error("Błąd podczas debugowania walidacji kanałów: %s", e)
         raise HTTPException(status_code=500, detail=str(e)) 
 
 
@@ -1068,7 +1071,7 @@ async def debug_volume_config():
         }
         
     except Exception as e:
-        logger.error(f"Błąd podczas debugowania konfiguracji volume: {e}")
+        logger.error("Błąd podczas debugowania konfiguracji volume: %s", e)
         raise HTTPException(status_code=500, detail=str(e)) 
 
 
@@ -1108,8 +1111,7 @@ async def rename_old_format_reports():
         csv_generator = CSVGenerator()
         result = csv_generator.rename_old_reports()
         
-        print(f"🔄 API: Przemianowanie zakończone - {result['message']}")
-        logger.info(f"Przemianowanie raportów: {result['message']}")
+        logger.info("Przemianowanie raportów: %s", result['message'])
         
         return {
             "success": True,
@@ -1121,21 +1123,17 @@ async def rename_old_format_reports():
         
     except Exception as e:
         error_msg = f"Błąd podczas przemianowania raportów: {e}"
-        print(f"❌ API: {error_msg}")
         logger.error(error_msg)
         raise HTTPException(status_code=500, detail=error_msg) 
 
 
-@router.post("/trends/analyze-all")
-async def analyze_all_csvs():
-    """
-    Endpoint do ręcznego uruchomienia analizy wszystkich istniejących plików CSV.
-    """
+def _analyze_all_csvs() -> Dict:
+    """Wczytuje wszystkie pliki CSV z katalogu raportów (w puli io)"""
     try:
         logger.info("Ręczne uruchomienie analizy wszystkich plików CSV")
         
         # Sprawdź czy katalog raportów istnieje
-        reports_dir = "/mnt/volume/reports"
+        reports_dir = str(settings.reports_path)
         if not os.path.exists(reports_dir):
             return {
                 "message": "Katalog raportów nie istnieje",
@@ -1150,10 +1148,10 @@ async def analyze_all_csvs():
         # Znajdź wszystkie pliki CSV
         csv_files = []
         for file in os.listdir(reports_dir):
-            if file.endswith('.csv'):
+            if is_report_file(file):
                 csv_files.append(file)
         
-        logger.info(f"Znaleziono {len(csv_files)} plików CSV: {csv_files}")
+        logger.info("Znaleziono %s plików CSV: %s", len(csv_files), csv_files)
         
         if not csv_files:
             return {
@@ -1174,7 +1172,7 @@ async def analyze_all_csvs():
         for csv_file in csv_files:
             try:
                 file_path = os.path.join(reports_dir, csv_file)
-                logger.info(f"Przetwarzam plik: {csv_file}")
+                logger.info("Przetwarzam plik: %s", csv_file)
                 
                 # Wczytaj plik CSV
                 import pandas as pd
@@ -1191,7 +1189,7 @@ async def analyze_all_csvs():
                 
                 processed_files.append(analysis_result)
                 successful_files.append(csv_file)
-                logger.info(f"Pomyślnie przetworzono: {csv_file} ({len(df)} wierszy)")
+                logger.info("Pomyślnie przetworzono: %s (%s wierszy)", csv_file, len(df))
                 
             except Exception as e:
                 error_msg = f"Błąd podczas przetwarzania {csv_file}: {str(e)}"
@@ -1207,7 +1205,7 @@ async def analyze_all_csvs():
             "errors": errors
         }
         
-        logger.info(f"Analiza zakończona: {len(processed_files)} przetworzonych, {len(successful_files)} pomyślnie")
+        logger.info("Analiza zakończona: %s przetworzonych, %s pomyślnie", len(processed_files), len(successful_files))
         
         return {
             "message": "Analiza wszystkich plików CSV zakończona",
@@ -1215,20 +1213,25 @@ async def analyze_all_csvs():
         }
         
     except Exception as e:
-        logger.error(f"Błąd podczas analizy wszystkich CSV: {e}")
+        logger.error("Błąd podczas analizy wszystkich CSV: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/trends/{category_name}/reanalyze")
-async def reanalyze_category(category_name: str, date: str = None):
+@router.post("/trends/analyze-all")
+async def analyze_all_csvs():
     """
-    Endpoint do wymuszenia ponownej analizy kategorii.
+    Endpoint do ręcznego uruchomienia analizy wszystkich istniejących plików CSV.
     """
+    return await run_io(_analyze_all_csvs)
+
+
+def _reanalyze_category(category_name: str, date: str = None) -> Dict:
+    """Wczytuje pliki CSV kategorii (w puli io)"""
     try:
-        logger.info(f"Wymuszenie ponownej analizy dla kategorii {category_name} {date or 'dzisiaj'}")
+        logger.info("Wymuszenie ponownej analizy dla kategorii %s %s", category_name, date or 'dzisiaj')
         
         # Sprawdź czy katalog raportów istnieje
-        reports_dir = "/mnt/volume/reports"
+        reports_dir = str(settings.reports_path)
         if not os.path.exists(reports_dir):
             raise HTTPException(
                 status_code=400, 
@@ -1239,7 +1242,7 @@ async def reanalyze_category(category_name: str, date: str = None):
         category_pattern = f"report_{category_name.upper()}_*.csv"
         csv_files = []
         for file in os.listdir(reports_dir):
-            if file.startswith(f"report_{category_name.upper()}_") and file.endswith('.csv'):
+            if file.startswith(f"report_{category_name.upper()}_") and is_report_file(file):
                 csv_files.append(file)
         
         if not csv_files:
@@ -1255,7 +1258,7 @@ async def reanalyze_category(category_name: str, date: str = None):
         for csv_file in csv_files:
             try:
                 file_path = os.path.join(reports_dir, csv_file)
-                logger.info(f"Przetwarzam plik kategorii: {csv_file}")
+                logger.info("Przetwarzam plik kategorii: %s", csv_file)
                 
                 # Wczytaj plik CSV
                 import pandas as pd
@@ -1272,10 +1275,10 @@ async def reanalyze_category(category_name: str, date: str = None):
                 }
                 
                 processed_files.append(analysis_result)
-                logger.info(f"Pomyślnie przeanalizowano {category_name}: {csv_file} ({len(df)} wierszy)")
+                logger.info("Pomyślnie przeanalizowano %s: %s (%s wierszy)", category_name, csv_file, len(df))
                 
             except Exception as e:
-                logger.error(f"Błąd podczas analizy {category_name} {csv_file}: {e}")
+                logger.error("Błąd podczas analizy %s %s: %s", category_name, csv_file, e)
                 raise HTTPException(
                     status_code=400, 
                     detail=f"Nie udało się przeanalizować {category_name}: {str(e)}"
@@ -1290,10 +1293,18 @@ async def reanalyze_category(category_name: str, date: str = None):
         }
         
     except Exception as e:
-        logger.error(f"Błąd podczas ponownej analizy {category_name}: {e}")
+        logger.error("Błąd podczas ponownej analizy %s: %s", category_name, e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/trends/{category_name}/reanalyze")
+async def reanalyze_category(category_name: str, date: str = None):
+    """
+    Endpoint do wymuszenia ponownej analizy kategorii.
+    """
+    return await run_io(_reanalyze_category, category_name, date)
+
+
 @router.get("/trends/local-analysis/{category_name}")
 async def get_local_trend_analysis(category_name: str):
     """
@@ -1301,10 +1312,10 @@ async def get_local_trend_analysis(category_name: str):
     Wczytuje plik JSON wygenerowany przez lokalny analizator.
     """
     try:
-        logger.info(f"Pobieranie lokalnej analizy trendów dla kategorii {category_name}")
+        logger.info("Pobieranie lokalnej analizy trendów dla kategorii %s", category_name)
         
         # Ścieżka do pliku JSON z lokalnej analizy
-        json_file_path = f"/mnt/volume/reports/trend_analysis_{category_name.lower()}_latest.json"
+        json_file_path = str(settings.reports_path / f"trend_analysis_{category_name.lower()}_latest.json")
         
         if not os.path.exists(json_file_path):
             return {
@@ -1317,7 +1328,7 @@ async def get_local_trend_analysis(category_name: str):
         with open(json_file_path, 'r', encoding='utf-8') as f:
             analysis_data = json.load(f)
         
-        logger.info(f"Pomyślnie wczytano lokalną analizę: {len(analysis_data.get('reports', []))} raportów")
+        logger.info("Pomyślnie wczytano lokalną analizę: %s raportów", len(analysis_data.get('reports', [])))
         
         return {
             "message": f"Lokalna analiza trendów dla {category_name}",
@@ -1325,7 +1336,7 @@ async def get_local_trend_analysis(category_name: str):
         }
         
     except Exception as e:
-        logger.error(f"Błąd podczas wczytywania lokalnej analizy dla {category_name}: {e}")
+        logger.error("Błąd podczas wczytywania lokalnej analizy dla %s: %s", category_name, e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -1347,7 +1358,7 @@ async def upload_trend_analysis(category_name: str, file: UploadFile = File(...)
     Endpoint do przesyłania plików JSON z analizą trendów.
     """
     try:
-        logger.info(f"Przesyłanie analizy trendów dla kategorii {category_name}")
+        logger.info("Przesyłanie analizy trendów dla kategorii %s", category_name)
         
         # Sprawdź czy plik to JSON
         if not file.filename.endswith('.json'):
@@ -1357,10 +1368,7 @@ async def upload_trend_analysis(category_name: str, file: UploadFile = File(...)
             )
         
         # Sprawdź czy katalog reports istnieje
-        reports_dir = "/mnt/volume/reports"
-        if not os.path.exists(reports_dir):
-            os.makedirs(reports_dir, exist_ok=True)
-            logger.info(f"Utworzono katalog: {reports_dir}")
+        reports_dir = str(settings.reports_path)
         
         # Zapisz plik
         file_path = os.path.join(reports_dir, f"trend_analysis_{category_name.lower()}_latest.json")
@@ -1369,7 +1377,7 @@ async def upload_trend_analysis(category_name: str, file: UploadFile = File(...)
             content = await file.read()
             f.write(content)
         
-        logger.info(f"Pomyślnie zapisano analizę trendów: {file_path}")
+        logger.info("Pomyślnie zapisano analizę trendów: %s", file_path)
         
         return {
             "message": f"Analiza trendów dla {category_name} została przesłana",
@@ -1379,7 +1387,7 @@ async def upload_trend_analysis(category_name: str, file: UploadFile = File(...)
         }
         
     except Exception as e:
-        logger.error(f"Błąd podczas przesyłania analizy trendów: {e}")
+        logger.error("Błąd podczas przesyłania analizy trendów: %s", e)
         raise HTTPException(status_code=500, detail=str(e)) 
 
 
@@ -1390,7 +1398,7 @@ async def force_report_generation(category: str):
     Użyteczne do testowania i debugowania.
     """
     try:
-        logger.info(f"Wymuszam generowanie raportu dla kategorii: {category}")
+        logger.info("Wymuszam generowanie raportu dla kategorii: %s", category)
         
         # Pobierz kanały dla danej kategorii
         channels = task_scheduler.get_channels().get(category, [])
@@ -1398,63 +1406,39 @@ async def force_report_generation(category: str):
         if not channels:
             return {"detail": f"Nie znaleziono kanałów dla kategorii {category}"}
         
-        # Pobierz dane z YouTube API
-        all_videos = []
-        for channel in channels:
-            try:
-                videos = await task_scheduler.get_channel_videos(
-                    channel['id'], 
-                    settings.days_back
-                )
-                
-                # Dodaj informacje o kanale do każdego filmu
-                for video in videos:
-                    video['channel_title'] = channel['title']
-                    video['channel_id'] = channel['id']
-                
-                all_videos.extend(videos)
-                logger.info(f"Pobrano {len(videos)} filmów z kanału {channel['title']}")
-                
-            except Exception as e:
-                logger.error(f"Błąd podczas pobierania filmów z kanału {channel['title']}: {e}")
+        # Pobierz dane z YouTube API (kanały równolegle)
+        category_videos = await task_scheduler.collect_category_videos(
+            {category: channels},
+            settings.days_back
+        )
+        all_videos = category_videos.get(category, [])
         
         if not all_videos:
             return {"detail": f"Nie udało się pobrać filmów dla kategorii {category}"}
         
         # Generuj raport CSV
         csv_generator = CSVGenerator()
-        csv_path = csv_generator.generate_csv(all_videos, category)
-        logger.info(f"Wygenerowano raport dla kategorii {category}: {csv_path}")
+        csv_path = await run_io(csv_generator.generate_csv, all_videos, category)
+        logger.info("Wygenerowano raport dla kategorii %s: %s", category, csv_path)
         
         # Generuj ranking (jeśli moduł trendów jest aktywny)
         ranking_path = None
         if os.environ.get("ENABLE_TREND", "false").lower() == "true":
             try:
-                # UŻYWAJ NOWEGO SYSTEMU zamiast starego ranking_manager
-                from app.trend.services.ranking_analyzer import RankingAnalyzer
-                import pandas as pd
-                
-                print(f"🔄 Generowanie rankingu dla {category} - używam nowego systemu...")
-                
-                # Wczytaj dane z wygenerowanego CSV
-                df = pd.read_csv(csv_path)
-                csv_videos = df.to_dict('records')
+                # UŻYWAJ NOWEGO SYSTEMU zamiast starego ranking_manager (analiza w puli procesów)
+                from app.trend.services.ranking_analyzer import run_ranking_analysis
                 
-                # Użyj nowego systemu RankingAnalyzer
-                analyzer = RankingAnalyzer()
-                success = analyzer.run_analysis_for_category(category)
+                logger.debug("🔄 Generowanie rankingu dla %s - używam nowego systemu...", category)
+                success = await run_cpu(run_ranking_analysis, category, str(settings.reports_path))
                 
                 if success:
                     ranking_path = f"data/rankings/ranking_{category.upper()}.json"
-                    logger.info(f"Wygenerowano ranking dla kategorii {category} nowym systemem")
-                    print(f"✅ Ranking dla {category} wygenerowany nowym systemem")
+                    logger.info("Wygenerowano ranking dla kategorii %s nowym systemem", category)
                 else:
-                    logger.warning(f"Nie udało się wygenerować rankingu nowym systemem dla {category}")
-                    print(f"⚠️ Błąd generowania rankingu nowym systemem dla {category}")
+                    logger.warning("Nie udało się wygenerować rankingu nowym systemem dla %s", category)
                     
             except Exception as e:
-                logger.warning(f"Nie udało się wygenerować rankingu: {e}")
-                print(f"❌ Błąd generowania rankingu: {e}")
+                logger.warning("Nie udało się wygenerować rankingu: %s", e)
         
         return {
             "message": f"Raport dla kategorii {category} został wygenerowany pomyślnie",
@@ -1465,7 +1449,7 @@ async def force_report_generation(category: str):
         }
         
     except Exception as e:
-        logger.error(f"Błąd podczas wymuszonego generowania raportu dla {category}: {e}")
+        logger.error("Błąd podczas wymuszonego generowania raportu dla %s: %s", category, e)
         return {"detail": f"Błąd podczas generowania raportu: {str(e)}"}
 
 @router.post("/force-ranking/{category}")
@@ -1474,23 +1458,19 @@ async def force_ranking_regeneration(category: str):
     Wymusza regenerację rankingu dla danej kategorii używając najnowszych danych CSV i nowej logiki.
     """
     try:
-        logger.info(f"Wymuszam regenerację rankingu dla kategorii: {category}")
-        print(f"🔄 Wymuszam regenerację rankingu dla {category} - używam nowego systemu...")
+        logger.info("Wymuszam regenerację rankingu dla kategorii: %s", category)
         
         # Sprawdź czy moduł trendów jest aktywny
         if os.environ.get("ENABLE_TREND", "false").lower() != "true":
             return {"detail": "Moduł trendów nie jest aktywny"}
         
-        # UŻYWAJ NOWEGO SYSTEMU RankingAnalyzer zamiast starego ranking_manager
-        from app.trend.services.ranking_analyzer import RankingAnalyzer
+        # UŻYWAJ NOWEGO SYSTEMU RankingAnalyzer zamiast starego ranking_manager (w puli procesów)
+        from app.trend.services.ranking_analyzer import run_ranking_analysis
         
-        # Uruchom analizę dla kategorii używając nowego systemu
-        analyzer = RankingAnalyzer()
-        success = analyzer.run_analysis_for_category(category)
+        success = await run_cpu(run_ranking_analysis, category, str(settings.reports_path))
         
         if success:
-            logger.info(f"Ranking dla {category} został zregenerowany nowym systemem")
-            print(f"✅ Ranking dla {category} zregenerowany nowym systemem")
+            logger.info("Ranking dla %s został zregenerowany nowym systemem", category)
             
             return {
                 "message": f"Ranking dla kategorii {category} został zregenerowany nowym systemem",
@@ -1500,8 +1480,7 @@ async def force_ranking_regeneration(category: str):
                 "note": "Nowa logika: analiza z kilku najnowszych raportów CSV"
             }
         else:
-            logger.warning(f"Nie udało się zregenerować rankingu nowym systemem dla {category}")
-            print(f"⚠️ Błąd regeneracji rankingu nowym systemem dla {category}")
+            logger.warning("Nie udało się zregenerować rankingu nowym systemem dla %s", category)
             
             return {
                 "detail": f"Błąd podczas regeneracji rankingu nowym systemem dla {category}",
@@ -1511,8 +1490,7 @@ async def force_ranking_regeneration(category: str):
             }
             
     except Exception as e:
-        logger.error(f"Błąd podczas regeneracji rankingu dla {category}: {e}")
-        print(f"❌ Błąd regeneracji rankingu: {e}")
+        logger.error("Błąd podczas regeneracji rankingu dla %s: %s", category, e)
         return {
             "detail": f"Błąd podczas regeneracji rankingu: {str(e)}",
             "category": category,
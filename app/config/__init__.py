@@ -1,3 +1,3 @@
-from .settings import settings
+from .settings import settings, storage_locations
 
-__all__ = ["settings"] 
\ No newline at end of file
+__all__ = ["settings", "storage_locations"]
@@ -0,0 +1,66 @@
+try:
+    import atexit
+    import logging
+    import queue
+    from logging.handlers import QueueHandler, QueueListener
+    from typing import Optional
+except ImportError as e:
+    print(f"❌ Błąd importu w logging setup: {e}")
+    raise
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging(level: str = "INFO", log_file: Optional[str] = None) -> QueueListener:
+    """
+    Konfiguruje logowanie aplikacji z nieblokującym zapisem.
+
+    Root logger ma tylko QueueHandler: wywołanie loggera w pętli zdarzeń wkłada
+    rekord do kolejki, a zapis na stdout i do pliku robi wątek QueueListener.
+    Poziom (LOG_LEVEL) odcina rekordy przed formatowaniem, więc logger.debug()
+    z argumentami %s w gorących ścieżkach nic nie kosztuje przy INFO.
+
+    Wywołanie ponowne zwraca już działający listener.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    handlers = [logging.StreamHandler()]
+    file_error = None
+    if log_file:
+        try:
+            handlers.append(logging.FileHandler(log_file))
+        except OSError as e:
+            file_error = e  # Tylko konsola - zgłoszone po starcie listenera
+    formatter = logging.Formatter(LOG_FORMAT)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+    if file_error is not None:
+        logging.getLogger(__name__).warning("Brak logowania do pliku %s: %s", log_file, file_error)
+    return _listener
+
+
+def stop_logging():
+    """Zapisuje rekordy z kolejki i zatrzymuje wątek zapisu"""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
@@ -1,23 +1,38 @@
 try:
+    from pydantic import field_validator
     from pydantic_settings import BaseSettings
-    from typing import List
-    import os
+    from typing import List, Union
+    import logging
     from pathlib import Path
-    
-    print("✅ Wszystkie importy w config udane")
+    from .storage import StorageLocations
 except ImportError as e:
     print(f"❌ Błąd importu w config: {e}")
     import traceback
     traceback.print_exc()
     raise
 
+logger = logging.getLogger(__name__)
+
 
 class Settings(BaseSettings):
     """Konfiguracja aplikacji z zmiennych środowiskowych"""
     
     # YouTube API settings
     youtube_api_key: str = ""
+    # Dodatkowe klucze (osobny projekt = osobna dzienna quota): JSON ["k1","k2"] albo k1,k2
+    # (Union ze str - pydantic-settings nie odrzuca wartości, która nie jest JSON-em)
+    youtube_api_keys: Union[List[str], str] = []
+    youtube_quota_per_key: int = 10000  # Dzienny limit quota jednego klucza
     days_back: int = 3  # Przywracam oryginalne ustawienie - 3 dni wstecz
+    youtube_max_concurrency: int = 8  # Maks. liczba kanałów pobieranych równolegle
+    video_metadata_ttl_hours: int = 168  # Cache tytułów, opisów, czasu trwania (7 dni)
+    video_stats_ttl_hours: int = 6  # Cache wyświetleń, polubień, komentarzy
+    youtube_request_timeout: float = 30.0  # Limit czasu pojedynczego zapytania (s)
+    youtube_max_retries: int = 4  # Ponowienia przy 5xx / rateLimitExceeded / timeout
+    youtube_hedge_after: float = 0.0  # Zapytanie zapasowe po N s bez odpowiedzi (0 = wyłączone)
+    quota_flush_units: int = 50  # Maks. zaniżenie zapisanej quota po awarii
+    quota_flush_interval_seconds: int = 60  # Co ile sekund zapisywać pełny stan quota
+    quota_reserve: int = 200  # Quota zostawiana poza planem przebiegu (ręczne akcje)
     
     # FastAPI
     secret_key: str
@@ -31,11 +46,20 @@ class Settings(BaseSettings):
     # Scheduler
     scheduler_hour: int = 1
     scheduler_minute: int = 0
+    leader_retry_seconds: int = 30  # Co ile sekund worker bez roli lidera próbuje ją przejąć
     timezone: str = "Europe/Warsaw"
     
+    # Pule wykonawcze (praca blokująca poza pętlą zdarzeń)
+    io_workers: int = 8  # Wątki dla operacji plikowych (glob, odczyt JSON, zapis CSV)
+    cpu_workers: int = 2  # Procesy dla analiz pandas (rankingi, trendy)
+    worker_queue_size: int = 16  # Maks. liczba zadań czekających w kolejce puli
+    
     # Storage
+    state_backend: str = "json"  # json (pliki) albo sqlite (state.db, migracja z JSON przy pierwszym starcie)
     data_dir: str = "data"
     reports_dir: str = "reports"
+    report_compression: str = ""  # gzip (.csv.gz) albo zstd (.csv.zst, pakiet zstandard); puste = zwykłe .csv
+    report_compact_text: bool = False  # Opisy i tagi raz w report_texts.db, w raporcie tylko skróty
     backup_dir: str = "backups"
     
     # CORS
@@ -49,51 +73,23 @@ class Settings(BaseSettings):
         env_file = ".env"
         case_sensitive = False
     
+    @field_validator('youtube_api_keys', mode='before')
+    @classmethod
+    def split_api_keys(cls, value):
+        """YOUTUBE_API_KEYS=k1,k2 (lista po przecinkach) obok listy JSON"""
+        if isinstance(value, str):
+            return [key.strip() for key in value.split(',') if key.strip()]
+        return value
+    
     @property
     def data_path(self) -> Path:
-        """Ścieżka do katalogu z danymi"""
-        # Użyj Railway Volume Path jeśli dostępny, w przeciwnym razie lokalny katalog
-        railway_volume = os.getenv("RAILWAY_VOLUME_MOUNT_PATH")
-        if railway_volume:
-            try:
-                # Sprawdź czy katalog jest zapisywalny
-                test_path = Path(railway_volume) / "data"
-                test_path.mkdir(parents=True, exist_ok=True)
-                # Sprawdź czy można zapisać plik testowy
-                test_file = test_path / ".test_write"
-                test_file.write_text("test")
-                test_file.unlink()  # Usuń plik testowy
-                print(f"✅ Railway volume dostępny i zapisywalny: {railway_volume}")
-                return test_path
-            except Exception as e:
-                print(f"⚠️ Railway volume niedostępny lub tylko do odczytu: {e}")
-                # Fallback do lokalnego katalogu
-                return Path(self.data_dir)
-        else:
-            return Path(self.data_dir)
+        """Ścieżka do katalogu z danymi (rozstrzygana raz - patrz StorageLocations)"""
+        return storage_locations.data
     
     @property
     def reports_path(self) -> Path:
-        """Ścieżka do katalogu z raportami"""
-        # Użyj Railway Volume Path jeśli dostępny, w przeciwnym razie lokalny katalog
-        railway_volume = os.getenv("RAILWAY_VOLUME_MOUNT_PATH")
-        if railway_volume:
-            try:
-                # Sprawdź czy katalog jest zapisywalny
-                test_path = Path(railway_volume) / "reports"
-                test_path.mkdir(parents=True, exist_ok=True)
-                # Sprawdź czy można zapisać plik testowy
-                test_file = test_path / ".test_write"
-                test_file.write_text("test")
-                test_file.unlink()  # Usuń plik testowy
-                print(f"✅ Railway reports volume dostępny i zapisywalny: {railway_volume}")
-                return test_path
-            except Exception as e:
-                print(f"⚠️ Railway reports volume niedostępny lub tylko do odczytu: {e}")
-                # Fallback do lokalnego katalogu
-                return Path(self.reports_dir)
-        else:
-            return Path(self.reports_dir)
+        """Ścieżka do katalogu z raportami (rozstrzygana raz - patrz StorageLocations)"""
+        return storage_locations.reports
     
     @property
     def backup_path(self) -> Path:
@@ -103,28 +99,29 @@ class Settings(BaseSettings):
     def create_directories(self):
         """Tworzy wymagane katalogi"""
         try:
-            print(f"📁 Tworzenie katalogów...")
+            logger.debug("📁 Tworzenie katalogów...")
             
             # Katalog danych
             self.data_path.mkdir(exist_ok=True)
-            print(f"✅ Katalog danych: {self.data_path.absolute()}")
+            logger.debug("✅ Katalog danych: %s", self.data_path.absolute())
             
             # Katalog raportów (trwały)
             self.reports_path.mkdir(parents=True, exist_ok=True)
-            print(f"✅ Katalog raportów: {self.reports_path.absolute()}")
+            logger.debug("✅ Katalog raportów: %s", self.reports_path.absolute())
             
             # Katalog backupów
             self.backup_path.mkdir(exist_ok=True)
-            print(f"✅ Katalog backupów: {self.backup_path.absolute()}")
+            logger.debug("✅ Katalog backupów: %s", self.backup_path.absolute())
             
             # Katalog logów
             Path("logs").mkdir(exist_ok=True)
-            print(f"✅ Katalog logów: logs/")
+            logger.debug("✅ Katalog logów: logs/")
             
         except Exception as e:
-            print(f"❌ Błąd podczas tworzenia katalogów: {e}")
+            logger.error("Błąd podczas tworzenia katalogów: %s", e)
             raise
 
 
 # Instancja ustawień
-settings = Settings() 
\ No newline at end of file
+settings = Settings()
+storage_locations = StorageLocations(settings) 
\ No newline at end of file
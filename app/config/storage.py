@@ -0,0 +1,109 @@
+try:
+    import logging
+    import os
+    import threading
+    from pathlib import Path
+    from typing import Dict, List, Optional
+except ImportError as e:
+    print(f"❌ Błąd importu w storage locations: {e}")
+    raise
+
+logger = logging.getLogger(__name__)
+
+# Domyślny punkt montowania wolumenu (używany, gdy istnieje, nawet bez zmiennych środowiskowych)
+DEFAULT_VOLUME = "/mnt/volume"
+
+
+class StorageLocations:
+    """
+    Jedno miejsce rozstrzygania katalogów danych i raportów.
+
+    Katalog jest sprawdzany (mkdir + plik testowy) raz, przy pierwszym użyciu,
+    a wynik trzymany w pamięci - kolejne odczyty settings.reports_path nie
+    dotykają systemu plików. Po błędzie zapisu wywołujący zgłasza invalidate(),
+    a następny odczyt sprawdza lokalizacje od nowa.
+
+    Kolejność kandydatów:
+        1. REPORTS_DIR / DATA_DIR (<RODZAJ>_DIR) - jawnie wskazany katalog inny niż
+           domyślny lokalny (./reports, ./data); wartość domyślna nie przesłania wolumenu
+        2. RAILWAY_VOLUME_MOUNT_PATH, RAILWAY_VOLUME_PATH - wolumen Railway
+        3. /mnt/volume - jeśli wolumen jest zamontowany
+        4. lokalny katalog z ustawień (reports_dir / data_dir, inne rodzaje: ./<rodzaj>)
+    """
+
+    KINDS = ('data', 'reports')
+    LOCAL_DIRS = {'data': 'data_dir', 'reports': 'reports_dir'}  # Pola Settings z lokalnym katalogiem
+
+    def __init__(self, settings):
+        self.settings = settings
+        self._lock = threading.Lock()
+        self._resolved: Dict[str, Path] = {}
+
+    def _candidates(self, kind: str) -> List[Path]:
+        candidates = []
+        explicit = os.getenv(f"{kind.upper()}_DIR")
+        # DATA_DIR=data (stary env.example) to tylko lokalny domyślny katalog, nie nadpisanie
+        if explicit and Path(explicit) != Path(kind):
+            candidates.append(Path(explicit))
+        for variable in ("RAILWAY_VOLUME_MOUNT_PATH", "RAILWAY_VOLUME_PATH"):
+            volume = os.getenv(variable)
+            if volume:
+                candidates.append(Path(volume) / kind)
+        if os.path.isdir(DEFAULT_VOLUME):
+            candidates.append(Path(DEFAULT_VOLUME) / kind)
+        local = Path(getattr(self.settings, self.LOCAL_DIRS[kind]) if kind in self.LOCAL_DIRS else kind)
+        return list(dict.fromkeys(candidates + [local]))
+
+    @staticmethod
+    def _is_writable(path: Path) -> bool:
+        try:
+            path.mkdir(parents=True, exist_ok=True)
+            test_file = path / ".test_write"
+            test_file.write_text("test")
+            test_file.unlink()
+            return True
+        except OSError as e:
+            logger.warning("Katalog niedostępny lub tylko do odczytu: %s - %s", path, e)
+            return False
+
+    def _resolve(self, kind: str) -> Path:
+        candidates = self._candidates(kind)
+        for path in candidates:
+            if self._is_writable(path):
+                logger.info("Katalog %s: %s", kind, path.absolute())
+                return path
+        # Nic nie jest zapisywalne - zwróć lokalny katalog, błąd wyjdzie przy zapisie
+        return candidates[-1]
+
+    def get(self, kind: str) -> Path:
+        """Katalog danego rodzaju (sprawdzany tylko przy pierwszym użyciu i po invalidate())"""
+        path = self._resolved.get(kind)
+        if path is None:
+            with self._lock:
+                path = self._resolved.get(kind)
+                if path is None:
+                    path = self._resolved[kind] = self._resolve(kind)
+        return path
+
+    @property
+    def data(self) -> Path:
+        return self.get('data')
+
+    @property
+    def reports(self) -> Path:
+        return self.get('reports')
+
+    def invalidate(self, kind: Optional[str] = None):
+        """Wymusza ponowne sprawdzenie lokalizacji (po błędzie zapisu)"""
+        with self._lock:
+            if kind is None:
+                self._resolved.clear()
+            else:
+                self._resolved.pop(kind, None)
+        logger.info("Ponowne sprawdzenie lokalizacji: %s", kind or 'wszystkie')
+
+    def status(self) -> Dict[str, Optional[str]]:
+        """Rozstrzygnięte katalogi (bez sprawdzania tych, których jeszcze nie użyto)"""
+        kinds = list(self.KINDS) + [kind for kind in self._resolved if kind not in self.KINDS]
+        return {kind: str(self._resolved[kind].absolute()) if kind in self._resolved else None
+                for kind in kinds}
@@ -3,58 +3,33 @@ try:
     from fastapi.middleware.cors import CORSMiddleware
     from fastapi.staticfiles import StaticFiles
     from fastapi.templating import Jinja2Templates
-    from fastapi.responses import HTMLResponse
+    from fastapi.responses import HTMLResponse, JSONResponse
     import logging
     from pathlib import Path
     import os
+    import asyncio
     from contextlib import asynccontextmanager
-    
-    print("✅ Wszystkie importy w main udane")
+    from typing import Optional
 except ImportError as e:
     print(f"❌ Błąd importu w main: {e}")
     import traceback
     traceback.print_exc()
     raise
 
-print("🚀🚀🚀 URUCHAMIAM NAJNOWSZĄ WERSJĘ Z 23 SIERPNIA - NOWY INTERFEJS! 🚀🚀🚀")
-
-# Załaduj zmienne środowiskowe z .env
+# Załaduj zmienne środowiskowe z .env (wynik logowany po konfiguracji logowania)
 try:
     from dotenv import load_dotenv
     load_dotenv()
-    print("✅ .env file loaded successfully")
+    dotenv_status = ".env file loaded successfully"
 except ImportError:
-    print("⚠️ python-dotenv not available, using system env vars")
-except Exception as e:
-    print(f"⚠️ Error loading .env: {e}")
-
-# DEBUG: Sprawdź zmienne środowiskowe
-print("🔍 DEBUG: Sprawdzam zmienne środowiskowe...")
-print(f"🔍 ENABLE_TREND = {os.environ.get('ENABLE_TREND', 'NOT_SET')}")
-print(f"🔍 PYTHONPATH = {os.environ.get('PYTHONPATH', 'NOT_SET')}")
-print(f"🔍 PWD = {os.environ.get('PWD', 'NOT_SET')}")
-print(f"🔍 Current working directory = {os.getcwd()}")
-
-# Log startowy z branch, SHA i konfiguracją
-try:
-    import subprocess
-    git_branch = subprocess.check_output(['git', 'rev-parse', '--abbrev-ref', 'HEAD'], text=True).strip()
-    git_sha = subprocess.check_output(['git', 'rev-parse', 'HEAD'], text=True).strip()[:8]
-    print(f"🚀 STARTUP: Branch={git_branch}, SHA={git_sha}, ENABLE_TREND={os.environ.get('ENABLE_TREND', 'NOT_SET')}")
+    dotenv_status = "python-dotenv not available, using system env vars"
 except Exception as e:
-    print(f"⚠️ Nie można pobrać informacji Git: {e}")
-    git_branch = "unknown"
-    git_sha = "unknown"
+    dotenv_status = f"Error loading .env: {e}"
 
 # Import z obsługą błędów
 try:
-    print("🔍 Importuję moduły aplikacji...")
     from .config import settings
-    print("✅ Config zaimportowany")
-    from .api import router
-    print("✅ API router zaimportowany")
-    from .scheduler import TaskScheduler
-    print("✅ TaskScheduler zaimportowany")
+    from .config.logging_setup import setup_logging
 except ImportError as e:
     print(f"❌ Błąd importu: {e}")
     import traceback
@@ -68,20 +43,12 @@ except ImportError as e:
             Path("logs").mkdir(exist_ok=True)
     
     settings = FallbackSettings()
-    router = None
-    TaskScheduler = None
+    setup_logging = None
 
-# Konfiguracja logowania
-try:
-    logging.basicConfig(
-        level=getattr(logging, settings.log_level),
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(settings.log_file),
-            logging.StreamHandler()
-        ]
-    )
-except Exception:
+# Konfiguracja logowania: kolejka + wątek zapisu (stdout i plik), poziom z LOG_LEVEL
+if setup_logging:
+    setup_logging(settings.log_level, settings.log_file)
+else:
     # Fallback - tylko console logging
     logging.basicConfig(
         level=getattr(logging, settings.log_level),
@@ -91,36 +58,110 @@ except Exception:
         ]
     )
 
+try:
+    from .api import router
+    from .scheduler import TaskScheduler
+    from .workers import WorkerPoolFull, run_cpu_wait, run_io_wait, shutdown_worker_pools
+except ImportError as e:
+    print(f"❌ Błąd importu: {e}")
+    import traceback
+    traceback.print_exc()
+    router = None
+    TaskScheduler = None
+
 logger = logging.getLogger(__name__)
 
-# Scheduler
-print("🔍 Inicjalizacja schedulera...")
-if TaskScheduler:
+logger.info("🚀 Uruchamiam Hook Boost Web")
+logger.debug("%s", dotenv_status)
+
+# DEBUG: Sprawdź zmienne środowiskowe
+logger.debug("ENABLE_TREND = %s", os.environ.get('ENABLE_TREND', 'NOT_SET'))
+logger.debug("PYTHONPATH = %s", os.environ.get('PYTHONPATH', 'NOT_SET'))
+logger.debug("PWD = %s", os.environ.get('PWD', 'NOT_SET'))
+logger.debug("Current working directory = %s", os.getcwd())
+
+# Log startowy z branch, SHA i konfiguracją
+try:
+    import subprocess
+    git_branch = subprocess.check_output(['git', 'rev-parse', '--abbrev-ref', 'HEAD'], text=True).strip()
+    git_sha = subprocess.check_output(['git', 'rev-parse', 'HEAD'], text=True).strip()[:8]
+    logger.info("🚀 STARTUP: Branch=%s, SHA=%s, ENABLE_TREND=%s", git_branch, git_sha, os.environ.get('ENABLE_TREND', 'NOT_SET'))
+except Exception as e:
+    logger.warning("Nie można pobrać informacji Git: %s", e)
+    git_branch = "unknown"
+    git_sha = "unknown"
+
+# Scheduler (stan, klient YouTube) tworzony w lifespan - import app.main nie dotyka plików danych
+scheduler = None
+ranking_warmup: Optional[asyncio.Task] = None
+
+
+def create_scheduler():
+    """Tworzy TaskScheduler, ładuje dane i przekazuje go do API (None, gdy niedostępny)"""
+    logger.debug("🔍 Inicjalizacja schedulera...")
+    if not TaskScheduler:
+        logger.error("TaskScheduler nie jest dostępny")
+        return None
     try:
-        scheduler = TaskScheduler()
-        print("✅ TaskScheduler zainicjalizowany pomyślnie")
+        instance = TaskScheduler()
+        logger.debug("✅ TaskScheduler zainicjalizowany pomyślnie")
     except Exception as e:
-        print(f"❌ Błąd inicjalizacji TaskScheduler: {e}")
+        logger.error("Błąd inicjalizacji TaskScheduler: %s", e)
         import traceback
         traceback.print_exc()
-        scheduler = None
-else:
-    print("❌ TaskScheduler nie jest dostępny")
-    scheduler = None
+        return None
+    
+    # Upewnij się, że dane są załadowane przed startem API
+    if instance.state_manager:
+        logger.debug("🔄 Wymuszanie załadowania danych przed startem API...")
+        try:
+            instance.state_manager.load_all_data()
+            logger.debug("✅ Dane załadowane przed startem API")
+        except Exception as e:
+            logger.warning("Błąd podczas ładowania danych: %s", e)
+    else:
+        logger.warning("State_manager niedostępny - dane nie zostaną załadowane")
+    
+    if router:
+        # Przekaż instancję schedulera do API
+        try:
+            from .api.routes import set_task_scheduler
+            set_task_scheduler(instance)
+            logger.debug("✅ Scheduler przekazany do API")
+        except ImportError as e:
+            logger.error("Nie można zaimportować set_task_scheduler: %s", e)
+    return instance
 
-print(f"📊 Status schedulera: {'✅ Dostępny' if scheduler else '❌ Niedostępny'}")
 
-# Upewnij się, że dane są załadowane przed startem API
-if scheduler and scheduler.state_manager:
-    print("🔄 Wymuszanie załadowania danych przed startem API...")
+def _missing_rankings(categories) -> list:
+    """Kategorie bez żadnego pliku rankingu w katalogu raportów"""
+    return [
+        category for category in categories
+        if not any(settings.reports_path.glob(f"ranking_{category.upper()}_*.json"))
+    ]
+
+
+async def warm_up_rankings(state_manager):
+    """Generuje rankingi kategorii (z kanałów state_manager), dla których po restarcie nie ma pliku rankingu"""
     try:
-        scheduler.state_manager.load_all_data()
-        print("✅ Dane załadowane przed startem API")
+        logger.debug("🔄 Sprawdzam czy rankingi istnieją po restarcie...")
+        from app.trend.services.ranking_analyzer import run_ranking_analysis
+        
+        missing = await run_io_wait(_missing_rankings, list(state_manager.get_channels().keys()))
+        for category in missing:
+            try:
+                logger.warning("Brak rankingów dla %s - generuję automatycznie nowym systemem...", category)
+                if await run_cpu_wait(run_ranking_analysis, category, str(settings.reports_path)):
+                    logger.debug("✅ Automatycznie wygenerowano ranking dla %s nowym systemem", category)
+                else:
+                    logger.warning("Błąd podczas generowania rankingu dla %s nowym systemem", category)
+            except Exception as e:
+                logger.warning("Błąd podczas sprawdzania rankingu dla %s: %s", category, e)
+        
+        logger.debug("✅ Sprawdzanie rankingów po restarcie zakończone (nowy system)")
     except Exception as e:
-        print(f"⚠️ Błąd podczas ładowania danych: {e}")
-        logger.warning(f"Błąd podczas ładowania danych: {e}")
-else:
-    print("⚠️ Scheduler lub state_manager niedostępny - dane nie zostaną załadowane")
+        logger.warning("Błąd podczas automatycznego generowania rankingów: %s", e)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -131,79 +172,41 @@ async def lifespan(app: FastAPI):
         # Utwórz wymagane katalogi
         try:
             settings.create_directories()
-            print("✅ Katalogi utworzone")
+            logger.debug("✅ Katalogi utworzone")
         except Exception as e:
-            print(f"⚠️ Błąd tworzenia katalogów: {e}")
-            logger.warning(f"Błąd tworzenia katalogów: {e}")
+            logger.warning("Błąd tworzenia katalogów: %s", e)
+        
+        # Moduł trendów i scheduler ładowane przy starcie, nie przy imporcie app.main
+        include_trend_router(app)
+        global scheduler
+        scheduler = create_scheduler()
         
         # Uruchom scheduler jeśli dostępny
         if scheduler:
-            print("🔄 Uruchamiam scheduler...")
+            logger.debug("🔄 Uruchamiam scheduler...")
             try:
                 success = scheduler.start()
                 if success:
-                    print("✅ Scheduler uruchomiony pomyślnie!")
+                    logger.debug("✅ Scheduler uruchomiony pomyślnie!")
                 else:
-                    print("⚠️ Scheduler nie uruchomił się, ale aplikacja będzie działać")
+                    logger.warning("Scheduler nie uruchomił się, ale aplikacja będzie działać")
             except Exception as e:
-                print(f"⚠️ Błąd uruchamiania schedulera: {e}")
-                logger.warning(f"Błąd uruchamiania schedulera: {e}")
+                logger.warning("Błąd uruchamiania schedulera: %s", e)
                 # Kontynuuj mimo błędu schedulera
         else:
-            print("ℹ️ Brak schedulera do uruchomienia")
+            logger.debug("ℹ️ Brak schedulera do uruchomienia")
         
-        # Automatycznie wygeneruj rankingi po restarcie jeśli nie istnieją
-        try:
-            print("🔄 Sprawdzam czy rankingi istnieją po restarcie...")
-            
-            # UŻYWAJ NOWEGO SYSTEMU RankingAnalyzer
-            from app.trend.services.ranking_analyzer import RankingAnalyzer
-            from app.storage.state_manager import state_manager
-            
-            # Sprawdź każdą kategorię
-            categories = state_manager.get_channels().keys()
-            for category in categories:
-                try:
-                    # Sprawdź czy istnieje ranking z nowego systemu
-                    from pathlib import Path
-                    from app.config.settings import settings
-                    
-                    base_path = settings.reports_path
-                    pattern = f"ranking_{category.upper()}_*.json"
-                    ranking_files = list(base_path.glob(pattern))
-                    
-                    if not ranking_files:
-                        print(f"⚠️ Brak rankingów dla {category} - generuję automatycznie nowym systemem...")
-                        
-                        # Użyj nowego systemu RankingAnalyzer
-                        analyzer = RankingAnalyzer()
-                        success = analyzer.run_analysis_for_category(category)
-                        
-                        if success:
-                            print(f"✅ Automatycznie wygenerowano ranking dla {category} nowym systemem")
-                        else:
-                            print(f"⚠️ Błąd podczas generowania rankingu dla {category} nowym systemem")
-                    else:
-                        print(f"✅ Ranking dla {category} już istnieje (nowy system)")
-                        
-                except Exception as e:
-                    print(f"⚠️ Błąd podczas sprawdzania rankingu dla {category}: {e}")
-                    logger.warning(f"Błąd podczas sprawdzania rankingu dla {category}: {e}")
-            
-            print("✅ Sprawdzanie rankingów po restarcie zakończone (nowy system)")
-            
-        except Exception as e:
-            print(f"⚠️ Błąd podczas automatycznego generowania rankingów: {e}")
-            logger.warning(f"Błąd podczas automatycznego generowania rankingów: {e}")
-            # Nie blokuj uruchamiania aplikacji
+        # Rankingi brakujące po restarcie generowane w tle - API odpowiada od razu
+        global ranking_warmup
+        if scheduler and scheduler.state_manager:
+            ranking_warmup = asyncio.create_task(warm_up_rankings(scheduler.state_manager))
         
         logger.info("✅ Aplikacja uruchomiona pomyślnie!")
         
         yield  # Aplikacja działa
         
     except Exception as e:
-        logger.error(f"❌ Błąd podczas uruchamiania aplikacji: {e}")
-        print(f"❌ Błąd podczas uruchamiania aplikacji: {e}")
+        logger.error("❌ Błąd podczas uruchamiania aplikacji: %s", e)
         import traceback
         traceback.print_exc()
         # Nie rzucaj błędu - pozwól aplikacji się uruchomić
@@ -212,18 +215,24 @@ async def lifespan(app: FastAPI):
         try:
             logger.info("🛑 Zatrzymywanie aplikacji...")
             
-            # Zatrzymaj scheduler jeśli dostępny
-            if scheduler and scheduler.scheduler.running:
+            if ranking_warmup and not ranking_warmup.done():
+                ranking_warmup.cancel()
+            
+            # Zatrzymaj scheduler jeśli dostępny (zapisuje też stan quota)
+            if scheduler:
                 try:
                     scheduler.stop()
                     logger.info("✅ Scheduler zatrzymany")
                 except Exception as e:
-                    logger.warning(f"Błąd zatrzymywania schedulera: {e}")
+                    logger.warning("Błąd zatrzymywania schedulera: %s", e)
+            
+            # Pule robocze (wątki io, procesy analiz) - bez czekania na trwające zadania
+            shutdown_worker_pools(wait=False)
             
             logger.info("✅ Aplikacja zatrzymana pomyślnie!")
             
         except Exception as e:
-            logger.error(f"❌ Błąd podczas zatrzymywania aplikacji: {e}")
+            logger.error("❌ Błąd podczas zatrzymywania aplikacji: %s", e)
 
 # Tworzenie aplikacji FastAPI z nowym systemem lifecycle
 app = FastAPI(
@@ -242,6 +251,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if router:
+    @app.exception_handler(WorkerPoolFull)
+    async def worker_pool_full_handler(request: Request, exc: WorkerPoolFull):
+        """Pełna kolejka puli roboczej - klient może ponowić zapytanie"""
+        logger.warning("Odrzucono %s: %s", request.url.path, exc)
+        return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "5"})
+
 # Statyczne pliki i templates z fallback
 import os
 from fastapi.staticfiles import StaticFiles
@@ -255,8 +271,8 @@ static_root = (
     "hook-boost-web/static" if os.path.isdir("hook-boost-web/static") else "static"
 )
 
-print(f"🔍 DEBUG: Templates directory = {tpl_root}")
-print(f"🔍 DEBUG: Static directory = {static_root}")
+logger.debug("🔍 DEBUG: Templates directory = %s", tpl_root)
+logger.debug("🔍 DEBUG: Static directory = %s", static_root)
 
 # Templates
 templates = Jinja2Templates(directory=tpl_root)
@@ -264,38 +280,25 @@ templates = Jinja2Templates(directory=tpl_root)
 # Statyczne pliki
 try:
     app.mount("/static", StaticFiles(directory=static_root), name="static")
-    print(f"✅ Static files mounted from {static_root}")
+    logger.debug("✅ Static files mounted from %s", static_root)
 except RuntimeError as e:
-    print(f"⚠️ Static files mount failed: {e}")
+    logger.warning("Static files mount failed: %s", e)
     # Jeśli katalog static nie istnieje, pomiń montowanie
     pass
 
-# Dodaj router API jeśli dostępny
+# Dodaj router API jeśli dostępny (scheduler przekazuje create_scheduler w lifespan)
 if router:
-    # Przekaż instancję schedulera do API
-    try:
-        from .api.routes import set_task_scheduler
-        if scheduler:
-            print("🔄 Przekazuję scheduler do API...")
-            set_task_scheduler(scheduler)
-            print("✅ Scheduler przekazany do API")
-        else:
-            print("⚠️ Scheduler niedostępny - API może nie działać poprawnie")
-    except ImportError as e:
-        print(f"❌ Nie można zaimportować set_task_scheduler: {e}")
-        pass
-    
     app.include_router(router, prefix="/api/v1", tags=["api"])
-    print("✅ API router dodany")
+    logger.debug("✅ API router dodany")
 else:
-    print("⚠️ API router niedostępny")
+    logger.warning("API router niedostępny")
 
 # --- Trend module (feature-flag) ---
-print("🔍 DEBUG: Sprawdzam moduł trendów...")
-print(f"🔍 ENABLE_TREND value = '{os.environ.get('ENABLE_TREND','false')}'")
-print(f"🔍 ENABLE_TREND type = {type(os.environ.get('ENABLE_TREND','false'))}")
-print(f"🔍 ENABLE_TREND.lower() = '{os.environ.get('ENABLE_TREND','false').lower()}'")
-print(f"🔍 Comparison result = {os.environ.get('ENABLE_TREND','false').lower()=='true'}")
+logger.debug("🔍 DEBUG: Sprawdzam moduł trendów...")
+logger.debug("🔍 ENABLE_TREND value = '%s'", os.environ.get('ENABLE_TREND','false'))
+logger.debug("🔍 ENABLE_TREND type = %s", type(os.environ.get('ENABLE_TREND','false')))
+logger.debug("🔍 ENABLE_TREND.lower() = '%s'", os.environ.get('ENABLE_TREND','false').lower())
+logger.debug("🔍 Comparison result = %s", os.environ.get('ENABLE_TREND','false').lower()=='true')
 
 # Dodatkowe sprawdzenie - może zmienna jest ustawiona w inny sposób
 enable_trend = (
@@ -304,38 +307,33 @@ enable_trend = (
     os.environ.get('ENABLE_TREND', 'false') == True
 )
 
-print(f"🔍 DEBUG: Final enable_trend decision = {enable_trend}")
+logger.debug("🔍 DEBUG: Final enable_trend decision = %s", enable_trend)
 
-if enable_trend:
-    print("🔍 DEBUG: ENABLE_TREND is true, loading trend module...")
-    try:
-        from app.trend.routers.router import router as trend_router
-        print("🔍 DEBUG: Trend router imported successfully")
-        app.include_router(trend_router)
-        print("✅ Trend module loaded successfully")
-        # Usunięto nieistniejący import scheduler_bind
-        print("ℹ️ Trend module loaded without scheduler binding (not required)")
-    except Exception as e:
-        print(f"❌ Trend module failed to load: {e}")
-        import traceback
-        traceback.print_exc()
-else:
-    print("ℹ️ Trend module disabled (ENABLE_TREND!=true)")
-    # Fallback - spróbuj załadować moduł trendów mimo wszystko
-    print("🔄 DEBUG: Próbuję załadować moduł trendów mimo wszystko...")
+trend_router_included = False
+
+
+def include_trend_router(app: FastAPI):
+    """Rejestruje router trendów (wywoływane w lifespan - import modułu nie spowalnia importu app.main)"""
+    global trend_router_included
+    if trend_router_included:
+        return
+    if enable_trend:
+        logger.debug("🔍 DEBUG: ENABLE_TREND is true, loading trend module...")
+    else:
+        logger.debug("ℹ️ Trend module disabled (ENABLE_TREND!=true)")
+        # Fallback - spróbuj załadować moduł trendów mimo wszystko
+        logger.debug("🔄 DEBUG: Próbuję załadować moduł trendów mimo wszystko...")
     try:
         from app.trend.routers.router import router as trend_router
-        print("🔍 DEBUG: Trend router imported successfully (fallback)")
         app.include_router(trend_router)
-        print("✅ Trend module loaded successfully (fallback)")
+        trend_router_included = True
+        logger.debug("✅ Trend module loaded successfully%s", "" if enable_trend else " (fallback)")
     except Exception as e:
-        print(f"❌ Trend module fallback failed: {e}")
+        logger.error("Trend module failed to load: %s", e)
         import traceback
         traceback.print_exc()
 
 
-
-
 @app.get("/", response_class=HTMLResponse)
 async def root(request: Request):
     """Strona główna aplikacji"""
@@ -1,18 +1,15 @@
 try:
     from apscheduler.schedulers.asyncio import AsyncIOScheduler
-    from apscheduler.triggers.cron import CronTrigger
     import logging
-    from datetime import datetime
-    from typing import Dict, List
+    import os
+    from typing import Dict, List, Optional, Set
     from ..config import settings
-    from ..youtube import YouTubeClient
+    from ..youtube import YouTubeClient, QuotaPlanner
     from ..storage import CSVGenerator
-    from ..storage.state_manager import StateManager
-    from pathlib import Path
-    import pandas as pd
+    from ..storage.state_manager import create_state_manager
+    from ..storage.file_lock import InterProcessLock
+    from ..workers import run_cpu_wait, run_io_wait
     import pytz
-    
-    print("✅ Wszystkie importy w TaskScheduler udane")
 except ImportError as e:
     print(f"❌ Błąd importu w TaskScheduler: {e}")
     import traceback
@@ -29,67 +26,109 @@ class TaskScheduler:
         # Użyj polskiej strefy czasowej
         timezone = pytz.timezone(settings.timezone)
         self.scheduler = AsyncIOScheduler(timezone=timezone)
-        self.state_manager = StateManager()  # Zarządza trwałymi danymi
-        self.youtube_client = YouTubeClient(settings.youtube_api_key, self.state_manager)
+        # Zarządza trwałymi danymi (pliki JSON albo SQLite - STATE_BACKEND)
+        self.state_manager = create_state_manager(settings.state_backend, quota_flush_units=settings.quota_flush_units)
+        self.youtube_client = YouTubeClient(
+            [settings.youtube_api_key, *settings.youtube_api_keys],
+            self.state_manager,
+            max_concurrency=settings.youtube_max_concurrency,
+            metadata_ttl_hours=settings.video_metadata_ttl_hours,
+            stats_ttl_hours=settings.video_stats_ttl_hours,
+            request_timeout=settings.youtube_request_timeout,
+            max_retries=settings.youtube_max_retries,
+            hedge_after=settings.youtube_hedge_after,
+            quota_limit_per_key=settings.youtube_quota_per_key
+        )
+        self.quota_planner = QuotaPlanner(self.youtube_client, self.state_manager, reserve=settings.quota_reserve)
         self.csv_generator = CSVGenerator()
+        # Przy kilku workerach raporty planuje tylko lider (właściciel blokady pliku)
+        self.leader_lock = InterProcessLock(self.state_manager.data_dir / "scheduler.lock")
+    
+    @property
+    def is_leader(self) -> bool:
+        return self.leader_lock.held
+    
+    def _try_become_leader(self):
+        """Przejmuje rolę lidera, jeśli blokada jest wolna, i planuje zadania raportów"""
+        if not self.leader_lock.try_acquire():
+            return
+        if self.scheduler.get_job('leader_election'):
+            self.scheduler.remove_job('leader_election')
+        
+        self.scheduler.add_job(
+            self.daily_report_task,
+            'cron',
+            hour=settings.scheduler_hour,
+            minute=settings.scheduler_minute,
+            id='daily_report',
+            name='Codzienny raport o 1:00'
+        )
+        
+        self.scheduler.add_job(
+            self.daily_ranking_analysis_task,
+            'cron',
+            hour=settings.scheduler_hour,
+            minute=settings.scheduler_minute + 30,
+            id='daily_ranking_analysis',
+            name='Codzienna analiza rankingowa o 1:30'
+        )
+        logger.info("Worker %s jest liderem schedulera", os.getpid())
     
     def start(self) -> bool:
         """Uruchamia scheduler"""
         try:
             if self.scheduler.running:
-                print("ℹ️ Scheduler już uruchomiony")
                 logger.info("Scheduler już uruchomiony")
                 return True
             
             # Sprawdź czy zadania już istnieją
             existing_jobs = self.scheduler.get_jobs()
             if existing_jobs:
-                print(f"⚠️ Znaleziono {len(existing_jobs)} istniejących zadań - usuwam")
+                logger.warning("Znaleziono %s istniejących zadań - usuwam", len(existing_jobs))
                 for job in existing_jobs:
                     job.remove()
             
-            # Dodaj zadania
+            # Dodaj zadania - zapis quota w każdym workerze, raporty tylko u lidera
             self.scheduler.add_job(
-                self.daily_report_task,
-                'cron',
-                hour=settings.scheduler_hour,
-                minute=settings.scheduler_minute,
-                id='daily_report',
-                name='Codzienny raport o 1:00'
+                self.state_manager.flush_quota,
+                'interval',
+                seconds=settings.quota_flush_interval_seconds,
+                id='quota_flush',
+                name='Zapis stanu quota'
             )
             
-            self.scheduler.add_job(
-                self.daily_ranking_analysis_task,
-                'cron',
-                hour=settings.scheduler_hour,
-                minute=settings.scheduler_minute + 30,
-                id='daily_ranking_analysis',
-                name='Codzienna analiza rankingowa o 1:30'
-            )
+            self._try_become_leader()
+            if not self.is_leader:
+                # Inny worker trzyma blokadę - przejmij rolę, gdy zwolni ją albo padnie
+                logger.info("Inny worker jest liderem schedulera")
+                self.scheduler.add_job(
+                    self._try_become_leader,
+                    'interval',
+                    seconds=settings.leader_retry_seconds,
+                    id='leader_election',
+                    name='Wybór lidera schedulera'
+                )
             
             # Uruchom scheduler
             self.scheduler.start()
             
             # Sprawdź czy scheduler się uruchomił
             if not self.scheduler.running:
-                print("❌ Scheduler nie uruchomił się")
                 logger.error("Scheduler nie uruchomił się")
                 return False
             
             # Sprawdź czy zadania są zaplanowane
             jobs = self.scheduler.get_jobs()
-            print(f"✅ Scheduler uruchomiony pomyślnie!")
-            print(f"📅 Zaplanowane zadania: {len(jobs)}")
+            logger.debug("✅ Scheduler uruchomiony pomyślnie!")
+            logger.debug("📅 Zaplanowane zadania: %s", len(jobs))
             for job in jobs:
-                print(f"   - {job.name}: {job.next_run_time}")
+                logger.debug("   - %s: %s", job.name, job.next_run_time)
             
             timezone = pytz.timezone(settings.timezone)
-            print(f"✅ Scheduler uruchomiony - raporty codziennie o {settings.scheduler_hour}:{str(settings.scheduler_minute).zfill(2)} {timezone}")
-            logger.info(f"Scheduler uruchomiony - raporty codziennie o {settings.scheduler_hour}:{str(settings.scheduler_minute).zfill(2)} {timezone}")
+            logger.info("Scheduler uruchomiony - raporty codziennie o %s:%s %s", settings.scheduler_hour, str(settings.scheduler_minute).zfill(2), timezone)
             
         except Exception as e:
-            print(f"❌ Błąd podczas uruchamiania schedulera: {e}")
-            logger.error(f"Błąd podczas uruchamiania schedulera: {e}")
+            logger.error("Błąd podczas uruchamiania schedulera: %s", e)
             import traceback
             traceback.print_exc()
             # Nie rzucaj błędu - pozwól aplikacji się uruchomić
@@ -102,93 +141,191 @@ class TaskScheduler:
         if self.scheduler.running:
             self.scheduler.shutdown()
             logger.info("Scheduler zatrzymany")
+        self.leader_lock.release()
+        self.state_manager.flush_quota()
     
     async def daily_report_task(self):
         """Codzienne zadanie generowania raportów"""
         try:
             logger.info("Rozpoczęcie codziennego zadania raportowania")
-            print("🔄 Rozpoczynam codzienne zadanie raportowania...")
             
             # Reset quota (tylko raz dziennie)
             self.state_manager.reset_quota()
-            print("✅ Quota zresetowana")
+            logger.debug("✅ Quota zresetowana")
             
-            # Pobierz dane ze wszystkich kanałów
-            all_videos = {}
             total_quota_before = self.youtube_client.get_quota_usage()['used']
-            print(f"📊 Quota przed raportowaniem: {total_quota_before}")
+            logger.debug("📊 Quota przed raportowaniem: %s", total_quota_before)
             
-            for category, channels in self.state_manager.get_channels().items():
-                category_videos = []
-                
-                for channel in channels:
-                    try:
-                        print(f"📺 Pobieram dane z kanału: {channel['title']}")
-                        videos = await self.youtube_client.get_channel_videos(
-                            channel['id'], 
-                            settings.days_back
-                        )
-                        
-                        # Dodaj informacje o kanale do każdego filmu
-                        for video in videos:
-                            video['channel_title'] = channel['title']
-                            video['channel_id'] = channel['id']
-                        
-                        category_videos.extend(videos)
-                        print(f"✅ Pobrano {len(videos)} filmów z kanału {channel['title']}")
-                        logger.info(f"Pobrano {len(videos)} filmów z kanału {channel['title']}")
-                        
-                    except Exception as e:
-                        print(f"❌ Błąd podczas pobierania filmów z kanału {channel['title']}: {e}")
-                        logger.error(f"Błąd podczas pobierania filmów z kanału {channel['title']}: {e}")
-                
-                if category_videos:
-                    all_videos[category] = category_videos
+            # Zaplanuj przebieg w ramach dostępnej quota (kolejność wg priorytetu, tryb oszczędny)
+            channels = self.state_manager.get_channels()
+            plan = self.plan_run(settings.days_back)
+            channels, skip_stats = QuotaPlanner.apply(plan, channels)
+            logger.debug("📊 Plan quota: szacowany koszt %s, planowany %s, dostępne %s", plan['estimated_cost'], plan['planned_cost'], plan['available'])
+            if not plan['fits']:
+                skipped = sum(
+                    1 for category_plan in plan['categories'].values()
+                    for entry in category_plan['channels'] if entry['mode'] == QuotaPlanner.MODE_SKIP
+                )
+                logger.warning("Tryb oszczędny quota - bez statystyk: %s, pominięte kanały: %s", len(skip_stats), skipped)
             
-            # Generuj raporty CSV
-            if all_videos:
-                total_videos = sum(len(videos) for videos in all_videos.values())
-                print(f"📊 Łącznie pobrano {total_videos} filmów")
-                
-                # Raport dla każdej kategorii
-                for category, videos in all_videos.items():
-                    try:
-                        csv_path = self.csv_generator.generate_csv(videos, category)
-                        print(f"✅ Wygenerowano raport dla kategorii {category}: {csv_path}")
-                        logger.info(f"Wygenerowano raport dla kategorii {category}: {csv_path}")
-                    except Exception as e:
-                        print(f"❌ Błąd podczas generowania raportu dla kategorii {category}: {e}")
-                        logger.error(f"Błąd podczas generowania raportu dla kategorii {category}: {e}")
+            # Pobierz dane ze wszystkich kanałów (równolegle) i dopisuj je do raportów na bieżąco
+            reports = await self.stream_category_reports(
+                channels,
+                settings.days_back,
+                skip_stats_refresh=skip_stats
+            )
+            
+            if reports:
+                total_videos = sum(report['videos'] for report in reports.values())
+                logger.debug("📊 Łącznie pobrano %s filmów", total_videos)
                 
                 # Sprawdź zużycie quota po raportowaniu
                 total_quota_after = self.youtube_client.get_quota_usage()['used']
                 quota_used = total_quota_after - total_quota_before
-                print(f"📊 Quota po raportowaniu: {total_quota_after}")
-                print(f"📊 Zużyto quota: {quota_used} jednostek")
+                logger.debug("📊 Quota po raportowaniu: %s", total_quota_after)
+                logger.debug("📊 Zużyto quota: %s jednostek", quota_used)
                 
                 # Zapisz aktualne zużycie quota po wygenerowaniu raportów
                 try:
-                    current_quota = self.youtube_client.get_quota_usage()
-                    self.state_manager.persist_quota(current_quota['used'])
-                    print(f"✅ Zapisano quota: {current_quota['used']}")
-                    logger.info(f"Zapisano quota po wygenerowaniu raportów: {current_quota['used']}")
+                    persisted = self.state_manager.persist_quota()
+                    logger.info("Zapisano quota po wygenerowaniu raportów: %s", persisted)
                 except Exception as e:
-                    print(f"❌ Błąd podczas zapisywania quota: {e}")
-                    logger.error(f"Błąd podczas zapisywania quota: {e}")
+                    logger.error("Błąd podczas zapisywania quota: %s", e)
             else:
-                print("⚠️ Brak filmów do raportowania")
+                logger.warning("Brak filmów do raportowania")
             
             # Log quota usage
             quota_state = self.state_manager.get_quota_state()
-            print(f"📊 Stan quota: {quota_state['used']}/10000 ({quota_state['used']/100:.1f}%)")
-            logger.info(f"Zużycie quota: {quota_state['used']}/10000 ({quota_state['used']/100:.1f}%)")
+            quota_limit = self.youtube_client.quota_limit  # Łączny limit wszystkich kluczy
+            logger.info("Zużycie quota: %s/%s (%.1f%%)", quota_state['used'], quota_limit,
+                        quota_state['used'] / quota_limit * 100)
             
-            print("✅ Codzienne zadanie raportowania zakończone")
             logger.info("Codzienne zadanie raportowania zakończone")
             
         except Exception as e:
-            print(f"❌ Błąd podczas wykonywania codziennego zadania: {e}")
-            logger.error(f"Błąd podczas wykonywania codziennego zadania: {e}")
+            logger.error("Błąd podczas wykonywania codziennego zadania: %s", e)
+    
+    def plan_run(self, days_back: int, available: Optional[int] = None) -> Dict:
+        """Szacuje koszt przebiegu i rozdziela quota między kategorie (bez wywołań API)"""
+        return self.quota_planner.plan(self.state_manager.get_channels(), days_back, available)
+    
+    async def collect_category_videos(self, channels_by_category: Dict[str, List[Dict]], days_back: int,
+                                      skip_stats_refresh: Optional[Set[str]] = None) -> Dict[str, List[Dict]]:
+        """
+        Pobiera filmy ze wszystkich kanałów wszystkich kategorii równolegle.
+        
+        Returns:
+            Słownik kategoria -> lista filmów (w kolejności kanałów); kategorie bez filmów są pomijane
+        """
+        flat_channels = [
+            (category, channel)
+            for category, channels in channels_by_category.items()
+            for channel in channels
+        ]
+        logger.debug("📺 Pobieram dane z %s kanałów (równolegle: %s)", len(flat_channels), self.youtube_client.max_concurrency)
+        
+        results = await self.youtube_client.get_videos_for_channels(
+            [channel for _, channel in flat_channels],
+            days_back,
+            skip_stats_refresh=skip_stats_refresh
+        )
+        
+        all_videos = {}
+        for (category, channel), result in zip(flat_channels, results):
+            if isinstance(result, Exception):
+                logger.error("Błąd podczas pobierania filmów z kanału %s: %s", channel['title'], result)
+                continue
+            
+            # Dodaj informacje o kanale do każdego filmu
+            for video in result:
+                video['channel_title'] = channel['title']
+                video['channel_id'] = channel['id']
+            
+            if result:
+                all_videos.setdefault(category, []).extend(result)
+            logger.debug("Pobrano %s filmów z kanału %s", len(result), channel['title'])
+        
+        # Zapisz zużycie quota po całym przebiegu
+        self.state_manager.flush_quota()
+        return all_videos
+    
+    async def stream_category_reports(self, channels_by_category: Dict[str, List[Dict]], days_back: int,
+                                      skip_stats_refresh: Optional[Set[str]] = None) -> Dict[str, Dict]:
+        """
+        Pobiera filmy wszystkich kanałów równolegle i od razu dopisuje je do raportów CSV kategorii.
+        
+        Raport nie czeka na ostatni kanał, a w pamięci są tylko filmy kanałów, które
+        skończyły się przed poprzednikami: wiersze trafiają do pliku w kolejności kanałów,
+        więc plik jest taki sam jak z generate_csv(collect_category_videos(...)).
+        
+        Returns:
+            Słownik kategoria -> {'path': ścieżka raportu albo None po błędzie zapisu, 'videos': liczba filmów};
+            kategorie bez filmów są pomijane
+        """
+        flat_channels = [
+            (category, position, channel)
+            for category, channels in channels_by_category.items()
+            for position, channel in enumerate(channels)
+        ]
+        logger.debug("📺 Pobieram dane z %s kanałów (równolegle: %s)", len(flat_channels), self.youtube_client.max_concurrency)
+        
+        waiting: Dict[str, Dict[int, List[Dict]]] = {category: {} for category in channels_by_category}
+        next_position = {category: 0 for category in channels_by_category}
+        writers = {}
+        reports: Dict[str, Dict] = {}
+        
+        async def write(category: str, videos: List[Dict]):
+            report = reports.setdefault(category, {'path': None, 'videos': 0})
+            report['videos'] += len(videos)
+            if category in writers and writers[category] is None:
+                return  # Zapis kategorii już się nie powiódł
+            try:
+                if category not in writers:
+                    writers[category] = await run_io_wait(self.csv_generator.open_report, category)
+                await run_io_wait(writers[category].add_videos, videos)
+            except Exception as e:
+                logger.error("Błąd podczas generowania raportu dla kategorii %s: %s", category, e)
+                if writers.get(category) is not None:
+                    writers[category].abort()
+                writers[category] = None
+        
+        try:
+            async for index, channel, videos, error in self.youtube_client.iter_channels_videos(
+                [channel for _, _, channel in flat_channels], days_back, skip_stats_refresh
+            ):
+                category, position, _ = flat_channels[index]
+                if error:
+                    logger.error("Błąd podczas pobierania filmów z kanału %s: %s", channel['title'], error)
+                    videos = []
+                for video in videos:
+                    video['channel_title'] = channel['title']
+                    video['channel_id'] = channel['id']
+                logger.debug("Pobrano %s filmów z kanału %s", len(videos), channel['title'])
+                
+                # Kanały kategorii zapisywane po kolei - późniejsze czekają na wcześniejsze
+                waiting[category][position] = videos
+                while next_position[category] in waiting[category]:
+                    ready = waiting[category].pop(next_position[category])
+                    next_position[category] += 1
+                    if ready:
+                        await write(category, ready)
+            
+            for category, writer in writers.items():
+                if writer is None:
+                    continue
+                try:
+                    reports[category]['path'] = await run_io_wait(writer.finalize)
+                    logger.info("Wygenerowano raport dla kategorii %s: %s", category, reports[category]['path'])
+                except Exception as e:
+                    logger.error("Błąd podczas generowania raportu dla kategorii %s: %s", category, e)
+        finally:
+            # Przerwany przebieg nie zostawia niedokończonych plików
+            for writer in writers.values():
+                if writer is not None:
+                    writer.abort()
+            # Zapisz zużycie quota po całym przebiegu
+            self.state_manager.flush_quota()
+        return reports
     
     async def daily_ranking_analysis_task(self):
         """
@@ -197,48 +334,39 @@ class TaskScheduler:
         """
         try:
             logger.info("Rozpoczynam codzienną analizę rankingową z nowym RankingAnalyzer...")
-            print("🔄 Rozpoczynam codzienną analizę rankingową z nowym systemem...")
-            
-            # Import nowego analizatora
-            from app.trend.services.ranking_analyzer import RankingAnalyzer
             
-            # Utwórz instancję analizatora
-            analyzer = RankingAnalyzer()
+            # Analizy pandas w puli procesów - pętla zdarzeń obsługuje w tym czasie API
+            from app.trend.services.ranking_analyzer import run_ranking_analysis
+            reports_dir = str(settings.reports_path)
             
             # Pobierz wszystkie kategorie
             categories = self.state_manager.get_channels().keys()
-            print(f"📊 Analizuję rankingi dla {len(categories)} kategorii: {list(categories)}")
+            logger.debug("📊 Analizuję rankingi dla %s kategorii: %s", len(categories), list(categories))
             
             success_count = 0
             total_count = len(categories)
             
             for category in categories:
                 try:
-                    print(f"🔄 Analizuję ranking dla kategorii: {category}")
-                    logger.info(f"Analizuję ranking dla kategorii: {category}")
+                    logger.info("Analizuję ranking dla kategorii: %s", category)
                     
                     # Uruchom analizę dla kategorii
-                    success = analyzer.run_analysis_for_category(category)
+                    success = await run_cpu_wait(run_ranking_analysis, category, reports_dir)
                     
                     if success:
                         success_count += 1
-                        print(f"✅ Pomyślnie przeanalizowano ranking dla {category}")
-                        logger.info(f"Pomyślnie przeanalizowano ranking dla {category}")
+                        logger.info("Pomyślnie przeanalizowano ranking dla %s", category)
                     else:
-                        print(f"⚠️ Analiza rankingu dla {category} nie powiodła się")
-                        logger.warning(f"Analiza rankingu dla {category} nie powiodła się")
+                        logger.warning("Analiza rankingu dla %s nie powiodła się", category)
                     
                 except Exception as e:
-                    print(f"❌ Błąd podczas analizy rankingu dla kategorii {category}: {e}")
-                    logger.error(f"Błąd podczas analizy rankingu dla kategorii {category}: {e}")
+                    logger.error("Błąd podczas analizy rankingu dla kategorii %s: %s", category, e)
                     continue
             
-            print(f"✅ Codzienna analiza rankingowa zakończona: {success_count}/{total_count} kategorii")
-            logger.info(f"Codzienna analiza rankingowa zakończona: {success_count}/{total_count} kategorii")
+            logger.info("Codzienna analiza rankingowa zakończona: %s/%s kategorii", success_count, total_count)
             
         except Exception as e:
-            print(f"❌ Błąd podczas wykonywania codziennej analizy rankingowej: {e}")
-            logger.error(f"Błąd podczas wykonywania codziennej analizy rankingowej: {e}")
+            logger.error("Błąd podczas wykonywania codziennej analizy rankingowej: %s", e)
             import traceback
             traceback.print_exc()
     
@@ -259,6 +387,7 @@ class TaskScheduler:
         channels = self.state_manager.get_channels()
         return {
             'running': self.scheduler.running,
+            'leader': self.is_leader,
             'jobs': len(self.scheduler.get_jobs()),
             'channels_count': sum(len(channels) for channels in channels.values()),
             'categories': list(channels.keys()),
@@ -274,11 +403,11 @@ class TaskScheduler:
             # Dodaj do state manager
             self.state_manager.add_channel(channel_info, category)
             
-            logger.info(f"Dodano kanał: {channel_info['title']} do kategorii {category}")
+            logger.info("Dodano kanał: %s do kategorii %s", channel_info['title'], category)
             return channel_info
                 
         except Exception as e:
-            logger.error(f"Błąd podczas dodawania kanału: {e}")
+            logger.error("Błąd podczas dodawania kanału: %s", e)
             raise
     
     async def get_channel_videos(self, channel_id: str, days_back: int = 7):
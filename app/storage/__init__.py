@@ -1,3 +1,9 @@
 from .csv_generator import CSVGenerator
+from .report_columns import read_report, read_report_rows, write_report_columns
+from .stats_series import StatsSeriesStore, get_stats_series
+from .text_store import TextStore, get_text_store
 
-__all__ = ["CSVGenerator"] 
\ No newline at end of file
+__all__ = [
+    "CSVGenerator", "StatsSeriesStore", "TextStore", "get_stats_series", "get_text_store",
+    "read_report", "read_report_rows", "write_report_columns",
+] 
\ No newline at end of file
@@ -1,14 +1,21 @@
 try:
-    import pandas as pd
-    from typing import List, Dict, Any
+    import csv
+    import io
+    import os
+    import uuid
+    from typing import List, Dict, Any, Optional
     from datetime import datetime
     import pytz
     import logging
     from pathlib import Path
-    from ..config import settings
+    from ..config import settings, storage_locations
+    from .report_columns import ReportColumnsBuilder
+    from .report_files import (
+        REPORT_SUFFIXES, compressed_writer, remove_other_forms, report_date, report_suffix, split_report_name
+    )
+    from .stats_series import get_stats_series
+    from .text_store import TEXT_COLUMNS, get_text_store
     import re
-    
-    print("✅ Wszystkie importy w CSVGenerator udane")
 except ImportError as e:
     print(f"❌ Błąd importu w CSVGenerator: {e}")
     import traceback
@@ -45,89 +52,68 @@ class CSVGenerator:
             'Thumbnail_URL'
         ]
     
+    def open_report(self, category: str = "general", filename: str = None,
+                    extra_columns: List[str] = (), record_stats: bool = True) -> "CSVReportWriter":
+        """
+        Otwiera strumieniowy zapis raportu kategorii.
+
+        Bez `filename` nazwa powstaje przy finalize(): report_{KATEGORIA}_{DATA_DANYCH}.csv
+        (data najnowszego filmu; bez filmów - dzisiejsza). Rozszerzenie (.csv, .csv.gz,
+        .csv.zst) zawsze wynika z settings.report_compression. record_stats=False - raport
+        nie trafia do szeregu statystyk (np. podsumowanie powtarzające raporty kategorii).
+        """
+        return CSVReportWriter(self, category, filename=filename, extra_columns=list(extra_columns),
+                               record_stats=record_stats)
+    
+    def video_row(self, video: Dict) -> Dict[str, Any]:
+        """Wiersz raportu dla jednego filmu (klucze = self.columns)"""
+        # Wyciągnij nazwiska - WYŁĄCZONE
+        # from ..analysis import NameExtractor
+        # extractor = NameExtractor()
+        # names = extractor.extract_from_video_data(video)
+        
+        # Określ typ filmu (shorts vs long)
+        video_type = self._determine_video_type(video.get('duration', ''), video.get('id', ''), video.get('url', ''))
+        
+        # Przygotuj datę (offset-aware)
+        published_at = datetime.fromisoformat(
+            video['published_at'].replace('Z', '+00:00')
+        )
+        # Upewnij się, że ma strefę czasową UTC
+        if published_at.tzinfo is None:
+            published_at = published_at.replace(tzinfo=pytz.utc)
+        
+        return {
+            'Channel_Name': video.get('channel_title', ''),
+            'Channel_ID': video.get('channel_id', ''),
+            'Date_of_Publishing': published_at.strftime('%Y-%m-%d'),
+            'Hour_GMT2': published_at.strftime('%H:%M'),
+            'Title': video.get('title', ''),
+            'Description': video.get('description', ''),
+            'Tags': ', '.join(video.get('tags', [])),
+            'video_type': video_type,
+            'View_Count': video.get('view_count', 0),
+            'Like_Count': video.get('like_count', 0),
+            'Comment_Count': video.get('comment_count', 0),
+            'Favorite_Count': video.get('favorite_count', 0),
+            'Definition': video.get('definition', ''),
+            'Has_Captions': video.get('caption', ''),
+            'Licensed_Content': video.get('licensed_content', False),
+            'Topic_Categories': video.get('category_id', ''),
+            # 'Names_Extracted': ', '.join(names),  # Usunięte
+            'Video_ID': video.get('id', ''),
+            'Duration': video.get('duration', ''),
+            'Thumbnail_URL': video.get('thumbnail', '')
+        }
+    
     def generate_csv(self, videos_data: List[Dict], category: str = "general") -> str:
         """Generuje plik CSV z danymi filmów"""
         try:
-            # Przygotuj dane
-            rows = []
-            for video in videos_data:
-                # Wyciągnij nazwiska - WYŁĄCZONE
-                # from ..analysis import NameExtractor
-                # extractor = NameExtractor()
-                # names = extractor.extract_from_video_data(video)
-                
-                # Określ typ filmu (shorts vs long)
-                video_type = self._determine_video_type(video.get('duration', ''), video.get('id', ''), video.get('url', ''))
-                
-                # Przygotuj datę (offset-aware)
-                published_at = datetime.fromisoformat(
-                    video['published_at'].replace('Z', '+00:00')
-                )
-                # Upewnij się, że ma strefę czasową UTC
-                if published_at.tzinfo is None:
-                    published_at = published_at.replace(tzinfo=pytz.utc)
-                date_str = published_at.strftime('%Y-%m-%d')
-                hour_str = published_at.strftime('%H:%M')
-                
-                row = {
-                    'Channel_Name': video.get('channel_title', ''),
-                    'Channel_ID': video.get('channel_id', ''),
-                    'Date_of_Publishing': date_str,
-                    'Hour_GMT2': hour_str,
-                    'Title': video.get('title', ''),
-                    'Description': video.get('description', ''),
-                    'Tags': ', '.join(video.get('tags', [])),
-                    'video_type': video_type,
-                    'View_Count': video.get('view_count', 0),
-                    'Like_Count': video.get('like_count', 0),
-                    'Comment_Count': video.get('comment_count', 0),
-                    'Favorite_Count': video.get('favorite_count', 0),
-                    'Definition': video.get('definition', ''),
-                    'Has_Captions': video.get('caption', ''),
-                    'Licensed_Content': video.get('licensed_content', False),
-                    'Topic_Categories': video.get('category_id', ''),
-                    # 'Names_Extracted': ', '.join(names),  # Usunięte
-                    'Video_ID': video.get('id', ''),
-                    'Duration': video.get('duration', ''),
-                    'Thumbnail_URL': video.get('thumbnail', '')
-                }
-                rows.append(row)
-            
-            # Utwórz DataFrame
-            df = pd.DataFrame(rows, columns=self.columns)
-            
-            # Generuj nazwę pliku w nowym formacie: report_{KATEGORIA}_{DATA_DANYCH}.csv
-            # Użyj daty z danych (ostatni film) zamiast daty generowania
-            if rows:
-                # Znajdź najnowszą datę w danych
-                latest_date = max(row['Date_of_Publishing'] for row in rows if row['Date_of_Publishing'])
-                filename = f"report_{category.upper()}_{latest_date}.csv"
-            else:
-                # Fallback - użyj dzisiejszej daty
-                timestamp = datetime.now().strftime('%Y-%m-%d')
-                filename = f"report_{category.upper()}_{timestamp}.csv"
-            
-            filepath = settings.reports_path / filename
-            
-            # Upewnij się, że katalog raportów istnieje
-            settings.reports_path.mkdir(parents=True, exist_ok=True)
-            
-            # Zapisz CSV
-            df.to_csv(filepath, index=False, encoding='utf-8')
-            
-            print(f"📊 Wygenerowano raport CSV: {filepath.absolute()}")
-            print(f"   📄 Nazwa pliku: {filename}")
-            print(f"   📁 Katalog: {settings.reports_path.absolute()}")
-            print(f"   📈 Liczba wierszy: {len(df)}")
-            print(f"   💾 Rozmiar pliku: {filepath.stat().st_size} bytes")
-            
-            logger.info(f"Wygenerowano CSV: {filepath}")
-            logger.info(f"Raport CSV: {filename}, {len(df)} wierszy, {filepath.stat().st_size} bytes")
-            
-            return str(filepath)
-            
+            with self.open_report(category) as report:
+                report.add_videos(videos_data)
+                return report.finalize()
         except Exception as e:
-            logger.error(f"Błąd podczas generowania CSV: {e}")
+            logger.error("Błąd podczas generowania CSV: %s", e)
             raise
     
     def _determine_video_type(self, duration: str, video_id: str = None, video_url: str = None) -> str:
@@ -167,78 +153,16 @@ class CSVGenerator:
     def generate_summary_csv(self, all_data: Dict[str, List[Dict]]) -> str:
         """Generuje podsumowanie CSV ze wszystkich kategorii"""
         try:
-            all_rows = []
-            
-            for category, videos in all_data.items():
-                for video in videos:
-                    # Wyciągnij nazwiska
-                    from ..analysis import NameExtractor
-                    extractor = NameExtractor()
-                    names = extractor.extract_from_video_data(video)
-                    
-                    # Określ typ filmu (shorts vs long)
-                    video_type = self._determine_video_type(video.get('duration', ''), video.get('id', ''), video.get('url', ''))
-                    
-                    # Przygotuj datę (offset-aware)
-                    published_at = datetime.fromisoformat(
-                        video['published_at'].replace('Z', '+00:00')
-                    )
-                    # Upewnij się, że ma strefę czasową UTC
-                    if published_at.tzinfo is None:
-                        published_at = published_at.replace(tzinfo=pytz.utc)
-                    date_str = published_at.strftime('%Y-%m-%d')
-                    hour_str = published_at.strftime('%H:%M')
-                    
-                    row = {
-                        'Channel_Name': video.get('channel_title', ''),
-                        'Channel_ID': video.get('channel_id', ''),
-                        'Date_of_Publishing': date_str,
-                        'Hour_GMT2': hour_str,
-                        'Title': video.get('title', ''),
-                        'Description': video.get('description', ''),
-                        'Tags': ', '.join(video.get('tags', [])),
-                        'video_type': video_type,
-                        'View_Count': video.get('view_count', 0),
-                        'Like_Count': video.get('like_count', 0),
-                        'Comment_Count': video.get('comment_count', 0),
-                        'Favorite_Count': video.get('favorite_count', 0),
-                        'Definition': video.get('definition', ''),
-                        'Has_Captions': video.get('caption', ''),
-                        'Licensed_Content': video.get('licensed_content', False),
-                        'Topic_Categories': video.get('category_id', ''),
-                        'Names_Extracted': ', '.join(names),
-                        'Video_ID': video.get('id', ''),
-                        'Duration': video.get('duration', ''),
-                        'Thumbnail_URL': video.get('thumbnail', ''),
-                        'Category': category
-                    }
-                    all_rows.append(row)
-            
-            # Generuj nazwę pliku w nowym formacie: report_SUMMARY_{YYYY-MM-DD}.csv
+            # Nazwa w nowym formacie: report_SUMMARY_{YYYY-MM-DD}.csv
             timestamp = datetime.now().strftime('%Y-%m-%d')
-            filename = f"report_SUMMARY_{timestamp}.csv"
-            filepath = settings.reports_path / filename
-            
-            # Upewnij się, że katalog raportów istnieje
-            settings.reports_path.mkdir(parents=True, exist_ok=True)
-            
-            # Utwórz DataFrame z odpowiednimi kolumnami
-            df = pd.DataFrame(all_rows, columns=self.columns + ['Category'])
-            df.to_csv(filepath, index=False, encoding='utf-8')
-            
-            print(f"📊 Wygenerowano raport podsumowujący CSV: {filepath.absolute()}")
-            print(f"   📄 Nazwa pliku: {filename}")
-            print(f"   📁 Katalog: {settings.reports_path.absolute()}")
-            print(f"   📈 Liczba wierszy: {len(df)}")
-            print(f"   💾 Rozmiar pliku: {filepath.stat().st_size} bytes")
-            
-            logger.info(f"Wygenerowano podsumowanie CSV: {filepath}")
-            logger.info(f"Raport podsumowujący CSV: {filename}, {len(df)} wierszy, {filepath.stat().st_size} bytes")
-            
-            return str(filepath)
-            
+            # Filmy są już w szeregu statystyk z raportów kategorii (pod datą danych)
+            with self.open_report('SUMMARY', filename=f"report_SUMMARY_{timestamp}.csv",
+                                  extra_columns=['Category'], record_stats=False) as report:
+                for category, videos in all_data.items():
+                    report.add_videos(videos, Category=category)
+                return report.finalize()
         except Exception as e:
-            logger.error(f"Błąd podczas generowania podsumowania CSV: {e}")
+            logger.error("Błąd podczas generowania podsumowania CSV: %s", e)
             raise
 
     def rename_old_reports(self) -> Dict[str, Any]:
@@ -248,8 +172,8 @@ class CSVGenerator:
         renamed_files = []
         
         try:
-            print(f"🔄 Rozpoczynam przemianowanie starych raportów...")
-            print(f"📁 Katalog raportów: {settings.reports_path.absolute()}")
+            logger.debug("🔄 Rozpoczynam przemianowanie starych raportów...")
+            logger.debug("📁 Katalog raportów: %s", settings.reports_path.absolute())
             
             # Upewnij się, że katalog istnieje
             settings.reports_path.mkdir(parents=True, exist_ok=True)
@@ -292,12 +216,12 @@ class CSVGenerator:
                                 'old_name': old_name,
                                 'new_name': new_name
                             })
-                            print(f"✅ Przemianowano: {old_name} → {new_name}")
+                            logger.debug("✅ Przemianowano: %s → %s", old_name, new_name)
                             
                         except ValueError as e:
                             error_msg = f"Nieprawidłowa data w {old_name}: {e}"
                             errors.append(error_msg)
-                            print(f"❌ {error_msg}")
+                            logger.error("%s", error_msg)
                 
                 elif re.match(r'^summary_\d{8}_\d{6}\.csv$', old_name):
                     # Specjalny przypadek dla summary
@@ -325,18 +249,18 @@ class CSVGenerator:
                                 'old_name': old_name,
                                 'new_name': new_name
                             })
-                            print(f"✅ Przemianowano: {old_name} → {new_name}")
+                            logger.debug("✅ Przemianowano: %s → %s", old_name, new_name)
                             
                         except ValueError as e:
                             error_msg = f"Nieprawidłowa data w {old_name}: {e}"
                             errors.append(error_msg)
-                            print(f"❌ {error_msg}")
+                            logger.error("%s", error_msg)
             
-            print(f"✅ Zakończono przemianowanie: {renamed_count} plików przemianowano")
+            logger.debug("✅ Zakończono przemianowanie: %s plików przemianowano", renamed_count)
             if errors:
-                print(f"⚠️ Wystąpiły błędy: {len(errors)}")
+                logger.warning("Wystąpiły błędy: %s", len(errors))
                 for error in errors:
-                    print(f"   - {error}")
+                    logger.debug("   - %s", error)
             
             return {
                 "renamed": renamed_count,
@@ -354,4 +278,142 @@ class CSVGenerator:
                 "errors": errors,
                 "renamed_files": renamed_files,
                 "message": f"Błąd: {error_msg}"
-            } 
\ No newline at end of file
+            } 
+
+
+class CSVReportWriter:
+    """
+    Strumieniowy zapis raportu CSV - wiersze trafiają do pliku, gdy przychodzą filmy kanału.
+
+    Pliki są bajt w bajt takie jak dotychczasowe DataFrame.to_csv(index=False):
+    stała kolejność kolumn, cytowanie QUOTE_MINIMAL, puste pole dla None, znak
+    końca linii os.linesep. W pamięci zostaje tylko bieżąca porcja filmów.
+    Zapis idzie do pliku tymczasowego (.partial, poza wzorcem *.csv) w katalogu
+    raportów; finalize() robi fsync i atomowo podmienia go na docelowy raport,
+    a abort() (lub wyjątek w bloku with) usuwa go bez śladu.
+
+    Przy settings.report_compact_text zamiast kolumn Description i Tags są
+    Description_Hash i Tags_Hash - teksty trafiają raz do magazynu
+    (text_store.TextStore), jedną transakcją na każde add_videos().
+
+    Przy settings.report_compression = gzip / zstd te same bajty trafiają do
+    report_*.csv.gz / .csv.zst; poprzednia wersja raportu w innej formie jest
+    usuwana przy podmianie, więc dla danej nazwy zostaje jeden plik.
+
+    Liczniki i kolumny wyliczane każdej porcji trafiają do plików tymczasowych
+    (report_columns.ReportColumnsBuilder); po podmianie finalize() dokłada do nich
+    kolumny tekstowe wczytane z gotowego raportu, zapisuje obok plik kolumnowy
+    z typami (bez pandas) oraz dopisuje wyświetlenia, polubienia i komentarze
+    filmów do szeregu statystyk (stats_series.StatsSeriesStore) pod datą z nazwy
+    raportu - chyba że record_stats=False (raport podsumowujący).
+    """
+
+    def __init__(self, generator: CSVGenerator, category: str, filename: Optional[str] = None,
+                 extra_columns: List[str] = (), record_stats: bool = True):
+        self.generator = generator
+        self.category = category
+        self.filename = filename
+        self.columns = generator.columns + list(extra_columns)
+        self.text_store = get_text_store() if settings.report_compact_text else None
+        if self.text_store is not None:
+            self.columns = [TEXT_COLUMNS.get(column, column) for column in self.columns]
+        self.rows = 0
+        self.latest_date = ''
+        self.record_stats = record_stats
+        self.suffix = report_suffix(settings.report_compression)
+        self.compression = REPORT_SUFFIXES[self.suffix]
+        self.directory = settings.reports_path
+        # Unikalna nazwa (równoległe raporty tej samej kategorii), prawa dostępu jak zwykły plik
+        self.temp_path = self.directory / f".report_{category.upper()}_{uuid.uuid4().hex[:12]}.partial"
+        try:
+            self._raw = open(self.temp_path, 'xb')
+        except OSError:
+            # Wolumen mógł zniknąć - przy następnym zapisie sprawdź lokalizacje od nowa
+            storage_locations.invalidate('reports')
+            raise
+        stream = compressed_writer(self._raw, self.compression) if self.compression else self._raw
+        self._file = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+        self._writer = csv.writer(self._file, lineterminator=os.linesep)
+        self._writer.writerow(self.columns)
+        self._columns = ReportColumnsBuilder(self.columns, self.directory)
+
+    def add_videos(self, videos: List[Dict], **extra) -> int:
+        """Dopisuje wiersze filmów (extra - wartości dodatkowych kolumn); zwraca liczbę wierszy"""
+        rows = [self.generator.video_row(video) for video in videos]
+        if self.text_store is not None:
+            # Teksty całej porcji w jednej transakcji, w wierszu zostaje skrót
+            keys = iter(self.text_store.put_many(row.pop(column) for row in rows for column in TEXT_COLUMNS))
+            for row in rows:
+                for hash_column in TEXT_COLUMNS.values():
+                    row[hash_column] = next(keys)
+        for row in rows:
+            row.update(extra)
+            if row['Date_of_Publishing'] > self.latest_date:
+                self.latest_date = row['Date_of_Publishing']
+        values = [[row.get(column) for column in self.columns] for row in rows]
+        self._writer.writerows(values)
+        self._columns.add_rows(values)
+        self.rows += len(videos)
+        return len(videos)
+
+    def finalize(self) -> str:
+        """Zamyka raport i atomowo nadaje mu docelową nazwę; zwraca ścieżkę"""
+        if not self.filename:
+            # Data z danych (najnowszy film) zamiast daty generowania
+            date_part = self.latest_date or datetime.now().strftime('%Y-%m-%d')
+            self.filename = f"report_{self.category.upper()}_{date_part}"
+        self.filename = split_report_name(self.filename)[0] + self.suffix
+        filepath = self.directory / self.filename
+        try:
+            if self.compression:
+                # Domyka ramkę gzip/zstd; surowy plik zostaje otwarty do fsync
+                self._file.close()
+            else:
+                self._file.flush()
+            self._raw.flush()
+            os.fsync(self._raw.fileno())
+            self._file.close()
+            self._raw.close()
+            os.replace(self.temp_path, filepath)
+        except OSError:
+            self.abort()
+            storage_locations.invalidate('reports')
+            raise
+        remove_other_forms(filepath)
+        logger.info("Raport CSV: %s, %s wierszy, %s bytes", self.filename, self.rows, filepath.stat().st_size)
+        columns = self._columns.build(filepath)
+        if columns is not None:
+            self._columns.write(filepath, columns)
+            self._record_observations(report_date(filepath), columns)
+        return str(filepath)
+
+    def _record_observations(self, date: str, columns: Dict[str, Any]):
+        """Dopisuje statystyki filmów raportu (z kolumn raportu) do szeregu; błąd nie przerywa raportu"""
+        if not self.record_stats or not re.fullmatch(r'\d{4}-\d{2}-\d{2}', date):
+            return  # Raport poza szeregiem albo nazwa bez daty (stary format)
+        try:
+            video_ids = ['' if isinstance(value, float) else str(value) for value in columns['Video_ID'].tolist()]
+            observations = zip(video_ids, columns['View_Count'].tolist(), columns['Like_Count'].tolist(),
+                               columns['Comment_Count'].tolist())
+            get_stats_series().record(self.category, date, observations)
+        except Exception as e:
+            logger.warning("Nie zapisano statystyk raportu %s do szeregu: %s", self.filename, e)
+
+    def abort(self):
+        """Porzuca raport (plik tymczasowy jest usuwany)"""
+        if not self._file.closed:
+            self._file.close()
+        if not self._raw.closed:
+            self._raw.close()
+        self._columns.close()
+        try:
+            self.temp_path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self) -> "CSVReportWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is not None or not self._raw.closed:
+            self.abort()
@@ -0,0 +1,99 @@
+try:
+    import logging
+    import os
+    import threading
+    from contextlib import contextmanager
+    from pathlib import Path
+    from typing import Iterator, Optional
+except ImportError as e:
+    print(f"❌ Błąd importu w file_lock: {e}")
+    raise
+
+try:
+    import fcntl
+except ImportError:  # Windows - blokady między procesami niedostępne
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class InterProcessLock:
+    """
+    Blokada pliku (flock) współdzielona przez procesy na tym samym wolumenie danych.
+
+    hold() blokuje do uzyskania blokady (wyłącznej albo współdzielonej) i jest
+    reentrant w obrębie procesu. try_acquire() bierze blokadę wyłączną bez czekania
+    i trzyma ją do release() - tak działa wybór lidera schedulera: system zwalnia
+    blokadę razem z procesem, więc po awarii lidera inny worker może ją przejąć.
+    Bez fcntl (Windows) blokada działa tylko w obrębie procesu.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._thread_lock = threading.RLock()
+        self._fd: Optional[int] = None
+        self._depth = 0
+        self._held = False  # Blokada trzymana przez try_acquire()
+
+    def _open(self) -> int:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        return os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+
+    @contextmanager
+    def hold(self, shared: bool = False) -> Iterator[None]:
+        """Sekcja krytyczna między procesami (zagnieżdżenia w procesie nie blokują)"""
+        with self._thread_lock:
+            if self._depth == 0 and not self._held:
+                self._fd = self._open()
+                if fcntl is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0 and not self._held:
+                    self._close()
+
+    def try_acquire(self) -> bool:
+        """Próbuje wziąć blokadę wyłączną bez czekania; True = blokada należy do tego procesu"""
+        with self._thread_lock:
+            if self._held:
+                return True
+            fd = self._open()
+            if fcntl is not None:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    os.close(fd)
+                    return False
+            self._fd = fd
+            self._held = True
+            try:
+                os.ftruncate(fd, 0)
+                os.write(fd, f"{os.getpid()}\n".encode('ascii'))
+            except OSError as e:
+                logger.debug("Nie udało się zapisać PID w %s: %s", self.path, e)
+            return True
+
+    def release(self):
+        """Zwalnia blokadę wziętą przez try_acquire()"""
+        with self._thread_lock:
+            if self._held:
+                self._held = False
+                if self._depth == 0:
+                    self._close()
+
+    @property
+    def held(self) -> bool:
+        return self._held
+
+    def _close(self):
+        if self._fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._fd)
+            self._fd = None
@@ -0,0 +1,466 @@
+try:
+    import csv
+    import functools
+    import logging
+    import os
+    import re
+    import tempfile
+    import uuid
+    from datetime import datetime, timezone
+    from pathlib import Path
+    from typing import Any, Dict, List, Optional, Sequence, Union
+    from .report_files import open_report_text, report_stem
+    from .text_store import TEXT_COLUMNS, expand_text_columns
+except ImportError as e:
+    print(f"❌ Błąd importu w report_columns: {e}")
+    import traceback
+    traceback.print_exc()
+    raise
+
+logger = logging.getLogger(__name__)
+
+# Kolumny wyliczane przy zapisie raportu (nie ma ich w CSV)
+DERIVED_COLUMNS = ('duration_seconds', 'is_short', 'published_ts')
+COUNT_COLUMNS = ('View_Count', 'Like_Count', 'Comment_Count')
+# Kolumny liczbowe raportu zbierane przy zapisie (pozostałe wczytywane z gotowego pliku)
+NUMERIC_COLUMNS = COUNT_COLUMNS + ('Favorite_Count',)
+# Brak wartości w kolumnach całkowitych (czas trwania, data publikacji)
+UNKNOWN = -1
+# Próg jak w CSVGenerator._determine_video_type
+SHORTS_MAX_SECONDS = 600
+ISO_DURATION = re.compile(r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?')
+# Reguły pd.read_csv (parser C) dla pól tekstowych: puste wartości, liczby, logiczne
+CSV_NA_VALUES = frozenset({
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+})
+CSV_INT = re.compile(r'\s*[+-]?\d+\s*')
+CSV_FLOAT = re.compile(r'\s*[+-]?(?:(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?|inf|infinity)\s*', re.IGNORECASE)
+CSV_BOOLS = {'True': True, 'TRUE': True, 'true': True, 'False': False, 'FALSE': False, 'false': False}
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+PathLike = Union[str, Path]
+
+
+@functools.lru_cache(maxsize=None)
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def sidecar_candidates(csv_path: PathLike) -> List[Path]:
+    """Możliwe pliki kolumnowe raportu: report_X_DATA.columns.parquet / .columns.npz (też dla .csv.gz)"""
+    path = Path(csv_path)
+    stem = report_stem(path)
+    return [path.with_name(f"{stem}.columns{suffix}") for suffix in ('.parquet', '.npz')]
+
+
+def find_sidecar(csv_path: PathLike) -> Optional[Path]:
+    """
+    Aktualny plik kolumnowy raportu albo None.
+
+    Plik starszy niż CSV (raport nadpisany po zapisie kolumn) jest pomijany.
+    """
+    try:
+        csv_mtime = os.stat(csv_path).st_mtime_ns
+    except OSError:
+        return None
+    for candidate in sidecar_candidates(csv_path):
+        try:
+            if candidate.stat().st_mtime_ns >= csv_mtime:
+                return candidate
+        except OSError:
+            continue
+    return None
+
+
+def duration_seconds(value: Any) -> int:
+    """Sekundy z Duration: ISO 8601 (PT1H2M3S) albo liczba; UNKNOWN gdy się nie da"""
+    text = str(value)
+    match = ISO_DURATION.match(text)
+    if match:
+        hours, minutes, seconds = (int(part or 0) for part in match.groups())
+        return hours * 3600 + minutes * 60 + seconds
+    try:
+        return int(float(text))
+    except (ValueError, OverflowError):
+        return UNKNOWN
+
+
+def add_derived_columns(df):
+    """
+    Dokłada kolumny typowane do DataFrame raportu (w miejscu, zwraca df).
+
+    duration_seconds - sekundy z Duration (ISO 8601 albo liczba), UNKNOWN gdy brak,
+    is_short         - 0 <= duration_seconds <= 600 (jak video_type 'shorts'),
+    published_ts     - Date_of_Publishing + Hour_GMT2 jako sekundy epoki UTC, UNKNOWN gdy brak,
+    View/Like/Comment_Count - int64 (puste pole = 0).
+    """
+    import numpy as np
+    import pandas as pd
+
+    # Stary format raportów ma od razu liczbowe duration_seconds
+    source = next((column for column in ('Duration', 'duration_seconds') if column in df), None)
+    if source is not None:
+        # Czasy trwania mocno się powtarzają - parsowana jest każda wartość raz
+        codes, uniques = pd.factorize(df[source])
+        lookup = np.array([duration_seconds(value) for value in uniques] + [UNKNOWN], dtype='int64')
+        df['duration_seconds'] = lookup[codes]  # kod -1 (puste pole) -> UNKNOWN
+    else:
+        df['duration_seconds'] = UNKNOWN
+    df['is_short'] = (df['duration_seconds'] >= 0) & (df['duration_seconds'] <= SHORTS_MAX_SECONDS)
+
+    if 'Date_of_Publishing' in df:
+        hour = df['Hour_GMT2'].astype('string').fillna('00:00') if 'Hour_GMT2' in df else '00:00'
+        stamp = df['Date_of_Publishing'].astype('string') + ' ' + hour
+        published = pd.to_datetime(stamp, format='%Y-%m-%d %H:%M', utc=True, errors='coerce')
+        epoch = (published - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)
+        df['published_ts'] = epoch.fillna(UNKNOWN).astype('int64')
+    else:
+        df['published_ts'] = UNKNOWN
+
+    for column in COUNT_COLUMNS:
+        if column in df:
+            df[column] = pd.to_numeric(df[column], errors='coerce').fillna(0).astype('int64')
+    return df
+
+
+def _read_csv(csv_path: PathLike):
+    import pandas as pd
+
+    # Skróty tekstów zawsze jako tekst (same cyfry szesnastkowe dałyby liczbę)
+    return pd.read_csv(csv_path, dtype={column: str for column in TEXT_COLUMNS.values()})
+
+
+def _save_columns(csv_path: Path, arrays: Dict[str, Any], rows: int) -> Optional[Path]:
+    """
+    Zapisuje kolumny (nazwa -> tablica NumPy) jako plik kolumnowy raportu.
+
+    Parquet gdy jest pyarrow, inaczej nieskompresowany .npz (tekst jako tablice
+    obiektów). Zapis przez plik tymczasowy i os.replace; błąd nie przerywa
+    raportu - czytelnicy wrócą wtedy do CSV. Zwraca ścieżkę albo None.
+    """
+    import numpy as np
+
+    parquet = parquet_available()
+    target = sidecar_candidates(csv_path)[0 if parquet else 1]
+    temp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex[:12]}.partial")
+    try:
+        if parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            # from_pandas - NaN (także w kolumnach tekstowych) zapisywany jako brak wartości
+            table = pa.table({column: pa.array(values, from_pandas=True) for column, values in arrays.items()})
+            pq.write_table(table, temp_path)
+        else:
+            with open(temp_path, 'xb') as f:
+                np.savez(f, __columns__=np.array(list(arrays)), **arrays)
+        os.replace(temp_path, target)
+    except Exception as e:
+        logger.warning("Nie zapisano kolumn raportu %s: %s", csv_path.name, e)
+        try:
+            temp_path.unlink()
+        except FileNotFoundError:
+            pass
+        return None
+    logger.debug("Kolumny raportu: %s, %s wierszy", target.name, rows)
+    return target
+
+
+def write_report_columns(csv_path: PathLike) -> Optional[Path]:
+    """
+    Zapisuje plik kolumnowy obok istniejącego raportu CSV (wczytuje cały raport).
+
+    Do uzupełniania raportów sprzed plików kolumnowych; nowe raporty dostają
+    plik z ReportColumnsBuilder bez ponownego czytania CSV. Kolumny mają typy
+    takie jak z pd.read_csv, plus DERIVED_COLUMNS.
+    """
+    csv_path = Path(csv_path)
+    try:
+        df = add_derived_columns(_read_csv(csv_path))
+    except Exception as e:
+        logger.warning("Nie zapisano kolumn raportu %s: %s", csv_path.name, e)
+        return None
+    return _save_columns(csv_path, {column: df[column].to_numpy() for column in df.columns}, len(df))
+
+
+def _typed_column(fields: List[str], text: bool = False):
+    """
+    Tablica NumPy z pól CSV kolumny, typ jak z pd.read_csv.
+
+    int64 (float64 gdy są puste pola), float64, bool (object gdy są puste pola),
+    inaczej object z NaN w miejscu pustych wartości. `text` - zawsze object
+    (jak dtype=str w _read_csv).
+    """
+    import numpy as np
+
+    if not fields:
+        return np.array([], dtype=object)
+    missing = [field in CSV_NA_VALUES for field in fields]
+    present = [field for field, is_missing in zip(fields, missing) if not is_missing]
+    has_missing = len(present) < len(fields)
+    if text:
+        return np.array([np.nan if is_missing else field for field, is_missing in zip(fields, missing)], dtype=object)
+    if not present:
+        return np.full(len(fields), np.nan)
+    if all(CSV_INT.fullmatch(field) for field in present):
+        numbers = [int(field) for field in present]
+        if INT64_MIN <= min(numbers) and max(numbers) <= INT64_MAX:
+            if not has_missing:
+                return np.array(numbers, dtype='int64')
+            return np.array([np.nan if is_missing else float(field) for field, is_missing in zip(fields, missing)])
+    if all(CSV_FLOAT.fullmatch(field) for field in present):
+        return np.array([np.nan if is_missing else float(field) for field, is_missing in zip(fields, missing)])
+    if all(field in CSV_BOOLS for field in present):
+        if not has_missing:
+            return np.array([CSV_BOOLS[field] for field in fields], dtype=bool)
+        return np.array([np.nan if is_missing else CSV_BOOLS[field] for field, is_missing in zip(fields, missing)],
+                        dtype=object)
+    return np.array([np.nan if is_missing else field for field, is_missing in zip(fields, missing)], dtype=object)
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and value != value)
+
+
+def _published_ts(date: str, hour: str) -> int:
+    """Date_of_Publishing + Hour_GMT2 (pola CSV) jako sekundy epoki UTC, jak w add_derived_columns"""
+    if date in CSV_NA_VALUES:
+        return UNKNOWN
+    hour = '00:00' if hour in CSV_NA_VALUES else hour
+    try:
+        published = datetime.strptime(f"{date} {hour}", '%Y-%m-%d %H:%M').replace(tzinfo=timezone.utc)
+    except ValueError:
+        return UNKNOWN
+    return int(published.timestamp())
+
+
+def _count_value(value: Any) -> int:
+    if _is_missing(value):
+        return 0
+    try:
+        return int(float(value))
+    except (TypeError, ValueError, OverflowError):
+        return 0
+
+
+def _csv_field(value: Any) -> str:
+    """Pole tak, jak zapisuje je csv.writer: None -> puste, reszta przez str()"""
+    return '' if value is None else value if isinstance(value, str) else str(value)
+
+
+class _SpillFile:
+    """Tablica int64 / uint8 dopisywana porcjami do anonimowego pliku tymczasowego"""
+
+    def __init__(self, directory: Path, dtype: str):
+        self.dtype = dtype
+        self._file = tempfile.TemporaryFile(dir=directory)
+
+    def append(self, values: List[int]):
+        import numpy as np
+        self._file.write(np.array(values, dtype=self.dtype).tobytes())
+
+    def read(self):
+        import numpy as np
+        self._file.seek(0)
+        return np.frombuffer(self._file.read(), dtype=self.dtype).copy()
+
+    def close(self):
+        self._file.close()
+
+
+class ReportColumnsBuilder:
+    """
+    Plik kolumnowy budowany przy zapisie raportu CSV.
+
+    CSVReportWriter przekazuje tu każdą porcję wierszy (te same wartości co do
+    csv.writer). Kolumny liczbowe (NUMERIC_COLUMNS) i DERIVED_COLUMNS są liczone
+    od razu i dopisywane porcjami jako int64 do plików tymczasowych - w pamięci
+    nie zostaje nic z poprzednich porcji. Kolumny tekstowe są przy build()
+    wczytywane z gotowego raportu (tylko te kolumny, bez pandas). Typy są takie
+    jak z pd.read_csv, więc wynik odpowiada write_report_columns().
+    """
+
+    def __init__(self, columns: Sequence[str], directory: PathLike):
+        self.columns = list(columns)
+        self.rows = 0
+        directory = Path(directory)
+        self._numeric = {column: (_SpillFile(directory, 'int64'), _SpillFile(directory, 'uint8'))
+                         for column in NUMERIC_COLUMNS if column in self.columns}
+        # Kolumna z wartością nie-całkowitą wraca do zwykłego odczytu z raportu
+        self._reread = set()
+        self._derived = {column: _SpillFile(directory, 'int64') for column in ('duration_seconds', 'published_ts')}
+        self._durations: Dict[str, int] = {}
+
+    def add_rows(self, rows: Sequence[Sequence[Any]]):
+        """Dodaje porcję wierszy (wartości w kolejności columns, jak dla csv.writer)"""
+        if not rows:
+            return
+        index = {column: position for position, column in enumerate(self.columns)}
+        for column, (values_file, missing_file) in self._numeric.items():
+            if column in self._reread:
+                continue
+            fields = [_csv_field(row[index[column]]) for row in rows]
+            missing = [field in CSV_NA_VALUES for field in fields]
+            if not all(is_missing or CSV_INT.fullmatch(field) for field, is_missing in zip(fields, missing)):
+                self._reread.add(column)
+                continue
+            values = [0 if is_missing else int(field) for field, is_missing in zip(fields, missing)]
+            if values and not (INT64_MIN <= min(values) and max(values) <= INT64_MAX):
+                self._reread.add(column)
+                continue
+            values_file.append(values)
+            missing_file.append(missing)
+
+        seconds = []
+        for row in rows:
+            field = _csv_field(row[index['Duration']]) if 'Duration' in index else ''
+            if field in CSV_NA_VALUES:
+                seconds.append(UNKNOWN)
+                continue
+            # Czasy trwania mocno się powtarzają - parsowana jest każda wartość raz
+            if field not in self._durations:
+                self._durations[field] = duration_seconds(field)
+            seconds.append(self._durations[field])
+        self._derived['duration_seconds'].append(seconds)
+
+        if 'Date_of_Publishing' in index:
+            stamps = [
+                _published_ts(_csv_field(row[index['Date_of_Publishing']]),
+                                    _csv_field(row[index['Hour_GMT2']]) if 'Hour_GMT2' in index else '')
+                for row in rows
+            ]
+        else:
+            stamps = [UNKNOWN] * len(rows)
+        self._derived['published_ts'].append(stamps)
+        self.rows += len(rows)
+
+    def _read_fields(self, csv_path: Path, columns: List[str]) -> Dict[str, List[str]]:
+        """Pola wskazanych kolumn z gotowego raportu (pozostałe kolumny są pomijane)"""
+        fields = {column: [] for column in columns}
+        with open_report_text(csv_path) as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            wanted = [(header.index(column), fields[column]) for column in columns]
+            for row in reader:
+                for position, buffer in wanted:
+                    buffer.append(row[position])
+        return fields
+
+    def build(self, csv_path: PathLike) -> Optional[Dict[str, Any]]:
+        """Kolumny raportu (nazwa -> tablica NumPy) po zapisie `csv_path`; None przy błędzie"""
+        import numpy as np
+
+        csv_path = Path(csv_path)
+        try:
+            spilled = [column for column in self._numeric if column not in self._reread] if self.rows else []
+            text_columns = set(TEXT_COLUMNS.values())
+            fields = self._read_fields(csv_path, [column for column in self.columns if column not in spilled])
+            arrays = {}
+            for column in self.columns:
+                if column not in spilled:
+                    arrays[column] = _typed_column(fields.pop(column), text=column in text_columns)
+                    continue
+                values_file, missing_file = self._numeric[column]
+                values, missing = values_file.read(), missing_file.read().astype(bool)
+                if column in COUNT_COLUMNS or not missing.any():
+                    arrays[column] = values  # Brak wartości w licznikach = 0
+                else:
+                    arrays[column] = np.where(missing, np.nan, values.astype('float64'))
+
+            arrays['duration_seconds'] = self._derived['duration_seconds'].read()
+            arrays['is_short'] = (arrays['duration_seconds'] >= 0) & (arrays['duration_seconds'] <= SHORTS_MAX_SECONDS)
+            arrays['published_ts'] = self._derived['published_ts'].read()
+            for column in COUNT_COLUMNS:
+                if column in arrays and column not in spilled:
+                    arrays[column] = np.array([_count_value(value) for value in arrays[column].tolist()],
+                                              dtype='int64')
+            return arrays
+        except Exception as e:
+            logger.warning("Nie zbudowano kolumn raportu %s: %s", csv_path.name, e)
+            return None
+        finally:
+            self.close()
+
+    def write(self, csv_path: PathLike, arrays: Optional[Dict[str, Any]] = None) -> Optional[Path]:
+        """Zapisuje plik kolumnowy obok raportu `csv_path` (z gotowych `arrays` albo build())"""
+        csv_path = Path(csv_path)
+        if arrays is None:
+            arrays = self.build(csv_path)
+        if arrays is None:
+            return None
+        return _save_columns(csv_path, arrays, self.rows)
+
+    def close(self):
+        """Usuwa pliki tymczasowe (build() robi to sam)"""
+        for spill in [*self._derived.values(), *(f for pair in self._numeric.values() for f in pair)]:
+            spill.close()
+
+
+def _read_sidecar(path: Path, columns: Optional[Sequence[str]]):
+    import numpy as np
+    import pandas as pd
+
+    if path.suffix == '.parquet':
+        if columns is not None:
+            import pyarrow.parquet as pq
+            available = set(pq.read_schema(path).names)
+            columns = [column for column in columns if column in available]
+        df = pd.read_parquet(path, columns=columns)
+        # Brak wartości w kolumnach object wraca jako None - jak w pd.read_csv ma być NaN
+        for column in df.columns[df.dtypes == object]:
+            if df[column].hasnans:
+                df[column] = df[column].astype(object).where(df[column].notna(), np.nan)
+        return df
+    # Tablice npz wczytywane są leniwie - tylko wskazane kolumny
+    with np.load(path, allow_pickle=True) as data:
+        names = [str(name) for name in data['__columns__']]
+        wanted = names if columns is None else [column for column in columns if column in names]
+        return pd.DataFrame({column: data[column] for column in wanted}, columns=wanted)
+
+
+def read_report(csv_path: PathLike, columns: Optional[Sequence[str]] = None):
+    """
+    DataFrame raportu: z pliku kolumnowego, a gdy go brak (lub jest nieaktualny) - z CSV.
+
+    Wynik jest taki sam w obu przypadkach: kolumny CSV z typami pd.read_csv
+    oraz DERIVED_COLUMNS. `columns` ogranicza wczytane kolumny (brakujące są pomijane).
+    """
+    sidecar = find_sidecar(csv_path)
+    if sidecar is not None:
+        try:
+            return _read_sidecar(sidecar, columns)
+        except Exception as e:
+            logger.warning("Plik kolumnowy %s nieczytelny (%s) - wczytuję CSV", sidecar.name, e)
+    df = add_derived_columns(_read_csv(csv_path))
+    if columns is not None:
+        df = df[[column for column in columns if column in df.columns]]
+    return df
+
+
+def read_report_rows(csv_path: PathLike, columns: Optional[Sequence[str]] = None,
+                     with_text: bool = False) -> List[Dict[str, Any]]:
+    """
+    Wiersze raportu jako słowniki (dla czytelników w stylu csv.DictReader).
+
+    Puste pola tekstowe i nieznany duration_seconds/published_ts to '' - jak w DictReader.
+    `with_text` uzupełnia raport kompaktowy o Description / Tags z magazynu tekstów.
+    """
+    from pandas.api.types import is_numeric_dtype
+
+    df = read_report(csv_path, columns)
+    values = []
+    for column in df.columns:
+        series = df[column]
+        if column in ('duration_seconds', 'published_ts'):
+            values.append(['' if value == UNKNOWN else value for value in series.tolist()])
+        elif is_numeric_dtype(series) and not series.hasnans:
+            values.append(series.tolist())
+        else:
+            values.append(series.astype(object).where(series.notna(), '').tolist())
+    names = list(df.columns)
+    rows = [dict(zip(names, row)) for row in zip(*values)]
+    return expand_text_columns(rows) if with_text else rows
@@ -0,0 +1,168 @@
+try:
+    import gzip
+    import io
+    import logging
+    from pathlib import Path
+    from typing import IO, Iterator, List, Optional, Tuple, Union
+except ImportError as e:
+    print(f"❌ Błąd importu w report_files: {e}")
+    import traceback
+    traceback.print_exc()
+    raise
+
+logger = logging.getLogger(__name__)
+
+# Rozszerzenie raportu -> kompresja (wartość report_compression / Content-Encoding)
+REPORT_SUFFIXES = {'.csv': '', '.csv.gz': 'gzip', '.csv.zst': 'zstd'}
+COMPRESSION_SUFFIXES = {compression: suffix for suffix, compression in REPORT_SUFFIXES.items()}
+CHUNK_SIZE = 64 * 1024
+
+PathLike = Union[str, Path]
+
+
+def split_report_name(name: str) -> Tuple[str, str]:
+    """('report_X_DATA', '.csv.gz') dla nazwy raportu; ('nazwa', '') gdy to nie raport"""
+    for suffix in sorted(REPORT_SUFFIXES, key=len, reverse=True):
+        if name.endswith(suffix):
+            return name[:-len(suffix)], suffix
+    return name, ''
+
+
+def report_stem(path: PathLike) -> str:
+    """Nazwa raportu bez rozszerzenia (report_PODCAST_2025-08-13 dla .csv i .csv.gz)"""
+    return split_report_name(Path(path).name)[0]
+
+
+def report_date(path: PathLike) -> str:
+    """Część nazwy raportu po ostatnim '_' (data YYYY-MM-DD w nowym formacie)"""
+    return report_stem(path).split('_')[-1]
+
+
+def is_report_file(name: str) -> bool:
+    """Czy nazwa to raport CSV (zwykły albo skompresowany)"""
+    return bool(split_report_name(name)[1])
+
+
+def report_compression(path: PathLike) -> str:
+    """'' dla zwykłego CSV, inaczej 'gzip' / 'zstd'"""
+    return REPORT_SUFFIXES.get(split_report_name(Path(path).name)[1], '')
+
+
+def report_suffix(compression: str) -> str:
+    """Rozszerzenie raportu dla ustawienia report_compression ('', 'gzip', 'zstd')"""
+    compression = (compression or '').strip().lower()
+    if compression in ('none', 'off'):
+        compression = ''
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Nieznana kompresja raportów: {compression!r} (dostępne: gzip, zstd)")
+    return COMPRESSION_SUFFIXES[compression]
+
+
+def glob_reports(directory: PathLike, prefix: str = '') -> List[Path]:
+    """Raporty w katalogu (wszystkie formy) o nazwie zaczynającej się od `prefix`"""
+    directory = Path(directory)
+    found = []
+    for suffix in REPORT_SUFFIXES:
+        found.extend(directory.glob(f"{prefix}*{suffix}"))
+    return found
+
+
+def find_report(directory: PathLike, stem: str) -> Optional[Path]:
+    """
+    Plik raportu o danej nazwie bez rozszerzenia, w dowolnej formie.
+
+    Gdy jest kilka (np. zmiana report_compression w trakcie dnia), wygrywa najnowszy.
+    """
+    newest = None
+    newest_mtime = -1
+    for suffix in REPORT_SUFFIXES:
+        candidate = Path(directory) / f"{stem}{suffix}"
+        try:
+            mtime = candidate.stat().st_mtime_ns
+        except OSError:
+            continue
+        if mtime > newest_mtime:
+            newest, newest_mtime = candidate, mtime
+    return newest
+
+
+def remove_other_forms(path: PathLike):
+    """Usuwa starsze wersje raportu w innej formie (report_X.csv obok nowego report_X.csv.gz)"""
+    path = Path(path)
+    stem = report_stem(path)
+    for suffix in REPORT_SUFFIXES:
+        sibling = path.with_name(f"{stem}{suffix}")
+        if sibling.name == path.name:
+            continue
+        try:
+            sibling.unlink()
+            logger.debug("Usunięto poprzednią wersję raportu: %s", sibling.name)
+        except FileNotFoundError:
+            pass
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("Kompresja zstd wymaga pakietu zstandard (pip install zstandard)") from None
+    return zstandard
+
+
+def open_report_binary(path: PathLike) -> IO[bytes]:
+    """Zdekompresowane bajty raportu (dowolna forma)"""
+    compression = report_compression(path)
+    if compression == 'gzip':
+        return gzip.open(path, 'rb')
+    if compression == 'zstd':
+        return _zstandard().ZstdDecompressor().stream_reader(open(path, 'rb'))
+    return open(path, 'rb')
+
+
+def open_report_text(path: PathLike) -> IO[str]:
+    """Raport jako tekst do csv.reader / csv.DictReader (BOM pomijany jak w utf-8-sig)"""
+    return io.TextIOWrapper(open_report_binary(path), encoding='utf-8-sig', newline='')
+
+
+def compressed_writer(raw: IO[bytes], compression: str) -> IO[bytes]:
+    """
+    Strumień kompresujący do otwartego pliku `raw` (nie zamyka go przy close()).
+
+    Zamknięcie zwróconego strumienia kończy ramkę gzip/zstd; fsync i zamknięcie
+    `raw` należą do wywołującego.
+    """
+    if compression == 'gzip':
+        # mtime=0 - ten sam raport daje te same bajty
+        return gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6, mtime=0)
+    if compression == 'zstd':
+        return _zstandard().ZstdCompressor(level=10).stream_writer(raw, closefd=False)
+    raise ValueError(f"Nieznana kompresja raportów: {compression!r}")
+
+
+def iter_report_bytes(path: PathLike, decompress: bool) -> Iterator[bytes]:
+    """Bajty pliku raportu porcjami CHUNK_SIZE - surowe albo zdekompresowane"""
+    with (open_report_binary(path) if decompress else open(path, 'rb')) as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+def accepts_encoding(accept_encoding: str, encoding: str) -> bool:
+    """Czy nagłówek Accept-Encoding dopuszcza `encoding` (q=0 oznacza odmowę, '*' - każde)"""
+    weights = {}
+    for item in (accept_encoding or '').split(','):
+        name, _, params = item.partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        weight = 1.0
+        params = params.replace(' ', '')
+        if params.startswith('q='):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name] = weight
+    return weights.get(encoding, weights.get('*', 0.0)) > 0
@@ -0,0 +1,349 @@
+try:
+    import json
+    import logging
+    import sqlite3
+    import threading
+    from pathlib import Path
+    from typing import Dict, List, Optional
+    from .state_manager import StateManager
+except ImportError as e:
+    print(f"❌ Błąd importu w sqlite_state_manager: {e}")
+    raise
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteStateManager(StateManager):
+    """
+    StateManager z danymi w osadzonej bazie SQLite (tryb WAL) zamiast plików JSON.
+
+    Każdy kanał to osobny wiersz, więc dodanie lub usunięcie kanału i kategorii
+    jest jedną krótką transakcją, a odczyt nie wymaga całego dokumentu w pamięci.
+    Stan quota, stan systemu i metadane kanałów są wierszami tabeli documents
+    (zapis = jeden UPSERT zamiast przepisania pliku z fsync). Przy pierwszym
+    starcie dane są migrowane z channels.json, quota_state.json, system_state.json
+    i channel_metadata.json; pliki JSON zostają na dysku jako kopia.
+    """
+
+    DB_NAME = "state.db"
+
+    def __init__(self, data_dir: str = None, quota_flush_units: int = 50):
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.RLock()
+        super().__init__(data_dir=data_dir, quota_flush_units=quota_flush_units)
+
+    # --- Baza ---
+
+    @property
+    def db_file(self) -> Path:
+        return self.data_dir / self.DB_NAME
+
+    def _open_database(self) -> bool:
+        """Otwiera bazę i tworzy schemat; zwraca True, jeśli baza jest nowa"""
+        is_new = not self.db_file.exists()
+        self._conn = sqlite3.connect(str(self.db_file), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # FULL: commit jest trwały po powrocie (jak dotychczasowy fsync plików JSON)
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS categories (name TEXT PRIMARY KEY, position INTEGER NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS channels ("
+                "id TEXT PRIMARY KEY, url TEXT NOT NULL UNIQUE, "
+                "category TEXT NOT NULL REFERENCES categories(name) ON DELETE CASCADE, "
+                "position INTEGER NOT NULL, data TEXT NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_channels_category ON channels(category, position)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS documents (name TEXT PRIMARY KEY, data TEXT NOT NULL)")
+        logger.info("Baza stanu: %s", self.db_file.absolute())
+        return is_new
+
+    def _migrate_from_json(self):
+        """Jednorazowy import istniejących plików JSON do nowej bazy"""
+        logger.info("Migracja stanu z plików JSON: %s", self.data_dir.absolute())
+        # Kanały przechodzą przez walidację i usuwanie duplikatów z StateManager.load_channels
+        StateManager.load_channels(self)
+        for path in (self.quota_file, self.system_state_file, self.channel_metadata_file):
+            data = StateManager._safe_read_file(self, path)
+            if data:
+                self._put_document(path, data)
+        channels_count = self._count_channels()
+        logger.info("Zmigrowano %s kanałów do %s", channels_count, self.db_file.name)
+
+    def _put_document(self, path: Path, data: dict):
+        with self._db_lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents VALUES (?, ?)",
+                (path.name, json.dumps(data, ensure_ascii=False))
+            )
+
+    def _count_channels(self) -> int:
+        with self._db_lock:
+            return self._conn.execute("SELECT COUNT(*) FROM channels").fetchone()[0]
+
+    def close(self):
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # --- Dokumenty (quota, stan systemu, metadane kanałów) ---
+
+    def _is_document(self, file_path: Path) -> bool:
+        return self._conn is not None and file_path in (
+            self.quota_file, self.system_state_file, self.channel_metadata_file
+        )
+
+    def _safe_write_file(self, file_path: Path, data: dict, fsync: bool = True):
+        """Dokumenty stanu zapisywane jako wiersz bazy (jedna transakcja)"""
+        if not self._is_document(file_path):
+            return super()._safe_write_file(file_path, data, fsync)
+        try:
+            self._put_document(file_path, data)
+            logger.debug("Zapisano dokument %s w bazie", file_path.name)
+        except Exception as e:
+            logger.error("Error writing %s to database: %s", file_path.name, e)
+            raise
+
+    def _safe_read_file(self, file_path: Path) -> dict:
+        """Dokumenty stanu czytane z bazy"""
+        if not self._is_document(file_path):
+            return super()._safe_read_file(file_path)
+        try:
+            with self._db_lock:
+                row = self._conn.execute(
+                    "SELECT data FROM documents WHERE name = ?", (file_path.name,)
+                ).fetchone()
+            return json.loads(row[0]) if row else {}
+        except Exception as e:
+            logger.error("Error reading %s from database: %s", file_path.name, e)
+            return {}
+
+    # --- Kanały ---
+
+    @property
+    def channels_data(self) -> Dict[str, List[Dict]]:
+        """Kanały w kategoriach (kolejność dodania), czytane z bazy przy każdym dostępie"""
+        if self._conn is None:
+            return {}
+        with self._db_lock:
+            categories = self._conn.execute("SELECT name FROM categories ORDER BY position").fetchall()
+            rows = self._conn.execute("SELECT category, data FROM channels ORDER BY position").fetchall()
+        data = {name: [] for name, in categories}
+        for category, channel in rows:
+            data.setdefault(category, []).append(json.loads(channel))
+        return data
+
+    @channels_data.setter
+    def channels_data(self, value: Dict[str, List[Dict]]):
+        """Zastępuje wszystkie kanały jedną transakcją (migracja, czyszczenie danych)"""
+        if self._conn is None:
+            return
+        with self._db_lock, self._conn:
+            self._conn.execute("DELETE FROM channels")
+            self._conn.execute("DELETE FROM categories")
+            for category_position, (category, channels) in enumerate(value.items()):
+                self._conn.execute("INSERT INTO categories VALUES (?, ?)", (category, category_position))
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO channels VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (channel['id'], channel['url'], category, position, json.dumps(channel, ensure_ascii=False))
+                        for position, channel in enumerate(channels)
+                    ]
+                )
+
+    def _channel_map(self, key_column: str, value_column: str) -> Dict[str, Dict]:
+        if self._conn is None:
+            return {}
+        with self._db_lock:
+            rows = self._conn.execute(
+                f"SELECT {key_column}, {value_column}, category, json_extract(data, '$.title') FROM channels"
+            ).fetchall()
+        value_name = 'url' if value_column == 'url' else 'id'
+        return {key: {'name': title, 'category': category, value_name: value} for key, value, category, title in rows}
+
+    @property
+    def channel_id_map(self) -> Dict[str, Dict]:
+        """Indeks ID kanałów (w bazie: klucz główny tabeli channels)"""
+        return self._channel_map('id', 'url')
+
+    @channel_id_map.setter
+    def channel_id_map(self, value):
+        pass  # Unikalność pilnuje baza
+
+    @property
+    def channel_url_map(self) -> Dict[str, Dict]:
+        """Indeks URL kanałów (w bazie: ograniczenie UNIQUE)"""
+        return self._channel_map('url', 'id')
+
+    @channel_url_map.setter
+    def channel_url_map(self, value):
+        pass  # Unikalność pilnuje baza
+
+    def load_all_data(self):
+        """Otwiera bazę (przy pierwszym starcie migruje pliki JSON) i ładuje stan"""
+        if self._conn is None:
+            try:
+                if self._open_database():
+                    self._migrate_from_json()
+            except Exception as e:
+                logger.error("Błąd podczas otwierania bazy stanu: %s", e)
+                raise
+        super().load_all_data()
+
+    def load_channels(self) -> Dict[str, List[Dict]]:
+        """Kanały są w bazie - tylko podsumowanie"""
+        channels_count = self._count_channels()
+        logger.info("Kanały w bazie: %s", channels_count)
+        return self.channels_data
+
+    def save_channels(self):
+        """Każda zmiana kanałów jest osobną transakcją - nie ma czego zapisywać"""
+
+    def _sync_channels(self):
+        """Odczyty idą prosto z bazy - zmiany innych workerów są widoczne od razu"""
+
+    def get_channels(self) -> Dict[str, List[Dict]]:
+        """Zwraca wszystkie kanały z dodanym polem category"""
+        return {
+            category: [dict(channel, category=category) for channel in channels]
+            for category, channels in self.channels_data.items()
+        }
+
+    def add_channel(self, channel_data: Dict, category: str = "general"):
+        """Dodaje kanał do kategorii (jeden wiersz, jedna transakcja)"""
+        try:
+            channel_id = channel_data.get('id', '')
+            channel_name = channel_data.get('title', '')
+            channel_url = channel_data.get('url', '')
+
+            logger.info("Adding channel: %s (%s) to category: %s", channel_name, channel_id, category)
+
+            if not channel_id or not channel_id.startswith('UC'):
+                raise ValueError(f"Invalid channel_id: {channel_id}")
+            if not channel_name:
+                raise ValueError("Missing channel_name")
+            if not channel_url:
+                raise ValueError("Missing channel_url")
+            if not self._validate_youtube_url(channel_url):
+                raise ValueError(f"Invalid YouTube URL format: {channel_url}")
+
+            with self._db_lock, self._conn:
+                for column, value, label in (('id', channel_id, 'ID'), ('url', channel_url, 'URL')):
+                    existing = self._conn.execute(
+                        f"SELECT category, json_extract(data, '$.title') FROM channels WHERE {column} = ?", (value,)
+                    ).fetchone()
+                    if existing:
+                        raise ValueError(
+                            f"Channel with {label} {value} already exists in category {existing[0]}: {existing[1]}"
+                        )
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO categories VALUES (?, (SELECT COALESCE(MAX(position), -1) + 1 FROM categories))",
+                    (category,)
+                )
+                self._conn.execute(
+                    "INSERT INTO channels VALUES (?, ?, ?, (SELECT COALESCE(MAX(position), -1) + 1 FROM channels), ?)",
+                    (channel_id, channel_url, category, json.dumps(channel_data, ensure_ascii=False))
+                )
+
+            logger.info("Successfully added channel: %s (%s) to category: %s", channel_name, channel_id, category)
+
+        except Exception as e:
+            logger.error("Error adding channel: %s", e)
+            raise
+
+    def remove_channel(self, channel_id: str, category: str = "general"):
+        """Usuwa kanał z kategorii (pusta kategoria jest usuwana w tej samej transakcji)"""
+        try:
+            logger.info("Removing channel: %s from category: %s", channel_id, category)
+
+            with self._db_lock, self._conn:
+                if not self._conn.execute("SELECT 1 FROM categories WHERE name = ?", (category,)).fetchone():
+                    raise ValueError(f"Category {category} not found")
+                deleted = self._conn.execute(
+                    "DELETE FROM channels WHERE id = ? AND category = ?", (channel_id, category)
+                ).rowcount
+                if not deleted:
+                    raise ValueError(f"Channel {channel_id} not found in category {category}")
+                self._conn.execute(
+                    "DELETE FROM categories WHERE name = ? AND NOT EXISTS "
+                    "(SELECT 1 FROM channels WHERE category = ?)", (category, category)
+                )
+
+            logger.info("Successfully removed channel: %s from category: %s", channel_id, category)
+
+        except Exception as e:
+            logger.error("Error removing channel: %s", e)
+            raise
+
+    def add_category(self, category_name: str) -> Dict:
+        """Dodaje nową kategorię"""
+        try:
+            if not category_name or not category_name.strip():
+                raise ValueError("Nazwa kategorii nie może być pusta")
+            category_name = category_name.strip()
+
+            with self._db_lock, self._conn:
+                if self._conn.execute("SELECT 1 FROM categories WHERE name = ?", (category_name,)).fetchone():
+                    raise ValueError(f"Kategoria '{category_name}' już istnieje")
+                self._conn.execute(
+                    "INSERT INTO categories VALUES (?, (SELECT COALESCE(MAX(position), -1) + 1 FROM categories))",
+                    (category_name,)
+                )
+
+            logger.info("Added new category: %s", category_name)
+
+            return {
+                'name': category_name,
+                'channels_count': 0,
+                'message': f'Kategoria "{category_name}" została dodana'
+            }
+
+        except Exception as e:
+            logger.error("Error adding category: %s", e)
+            raise
+
+    def remove_category(self, category_name: str, force: bool = False) -> Dict:
+        """Usuwa kategorię (kanały usuwane kaskadowo w tej samej transakcji)"""
+        try:
+            with self._db_lock, self._conn:
+                if not self._conn.execute("SELECT 1 FROM categories WHERE name = ?", (category_name,)).fetchone():
+                    raise ValueError(f"Kategoria '{category_name}' nie istnieje")
+                channels_count = self._conn.execute(
+                    "SELECT COUNT(*) FROM channels WHERE category = ?", (category_name,)
+                ).fetchone()[0]
+                if channels_count > 0 and not force:
+                    raise ValueError(
+                        f"Kategoria '{category_name}' zawiera {channels_count} kanałów. "
+                        "Użyj force=true aby usunąć kategorię wraz z kanałami."
+                    )
+                self._conn.execute("DELETE FROM categories WHERE name = ?", (category_name,))
+
+            logger.info("Removed category: %s (%s channels)", category_name, channels_count)
+
+            return {
+                'name': category_name,
+                'channels_count': channels_count,
+                'message': f'Kategoria "{category_name}" została usunięta ({channels_count} kanałów)'
+            }
+
+        except Exception as e:
+            logger.error("Error removing category: %s", e)
+            raise
+
+    def clear_all_data(self):
+        """Czyści wszystkie dane (pliki JSON i tabele bazy)"""
+        super().clear_all_data()
+        with self._db_lock, self._conn:
+            self._conn.execute("DELETE FROM documents")
+        logger.debug("[CLEAR] Cleared state database: %s", self.db_file.absolute())
+
+    def get_data_stats(self) -> Dict:
+        """Zwraca statystyki danych (z informacją o bazie)"""
+        stats = super().get_data_stats()
+        stats['backend'] = 'sqlite'
+        stats['files_exist'][self.DB_NAME] = self.db_file.exists()
+        return stats
@@ -1,14 +1,17 @@
 try:
+    import functools
+    import hashlib
     import json
     import logging
     import os
     from pathlib import Path
-    from typing import Dict, List, Optional, Any
+    from typing import Dict, List, Optional, Any, Tuple
     from datetime import datetime, timedelta
     import re
-    from ..config import settings
-    
-    print("✅ Wszystkie importy w state_manager udane")
+    import threading
+    from ..config import settings, storage_locations
+    from .file_lock import InterProcessLock
+    from .report_files import glob_reports
 except ImportError as e:
     print(f"❌ Błąd importu w state_manager: {e}")
     import traceback
@@ -18,27 +21,29 @@ except ImportError as e:
 logger = logging.getLogger(__name__)
 
 
+def _synchronized(method):
+    """Mutacja kanałów pod blokadą międzyprocesową, na danych zapisanych przez inne procesy"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._state_lock.hold():
+            self._sync_channels()
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class StateManager:
     """Zarządza trwałymi danymi systemu z obsługą Railway Volume Path"""
     
-    def __init__(self, data_dir: str = None):
-        print(f"[INIT] StateManager initialization started")
+    def __init__(self, data_dir: str = None, quota_flush_units: int = 50):
+        logger.debug("[INIT] StateManager initialization started")
         
-        # Użyj Railway Volume Path jeśli dostępny, w przeciwnym razie domyślny katalog /mnt/volume
+        # Katalog na wolumenie (Railway / /mnt/volume) albo lokalny - wspólny dla całej aplikacji
         if data_dir is None:
-            railway_volume = os.getenv("RAILWAY_VOLUME_PATH")
-            if railway_volume:
-                data_dir = os.path.join(railway_volume, "data")
-                print(f"[INIT] Using Railway Volume Path: {data_dir}")
-                logger.info(f"Using Railway Volume Path: {data_dir}")
-            else:
-                data_dir = "/mnt/volume/data"
-                print(f"[INIT] Using default persistent directory: {data_dir}")
-                logger.info(f"Using default persistent directory: {data_dir}")
+            data_dir = storage_locations.data
+            logger.info("Using persistent directory: %s", data_dir)
         
         self.data_dir = Path(data_dir)
-        print(f"[INIT] Data directory set to: {self.data_dir.absolute()}")
-        logger.info(f"Data directory set to: {self.data_dir.absolute()}")
+        logger.info("Data directory set to: %s", self.data_dir.absolute())
         
         # Sprawdź i utwórz katalog jeśli nie istnieje
         self._ensure_data_directory()
@@ -46,166 +51,224 @@ class StateManager:
         # Pliki z danymi
         self.channels_file = self.data_dir / "channels.json"
         self.quota_file = self.data_dir / "quota_state.json"
+        # Dziennik przyrostów quota (append-only) między zapisami quota_state.json
+        self.quota_wal_file = self.data_dir / "quota_state.wal"
         self.system_state_file = self.data_dir / "system_state.json"
+        self.channel_metadata_file = self.data_dir / "channel_metadata.json"
+        # Skrót ostatnio zwalidowanego channels.json (szybki start bez walidacji)
+        self.channels_snapshot_file = self.data_dir / "channels_snapshot.json"
+        # Workerzy uvicorn współdzielą katalog danych: zmiany kanałów i scalanie quota
+        # odbywają się pod blokadą pliku, a zmiana channels.json jest wykrywana po stat()
+        self._state_lock = InterProcessLock(self.data_dir / ".state.lock")
+        self._channels_stamp = None
         
-        print(f"[INIT] File paths:")
-        print(f"[INIT]   channels: {self.channels_file.absolute()}")
-        print(f"[INIT]   quota: {self.quota_file.absolute()}")
-        print(f"[INIT]   system: {self.system_state_file.absolute()}")
-        logger.info(f"File paths - channels: {self.channels_file.absolute()}, quota: {self.quota_file.absolute()}, system: {self.system_state_file.absolute()}")
+        logger.info("File paths - channels: %s, quota: %s, system: %s", self.channels_file.absolute(), self.quota_file.absolute(), self.system_state_file.absolute())
         
         # Inicjalizacja danych
         self.channels_data = {}
         self.quota_state = {}
         self.system_state = {}
         
+        # Licznik quota trzymany w pamięci: przyrosty trafiają do dziennika co
+        # quota_flush_units jednostek, a pełny stan jest zapisywany przez flush_quota()
+        self.quota_flush_units = max(1, quota_flush_units)
+        self._quota_lock = threading.Lock()
+        self._quota_unlogged = 0  # Jednostki jeszcze niezapisane w dzienniku
+        self._quota_unlogged_keys: Dict[str, int] = {}  # j.w. w podziale na klucze API
+        self._quota_dirty = False  # Stan w pamięci różni się od quota_state.json
+        # Metadane kanałów: playlisty uploadów, handle -> channel_id, znaczniki skanu
+        self.channel_metadata = {'uploads_playlists': {}, 'handles': {}, 'watermarks': {}}
+        
         # Mapy do śledzenia kanałów (dla walidacji duplikatów)
         self.channel_id_map = {}
         self.channel_url_map = {}
         
         # Załaduj dane przy starcie
-        print(f"[INIT] Loading all data...")
+        logger.debug("[INIT] Loading all data...")
         self.load_all_data()
-        print(f"[INIT] StateManager initialization completed")
         logger.info("StateManager initialization completed")
     
     def _ensure_data_directory(self):
         """Sprawdza i tworzy katalog danych z odpowiednimi uprawnieniami"""
         try:
-            print(f"[DIR] Checking data directory: {self.data_dir.absolute()}")
-            logger.info(f"Checking data directory: {self.data_dir.absolute()}")
+            logger.info("Checking data directory: %s", self.data_dir.absolute())
             
             if not self.data_dir.exists():
-                print(f"[DIR] Creating data directory: {self.data_dir.absolute()}")
-                logger.info(f"Creating data directory: {self.data_dir.absolute()}")
+                logger.info("Creating data directory: %s", self.data_dir.absolute())
                 self.data_dir.mkdir(parents=True, exist_ok=True)
-                print(f"[DIR] Data directory created: {self.data_dir.absolute()}")
-                logger.info(f"Data directory created: {self.data_dir.absolute()}")
+                logger.info("Data directory created: %s", self.data_dir.absolute())
             else:
-                print(f"[DIR] Data directory exists: {self.data_dir.absolute()}")
-                logger.info(f"Data directory exists: {self.data_dir.absolute()}")
+                logger.info("Data directory exists: %s", self.data_dir.absolute())
             
             # Sprawdź uprawnienia do zapisu
             test_file = self.data_dir / "test_write.tmp"
             try:
                 test_file.write_text("test")
                 test_file.unlink()
-                print(f"[DIR] Write permissions OK: {self.data_dir.absolute()}")
-                logger.info(f"Write permissions OK: {self.data_dir.absolute()}")
+                logger.info("Write permissions OK: %s", self.data_dir.absolute())
             except Exception as e:
-                print(f"[DIR] Write permission error: {self.data_dir.absolute()} - {e}")
-                logger.error(f"Write permission error: {self.data_dir.absolute()} - {e}")
+                logger.error("Write permission error: %s - %s", self.data_dir.absolute(), e)
                 # Spróbuj alternatywny katalog
                 alt_dir = Path("/tmp/data")
-                print(f"[DIR] Trying alternative directory: {alt_dir}")
-                logger.warning(f"Trying alternative directory: {alt_dir}")
+                logger.warning("Trying alternative directory: %s", alt_dir)
                 alt_dir.mkdir(parents=True, exist_ok=True)
                 self.data_dir = alt_dir
                 
         except Exception as e:
-            print(f"[DIR] Error creating data directory: {e}")
-            logger.error(f"Error creating data directory: {e}")
+            logger.error("Error creating data directory: %s", e)
             # Fallback do katalogu roboczego
             self.data_dir = Path("data")
             self.data_dir.mkdir(exist_ok=True)
-            print(f"[DIR] Fallback to working directory: {self.data_dir.absolute()}")
-            logger.warning(f"Fallback to working directory: {self.data_dir.absolute()}")
+            logger.warning("Fallback to working directory: %s", self.data_dir.absolute())
     
-    def _safe_write_file(self, file_path: Path, data: dict):
-        """Bezpieczny zapis pliku z flush() i fsync()"""
+    def _safe_write_file(self, file_path: Path, data: dict, fsync: bool = True) -> str:
+        """
+        Bezpieczny zapis pliku z flush() i fsync().
+        
+        Returns:
+            Skrót SHA-256 zapisanej treści
+        """
         try:
-            print(f"[SAVE] Safe writing to: {file_path.absolute()}")
-            logger.info(f"Safe writing to: {file_path.absolute()}")
+            logger.debug("Safe writing to: %s", file_path.absolute())
+            
+            content = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
             
             # Zapisz do pliku tymczasowego
             temp_file = file_path.with_suffix('.tmp')
             
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-                f.flush()  # Wymuś zapis do bufora
-                os.fsync(f.fileno())  # Wymuś zapis na dysk
+            with open(temp_file, 'wb') as f:
+                f.write(content)
+                if fsync:
+                    f.flush()  # Wymuś zapis do bufora
+                    os.fsync(f.fileno())  # Wymuś zapis na dysk
             
             # Przenieś plik tymczasowy do docelowego
             temp_file.replace(file_path)
             
-            print(f"[SAVE] File written successfully: {file_path.absolute()}")
-            logger.info(f"File written successfully: {file_path.absolute()}")
+            logger.debug("File written successfully: %s", file_path.absolute())
+            return hashlib.sha256(content).hexdigest()
             
         except Exception as e:
-            print(f"[SAVE] Error writing file {file_path}: {e}")
-            logger.error(f"Error writing file {file_path}: {e}")
+            logger.error("Error writing file %s: %s", file_path, e)
             raise
     
     def _safe_read_file(self, file_path: Path) -> dict:
         """Bezpieczny odczyt pliku"""
         try:
-            print(f"[LOAD] Safe reading from: {file_path.absolute()}")
-            logger.info(f"Safe reading from: {file_path.absolute()}")
+            logger.debug("Safe reading from: %s", file_path.absolute())
             
             if file_path.exists():
                 with open(file_path, 'r', encoding='utf-8') as f:
                     data = json.load(f)
-                print(f"[LOAD] File read successfully: {file_path.absolute()}")
-                logger.info(f"File read successfully: {file_path.absolute()}")
+                logger.debug("File read successfully: %s", file_path.absolute())
                 return data
             else:
-                print(f"[LOAD] File does not exist: {file_path.absolute()}")
-                logger.info(f"File does not exist: {file_path.absolute()}")
+                logger.debug("File does not exist: %s", file_path.absolute())
                 return {}
                 
         except Exception as e:
-            print(f"[LOAD] Error reading file {file_path}: {e}")
-            logger.error(f"Error reading file {file_path}: {e}")
+            logger.error("Error reading file %s: %s", file_path, e)
             return {}
     
     def load_all_data(self):
         """Ładuje wszystkie dane z plików"""
         try:
-            print("🔄 Ładowanie danych z plików JSON...")
-            print(f"[LOAD_ALL] Starting data load from: {self.data_dir.absolute()}")
             logger.info("🔄 Ładowanie danych z plików JSON...")
-            logger.info(f"Starting data load from: {self.data_dir.absolute()}")
+            logger.info("Starting data load from: %s", self.data_dir.absolute())
             
             self.load_channels()
             self.load_quota_state()
             self.load_system_state()
+            self.load_channel_metadata()
             
             # Wyświetl podsumowanie wczytanych danych
             channels_count = sum(len(channels) for channels in self.channels_data.values())
             quota_used = self.quota_state.get('used', 0)
             last_reset = self.quota_state.get('last_reset', 'Nieznana')
             
-            print(f"[LOAD_ALL] Load summary:")
-            print(f"[LOAD_ALL]   channels_count: {channels_count}")
-            print(f"[LOAD_ALL]   quota_used: {quota_used}")
-            print(f"[LOAD_ALL]   last_reset: {last_reset}")
-            print(f"[LOAD_ALL]   data_directory: {self.data_dir.absolute()}")
-            
-            print(f"✅ Dane wczytane pomyślnie:")
-            print(f"   📺 Kanały: {channels_count}")
-            print(f"   📊 Quota użyte: {quota_used}")
-            print(f"   🕐 Ostatni reset: {last_reset}")
-            print(f"   📁 Katalog danych: {self.data_dir.absolute()}")
-            
-            logger.info(f"✅ Dane wczytane pomyślnie - Kanały: {channels_count}, Quota: {quota_used}")
-            logger.info(f"Data directory: {self.data_dir.absolute()}")
+            logger.info("✅ Dane wczytane pomyślnie - Kanały: %s, Quota: %s", channels_count, quota_used)
+            logger.info("Data directory: %s", self.data_dir.absolute())
         except Exception as e:
-            print(f"[LOAD_ALL] Error loading all data: {e}")
-            print(f"❌ Błąd podczas ładowania danych: {e}")
-            logger.error(f"Błąd podczas ładowania danych: {e}")
+            logger.error("Błąd podczas ładowania danych: %s", e)
+    
+    def _is_validated_snapshot(self, digest: str) -> bool:
+        """Czy channels.json o tym skrócie przeszedł już walidację"""
+        try:
+            if not self.channels_snapshot_file.exists():
+                return False
+            with open(self.channels_snapshot_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get('sha256') == digest
+        except Exception as e:
+            logger.warning("Nieprawidłowy plik snapshotu kanałów - pełna walidacja: %s", e)
+            return False
+    
+    def _save_channels_snapshot(self, digest: str):
+        """
+        Zapisuje skrót zwalidowanego channels.json.
+        
+        Plik jest pochodną channels.json (bez fsync) - uszkodzony albo nieaktualny
+        oznacza tylko pełną walidację przy następnym starcie.
+        """
+        try:
+            self._safe_write_file(self.channels_snapshot_file, {
+                'sha256': digest,
+                'channels_count': len(self.channel_id_map),
+                'validated_at': datetime.now().isoformat()
+            }, fsync=False)
+        except Exception as e:
+            logger.warning("Błąd podczas zapisu snapshotu kanałów: %s", e)
+    
+    def _build_channel_maps(self):
+        """Odbudowuje indeksy ID i URL z danych już zwalidowanych (bez regexów)"""
+        self.channel_id_map = {}
+        self.channel_url_map = {}
+        for category, channels in self.channels_data.items():
+            for channel in channels:
+                self.channel_id_map[channel['id']] = {'name': channel['title'], 'category': category, 'url': channel['url']}
+                self.channel_url_map[channel['url']] = {'name': channel['title'], 'category': category, 'id': channel['id']}
+    
+    @staticmethod
+    def _file_stamp(file_path: Path) -> Optional[tuple]:
+        try:
+            stat = file_path.stat()
+            return stat.st_mtime_ns, stat.st_size
+        except FileNotFoundError:
+            return None
+    
+    def _sync_channels(self):
+        """Przeładowuje kanały, jeśli channels.json zapisał inny proces"""
+        if self._file_stamp(self.channels_file) != self._channels_stamp:
+            logger.info("channels.json zmieniony przez inny proces - przeładowanie")
+            self.load_channels()
     
     def load_channels(self) -> Dict[str, List[Dict]]:
-        """Ładuje dane kanałów z pliku z walidacją i czyszczeniem"""
+        """
+        Ładuje dane kanałów z pliku z walidacją i czyszczeniem.
+        
+        Jeśli channels.json nie zmienił się od ostatniej walidacji (zgodny skrót
+        SHA-256 w channels_snapshot.json), walidacja jest pomijana, a indeksy ID i URL
+        budowane wprost z wczytanych danych.
+        """
         try:
-            print(f"[LOAD] channels.json exists: {self.channels_file.exists()}")
-            print(f"[LOAD] channels.json path: {self.channels_file.absolute()}")
+            logger.debug("[LOAD] channels.json exists: %s", self.channels_file.exists())
+            logger.debug("[LOAD] channels.json path: %s", self.channels_file.absolute())
+            
+            # Szybka ścieżka: plik bez zmian od ostatniej walidacji
+            raw_bytes = self.channels_file.read_bytes() if self.channels_file.exists() else b''
+            digest = hashlib.sha256(raw_bytes).hexdigest()
+            self._channels_stamp = self._file_stamp(self.channels_file)
+            if raw_bytes and self._is_validated_snapshot(digest):
+                self.channels_data = json.loads(raw_bytes)
+                self._build_channel_maps()
+                channels_count = sum(len(channels) for channels in self.channels_data.values())
+                logger.info("Załadowano %s kanałów ze zwalidowanego snapshotu (%s)", channels_count, digest[:12])
+                return self.channels_data
             
             # Wczytaj surowe dane
             raw_channels_data = self._safe_read_file(self.channels_file)
             
             if raw_channels_data:
-                print(f"[LOAD] Raw channels data loaded: {len(raw_channels_data)} categories")
-                logger.info(f"Raw channels data loaded: {len(raw_channels_data)} categories")
+                logger.info("Raw channels data loaded: %s categories", len(raw_channels_data))
                 
                 # Waliduj i wyczyść dane
                 cleaned_channels_data = {}
@@ -217,8 +280,7 @@ class StateManager:
                 channel_url_map = {}
                 
                 for category, channels in raw_channels_data.items():
-                    print(f"[VALIDATE] Processing category: {category} ({len(channels)} channels)")
-                    logger.info(f"Processing category: {category} ({len(channels)} channels)")
+                    logger.debug("Processing category: %s (%s channels)", category, len(channels))
                     
                     valid_channels = []
                     
@@ -285,9 +347,7 @@ class StateManager:
                         
                         # Jeśli kanał jest niepoprawny, zaloguj i pomiń
                         if not is_valid:
-                            print(f"[CORRUPTED] Invalid channel in {category}[{i}]: {channel_name} ({channel_id})")
-                            print(f"[CORRUPTED] Errors: {validation_errors}")
-                            logger.warning(f"[CORRUPTED] Invalid channel in {category}[{i}]: {channel_name} ({channel_id}) - Errors: {validation_errors}")
+                            logger.warning("[CORRUPTED] Invalid channel in %s[%s]: %s (%s) - Errors: %s", category, i, channel_name, channel_id, validation_errors)
                             
                             corrupted_entries.append({
                                 'channel_id': channel_id,
@@ -312,14 +372,13 @@ class StateManager:
                         }
                         
                         valid_channels.append(channel)
-                        print(f"[VALID] Valid channel: {channel_name} ({channel_id}) in {category}")
                     
                     # Dodaj kategorię (nawet jeśli pusta)
                     cleaned_channels_data[category] = valid_channels
                     if valid_channels:
-                        print(f"[VALIDATE] Category {category}: {len(valid_channels)} valid channels (removed {len(channels) - len(valid_channels)} invalid)")
+                        logger.debug("[VALIDATE] Category %s: %s valid channels (removed %s invalid)", category, len(valid_channels), len(channels) - len(valid_channels))
                     else:
-                        print(f"[VALIDATE] Category {category}: no valid channels, keeping empty category")
+                        logger.debug("[VALIDATE] Category %s: no valid channels, keeping empty category", category)
                 
                 # Zaktualizuj dane kanałów
                 self.channels_data = cleaned_channels_data
@@ -334,59 +393,45 @@ class StateManager:
                 total_corrupted = len(corrupted_entries)
                 total_duplicates = len(duplicate_entries)
                 
-                print(f"[VALIDATE] Validation summary:")
-                print(f"[VALIDATE]   Original channels: {total_original}")
-                print(f"[VALIDATE]   Valid channels: {total_valid}")
-                print(f"[VALIDATE]   Corrupted entries: {total_corrupted}")
-                print(f"[VALIDATE]   Duplicate entries: {total_duplicates}")
-                print(f"[VALIDATE]   Categories: {list(cleaned_channels_data.keys())}")
-                
-                logger.info(f"Validation summary - Original: {total_original}, Valid: {total_valid}, Corrupted: {total_corrupted}, Duplicates: {total_duplicates}")
+                logger.info("Validation summary - Original: %s, Valid: %s, Corrupted: %s, Duplicates: %s", total_original, total_valid, total_corrupted, total_duplicates)
                 
-                # Jeśli były zmiany, zapisz wyczyszczone dane
+                # Jeśli były zmiany, zapisz wyczyszczone dane (razem ze skrótem snapshotu)
                 if total_original != total_valid:
-                    print(f"[VALIDATE] Data was cleaned, saving updated channels.json")
-                    logger.info(f"Data was cleaned, saving updated channels.json")
+                    logger.info("Data was cleaned, saving updated channels.json")
                     self.save_channels()
+                else:
+                    self._save_channels_snapshot(digest)
                 
                 # Wyświetl szczegóły kanałów
                 channels_count = sum(len(channels) for channels in self.channels_data.values())
                 categories = list(self.channels_data.keys())
                 
-                print(f"📺 Załadowano {channels_count} kanałów z kategorii: {categories}")
-                logger.info(f"Załadowano {channels_count} kanałów z kategorii: {categories}")
+                logger.info("Załadowano %s kanałów z kategorii: %s", channels_count, categories)
                 
-                # Wyświetl szczegóły kanałów
                 for category, channels in self.channels_data.items():
-                    print(f"   📂 {category}: {len(channels)} kanałów")
-                    for channel in channels:
-                        print(f"      - {channel.get('title', 'Unknown')} ({channel.get('id', 'No ID')})")
+                    logger.debug("   📂 %s: %s kanałów", category, len(channels))
                 
                 # Wyświetl szczegóły błędów jeśli były
                 if corrupted_entries:
-                    print(f"[CORRUPTED] Corrupted entries details:")
+                    logger.debug("[CORRUPTED] Corrupted entries details:")
                     for entry in corrupted_entries:
-                        print(f"   - {entry['category']}[{entry['index']}]: {entry['channel_name']} ({entry['channel_id']})")
-                        print(f"     Errors: {entry['errors']}")
+                        logger.debug("   - %s[%s]: %s (%s)", entry['category'], entry['index'], entry['channel_name'], entry['channel_id'])
+                        logger.debug("     Errors: %s", entry['errors'])
                 
                 if duplicate_entries:
-                    print(f"[DUPLICATE] Duplicate entries details:")
+                    logger.debug("[DUPLICATE] Duplicate entries details:")
                     for entry in duplicate_entries:
-                        print(f"   - {entry['category']}[{entry['index']}]: {entry['channel_name']} ({entry['channel_id']})")
-                        print(f"     Conflicts with: {entry['conflict_with']['category']}: {entry['conflict_with']['name']}")
+                        logger.debug("   - %s[%s]: %s (%s)", entry['category'], entry['index'], entry['channel_name'], entry['channel_id'])
+                        logger.debug("     Conflicts with: %s: %s", entry['conflict_with']['category'], entry['conflict_with']['name'])
                 
             else:
-                print("[LOAD] channels.json does not exist - creating empty data")
-                print("📁 Utworzono nowy plik kanałów (brak istniejących danych)")
                 logger.info("Utworzono nowy plik kanałów")
                 self.channels_data = {}
                 self.channel_id_map = {}
                 self.channel_url_map = {}
                 
         except Exception as e:
-            print(f"[LOAD] Error loading channels: {e}")
-            print(f"❌ Błąd podczas ładowania kanałów: {e}")
-            logger.error(f"Błąd podczas ładowania kanałów: {e}")
+            logger.error("Błąd podczas ładowania kanałów: %s", e)
             self.channels_data = {}
             self.channel_id_map = {}
             self.channel_url_map = {}
@@ -396,34 +441,37 @@ class StateManager:
     def save_channels(self):
         """Zapisuje dane kanałów do pliku"""
         try:
-            print(f"[SAVE] Saving channels to: {self.channels_file.absolute()}")
-            print(f"[SAVE] channels data: {self.channels_data}")
+            logger.debug("[SAVE] Saving channels to: %s", self.channels_file.absolute())
             
-            self._safe_write_file(self.channels_file, self.channels_data)
+            digest = self._safe_write_file(self.channels_file, self.channels_data)
+            self._channels_stamp = self._file_stamp(self.channels_file)
+            self._save_channels_snapshot(digest)
             
-            print(f"[SAVE] channels saved successfully")
-            logger.info("Kanały zapisane pomyślnie")
+            logger.debug("Kanały zapisane pomyślnie")
         except Exception as e:
-            print(f"[SAVE] Error saving channels: {e}")
-            logger.error(f"Błąd podczas zapisywania kanałów: {e}")
+            logger.error("Błąd podczas zapisywania kanałów: %s", e)
     
     def load_quota_state(self) -> Dict:
         """Ładuje stan quota z pliku"""
         try:
-            print(f"[LOAD] quota_state.json exists: {self.quota_file.exists()}")
-            print(f"[LOAD] quota_state.json path: {self.quota_file.absolute()}")
+            logger.debug("[LOAD] quota_state.json exists: %s", self.quota_file.exists())
+            logger.debug("[LOAD] quota_state.json path: %s", self.quota_file.absolute())
             
             self.quota_state = self._safe_read_file(self.quota_file)
             
+            # Odtwórz przyrosty z dziennika (po awarii albo zapisane przez innych workerów)
+            replayed = self._merge_quota_state() if self.quota_wal_file.exists() else 0
+            if replayed:
+                logger.info("Odtworzono %s jednostek quota z dziennika", replayed)
+            
             if self.quota_state:
-                print(f"[LOAD] quota content: {self.quota_state}")
+                logger.debug("[LOAD] quota content: %s", self.quota_state)
                 
                 # Sprawdź czy quota nie jest przestarzałe (więcej niż 24h)
                 last_reset = self.quota_state.get('last_reset')
                 if last_reset:
                     last_reset_date = datetime.fromisoformat(last_reset)
                     if datetime.now() - last_reset_date > timedelta(hours=24):
-                        print("🔄 Quota przestarzałe - reset")
                         logger.info("Quota przestarzałe - reset")
                         self.quota_state = {'used': 0, 'last_reset': datetime.now().isoformat()}
                         self.save_quota_state()
@@ -433,18 +481,14 @@ class StateManager:
                 
                 quota_used = self.quota_state.get('used', 0)
                 last_reset = self.quota_state.get('last_reset', 'Nieznana')
-                print(f"📊 Załadowano stan quota: {quota_used} użyte, ostatni reset: {last_reset}")
-                logger.info(f"Załadowano stan quota: {quota_used}")
+                logger.info("Załadowano stan quota: %s", quota_used)
             else:
-                print("[LOAD] quota_state.json does not exist - creating new")
+                logger.debug("[LOAD] quota_state.json does not exist - creating new")
                 self.quota_state = {'used': 0, 'last_reset': datetime.now().isoformat()}
                 self.save_quota_state()
-                print("📁 Utworzono nowy stan quota (brak istniejących danych)")
                 logger.info("Utworzono nowy stan quota")
         except Exception as e:
-            print(f"[LOAD] Error loading quota: {e}")
-            print(f"❌ Błąd podczas ładowania stanu quota: {e}")
-            logger.error(f"Błąd podczas ładowania stanu quota: {e}")
+            logger.error("Błąd podczas ładowania stanu quota: %s", e)
             self.quota_state = {'used': 0, 'last_reset': datetime.now().isoformat()}
         
         return self.quota_state
@@ -452,30 +496,33 @@ class StateManager:
     def save_quota_state(self):
         """Zapisuje stan quota do pliku"""
         try:
-            print(f"[SAVE] Saving quota to: {self.quota_file.absolute()}")
-            print(f"[SAVE] quota data: {self.quota_state}")
+            logger.debug("[SAVE] Saving quota to: %s", self.quota_file.absolute())
+            logger.debug("[SAVE] quota data: %s", self.quota_state)
             
-            self._safe_write_file(self.quota_file, self.quota_state)
+            with self._state_lock.hold(), self._quota_lock:
+                self._safe_write_file(self.quota_file, self.quota_state)
+                # Pełny stan zawiera wszystkie przyrosty - dziennik można wyczyścić
+                self._truncate_quota_wal()
+                self._quota_unlogged = 0
+                self._quota_unlogged_keys = {}
+                self._quota_dirty = False
             
-            print(f"[SAVE] quota saved successfully")
             logger.debug("Stan quota zapisany pomyślnie")
         except Exception as e:
-            print(f"[SAVE] Error saving quota: {e}")
-            logger.error(f"Błąd podczas zapisywania stanu quota: {e}")
+            logger.error("Błąd podczas zapisywania stanu quota: %s", e)
     
     def load_system_state(self) -> Dict:
         """Ładuje stan systemu z pliku"""
         try:
-            print(f"[LOAD] system_state.json exists: {self.system_state_file.exists()}")
-            print(f"[LOAD] system_state.json path: {self.system_state_file.absolute()}")
+            logger.debug("[LOAD] system_state.json exists: %s", self.system_state_file.exists())
+            logger.debug("[LOAD] system_state.json path: %s", self.system_state_file.absolute())
             
             self.system_state = self._safe_read_file(self.system_state_file)
             
             if self.system_state:
-                print(f"[LOAD] system_state content: {self.system_state}")
                 logger.info("Stan systemu załadowany pomyślnie")
             else:
-                print("[LOAD] system_state.json does not exist - creating new")
+                logger.debug("[LOAD] system_state.json does not exist - creating new")
                 self.system_state = {
                     'last_startup': datetime.now().isoformat(),
                     'total_reports_generated': 0,
@@ -484,8 +531,7 @@ class StateManager:
                 self.save_system_state()
                 logger.info("Utworzono nowy stan systemu")
         except Exception as e:
-            print(f"[LOAD] Error loading system_state: {e}")
-            logger.error(f"Błąd podczas ładowania stanu systemu: {e}")
+            logger.error("Błąd podczas ładowania stanu systemu: %s", e)
             self.system_state = {
                 'last_startup': datetime.now().isoformat(),
                 'total_reports_generated': 0,
@@ -494,20 +540,97 @@ class StateManager:
         
         return self.system_state
     
-    def save_system_state(self):
-        """Zapisuje stan systemu do pliku"""
+    def save_system_state(self, changes: Optional[Dict] = None):
+        """Zapisuje stan systemu do pliku.
+        
+        Pod blokadą pliku klucze ``changes`` (domyślnie cały stan z pamięci) są
+        nakładane na stan zapisany przez inne workery, więc ich klucze zostają.
+        """
         try:
-            print(f"[SAVE] Saving system_state to: {self.system_state_file.absolute()}")
-            print(f"[SAVE] system_state data: {self.system_state}")
+            logger.debug("[SAVE] Saving system_state to: %s", self.system_state_file.absolute())
             
-            self._safe_write_file(self.system_state_file, self.system_state)
+            with self._state_lock.hold():
+                state = self._safe_read_file(self.system_state_file)
+                state.update(self.system_state if changes is None else changes)
+                self._safe_write_file(self.system_state_file, state)
+                self.system_state = state
+            logger.debug("[SAVE] system_state data: %s", self.system_state)
             
-            print(f"[SAVE] system_state saved successfully")
             logger.debug("Stan systemu zapisany pomyślnie")
         except Exception as e:
-            print(f"[SAVE] Error saving system_state: {e}")
-            logger.error(f"Błąd podczas zapisywania stanu systemu: {e}")
+            logger.error("Błąd podczas zapisywania stanu systemu: %s", e)
+    
+    def load_channel_metadata(self) -> Dict:
+        """Ładuje cache metadanych kanałów z pliku"""
+        try:
+            data = self._safe_read_file(self.channel_metadata_file)
+            self.channel_metadata = {
+                'uploads_playlists': data.get('uploads_playlists', {}),
+                'handles': data.get('handles', {}),
+                'watermarks': data.get('watermarks', {})
+            }
+            logger.info("Załadowano metadane kanałów: %s playlist uploadów", len(self.channel_metadata['uploads_playlists']))
+        except Exception as e:
+            logger.error("Błąd podczas ładowania metadanych kanałów: %s", e)
+            self.channel_metadata = {'uploads_playlists': {}, 'handles': {}, 'watermarks': {}}
+        
+        return self.channel_metadata
     
+    def save_channel_metadata(self, changes: Optional[Dict[str, Dict]] = None):
+        """Zapisuje cache metadanych kanałów do pliku.
+        
+        Pod blokadą pliku wpisy ``changes`` (sekcja -> {klucz: wartość}, domyślnie
+        cały cache z pamięci) są nakładane na metadane zapisane przez inne workery.
+        """
+        if changes is None:
+            changes = self.channel_metadata
+        try:
+            with self._state_lock.hold():
+                data = self._safe_read_file(self.channel_metadata_file)
+                merged = {}
+                for section in ('uploads_playlists', 'handles', 'watermarks'):
+                    merged[section] = dict(data.get(section, {}))
+                    merged[section].update(changes.get(section, {}))
+                self._safe_write_file(self.channel_metadata_file, merged)
+                self.channel_metadata = merged
+            logger.debug("Metadane kanałów zapisane pomyślnie")
+        except Exception as e:
+            logger.error("Błąd podczas zapisywania metadanych kanałów: %s", e)
+    
+    def get_uploads_playlist(self, channel_id: str) -> Optional[str]:
+        """Zwraca zapamiętane ID playlisty uploadów kanału"""
+        return self.channel_metadata['uploads_playlists'].get(channel_id)
+    
+    def set_uploads_playlists(self, playlists: Dict[str, str]):
+        """Zapamiętuje playlisty uploadów (channel_id -> playlist_id), jeden zapis na całą partię"""
+        known = self.channel_metadata['uploads_playlists']
+        changed = {cid: pid for cid, pid in playlists.items() if pid and known.get(cid) != pid}
+        if changed:
+            known.update(changed)
+            self.save_channel_metadata({'uploads_playlists': changed})
+    
+    def get_channel_id_for_handle(self, handle: str) -> Optional[str]:
+        """Zwraca zapamiętane channel_id dla @handle"""
+        return self.channel_metadata['handles'].get(handle.lstrip('@').lower())
+    
+    def set_channel_id_for_handle(self, handle: str, channel_id: str):
+        """Zapamiętuje channel_id dla @handle"""
+        key = handle.lstrip('@').lower()
+        if self.channel_metadata['handles'].get(key) != channel_id:
+            self.channel_metadata['handles'][key] = channel_id
+            self.save_channel_metadata({'handles': {key: channel_id}})
+    
+    def get_watermark(self, channel_id: str) -> Optional[Dict]:
+        """Zwraca znacznik ostatniego skanu playlisty uploadów kanału"""
+        return self.channel_metadata['watermarks'].get(channel_id)
+    
+    def set_watermarks(self, watermarks: Dict[str, Dict]):
+        """Zapisuje znaczniki skanu wielu kanałów jednym zapisem pliku"""
+        if watermarks:
+            self.channel_metadata['watermarks'].update(watermarks)
+            self.save_channel_metadata({'watermarks': watermarks})
+    
+    @_synchronized
     def add_channel(self, channel_data: Dict, category: str = "general"):
         """Dodaje kanał do kategorii z walidacją duplikatów"""
         try:
@@ -515,53 +638,46 @@ class StateManager:
             channel_name = channel_data.get('title', '')
             channel_url = channel_data.get('url', '')
             
-            print(f"[ADD] Adding channel: {channel_name} ({channel_id}) to category: {category}")
-            logger.info(f"Adding channel: {channel_name} ({channel_id}) to category: {category}")
+            logger.info("Adding channel: %s (%s) to category: %s", channel_name, channel_id, category)
             
             # Sprawdź czy kanał ma wszystkie wymagane pola
             if not channel_id or not channel_id.startswith('UC'):
                 error_msg = f"Invalid channel_id: {channel_id}"
-                print(f"[ADD] Error: {error_msg}")
-                logger.error(f"[ADD] Error: {error_msg}")
+                logger.error("[ADD] Error: %s", error_msg)
                 raise ValueError(error_msg)
             
             if not channel_name:
                 error_msg = "Missing channel_name"
-                print(f"[ADD] Error: {error_msg}")
-                logger.error(f"[ADD] Error: {error_msg}")
+                logger.error("[ADD] Error: %s", error_msg)
                 raise ValueError(error_msg)
             
             if not channel_url:
                 error_msg = "Missing channel_url"
-                print(f"[ADD] Error: {error_msg}")
-                logger.error(f"[ADD] Error: {error_msg}")
+                logger.error("[ADD] Error: %s", error_msg)
                 raise ValueError(error_msg)
             
             if not self._validate_youtube_url(channel_url):
                 error_msg = f"Invalid YouTube URL format: {channel_url}"
-                print(f"[ADD] Error: {error_msg}")
-                logger.error(f"[ADD] Error: {error_msg}")
+                logger.error("[ADD] Error: %s", error_msg)
                 raise ValueError(error_msg)
             
             # Sprawdź duplikaty
             if channel_id in self.channel_id_map:
                 existing = self.channel_id_map[channel_id]
                 error_msg = f"Channel with ID {channel_id} already exists in category {existing['category']}: {existing['name']}"
-                print(f"[ADD] Error: {error_msg}")
-                logger.warning(f"[ADD] Error: {error_msg}")
+                logger.warning("[ADD] Error: %s", error_msg)
                 raise ValueError(error_msg)
             
             if channel_url in self.channel_url_map:
                 existing = self.channel_url_map[channel_url]
                 error_msg = f"Channel with URL {channel_url} already exists in category {existing['category']}: {existing['name']}"
-                print(f"[ADD] Error: {error_msg}")
-                logger.warning(f"[ADD] Error: {error_msg}")
+                logger.warning("[ADD] Error: %s", error_msg)
                 raise ValueError(error_msg)
             
             # Inicjalizuj kategorię jeśli nie istnieje
             if category not in self.channels_data:
                 self.channels_data[category] = []
-                print(f"[ADD] Created new category: {category}")
+                logger.debug("[ADD] Created new category: %s", category)
             
             # Dodaj kanał do danych
             self.channels_data[category].append(channel_data)
@@ -581,19 +697,17 @@ class StateManager:
             # Zapisz zmiany
             self.save_channels()
             
-            print(f"[ADD] Successfully added channel: {channel_name} ({channel_id}) to category: {category}")
-            logger.info(f"Successfully added channel: {channel_name} ({channel_id}) to category: {category}")
+            logger.info("Successfully added channel: %s (%s) to category: %s", channel_name, channel_id, category)
             
         except Exception as e:
-            print(f"[ADD] Error adding channel: {e}")
-            logger.error(f"Error adding channel: {e}")
+            logger.error("Error adding channel: %s", e)
             raise
     
+    @_synchronized
     def remove_channel(self, channel_id: str, category: str = "general"):
         """Usuwa kanał z kategorii i aktualizuje mapy"""
         try:
-            print(f"[REMOVE] Removing channel: {channel_id} from category: {category}")
-            logger.info(f"Removing channel: {channel_id} from category: {category}")
+            logger.info("Removing channel: %s from category: %s", channel_id, category)
             
             if category in self.channels_data:
                 # Znajdź kanał do usunięcia
@@ -612,41 +726,38 @@ class StateManager:
                     # Usuń z map
                     if channel_id in self.channel_id_map:
                         removed_info = self.channel_id_map.pop(channel_id)
-                        print(f"[REMOVE] Removed from channel_id_map: {channel_id}")
+                        logger.debug("[REMOVE] Removed from channel_id_map: %s", channel_id)
                     
                     channel_url = channel_to_remove.get('url', '')
                     if channel_url in self.channel_url_map:
                         self.channel_url_map.pop(channel_url)
-                        print(f"[REMOVE] Removed from channel_url_map: {channel_url}")
+                        logger.debug("[REMOVE] Removed from channel_url_map: %s", channel_url)
                     
                     # Usuń pustą kategorię
                     if not self.channels_data[category]:
                         del self.channels_data[category]
-                        print(f"[REMOVE] Removed empty category: {category}")
+                        logger.debug("[REMOVE] Removed empty category: %s", category)
                     
                     # Zapisz zmiany
                     self.save_channels()
                     
-                    print(f"[REMOVE] Successfully removed channel: {channel_id} from category: {category}")
-                    logger.info(f"Successfully removed channel: {channel_id} from category: {category}")
+                    logger.info("Successfully removed channel: %s from category: %s", channel_id, category)
                 else:
                     error_msg = f"Channel {channel_id} not found in category {category}"
-                    print(f"[REMOVE] Error: {error_msg}")
-                    logger.warning(f"[REMOVE] Error: {error_msg}")
+                    logger.warning("[REMOVE] Error: %s", error_msg)
                     raise ValueError(error_msg)
             else:
                 error_msg = f"Category {category} not found"
-                print(f"[REMOVE] Error: {error_msg}")
-                logger.warning(f"[REMOVE] Error: {error_msg}")
+                logger.warning("[REMOVE] Error: %s", error_msg)
                 raise ValueError(error_msg)
                 
         except Exception as e:
-            print(f"[REMOVE] Error removing channel: {e}")
-            logger.error(f"Error removing channel: {e}")
+            logger.error("Error removing channel: %s", e)
             raise
     
     def get_channels(self) -> Dict[str, List[Dict]]:
         """Zwraca wszystkie kanały z dodanym polem category"""
+        self._sync_channels()
         # Dodaj pole category do każdego kanału
         channels_with_category = {}
         
@@ -664,12 +775,150 @@ class StateManager:
         """Zwraca użyte quota"""
         return self.quota_state.get('used', 0)
     
-    def add_quota_used(self, amount: int):
-        """Dodaje użyte quota"""
-        current_used = self.quota_state.get('used', 0)
-        self.quota_state['used'] = current_used + amount
-        self.save_quota_state()
-        logger.debug(f"Dodano {amount} do quota, łącznie: {self.quota_state['used']}")
+    def get_key_quota_used(self, key_id: str) -> int:
+        """Zwraca quota użyte przez jeden klucz API"""
+        return self.quota_state.get('keys', {}).get(key_id, 0)
+    
+    def get_keys_quota(self) -> Dict[str, int]:
+        """Zwraca zużycie quota wszystkich kluczy API (key_id -> jednostki)"""
+        return dict(self.quota_state.get('keys', {}))
+    
+    def add_quota_used(self, amount: int, key_id: Optional[str] = None):
+        """
+        Dodaje użyte quota (łącznie i, jeśli podano, dla klucza API).
+        
+        Licznik jest aktualizowany w pamięci; do dziennika trafia przyrost co
+        quota_flush_units jednostek (jeden fsync), więc po awarii zapisany stan
+        zaniża zużycie najwyżej o quota_flush_units - 1.
+        """
+        to_log = None
+        with self._quota_lock:
+            self.quota_state['used'] = self.quota_state.get('used', 0) + amount
+            if key_id:
+                keys = self.quota_state.setdefault('keys', {})
+                keys[key_id] = keys.get(key_id, 0) + amount
+            self._quota_unlogged_keys[key_id] = self._quota_unlogged_keys.get(key_id, 0) + amount
+            self._quota_unlogged += amount
+            self._quota_dirty = True
+            if self._quota_unlogged >= self.quota_flush_units:
+                to_log, self._quota_unlogged_keys = self._quota_unlogged_keys, {}
+                self._quota_unlogged = 0
+        if to_log:
+            # Poza _quota_lock - blokada pliku jest brana przed _quota_lock (jak w scalaniu)
+            self._append_quota_wal(to_log)
+        logger.debug("Dodano %s do quota, łącznie: %s", amount, self.quota_state['used'])
+    
+    def is_key_exhausted(self, key_id: str) -> bool:
+        """Czy klucz API wyczerpał dzienną quota (wg odpowiedzi quotaExceeded)"""
+        return key_id in self.quota_state.get('exhausted_keys', [])
+    
+    def mark_key_exhausted(self, key_id: str):
+        """Oznacza klucz API jako wyczerpany do dziennego resetu"""
+        with self._quota_lock:
+            exhausted = self.quota_state.setdefault('exhausted_keys', [])
+            if key_id in exhausted:
+                return
+            exhausted.append(key_id)
+            self._quota_dirty = True
+        self.flush_quota()
+    
+    def flush_quota(self):
+        """
+        Zapisuje pełny stan quota (okresowo i przy zamykaniu aplikacji).
+        
+        Stan jest scalany z plikiem, więc przy kilku workerach każdy dolicza tylko
+        własne przyrosty i widzi zużycie pozostałych.
+        """
+        try:
+            self._merge_quota_state()
+        except Exception as e:
+            logger.error("Błąd podczas zapisywania stanu quota: %s", e)
+    
+    def _merge_quota_state(self) -> int:
+        """
+        Scala quota_state.json z dziennikiem i niezalogowanymi przyrostami tego procesu.
+        
+        Wynik = stan w pliku + wszystkie linie dziennika (dowolnego procesu) + przyrosty
+        tego procesu jeszcze niezapisane w dzienniku. Dziennik jest potem czyszczony,
+        a stan w pamięci zastępowany wynikiem.
+        
+        Returns:
+            Liczba jednostek odtworzonych z dziennika
+        """
+        with self._state_lock.hold(), self._quota_lock:
+            stored = self._safe_read_file(self.quota_file)
+            replayed, replayed_keys = self._replay_quota_wal()
+            if not replayed and not self._quota_dirty:
+                # Nic do zapisania - tylko odśwież widok zużycia innych workerów
+                if stored:
+                    self.quota_state = stored
+                return 0
+            
+            merged = dict(stored) if stored else {'used': 0, 'last_reset': datetime.now().isoformat()}
+            merged['used'] = merged.get('used', 0) + replayed + self._quota_unlogged
+            keys = dict(merged.get('keys', {}))
+            for source in (replayed_keys, self._quota_unlogged_keys):
+                for key_id, amount in source.items():
+                    if key_id:
+                        keys[key_id] = keys.get(key_id, 0) + amount
+            merged['keys'] = keys
+            # Wyczerpane klucze z pamięci liczą się tylko w tej samej dobie quota
+            if self.quota_state.get('last_reset') == merged.get('last_reset'):
+                exhausted = list(merged.get('exhausted_keys', []))
+                exhausted += [k for k in self.quota_state.get('exhausted_keys', []) if k not in exhausted]
+                merged['exhausted_keys'] = exhausted
+            
+            self._safe_write_file(self.quota_file, merged)
+            self._truncate_quota_wal()
+            self.quota_state = merged
+            self._quota_unlogged = 0
+            self._quota_unlogged_keys = {}
+            self._quota_dirty = False
+            return replayed
+    
+    def _append_quota_wal(self, amounts: Dict[Optional[str], int]):
+        """Dopisuje przyrosty do dziennika quota (linia "jednostki [key_id]" na klucz, jeden fsync)"""
+        lines = ''.join(
+            f"{amount} {key_id}\n" if key_id else f"{amount}\n"
+            for key_id, amount in amounts.items() if amount
+        )
+        try:
+            with self._state_lock.hold(shared=True):
+                self._write_quota_wal(lines)
+        except Exception as e:
+            logger.error("Błąd podczas zapisu dziennika quota: %s", e)
+    
+    def _write_quota_wal(self, lines: str):
+        fd = os.open(self.quota_wal_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, lines.encode('ascii'))
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    
+    def _replay_quota_wal(self) -> Tuple[int, Dict[str, int]]:
+        """Sumuje przyrosty z dziennika: łącznie i per klucz (niepełna ostatnia linia jest pomijana)"""
+        total, keys = 0, {}
+        try:
+            if not self.quota_wal_file.exists():
+                return 0, {}
+            content = self.quota_wal_file.read_text(encoding='ascii', errors='ignore')
+            for line in content.split('\n')[:-1]:
+                parts = line.split()
+                if not parts or not parts[0].isdigit():
+                    continue
+                amount = int(parts[0])
+                total += amount
+                if len(parts) > 1:
+                    keys[parts[1]] = keys.get(parts[1], 0) + amount
+            return total, keys
+        except Exception as e:
+            logger.error("Błąd podczas odczytu dziennika quota: %s", e)
+            return 0, {}
+    
+    def _truncate_quota_wal(self):
+        if self.quota_wal_file.exists():
+            self.quota_wal_file.unlink()
     
     def reset_quota(self):
         """Resetuje quota"""
@@ -684,11 +933,17 @@ class StateManager:
         """Zwraca stan quota"""
         return self.quota_state
     
-    def persist_quota(self, quota_used: int):
-        """Zapisuje aktualne zużycie quota"""
-        self.quota_state['used'] = quota_used
-        self.save_quota_state()
-        logger.info(f"Zapisano quota: {quota_used}")
+    def persist_quota(self) -> int:
+        """
+        Zapisuje zużycie quota po przebiegu i zwraca łączne zużycie.
+        
+        Idzie przez scalanie (flush_quota), a nie nadpisanie pliku - przyrosty
+        innych workerów z pliku i dziennika zostają zachowane.
+        """
+        self.flush_quota()
+        quota_used = self.get_quota_used()
+        logger.info("Zapisano quota: %s", quota_used)
+        return quota_used
     
     def get_persisted_quota(self) -> int:
         """Zwraca zapisane zużycie quota"""
@@ -697,7 +952,7 @@ class StateManager:
     def update_system_state(self, key: str, value):
         """Aktualizuje stan systemu"""
         self.system_state[key] = value
-        self.save_system_state()
+        self.save_system_state({key: value})
     
     def get_system_state(self) -> Dict:
         """Zwraca stan systemu"""
@@ -706,24 +961,33 @@ class StateManager:
     def clear_all_data(self):
         """Czyści wszystkie dane"""
         try:
-            print(f"[CLEAR] Clearing all data from: {self.data_dir.absolute()}")
-            logger.info(f"Clearing all data from: {self.data_dir.absolute()}")
+            logger.info("Clearing all data from: %s", self.data_dir.absolute())
             
             # Usuń pliki
             if self.channels_file.exists():
                 self.channels_file.unlink()
-                print(f"[CLEAR] Deleted: {self.channels_file.absolute()}")
+                logger.debug("[CLEAR] Deleted: %s", self.channels_file.absolute())
             
             if self.quota_file.exists():
                 self.quota_file.unlink()
-                print(f"[CLEAR] Deleted: {self.quota_file.absolute()}")
+                logger.debug("[CLEAR] Deleted: %s", self.quota_file.absolute())
+            
+            self._truncate_quota_wal()
+            
+            if self.channels_snapshot_file.exists():
+                self.channels_snapshot_file.unlink()
             
             if self.system_state_file.exists():
                 self.system_state_file.unlink()
-                print(f"[CLEAR] Deleted: {self.system_state_file.absolute()}")
+                logger.debug("[CLEAR] Deleted: %s", self.system_state_file.absolute())
+            
+            if self.channel_metadata_file.exists():
+                self.channel_metadata_file.unlink()
+                logger.debug("[CLEAR] Deleted: %s", self.channel_metadata_file.absolute())
             
             # Resetuj dane w pamięci
             self.channels_data = {}
+            self.channel_metadata = {'uploads_playlists': {}, 'handles': {}, 'watermarks': {}}
             self.quota_state = {'used': 0, 'last_reset': datetime.now().isoformat()}
             self.system_state = {
                 'last_startup': datetime.now().isoformat(),
@@ -731,12 +995,10 @@ class StateManager:
                 'last_report_date': None
             }
             
-            print(f"[CLEAR] All data cleared successfully")
             logger.info("All data cleared successfully")
             
         except Exception as e:
-            print(f"[CLEAR] Error clearing data: {e}")
-            logger.error(f"Error clearing data: {e}")
+            logger.error("Error clearing data: %s", e)
     
     def get_channel_maps_status(self) -> Dict:
         """Zwraca status map kanałów"""
@@ -763,10 +1025,12 @@ class StateManager:
             'files_exist': {
                 'channels.json': self.channels_file.exists(),
                 'quota_state.json': self.quota_file.exists(),
-                'system_state.json': self.system_state_file.exists()
+                'system_state.json': self.system_state_file.exists(),
+                'channel_metadata.json': self.channel_metadata_file.exists()
             }
         }
 
+    @_synchronized
     def add_category(self, category_name: str) -> Dict:
         """Dodaje nową kategorię"""
         try:
@@ -784,8 +1048,7 @@ class StateManager:
             # Zapisz zmiany
             self.save_channels()
             
-            print(f"[CATEGORY] Added new category: {category_name}")
-            logger.info(f"Added new category: {category_name}")
+            logger.info("Added new category: %s", category_name)
             
             return {
                 'name': category_name,
@@ -794,10 +1057,10 @@ class StateManager:
             }
             
         except Exception as e:
-            print(f"[CATEGORY] Error adding category: {e}")
-            logger.error(f"Error adding category: {e}")
+            logger.error("Error adding category: %s", e)
             raise
 
+    @_synchronized
     def remove_category(self, category_name: str, force: bool = False) -> Dict:
         """Usuwa kategorię"""
         try:
@@ -819,11 +1082,11 @@ class StateManager:
                 
                 if channel_id in self.channel_id_map:
                     self.channel_id_map.pop(channel_id)
-                    print(f"[CATEGORY] Removed from channel_id_map: {channel_id}")
+                    logger.debug("[CATEGORY] Removed from channel_id_map: %s", channel_id)
                 
                 if channel_url in self.channel_url_map:
                     self.channel_url_map.pop(channel_url)
-                    print(f"[CATEGORY] Removed from channel_url_map: {channel_url}")
+                    logger.debug("[CATEGORY] Removed from channel_url_map: %s", channel_url)
             
             # Usuń kategorię
             del self.channels_data[category_name]
@@ -831,8 +1094,7 @@ class StateManager:
             # Zapisz zmiany
             self.save_channels()
             
-            print(f"[CATEGORY] Removed category: {category_name} ({channels_count} channels)")
-            logger.info(f"Removed category: {category_name} ({channels_count} channels)")
+            logger.info("Removed category: %s (%s channels)", category_name, channels_count)
             
             return {
                 'name': category_name,
@@ -841,22 +1103,15 @@ class StateManager:
             }
             
         except Exception as e:
-            print(f"[CATEGORY] Error removing category: {e}")
-            logger.error(f"Error removing category: {e}")
+            logger.error("Error removing category: %s", e)
             raise
 
     def get_categories(self) -> List[Dict]:
         """Zwraca listę kategorii z liczbą kanałów i informacją o dostępnych raportach"""
+        self._sync_channels()
         categories = []
         
-        # Sprawdź katalog raportów używając settings
-        try:
-            from app.config.settings import settings
-            reports_dir = settings.reports_path
-        except ImportError:
-            # Fallback do lokalnego katalogu
-            reports_dir = Path("reports")
-        
+        reports_dir = settings.reports_path
         has_reports_dir = reports_dir.exists()
         
         for category_name, channels in self.channels_data.items():
@@ -865,8 +1120,7 @@ class StateManager:
             if has_reports_dir:
                 try:
                     # Szukaj plików CSV dla tej kategorii
-                    pattern = f"report_{category_name.upper()}_*.csv"
-                    csv_files = list(reports_dir.glob(pattern))
+                    csv_files = glob_reports(reports_dir, f"report_{category_name.upper()}_")
                     has_reports = len(csv_files) > 0
                 except Exception:
                     has_reports = False
@@ -910,4 +1164,21 @@ class StateManager:
             if re.search(pattern, url):
                 return True
         
-        return False 
\ No newline at end of file
+        return False 
+
+
+def create_state_manager(backend: str = "json", **kwargs) -> StateManager:
+    """
+    Tworzy StateManager dla wybranego backendu.
+    
+    Args:
+        backend: "json" (pliki JSON) albo "sqlite" (baza state.db, migracja z JSON przy pierwszym starcie)
+        **kwargs: Argumenty StateManager (data_dir, quota_flush_units)
+    """
+    backend = (backend or "json").lower()
+    if backend == "sqlite":
+        from .sqlite_state_manager import SQLiteStateManager
+        return SQLiteStateManager(**kwargs)
+    if backend != "json":
+        raise ValueError(f"Nieznany backend stanu: {backend} (dostępne: json, sqlite)")
+    return StateManager(**kwargs)
@@ -0,0 +1,186 @@
+try:
+    import logging
+    import sqlite3
+    import threading
+    from pathlib import Path
+    from typing import Dict, Iterable, List, Optional, Tuple
+    from ..config import storage_locations
+except ImportError as e:
+    print(f"❌ Błąd importu w stats series: {e}")
+    raise
+
+logger = logging.getLogger(__name__)
+
+# Plik szeregu w katalogu raportów (obserwacje pochodzą z raportów)
+STATS_SERIES_FILENAME = "stats_series.db"
+
+OBSERVATIONS_TABLE = (
+    "CREATE TABLE IF NOT EXISTS observations ("
+    "video_id TEXT NOT NULL, date TEXT NOT NULL, category TEXT NOT NULL, "
+    "views INTEGER NOT NULL, likes INTEGER NOT NULL, comments INTEGER NOT NULL, "
+    "PRIMARY KEY (video_id, date, category)) WITHOUT ROWID"
+)
+
+# (video_id, views, likes, comments)
+Observation = Tuple[str, int, int, int]
+
+
+class StatsSeriesStore:
+    """
+    Szereg czasowy statystyk filmów w formacie długim (SQLite, tryb WAL).
+
+    Jeden wiersz = jedna obserwacja (video_id, data, kategoria, wyświetlenia,
+    polubienia, komentarze), dopisywana przy zapisie raportu dziennego. Klucz
+    główny (video_id, date, category) daje odczyt historii filmu jednym
+    przeszukaniem indeksu, a film z raportów dwóch kategorii ma wiersz w każdej
+    z nich. Indeks (category, date) - odczyt całego dnia lub okna dat kategorii
+    bez wczytywania raportów CSV. Ponowny raport z tą samą datą zastępuje
+    obserwacje tego dnia w kategorii (tak jak nadpisuje plik raportu).
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate_key()
+        self._conn.execute(OBSERVATIONS_TABLE)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_observations_category_date ON observations(category, date)"
+        )
+        self._conn.commit()
+
+    def _migrate_key(self):
+        """Tabela z kluczem (video_id, date) dostaje klucz z kategorią (wiersze zostają)"""
+        columns = self._conn.execute("PRAGMA table_info(observations)").fetchall()
+        if not columns or any(name == 'category' and pk for _, name, _, _, _, pk in columns):
+            return
+        logger.info("Szereg statystyk: klucz główny rozszerzany o kategorię")
+        # Jedna transakcja - przerwana migracja nie zostawia tabeli bez danych
+        self._conn.executescript(
+            "BEGIN;"
+            "DROP INDEX IF EXISTS idx_observations_category_date;"
+            "ALTER TABLE observations RENAME TO observations_old;"
+            f"{OBSERVATIONS_TABLE};"
+            "INSERT INTO observations (video_id, date, category, views, likes, comments) "
+            "SELECT video_id, date, category, views, likes, comments FROM observations_old;"
+            "DROP TABLE observations_old;"
+            "COMMIT;"
+        )
+
+    def record(self, category: str, date: str, observations: Iterable[Observation]) -> int:
+        """Dopisuje obserwacje jednego dnia kategorii w jednej transakcji; zwraca ich liczbę"""
+        rows = [
+            (video_id, date, category.upper(), int(views), int(likes), int(comments))
+            for video_id, views, likes, comments in observations
+            if video_id
+        ]
+        if rows:
+            with self._lock:
+                self._conn.executemany("INSERT OR REPLACE INTO observations VALUES (?, ?, ?, ?, ?, ?)", rows)
+                self._conn.commit()
+        return len(rows)
+
+    def views_on(self, category: str, date: str) -> Dict[str, int]:
+        """Wyświetlenia filmów kategorii zaobserwowane danego dnia (video_id -> views)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT video_id, views FROM observations WHERE category = ? AND date = ?",
+                (category.upper(), date)
+            ).fetchall()
+        return dict(rows)
+
+    def latest_before(self, video_ids: Iterable[str], date: str,
+                      category: Optional[str] = None) -> Dict[str, Tuple[str, int]]:
+        """
+        Ostatnia wcześniejsza obserwacja każdego filmu (video_id -> (data, views)).
+
+        Z category - tylko obserwacje tej kategorii; bez niej z dwóch kategorii
+        tego samego dnia wygrywa większa liczba wyświetleń.
+        """
+        ids = list(dict.fromkeys(video_id for video_id in video_ids if video_id))
+        outer_scope, inner_scope = (" AND o.category = ?", " AND category = ?") if category else ("", "")
+        scope_params = [category.upper()] if category else []
+        found = {}
+        with self._lock:
+            # SQLite ogranicza liczbę parametrów - pytamy partiami
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    "SELECT o.video_id, o.date, MAX(o.views) FROM observations o "
+                    f"WHERE o.video_id IN ({placeholders}){outer_scope} AND o.date = ("
+                    f"SELECT MAX(date) FROM observations WHERE video_id = o.video_id AND date < ?{inner_scope}) "
+                    "GROUP BY o.video_id, o.date",
+                    [*chunk, *scope_params, date, *scope_params]
+                ).fetchall()
+                for video_id, observed, views in rows:
+                    found[video_id] = (observed, views)
+        return found
+
+    def window(self, category: str, start: str, end: str) -> Dict[str, List[Tuple[str, int, int, int]]]:
+        """
+        Obserwacje kategorii w oknie dat [start, end] (video_id -> [(data, views, likes, comments)]).
+
+        Historia każdego filmu jest posortowana rosnąco po dacie.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT video_id, date, views, likes, comments FROM observations "
+                "WHERE category = ? AND date BETWEEN ? AND ? ORDER BY video_id, date",
+                (category.upper(), start, end)
+            ).fetchall()
+        series: Dict[str, List[Tuple[str, int, int, int]]] = {}
+        for video_id, observed, views, likes, comments in rows:
+            series.setdefault(video_id, []).append((observed, views, likes, comments))
+        return series
+
+    def growth(self, category: str, start: str, end: str) -> Dict[str, int]:
+        """Przyrost wyświetleń w oknie [start, end]: ostatnia minus pierwsza obserwacja filmu"""
+        return {
+            video_id: history[-1][1] - history[0][1]
+            for video_id, history in self.window(category, start, end).items()
+        }
+
+    def dates(self, category: str) -> List[str]:
+        """Daty z obserwacjami kategorii (rosnąco)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT date FROM observations WHERE category = ? ORDER BY date",
+                (category.upper(),)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def delete_before(self, date: str) -> int:
+        """Usuwa obserwacje starsze niż `date`, zwraca liczbę usuniętych"""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM observations WHERE date < ?", (date,))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM observations").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_stores: Dict[Path, StatsSeriesStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_stats_series() -> StatsSeriesStore:
+    """Wspólny szereg statystyk (jedno połączenie na katalog raportów)"""
+    path = storage_locations.reports / STATS_SERIES_FILENAME
+    store = _stores.get(path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(path)
+            if store is None:
+                store = _stores[path] = StatsSeriesStore(path)
+    return store
@@ -0,0 +1,144 @@
+try:
+    import hashlib
+    import logging
+    import sqlite3
+    import threading
+    from datetime import datetime
+    from pathlib import Path
+    from typing import Dict, Iterable, List, Optional
+    from ..config import storage_locations
+except ImportError as e:
+    print(f"❌ Błąd importu w text store: {e}")
+    raise
+
+logger = logging.getLogger(__name__)
+
+# Plik magazynu w katalogu raportów (raporty kompaktowe bez niego są niepełne)
+TEXT_STORE_FILENAME = "report_texts.db"
+# Kolumna tekstowa raportu -> kolumna ze skrótem w trybie kompaktowym
+TEXT_COLUMNS = {'Description': 'Description_Hash', 'Tags': 'Tags_Hash'}
+
+
+def text_key(text: str) -> str:
+    """Skrót treści (BLAKE2b, 128 bitów, hex); pusty tekst nie ma skrótu"""
+    if not text:
+        return ''
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class TextStore:
+    """
+    Magazyn tekstów adresowany treścią (SQLite, tryb WAL).
+
+    Opis i tagi filmu są zapisywane raz, pod skrótem treści - kolejne raporty
+    z tym samym filmem odwołują się tylko do skrótu. Ten sam tekst daje zawsze
+    ten sam klucz, więc zapis jest idempotentny (INSERT OR IGNORE), a odczyt
+    pobiera tylko wskazane teksty.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS texts ("
+            "hash TEXT PRIMARY KEY, text TEXT NOT NULL, created REAL NOT NULL) WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+    def put_many(self, texts: Iterable[str]) -> List[str]:
+        """Zapisuje teksty w jednej transakcji; zwraca ich skróty (w tej samej kolejności)"""
+        texts = ['' if text is None else str(text) for text in texts]
+        keys = [text_key(text) for text in texts]
+        created = datetime.now().timestamp()
+        rows = {key: (key, text, created) for key, text in zip(keys, texts) if key}
+        if rows:
+            with self._lock:
+                self._conn.executemany("INSERT OR IGNORE INTO texts VALUES (?, ?, ?)", rows.values())
+                self._conn.commit()
+        return keys
+
+    def put(self, text: str) -> str:
+        """Zapisuje jeden tekst, zwraca jego skrót"""
+        return self.put_many([text])[0]
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """Teksty dla podanych skrótów (skrót -> tekst); nieznane i puste są pomijane"""
+        keys = list(dict.fromkeys(key for key in keys if key))
+        found = {}
+        with self._lock:
+            # SQLite ogranicza liczbę parametrów - pytamy partiami
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT hash, text FROM texts WHERE hash IN ({placeholders})", chunk
+                ).fetchall()
+                found.update(rows)
+        return found
+
+    def get(self, key: str) -> Optional[str]:
+        """Tekst dla skrótu albo None"""
+        if not key:
+            return ''
+        return self.get_many([key]).get(key)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM texts").fetchone()[0]
+
+    def size_bytes(self) -> int:
+        """Rozmiar bazy na dysku (łącznie z plikiem WAL)"""
+        wal = self.db_path.with_name(self.db_path.name + '-wal')
+        return sum(path.stat().st_size for path in (self.db_path, wal) if path.exists())
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_stores: Dict[Path, TextStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_text_store() -> TextStore:
+    """Wspólny magazyn tekstów raportów (jedno połączenie na katalog raportów)"""
+    path = storage_locations.reports / TEXT_STORE_FILENAME
+    store = _stores.get(path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(path)
+            if store is None:
+                store = _stores[path] = TextStore(path)
+    return store
+
+
+def expand_text_columns(rows: List[Dict], store: Optional[TextStore] = None) -> List[Dict]:
+    """
+    Uzupełnia wiersze raportu kompaktowego o Description / Tags (w miejscu, zwraca rows).
+
+    Wszystkie teksty raportu pobierane są jednym zapytaniem; wiersze raportu
+    z tekstami (bez kolumn *_Hash) zostają bez zmian.
+    """
+    present = [(column, hash_column) for column, hash_column in TEXT_COLUMNS.items()
+               if rows and hash_column in rows[0]]
+    if not present:
+        return rows
+    store = store or get_text_store()
+    texts = store.get_many(row[hash_column] for row in rows for _, hash_column in present)
+    missing = 0
+    for row in rows:
+        for column, hash_column in present:
+            key = row[hash_column]
+            text = texts.get(key) if key else ''
+            if text is None:
+                missing += 1
+                text = ''
+            row[column] = text
+    if missing:
+        logger.warning("Brak %s tekstów w magazynie %s", missing, store.db_path.name)
+    return rows
@@ -1,7 +1,5 @@
 try:
     import pandas as pd
-    
-    print("✅ Wszystkie importy w moto analyzer udane")
 except ImportError as e:
     print(f"❌ Błąd importu w moto analyzer: {e}")
     import traceback
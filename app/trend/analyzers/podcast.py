@@ -1,8 +1,6 @@
 try:
     import pandas as pd, re
     from ..core.utils import safe_int
-    
-    print("✅ Wszystkie importy w podcast analyzer udane")
 except ImportError as e:
     print(f"❌ Błąd importu w podcast analyzer: {e}")
     import traceback
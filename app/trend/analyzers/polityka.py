@@ -1,7 +1,5 @@
 try:
     import pandas as pd
-    
-    print("✅ Wszystkie importy w polityka analyzer udane")
 except ImportError as e:
     print(f"❌ Błąd importu w polityka analyzer: {e}")
     import traceback
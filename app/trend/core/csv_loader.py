@@ -1,17 +1,18 @@
 try:
-    import csv
+    import logging
     from typing import Dict, Any, List
     from datetime import date
     from pathlib import Path
     from app.trend.core.store.trend_store import report_path_for_date
-    
-    print("✅ Wszystkie importy w trend csv_loader udane")
+    from app.storage.report_columns import read_report_rows
 except ImportError as e:
     print(f"❌ Błąd importu w trend csv_loader: {e}")
     import traceback
     traceback.print_exc()
     raise
 
+log = logging.getLogger("trend")
+
 def normalize_key(k: str) -> str:
     """Normalizuj klucz: strip, lower, usuń BOM, zamień spacje/- na _"""
     if not k:
@@ -118,17 +119,16 @@ def read_csv_for_date(category: str, d: date) -> List[Dict[str, Any]]:
     
     rows = []
     try:
-        with open(csv_path, 'r', encoding='utf-8-sig') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                # Znormalizuj nagłówki
-                normalized = map_headers(row)
-                
-                # Pomiń wiersze bez video_id
-                if normalized["video_id"]:
-                    rows.append(normalized)
+        # Plik kolumnowy raportu (duration_seconds w sekundach), inaczej CSV
+        for row in read_report_rows(csv_path, with_text=True):
+            # Znormalizuj nagłówki
+            normalized = map_headers(row)
+            
+            # Pomiń wiersze bez video_id
+            if normalized["video_id"]:
+                rows.append(normalized)
     
     except Exception as e:
-        print(f"Error loading CSV {csv_path}: {e}")
+        log.warning("Error loading CSV %s: %s", csv_path, e)
     
     return rows
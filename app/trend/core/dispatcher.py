@@ -5,8 +5,6 @@ try:
     from ..analyzers import podcast as podcast_an
     from ..analyzers import moto as moto_an
     from ..analyzers import polityka as pol_an
-    
-    print("✅ Wszystkie importy w trend dispatcher udane")
 except ImportError as e:
     print(f"❌ Błąd importu w trend dispatcher: {e}")
     import traceback
@@ -1,40 +1,50 @@
+import os
 import pandas as pd
+from app.storage.stats_series import get_stats_series
 from .store.trend_store import load_json, save_json, trends_path, growth_path
 
+def _count_column(df: pd.DataFrame, column: str) -> pd.Series:
+    if column not in df: return pd.Series(0, index=df.index)
+    return pd.to_numeric(df[column], errors="coerce").fillna(0).astype("int64")
+
 def update_growth(category: str, df: pd.DataFrame, report_date: str):
-    trends = load_json(trends_path(category))
-    # Zapis historii views per Video_ID
-    for _, r in df.iterrows():
-        vid = str(r.get("Video_ID","")).strip()
-        if not vid: continue
-        title = str(r.get("Title",""))
-        views = int(pd.to_numeric(r.get("View_Count",0), errors="coerce") or 0)
-        entry = trends.get(vid, {"title": title, "history": []})
-        # unikamy duplikatu dla danej daty
-        if not any(h.get("date")==report_date for h in entry["history"]):
-            entry["history"].append({"date": report_date, "views": views})
-            # sort rosnąco po dacie
-            entry["history"] = sorted(entry["history"], key=lambda x: x["date"])
-        entry["title"] = title or entry.get("title","")
-        trends[vid] = entry
-    save_json(trends_path(category), trends)
+    # Pierwszy wiersz filmu w raporcie (jak dotąd: jeden pomiar na datę)
+    ids = df["Video_ID"].astype("string").str.strip().fillna("") if "Video_ID" in df else pd.Series("", index=df.index)
+    today = pd.DataFrame({
+        "video_id": ids,
+        "title": df["Title"].astype("string").fillna("") if "Title" in df else "",
+        "views": _count_column(df, "View_Count"),
+        "likes": _count_column(df, "Like_Count"),
+        "comments": _count_column(df, "Comment_Count"),
+    })
+    today = today[today["video_id"] != ""].drop_duplicates("video_id")
+
+    # Pomiar dnia trafia do szeregu statystyk (raporty CSVGenerator są tam już od zapisu)
+    series = get_stats_series()
+    series.record(category, report_date, today[["video_id", "views", "likes", "comments"]].itertuples(index=False))
+    # Poprzedni pomiar każdego filmu - jeden odczyt indeksu zamiast historii w JSON
+    previous = series.latest_before(today["video_id"], report_date, category)
+
+    # Historia sprzed szeregu (video_trends.json) - tylko dla filmów bez wcześniejszej obserwacji.
+    # Plik nie jest już dopisywany: to jedyny jego czytelnik, historię trzyma szereg statystyk.
+    legacy = {}
+    if len(previous) < len(today) and os.path.exists(trends_path(category)):
+        legacy = load_json(trends_path(category))
 
-    # Oblicz delta lista na dziś
     growth_list = []
-    for vid, entry in trends.items():
-        hist = entry.get("history", [])
-        if not hist: continue
-        today = next((h for h in hist if h["date"]==report_date), None)
-        if not today: continue
-        # szukaj poprzedniego pomiaru
-        prev_items = [h for h in hist if h["date"]<report_date]
-        prev = prev_items[-1] if prev_items else None
+    for vid, title, views in zip(today["video_id"], today["title"], today["views"]):
+        views = int(views)
+        prev = previous.get(vid)
+        prev_views = prev[1] if prev else None
+        if prev is None and vid in legacy:
+            prev_items = [h for h in legacy[vid].get("history", []) if h["date"] < report_date]
+            prev_views = max(prev_items, key=lambda x: x["date"])["views"] if prev_items else None
         growth_list.append({
             "video_id": vid,
-            "title": entry.get("title",""),
-            "views_today": today["views"],
-            "views_yesterday": prev["views"] if prev else None,
-            "delta": (today["views"] - prev["views"]) if prev else None
+            "title": title or legacy.get(vid, {}).get("title", ""),
+            "views_today": views,
+            "views_yesterday": prev_views,
+            "delta": (views - prev_views) if prev_views is not None else None
         })
     # sort malejąco po delta (None na dół)
     growth_list = sorted(growth_list, key=lambda x: (-1_000_000_000 if x["delta"] is None else -x["delta"], -x["views_today"]))
@@ -15,13 +15,13 @@ def register_trend_job(scheduler, category="PODCAST"):
         try:
             df, report_date = load_latest(category)
             if df is None:
-                log.info(f"[TREND] no report for {category}")
+                log.info("[TREND] no report for %s", category)
                 return
             analyze_category(category, df)  # side effect: liczy rank + stats
             update_growth(category, df, report_date)
             st = publish_hour_stats(df)
             save_json(stats_path(category, report_date), st)
-            log.info(f"[TREND] done for {category} @ {report_date}")
+            log.info("[TREND] done for %s @ %s", category, report_date)
         except Exception as e:
-            log.exception(f"[TREND] job failed: {e}")
+            log.exception("[TREND] job failed: %s", e)
     scheduler.add_job(job, CronTrigger(hour=hour, minute=minute), id=f"trend_{category.lower()}_daily", replace_existing=True)
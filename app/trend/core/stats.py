@@ -1,8 +1,6 @@
 try:
     import pandas as pd
     from .utils import is_short, safe_int
-    
-    print("✅ Wszystkie importy w trend stats udane")
 except ImportError as e:
     print(f"❌ Błąd importu w trend stats: {e}")
     import traceback
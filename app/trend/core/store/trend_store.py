@@ -1,10 +1,10 @@
 try:
     import os, json, datetime as dt
-    from typing import Dict, Any
+    from typing import Dict, Any, Optional
     from pathlib import Path
     from datetime import date
-    
-    print("✅ Wszystkie importy w trend store udane")
+    from app.config import storage_locations
+    from app.storage.report_files import find_report
 except ImportError as e:
     print(f"❌ Błąd importu w trend store: {e}")
     import traceback
@@ -12,10 +12,8 @@ except ImportError as e:
     raise
 
 def base_dir():
-    root = os.environ.get("RAILWAY_VOLUME_PATH", "/mnt/volume")
-    path = os.path.join(root, "guest_analysis", "trends")
-    os.makedirs(path, exist_ok=True)
-    return path
+    # guest_analysis/ leży obok reports/ na tym samym wolumenie (sprawdzany raz)
+    return os.path.join(storage_locations.get("guest_analysis"), "trends")
 
 def cat_dir(category: str):
     d = os.path.join(base_dir(), category.lower())
@@ -31,6 +29,10 @@ def growth_path(category: str, report_date: str):
 def stats_path(category: str, report_date: str):
     return os.path.join(cat_dir(category), f"stats_{report_date}.json")
 
+def report_path_for_date(category: str, d: date) -> Optional[Path]:
+    # report_X_DATA.csv albo skompresowany .csv.gz / .csv.zst
+    return find_report(storage_locations.reports, f"report_{category.upper()}_{d.isoformat()}")
+
 def load_json(path: str) -> Dict[str, Any]:
     if not os.path.exists(path): return {}
     with open(path, "r", encoding="utf-8") as f:
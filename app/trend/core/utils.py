@@ -1,7 +1,5 @@
 try:
     import math
-    
-    print("✅ Wszystkie importy w trend utils udane")
 except ImportError as e:
     print(f"❌ Błąd importu w trend utils: {e}")
     import traceback
@@ -3,13 +3,10 @@ try:
     from fastapi import APIRouter, Request, Query
     from fastapi.responses import JSONResponse, HTMLResponse
     from fastapi.templating import Jinja2Templates
-    from app.trend.services.csv_processor import get_trend_data
     from datetime import date
-    import pandas as pd
     import os
     from pathlib import Path
-    
-    print("✅ Wszystkie importy w trend router udane")
+    from app.workers import run_cpu, run_io
 except ImportError as e:
     print(f"❌ Błąd importu w trend router: {e}")
     import traceback
@@ -30,26 +27,27 @@ def get_top_videos_from_csv(category_name: str, limit: int = 15):
         reports_dir = settings.reports_path
         
         if not reports_dir.exists():
-            log.warning(f"Katalog raportów nie istnieje: {reports_dir}")
+            log.warning("Katalog raportów nie istnieje: %s", reports_dir)
             return []
         
         # Znajdź najnowszy plik CSV dla danej kategorii
-        pattern = f"report_{category_name.upper()}_*.csv"
-        csv_files = list(reports_dir.glob(pattern))
+        from app.storage.report_files import glob_reports
+        csv_files = glob_reports(reports_dir, f"report_{category_name.upper()}_")
         
         if not csv_files:
-            log.warning(f"Nie znaleziono plików CSV dla kategorii {category_name}")
+            log.warning("Nie znaleziono plików CSV dla kategorii %s", category_name)
             return []
         
         # Weź najnowszy plik (sortuj po nazwie)
         latest_file = sorted(csv_files)[-1]
-        log.info(f"Używam pliku: {latest_file}")
+        log.info("Używam pliku: %s", latest_file)
         
-        # Wczytaj CSV
-        df = pd.read_csv(latest_file)
+        # Wczytaj raport (plik kolumnowy, inaczej CSV)
+        from app.storage.report_columns import read_report
+        df = read_report(latest_file)
         
         # Sprawdź jakie kolumny są dostępne
-        log.info(f"Dostępne kolumny: {list(df.columns)}")
+        log.info("Dostępne kolumny: %s", list(df.columns))
         
         # Znajdź kolumnę z liczbą wyświetleń (może być View_Count, views_today, etc.)
         view_column = None
@@ -59,7 +57,7 @@ def get_top_videos_from_csv(category_name: str, limit: int = 15):
                 break
         
         if not view_column:
-            log.warning(f"Nie znaleziono kolumny z wyświetleniami w {latest_file}")
+            log.warning("Nie znaleziono kolumny z wyświetleniami w %s", latest_file)
             return []
         
         # Znajdź kolumnę z tytułem
@@ -70,7 +68,7 @@ def get_top_videos_from_csv(category_name: str, limit: int = 15):
                 break
         
         if not title_column:
-            log.warning(f"Nie znaleziono kolumny z tytułem w {latest_file}")
+            log.warning("Nie znaleziono kolumny z tytułem w %s", latest_file)
             return []
         
         # Znajdź kolumnę z nazwą kanału
@@ -93,13 +91,61 @@ def get_top_videos_from_csv(category_name: str, limit: int = 15):
             }
             top_videos.append(video_data)
         
-        log.info(f"Pomyślnie wczytano {len(top_videos)} wideo z {latest_file}")
+        log.info("Pomyślnie wczytano %s wideo z %s", len(top_videos), latest_file)
         return top_videos
         
     except Exception as e:
-        log.error(f"Błąd podczas wczytywania CSV: {e}")
+        log.error("Błąd podczas wczytywania CSV: %s", e)
         return []
 
+def load_latest_ranking(category_name: str) -> dict:
+    """
+    Wczytuje dzisiejszy ranking kategorii, a gdy go nie ma - najnowszy dostępny.
+    Praca plikowa (glob + JSON) - handlery wołają ją przez run_io.
+    """
+    import json
+    from app.config.settings import settings
+    
+    base_path = settings.reports_path
+    today_str = date.today().strftime("%Y-%m-%d")
+    ranking_path = base_path / f"ranking_{category_name.upper()}_{today_str}.json"
+    
+    log.debug("📁 Szukam rankingu w: %s", ranking_path)
+    
+    if ranking_path.exists():
+        with open(ranking_path, 'r', encoding='utf-8') as f:
+            ranking_data = json.load(f)
+    else:
+        log.warning("Brak rankingu dla %s z dzisiaj: %s", category_name, ranking_path)
+        # Spróbuj znaleźć najnowszy dostępny ranking
+        ranking_files = list(base_path.glob(f"ranking_{category_name.upper()}_*.json"))
+        if ranking_files:
+            latest_ranking = sorted(ranking_files)[-1]
+            log.debug("📁 Używam najnowszego dostępnego rankingu: %s", latest_ranking)
+            with open(latest_ranking, 'r', encoding='utf-8') as f:
+                ranking_data = json.load(f)
+        else:
+            log.error("Brak jakichkolwiek rankingów dla %s", category_name)
+            ranking_data = {"shorts": [], "longform": [], "error": "Brak rankingów"}
+    
+    log.debug("✅ Zwracam dane dla %s: %s shorts, %s longform", category_name, len(ranking_data.get('shorts', [])), len(ranking_data.get('longform', [])))
+    return ranking_data
+
+
+def delete_rankings(category_name: str) -> int:
+    """Usuwa wszystkie pliki rankingów kategorii; zwraca liczbę usuniętych"""
+    from app.config.settings import settings
+    
+    deleted_count = 0
+    for ranking_file in settings.reports_path.glob(f"ranking_{category_name.upper()}_*.json"):
+        try:
+            ranking_file.unlink()
+            deleted_count += 1
+            log.debug("🗑️ Usunięto: %s", ranking_file.name)
+        except Exception as e:
+            log.warning("Błąd podczas usuwania %s: %s", ranking_file.name, e)
+    return deleted_count
+
 @router.get("/trends/{category_name}", response_class=HTMLResponse)
 async def get_category_trends(request: Request, category_name: str):
     """
@@ -107,10 +153,11 @@ async def get_category_trends(request: Request, category_name: str):
     Używa nowego serwisu csv_processor do pobierania danych.
     """
     try:
-        # Pobierz dane trendów używając nowego serwisu
-        videos = get_trend_data(category=category_name, report_date=date.today())
+        # Pobierz dane trendów używając nowego serwisu (pandas ładowany dopiero tutaj)
+        from app.trend.services.csv_processor import get_trend_data
+        videos = await run_cpu(get_trend_data, category=category_name, report_date=date.today())
         
-        log.info(f"Pobrano {len(videos)} wideo dla kategorii {category_name}")
+        log.info("Pobrano %s wideo dla kategorii %s", len(videos), category_name)
         
         # Renderuj szablon simple_report.html z nowymi danymi
         return templates.TemplateResponse(
@@ -125,7 +172,7 @@ async def get_category_trends(request: Request, category_name: str):
         )
         
     except Exception as e:
-        log.error(f"Błąd podczas pobierania trendów dla kategorii {category_name}: {e}")
+        log.error("Błąd podczas pobierania trendów dla kategorii %s: %s", category_name, e)
         
         # W przypadku błędu zwróć szablon z pustymi danymi
         return templates.TemplateResponse(
@@ -146,10 +193,10 @@ async def get_local_trends_page(request: Request, category_name: str):
     Strona HTML wyświetlająca top 15 najpopularniejszych wideo z pliku CSV.
     """
     try:
-        log.info(f"Wyświetlanie top wideo dla kategorii {category_name}")
+        log.info("Wyświetlanie top wideo dla kategorii %s", category_name)
         
         # Pobierz top 15 wideo bezpośrednio z pliku CSV
-        top_videos = get_top_videos_from_csv(category_name, limit=15)
+        top_videos = await run_io(get_top_videos_from_csv, category_name, limit=15)
         
         # Renderuj szablon
         return templates.TemplateResponse(
@@ -164,7 +211,7 @@ async def get_local_trends_page(request: Request, category_name: str):
         )
         
     except Exception as e:
-        log.error(f"Błąd podczas wyświetlania top wideo dla {category_name}: {e}")
+        log.error("Błąd podczas wyświetlania top wideo dla %s: %s", category_name, e)
         
         return templates.TemplateResponse(
             "trend/local_trends.html",
@@ -185,45 +232,9 @@ async def get_category_rankings(request: Request, category_name: str):
     UŻYWA NOWEGO SYSTEMU RankingAnalyzer zamiast starego ranking_manager.
     """
     try:
-        print(f"🔄 Stary endpoint /rankings/{category_name} - przekierowuję do nowego systemu...")
-        
-        # PRZEKIERUJ DO NOWEGO SYSTEMU zamiast używać starego ranking_manager
-        from datetime import date
-        import json
-        from pathlib import Path
-        from app.config.settings import settings
-        from app.trend.services.ranking_analyzer import RankingAnalyzer
-        
-        print(f"🔄 Używam nowego systemu RankingAnalyzer dla {category_name}...")
-        
-        base_path = settings.reports_path
-        today_str = date.today().strftime("%Y-%m-%d")
-        ranking_path = base_path / f"ranking_{category_name.upper()}_{today_str}.json"
+        log.debug("🔄 Stary endpoint /rankings/%s - przekierowuję do nowego systemu...", category_name)
         
-        print(f"📁 Szukam rankingu w: {ranking_path}")
-        
-        ranking_data = {"shorts": [], "longform": [], "error": "Brak rankingu"}
-        if ranking_path.exists():
-            print(f"✅ Znaleziono ranking: {ranking_path}")
-            with open(ranking_path, 'r', encoding='utf-8') as f:
-                ranking_data = json.load(f)
-            print(f"📊 Wczytano ranking: {len(ranking_data.get('shorts', []))} shorts, {len(ranking_data.get('longform', []))} longform")
-        else:
-            print(f"⚠️ Brak rankingu dla {category_name} z dzisiaj: {ranking_path}")
-            # Spróbuj znaleźć najnowszy dostępny ranking
-            pattern = f"ranking_{category_name.upper()}_*.json"
-            ranking_files = list(base_path.glob(pattern))
-            if ranking_files:
-                latest_ranking = sorted(ranking_files)[-1]
-                print(f"📁 Używam najnowszego dostępnego rankingu: {latest_ranking}")
-                with open(latest_ranking, 'r', encoding='utf-8') as f:
-                    ranking_data = json.load(f)
-                today_str = latest_ranking.stem.split('_')[-1]  # Wyciągnij datę z nazwy pliku
-            else:
-                print(f"❌ Brak jakichkolwiek rankingów dla {category_name}")
-                ranking_data = {"shorts": [], "longform": [], "error": "Brak rankingów"}
-        
-        print(f"✅ Zwracam dane dla {category_name}: {len(ranking_data.get('shorts', []))} shorts, {len(ranking_data.get('longform', []))} longform")
+        ranking_data = await run_io(load_latest_ranking, category_name)
         
         # Użyj tego samego szablonu co nowy system
         return templates.TemplateResponse(
@@ -243,8 +254,7 @@ async def get_category_rankings(request: Request, category_name: str):
         )
         
     except Exception as e:
-        print(f"❌ Błąd w starym endpoincie dla {category_name}: {e}")
-        log.error(f"Błąd podczas pobierania rankingu dla kategorii {category_name}: {e}")
+        log.error("Błąd podczas pobierania rankingu dla kategorii %s: %s", category_name, e)
         import traceback
         traceback.print_exc()
         
@@ -265,28 +275,11 @@ async def clear_category_ranking(request: Request, category_name: str):
     Czyści ranking dla danej kategorii, wymuszając regenerację z nową logiką.
     """
     try:
-        print(f"🔄 Czyszczenie rankingu dla {category_name} - używam nowego systemu...")
-        
-        # UŻYWAJ NOWEGO SYSTEMU zamiast starego ranking_manager
-        from pathlib import Path
-        from app.config.settings import settings
-        
-        base_path = settings.reports_path
+        log.debug("🔄 Czyszczenie rankingu dla %s - używam nowego systemu...", category_name)
         
-        # Usuń wszystkie pliki rankingów dla tej kategorii
-        pattern = f"ranking_{category_name.upper()}_*.json"
-        ranking_files = list(base_path.glob(pattern))
+        deleted_count = await run_io(delete_rankings, category_name)
         
-        deleted_count = 0
-        for ranking_file in ranking_files:
-            try:
-                ranking_file.unlink()
-                deleted_count += 1
-                print(f"🗑️ Usunięto: {ranking_file.name}")
-            except Exception as e:
-                print(f"⚠️ Błąd podczas usuwania {ranking_file.name}: {e}")
-        
-        print(f"✅ Usunięto {deleted_count} plików rankingów dla {category_name}")
+        log.debug("✅ Usunięto %s plików rankingów dla %s", deleted_count, category_name)
         
         return {
             "message": f"Ranking dla kategorii {category_name} został wyczyszczony",
@@ -296,8 +289,7 @@ async def clear_category_ranking(request: Request, category_name: str):
         }
             
     except Exception as e:
-        print(f"❌ Błąd podczas czyszczenia rankingu dla {category_name}: {e}")
-        log.error(f"Błąd podczas czyszczenia rankingu dla {category_name}: {e}")
+        log.error("Błąd podczas czyszczenia rankingu dla %s: %s", category_name, e)
         return {
             "message": f"Błąd podczas czyszczenia rankingu: {str(e)}",
             "category": category_name,
@@ -310,16 +302,13 @@ async def regenerate_category_ranking(request: Request, category_name: str):
     Regeneruje ranking dla danej kategorii używając najnowszych danych CSV i nowej logiki.
     """
     try:
-        print(f"🔄 Regeneracja rankingu dla {category_name} - używam nowego systemu...")
-        
-        # UŻYWAJ NOWEGO SYSTEMU RankingAnalyzer
-        from app.trend.services.ranking_analyzer import RankingAnalyzer
+        log.debug("🔄 Regeneracja rankingu dla %s - używam nowego systemu...", category_name)
         
-        # Utwórz instancję nowego analizatora
-        analyzer = RankingAnalyzer()
+        # UŻYWAJ NOWEGO SYSTEMU RankingAnalyzer (w puli procesów - pandas nie blokuje pętli)
+        from app.config.settings import settings
+        from app.trend.services.ranking_analyzer import run_ranking_analysis
         
-        # Uruchom analizę dla kategorii
-        success = analyzer.run_analysis_for_category(category_name)
+        success = await run_cpu(run_ranking_analysis, category_name, str(settings.reports_path))
         
         if success:
             return {
@@ -337,8 +326,7 @@ async def regenerate_category_ranking(request: Request, category_name: str):
             }
             
     except Exception as e:
-        print(f"❌ Błąd podczas regeneracji rankingu dla {category_name}: {e}")
-        log.error(f"Błąd podczas regeneracji rankingu dla {category_name}: {e}")
+        log.error("Błąd podczas regeneracji rankingu dla %s: %s", category_name, e)
         return {
             "message": f"Błąd podczas regeneracji rankingu: {str(e)}",
             "category": category_name,
@@ -352,42 +340,8 @@ async def get_modern_category_trends(request: Request, category_name: str):
     Używa nowego systemu RankingAnalyzer i plików JSON.
     """
     try:
-        from datetime import date
-        import json
-        from pathlib import Path
-        from app.config.settings import settings
-        
-        print(f"🔄 Nowy endpoint /modern/{category_name} - wczytuję ranking...")
-        
-        # Użyj naszych ustawień zamiast sztywnej ścieżki
-        base_path = settings.reports_path
-        today_str = date.today().strftime("%Y-%m-%d")
-        ranking_path = base_path / f"ranking_{category_name.upper()}_{today_str}.json"
-        
-        print(f"📁 Szukam rankingu w: {ranking_path}")
-        
-        ranking_data = {"shorts": [], "longform": [], "error": "Brak rankingu"}
-        if ranking_path.exists():
-            print(f"✅ Znaleziono ranking: {ranking_path}")
-            with open(ranking_path, 'r', encoding='utf-8') as f:
-                ranking_data = json.load(f)
-            print(f"📊 Wczytano ranking: {len(ranking_data.get('shorts', []))} shorts, {len(ranking_data.get('longform', []))} longform")
-        else:
-            print(f"⚠️ Brak rankingu dla {category_name} z dzisiaj: {ranking_path}")
-            # Spróbuj znaleźć najnowszy dostępny ranking
-            pattern = f"ranking_{category_name.upper()}_*.json"
-            ranking_files = list(base_path.glob(pattern))
-            if ranking_files:
-                latest_ranking = sorted(ranking_files)[-1]
-                print(f"📁 Używam najnowszego dostępnego rankingu: {latest_ranking}")
-                with open(latest_ranking, 'r', encoding='utf-8') as f:
-                    ranking_data = json.load(f)
-                today_str = latest_ranking.stem.split('_')[-1]  # Wyciągnij datę z nazwy pliku
-            else:
-                print(f"❌ Brak jakichkolwiek rankingów dla {category_name}")
-                ranking_data = {"shorts": [], "longform": [], "error": "Brak rankingów"}
-        
-        print(f"✅ Zwracam dane dla {category_name}: {len(ranking_data.get('shorts', []))} shorts, {len(ranking_data.get('longform', []))} longform")
+        log.debug("🔄 Nowy endpoint /modern/%s - wczytuję ranking...", category_name)
+        ranking_data = await run_io(load_latest_ranking, category_name)
         
         return templates.TemplateResponse(
             "trend/rankings.html",  # Użyj starego szablonu z pięknymi tabelami
@@ -406,8 +360,7 @@ async def get_modern_category_trends(request: Request, category_name: str):
         )
         
     except Exception as e:
-        print(f"❌ Błąd w nowym endpoincie dla {category_name}: {e}")
-        log.error(f"Błąd podczas pobierania nowoczesnego rankingu dla kategorii {category_name}: {e}")
+        log.error("Błąd podczas pobierania nowoczesnego rankingu dla kategorii %s: %s", category_name, e)
         import traceback
         traceback.print_exc()
         
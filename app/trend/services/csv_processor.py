@@ -9,8 +9,9 @@ try:
     from datetime import date, timedelta
     from typing import List, Dict, Any, Optional
     from pathlib import Path
-    
-    print("✅ Wszystkie importy w csv_processor udane")
+    from app.storage.report_columns import read_report
+    from app.storage.report_files import glob_reports, report_date as report_file_date, report_stem
+    from app.storage.stats_series import get_stats_series
 except ImportError as e:
     print(f"❌ Błąd importu w csv_processor: {e}")
     import traceback
@@ -40,45 +41,42 @@ class CSVProcessor:
         """
         try:
             # Znajdź najnowszy dostępny plik CSV dla danej kategorii
-            pattern = f"report_{category.upper()}_*.csv"
-            csv_files = list(self.base_path.glob(pattern))
+            csv_files = glob_reports(self.base_path, f"report_{category.upper()}_")
             
             if not csv_files:
-                print(f"❌ CSV Processor: Nie znaleziono plików CSV dla kategorii {category}")
-                logger.warning(f"Nie znaleziono plików CSV dla kategorii {category}")
+                logger.warning("Nie znaleziono plików CSV dla kategorii %s", category)
                 return []
             
             # Weź najnowszy plik (sortuj po nazwie)
             latest_file = sorted(csv_files)[-1]
-            print(f"🔍 CSV Processor: Używam najnowszego pliku: {latest_file}")
+            logger.debug("🔍 CSV Processor: Używam najnowszego pliku: %s", latest_file)
             
             # Wczytaj najnowszy raport
             latest_df = self._load_csv_safely(latest_file)
             if latest_df is None or latest_df.empty:
-                print(f"❌ CSV Processor: Nie można wczytać raportu: {latest_file}")
-                logger.warning(f"Nie można wczytać raportu: {latest_file}")
+                logger.warning("Nie można wczytać raportu: %s", latest_file)
                 return []
             
             # Znajdź poprzedni plik (dla obliczenia delta)
+            previous_df = None
+            previous_views = None
             if len(csv_files) > 1:
                 previous_file = sorted(csv_files)[-2]
-                print(f"🔍 CSV Processor: Używam poprzedniego pliku: {previous_file}")
-                previous_df = self._load_csv_safely(previous_file)
-            else:
-                previous_df = None
+                # Wyświetlenia z szeregu statystyk; raporty sprzed szeregu wczytywane w całości
+                previous_views = get_stats_series().views_on(category, report_file_date(previous_file)) or None
+                if previous_views is None:
+                    logger.debug("🔍 CSV Processor: Używam poprzedniego pliku: %s", previous_file)
+                    previous_df = self._load_csv_safely(previous_file)
             
             # Przygotuj dane
-            print(f"📊 Przetwarzanie danych: {len(latest_df)} filmów w najnowszym raporcie")
-            result_data = self._process_trend_data(latest_df, previous_df)
+            logger.debug("📊 Przetwarzanie danych: %s filmów w najnowszym raporcie", len(latest_df))
+            result_data = self._process_trend_data(latest_df, previous_df, previous_views)
             
-            print(f"✅ CSV Processor: Pomyślnie przetworzono {len(result_data)} rekordów dla kategorii {category}")
-            print(f"📈 Statystyki: {len(latest_df)} → {len(result_data)} filmów")
-            logger.info(f"Pomyślnie przetworzono {len(result_data)} rekordów dla kategorii {category}")
+            logger.info("Pomyślnie przetworzono %s rekordów dla kategorii %s", len(result_data), category)
             return result_data
             
         except Exception as e:
-            print(f"❌ CSV Processor: Błąd: {e}")
-            logger.error(f"Błąd podczas przetwarzania danych trendów dla {category} {report_date}: {e}")
+            logger.error("Błąd podczas przetwarzania danych trendów dla %s %s: %s", category, report_date, e)
             return []
     
     def _load_csv_safely(self, file_path: Path) -> Optional[pd.DataFrame]:
@@ -93,15 +91,15 @@ class CSVProcessor:
         """
         try:
             if not file_path.exists():
-                logger.debug(f"Plik nie istnieje: {file_path}")
+                logger.debug("Plik nie istnieje: %s", file_path)
                 return None
             
-            # Wczytaj CSV z obsługą różnych kodowań
-            df = pd.read_csv(file_path, encoding='utf-8')
+            # Plik kolumnowy raportu (typy i duration_seconds gotowe), inaczej CSV
+            df = read_report(file_path)
             
             # Sprawdź czy DataFrame nie jest pusty
             if df.empty:
-                logger.warning(f"Plik CSV jest pusty: {file_path}")
+                logger.warning("Plik CSV jest pusty: %s", file_path)
                 return None
             
             # Sprawdź wymagane kolumny - dostosuj do rzeczywistych plików CSV
@@ -115,35 +113,38 @@ class CSVProcessor:
             missing_columns_new = [col for col in required_columns_new if col not in df.columns]
             
             if missing_columns_old and missing_columns_new:
-                logger.error(f"Brak wymaganych kolumn w {file_path}. Stary format: {missing_columns_old}, Nowy format: {missing_columns_new}")
+                logger.error("Brak wymaganych kolumn w %s. Stary format: %s, Nowy format: %s", file_path, missing_columns_old, missing_columns_new)
                 return None
             
-            logger.debug(f"Pomyślnie wczytano {len(df)} rekordów z {file_path}")
+            logger.debug("Pomyślnie wczytano %s rekordów z %s", len(df), file_path)
             return df
             
         except FileNotFoundError:
-            logger.debug(f"Plik nie znaleziony: {file_path}")
+            logger.debug("Plik nie znaleziony: %s", file_path)
             return None
         except pd.errors.EmptyDataError:
-            logger.warning(f"Plik CSV jest pusty: {file_path}")
+            logger.warning("Plik CSV jest pusty: %s", file_path)
             return None
         except pd.errors.ParserError as e:
-            logger.error(f"Błąd parsowania CSV {file_path}: {e}")
+            logger.error("Błąd parsowania CSV %s: %s", file_path, e)
             return None
         except UnicodeDecodeError as e:
-            logger.error(f"Błąd kodowania UTF-8 w {file_path}: {e}")
+            logger.error("Błąd kodowania UTF-8 w %s: %s", file_path, e)
             return None
         except Exception as e:
-            logger.error(f"Nieoczekiwany błąd podczas wczytywania {file_path}: {e}")
+            logger.error("Nieoczekiwany błąd podczas wczytywania %s: %s", file_path, e)
             return None
     
-    def _process_trend_data(self, today_df: pd.DataFrame, yesterday_df: Optional[pd.DataFrame]) -> List[Dict[str, Any]]:
+    def _process_trend_data(self, today_df: pd.DataFrame, yesterday_df: Optional[pd.DataFrame],
+                            yesterday_views: Optional[Dict[str, int]] = None) -> List[Dict[str, Any]]:
         """
         Przetwarza dane trendów i oblicza przyrosty.
         
         Args:
             today_df (pd.DataFrame): Dzisiejsze dane
             yesterday_df (Optional[pd.DataFrame]): Wczorajsze dane
+            yesterday_views (Optional[Dict[str, int]]): Wczorajsze wyświetlenia z szeregu
+                statystyk (video_id -> views); gdy podane, yesterday_df nie jest potrzebne
             
         Returns:
             List[Dict[str, Any]]: Lista przetworzonych rekordów
@@ -235,25 +236,30 @@ class CSVProcessor:
                     return "Longform"
             
             # Debugowanie parsowania Duration
-            print(f"🔍 Parsowanie Duration dla {len(result_df)} filmów...")
+            logger.debug("🔍 Parsowanie Duration dla %s filmów...", len(result_df))
             
             # Sprawdź problematyczne Duration
             problematic_durations = result_df[result_df[duration_col].isin(['P0D', '', 'nan', 'None'])]
             if not problematic_durations.empty:
-                print(f"⚠️ Znaleziono problematyczne Duration:")
+                logger.warning("Znaleziono problematyczne Duration:")
                 for _, row in problematic_durations.iterrows():
-                    print(f"   - {row.get(title_col, '')[:50]}... | Duration: '{row.get(duration_col, '')}' | Views: {row.get(view_count_col, 0)}")
+                    logger.debug("   - %s... | Duration: '%s' | Views: %s", row.get(title_col, '')[:50], row.get(duration_col, ''), row.get(view_count_col, 0))
             
-            result_df['video_type'] = result_df[duration_col].apply(safe_parse_duration)
+            if 'is_short' in result_df.columns:
+                # Czas trwania sparsowany przy zapisie raportu
+                result_df['video_type'] = result_df['is_short'].map({True: "Shorts", False: "Longform"})
+            else:
+                result_df['video_type'] = result_df[duration_col].apply(safe_parse_duration)
             
             # Inicjalizuj kolumnę delta
             result_df['delta'] = 0
             
-            # Jeśli mamy wczorajsze dane, oblicz przyrosty
-            if yesterday_df is not None and not yesterday_df.empty:
-                # Mapuj wczorajsze wyświetlenia po video_id
+            # Mapuj wczorajsze wyświetlenia po video_id
+            if yesterday_views is None and yesterday_df is not None and not yesterday_df.empty:
                 yesterday_views = yesterday_df.set_index(video_id_col)[view_count_col].to_dict()
-                
+            
+            # Jeśli mamy wczorajsze dane, oblicz przyrosty
+            if yesterday_views:
                 # Oblicz delta
                 result_df['delta'] = result_df.apply(
                     lambda row: row[view_count_col] - yesterday_views.get(row[video_id_col], 0), 
@@ -280,7 +286,7 @@ class CSVProcessor:
                 
                 # Filtruj filmy z 0 wyświetleniami lub niepoprawnym Duration
                 if views == 0 or duration == 'P0D' or duration == '':
-                    print(f"⚠️ Pomijam film: {row.get(title_col, '')[:50]}... (views: {views}, duration: {duration})")
+                    logger.warning("Pomijam film: %s... (views: %s, duration: %s)", row.get(title_col, '')[:50], views, duration)
                     continue
                 
                 result_list.append({
@@ -294,11 +300,11 @@ class CSVProcessor:
                     'duration': duration
                 })
             
-            print(f"✅ Po filtrowaniu: {len(result_list)} filmów (pominięto zaplanowane transmisje live)")
+            logger.debug("✅ Po filtrowaniu: %s filmów (pominięto zaplanowane transmisje live)", len(result_list))
             return result_list
             
         except Exception as e:
-            logger.error(f"Błąd podczas przetwarzania danych trendów: {e}")
+            logger.error("Błąd podczas przetwarzania danych trendów: %s", e)
             return []
     
     def get_available_dates(self, category: str) -> List[str]:
@@ -313,21 +319,18 @@ class CSVProcessor:
         """
         try:
             if not self.base_path.exists():
-                logger.warning(f"Katalog raportów nie istnieje: {self.base_path}")
+                logger.warning("Katalog raportów nie istnieje: %s", self.base_path)
                 return []
             
-            # Wzorzec pliku
-            pattern = f"report_{category.upper()}_*.csv"
-            
-            # Znajdź pliki
-            csv_files = list(self.base_path.glob(pattern))
+            # Znajdź pliki (report_X_DATA.csv / .csv.gz / .csv.zst)
+            csv_files = glob_reports(self.base_path, f"report_{category.upper()}_")
             
             # Wyciągnij daty z nazw plików
             dates = []
             for file_path in csv_files:
                 try:
                     # Format: report_PODCAST_2025-08-13.csv
-                    filename = file_path.stem  # bez rozszerzenia
+                    filename = report_stem(file_path)  # bez rozszerzenia
                     date_part = filename.split('_')[-1]
                     
                     # Sprawdź czy to poprawna data
@@ -339,11 +342,11 @@ class CSVProcessor:
             # Sortuj daty malejąco (najnowsze pierwsze)
             dates.sort(reverse=True)
             
-            logger.info(f"Znaleziono {len(dates)} dostępnych dat dla kategorii {category}")
+            logger.info("Znaleziono %s dostępnych dat dla kategorii %s", len(dates), category)
             return dates
             
         except Exception as e:
-            logger.error(f"Błąd podczas pobierania dostępnych dat dla {category}: {e}")
+            logger.error("Błąd podczas pobierania dostępnych dat dla %s: %s", category, e)
             return []
 
 
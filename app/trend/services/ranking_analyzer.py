@@ -3,16 +3,22 @@ import pandas as pd
 from datetime import date, timedelta
 import datetime
 from pathlib import Path
+from typing import Any, Dict
 import logging
+from app.storage.report_columns import read_report
+from app.storage.report_files import glob_reports, report_date
 
 logger = logging.getLogger(__name__)
 
 class RankingAnalyzer:
     def __init__(self, base_path_str: str = None):
         from app.config.settings import settings
-        self.base_path = Path(base_path_str) if base_path_str else settings.reports_path
-        self.base_path.mkdir(exist_ok=True)
-        print(f"✅ RankingAnalyzer zainicjalizowany z ścieżką: {self.base_path}")
+        if base_path_str:
+            self.base_path = Path(base_path_str)
+            self.base_path.mkdir(exist_ok=True)
+        else:
+            self.base_path = settings.reports_path  # Utworzony przy rozstrzyganiu lokalizacji
+        logger.debug("✅ RankingAnalyzer zainicjalizowany z ścieżką: %s", self.base_path)
 
     def run_analysis_for_category(self, category: str) -> bool:
         """
@@ -24,41 +30,42 @@ class RankingAnalyzer:
         """
         try:
             today = date.today()
-            print(f"🔄 Rozpoczynam analizę rankingu dla kategorii: {category}")
+            logger.debug("🔄 Rozpoczynam analizę rankingu dla kategorii: %s", category)
             
             # 1. WCZYTAJ KILKA NAJNOWSZYCH RAPORTÓW CSV (ostatnie 5 dni)
-            pattern = f"report_{category.upper()}_*.csv"
-            csv_files = list(self.base_path.glob(pattern))
+            csv_files = glob_reports(self.base_path, f"report_{category.upper()}_")
             
             if not csv_files:
-                print(f"⚠️ Nie znaleziono żadnych raportów CSV dla {category}. Pomijam analizę.")
-                logger.warning(f"Nie znaleziono raportów CSV dla {category}")
+                logger.warning("Nie znaleziono raportów CSV dla %s", category)
                 return False
             
             # Sortuj pliki po dacie (najnowsze na końcu)
-            csv_files_sorted = sorted(csv_files, key=lambda x: x.stem.split('_')[-1])
+            csv_files_sorted = sorted(csv_files, key=report_date)
             
             # Weź ostatnie 5 raportów (lub wszystkie jeśli mniej niż 5)
             recent_csv_files = csv_files_sorted[-5:] if len(csv_files_sorted) >= 5 else csv_files_sorted
             
-            print(f"📊 Znaleziono {len(csv_files)} raportów CSV dla {category}")
-            print(f"📊 Używam {len(recent_csv_files)} najnowszych raportów:")
+            logger.debug("📊 Znaleziono %s raportów CSV dla %s", len(csv_files), category)
+            logger.debug("📊 Używam %s najnowszych raportów:", len(recent_csv_files))
             for csv_file in recent_csv_files:
-                date_str = csv_file.stem.split('_')[-1]
-                print(f"   - {csv_file.name} (data: {date_str})")
+                date_str = report_date(csv_file)
+                logger.debug("   - %s (data: %s)", csv_file.name, date_str)
             
             # 2. WCZYTAJ I POŁĄCZ WSZYSTKIE DANE Z CSV
-            print("🔄 Wczytuję i łączę dane z wszystkich raportów CSV...")
+            logger.debug("🔄 Wczytuję i łączę dane z wszystkich raportów CSV...")
             
             all_videos = {}  # Słownik: video_id -> najnowsze dane
             
             for csv_file in recent_csv_files:
-                date_str = csv_file.stem.split('_')[-1]
-                print(f"📊 Wczytuję raport: {csv_file.name}")
+                date_str = report_date(csv_file)
+                logger.debug("📊 Wczytuję raport: %s", csv_file.name)
                 
                 try:
-                    df = pd.read_csv(csv_file)
-                    print(f"   ✅ Wczytano {len(df)} filmów z {date_str}")
+                    df = read_report(csv_file, columns=[
+                        'Video_ID', 'Title', 'Channel_Name', 'View_Count', 'Thumbnail_URL',
+                        'Date_of_Publishing', 'Video_Type'
+                    ])
+                    logger.debug("   ✅ Wczytano %s filmów z %s", len(df), date_str)
                     
                     # Przetwórz każdy film z tego raportu
                     for _, row in df.iterrows():
@@ -88,33 +95,33 @@ class RankingAnalyzer:
                                 # Nowszy raport - aktualizuj dane
                                 old_views = existing_video['views']
                                 all_videos[video_id] = video_data
-                                print(f"   🔄 Zaktualizowano film: {video_data['title'][:50]}... (wyświetlenia: {old_views} → {video_data['views']})")
+                                logger.debug("   🔄 Zaktualizowano film: %s... (wyświetlenia: %s → %s)", video_data['title'][:50], old_views, video_data['views'])
                             # Jeśli starszy raport - pomiń
                         else:
                             # Nowy film - dodaj
                             all_videos[video_id] = video_data
-                            print(f"   🆕 Dodano nowy film: {video_data['title'][:50]}...")
+                            logger.debug("   🆕 Dodano nowy film: %s...", video_data['title'][:50])
                 
                 except Exception as e:
-                    print(f"   ❌ Błąd podczas wczytywania {csv_file.name}: {e}")
+                    logger.error("   ❌ Błąd podczas wczytywania %s: %s", csv_file.name, e)
                     continue
             
-            print(f"✅ Połączono dane z {len(recent_csv_files)} raportów: {len(all_videos)} unikalnych filmów")
+            logger.debug("✅ Połączono dane z %s raportów: %s unikalnych filmów", len(recent_csv_files), len(all_videos))
             
             # Sprawdź czy Marcin Banot jest w danych
             marcin_banot_found = False
             for video in all_videos.values():
                 if 'Marcin Banot' in video['title'] or 'Cyprian Majcher' in video['channel']:
-                    print(f"🎯 ZNALEZIONO: {video['title']} - {video['channel']} - {video['views']} wyświetleń z {video['source_date']}")
+                    logger.debug("🎯 ZNALEZIONO: %s - %s - %s wyświetleń z %s", video['title'], video['channel'], video['views'], video['source_date'])
                     marcin_banot_found = True
             
             if not marcin_banot_found:
-                print(f"⚠️ NIE ZNALEZIONO filmu Marcin Banot w danych!")
+                logger.warning("NIE ZNALEZIONO filmu Marcin Banot w danych!")
             else:
-                print(f"✅ ZNALEZIONO film Marcin Banot w danych!")
+                logger.debug("✅ ZNALEZIONO film Marcin Banot w danych!")
             
             # 3. PODZIEL NA SHORTS I LONG-FORM
-            print("🔄 Dzielę filmy na kategorie...")
+            logger.debug("🔄 Dzielę filmy na kategorie...")
             
             shorts_videos = []
             longform_videos = []
@@ -125,11 +132,11 @@ class RankingAnalyzer:
                 else:
                     longform_videos.append(video)
             
-            print(f"📱 Shorts: {len(shorts_videos)} filmów")
-            print(f"🎬 Long-form: {len(longform_videos)} filmów")
+            logger.debug("📱 Shorts: %s filmów", len(shorts_videos))
+            logger.debug("🎬 Long-form: %s filmów", len(longform_videos))
             
             # 4. POSORTUJ I WYBIERZ TOP 10 (OPCJA A - po wyświetleniach)
-            print("🏆 Sortuję i wybieram Top 10...")
+            logger.debug("🏆 Sortuję i wybieram Top 10...")
             
             # Sortuj po wyświetleniach (malejąco)
             shorts_sorted = sorted(shorts_videos, key=lambda x: x['views'], reverse=True)
@@ -139,11 +146,11 @@ class RankingAnalyzer:
             top_10_shorts = shorts_sorted[:10]
             top_10_longform = longform_sorted[:10]
             
-            print(f"🏆 Top 10 Shorts: {len(top_10_shorts)} filmów")
-            print(f"🏆 Top 10 Long-form: {len(top_10_longform)} filmów")
+            logger.debug("🏆 Top 10 Shorts: %s filmów", len(top_10_shorts))
+            logger.debug("🏆 Top 10 Long-form: %s filmów", len(top_10_longform))
             
             # 5. KONWERTUJ DO FORMATU STAREGO SYSTEMU (z trendami)
-            print("🔄 Konwertuję dane do formatu starego systemu...")
+            logger.debug("🔄 Konwertuję dane do formatu starego systemu...")
             
             def convert_to_old_format(videos_list, video_type):
                 """Konwertuje dane do formatu starego systemu z trendami"""
@@ -188,7 +195,7 @@ class RankingAnalyzer:
                 }
             
             # 6. ZAPISZ STAN NA JUTRO (plik-pamięć)
-            print("💾 Zapisuję ranking na jutro...")
+            logger.debug("💾 Zapisuję ranking na jutro...")
             
             # Znajdź najnowszą datę z użytych raportów
             latest_report_date = max([video['source_date'] for video in all_videos.values()])
@@ -210,27 +217,17 @@ class RankingAnalyzer:
             }
             
             output_path = self.base_path / f"ranking_{category.upper()}_{today}.json"
-            print(f"📁 Zapisuję ranking do: {output_path}")
+            logger.debug("📁 Zapisuję ranking do: %s", output_path)
             
             with open(output_path, 'w', encoding='utf-8') as f:
                 json.dump(final_ranking, f, indent=4, ensure_ascii=False)
             
-            print(f"✅ Zapisano analizę rankingu dla {category.upper()} w pliku: {output_path}")
-            print(f"📊 Statystyki:")
-            print(f"   - Użyte raporty CSV: {len(recent_csv_files)}")
-            print(f"   - Zakres dat: {min([video['source_date'] for video in all_videos.values()])} - {latest_report_date}")
-            print(f"   - Unikalne filmy: {len(all_videos)}")
-            print(f"   - Top 10 Shorts: {len(top_10_shorts)} filmów")
-            print(f"   - Top 10 Long-form: {len(top_10_longform)} filmów")
-            print(f"   - Metoda analizy: Analiza z {len(recent_csv_files)} raportów CSV")
-            
-            logger.info(f"Pomyślnie wygenerowano ranking dla {category}: {len(top_10_shorts)} shorts, {len(top_10_longform)} longform")
+            logger.info("Pomyślnie wygenerowano ranking dla %s: %s shorts, %s longform", category, len(top_10_shorts), len(top_10_longform))
             
             return True
             
         except Exception as e:
-            print(f"❌ Błąd podczas analizy rankingu dla {category}: {e}")
-            logger.error(f"Błąd podczas analizy rankingu dla {category}: {e}")
+            logger.error("Błąd podczas analizy rankingu dla %s: %s", category, e)
             import traceback
             traceback.print_exc()
             return False
@@ -253,10 +250,14 @@ class RankingAnalyzer:
                 with open(ranking_path, 'r', encoding='utf-8') as f:
                     return json.load(f)
             else:
-                print(f"ℹ️ Brak rankingu dla {category} z dzisiaj: {ranking_path}")
+                logger.debug("ℹ️ Brak rankingu dla %s z dzisiaj: %s", category, ranking_path)
                 return {"shorts": [], "longform": [], "error": "Brak rankingu"}
                 
         except Exception as e:
-            print(f"❌ Błąd podczas wczytywania rankingu dla {category}: {e}")
-            logger.error(f"Błąd podczas wczytywania rankingu dla {category}: {e}")
+            logger.error("Błąd podczas wczytywania rankingu dla %s: %s", category, e)
             return {"shorts": [], "longform": [], "error": str(e)}
+
+
+def run_ranking_analysis(category: str, base_path_str: str = None) -> bool:
+    """Analiza rankingu jednej kategorii - punkt wejścia dla puli procesów (run_cpu)"""
+    return RankingAnalyzer(base_path_str).run_analysis_for_category(category)
@@ -2,12 +2,14 @@
 
 import csv
 import os
-import glob
 import re
 from datetime import datetime, timedelta
 from typing import Dict, List, Any
 import logging
 
+from app.config import storage_locations
+from app.storage.report_files import glob_reports, open_report_text
+
 # Rekomendacje zmian w generatorze raportów
 AUDIT_RECOMMENDATION = """
 REKOMENDACJE POPRAWY GENERATORA RAPORTÓW CSV:
@@ -51,21 +53,22 @@ REKOMENDACJE POPRAWY GENERATORA RAPORTÓW CSV:
        video_type = "long"
 """
 
-def audit_csv(category: str, days: int = 7, reports_dir: str = "/mnt/volume/reports") -> dict:
+def audit_csv(category: str, days: int = 7, reports_dir: str = None) -> dict:
     """
     Skanuje ostatnie N dni plików CSV i wykrywa problemy z danymi.
     
     Args:
         category (str): Kategoria do audytu (np. "podcast")
         days (int): Liczba dni do przeanalizowania
-        reports_dir (str): Katalog z plikami CSV
+        reports_dir (str): Katalog z plikami CSV (domyślnie katalog raportów aplikacji)
     
     Returns:
         dict: Wyniki audytu z licznikami, przykładowymi wierszami i listą plików
     """
+    if reports_dir is None:
+        reports_dir = str(storage_locations.reports)
     category_upper = category.upper()
-    pattern = os.path.join(reports_dir, f"report_{category_upper}_*.csv")
-    files = sorted(glob.glob(pattern))
+    files = sorted(str(f) for f in glob_reports(reports_dir, f"report_{category_upper}_"))
     
     if not files:
         return {
@@ -101,7 +104,7 @@ def audit_csv(category: str, days: int = 7, reports_dir: str = "/mnt/volume/repo
     
     for filepath in recent_files:
         try:
-            with open(filepath, newline="", encoding="utf-8") as csvfile:
+            with open_report_text(filepath) as csvfile:
                 reader = csv.DictReader(csvfile)
                 all_columns.update(reader.fieldnames or [])
                 
@@ -166,7 +169,7 @@ def audit_csv(category: str, days: int = 7, reports_dir: str = "/mnt/volume/repo
     if not sample_rows and counts["total_rows"] > 0:
         # Dodaj przykładowy wiersz z pierwszego pliku
         try:
-            with open(recent_files[0], newline="", encoding="utf-8") as csvfile:
+            with open_report_text(recent_files[0]) as csvfile:
                 reader = csv.DictReader(csvfile)
                 for row in reader:
                     sample_rows.append({
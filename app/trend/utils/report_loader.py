@@ -1,22 +1,18 @@
 # app/trend/utils/report_loader.py
 
-import csv
-import os
 import re
-import glob
 import logging
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
 
+from app.config import storage_locations
+from app.storage.report_columns import read_report_rows
+from app.storage.report_files import find_report, glob_reports, report_date
+from app.storage.stats_series import get_stats_series
+
 def get_reports_dir():
-    """Zwraca ścieżkę do katalogu raportów z fallbackiem"""
-    import os
-    # Sprawdź lokalny katalog reports
-    local_reports = "./hook-boost-web/reports"
-    if os.path.exists(local_reports):
-        return local_reports
-    # Fallback do domyślnego
-    return "/mnt/volume/reports"
+    """Zwraca ścieżkę do katalogu raportów (wspólna lokalizacja aplikacji)"""
+    return str(storage_locations.reports)
 
 def load_daily_report(category: str, date: str) -> List[Dict[str, Any]]:
     """
@@ -24,111 +20,109 @@ def load_daily_report(category: str, date: str) -> List[Dict[str, Any]]:
     wylicza pole is_short oraz zwraca listę rekordów jako słowniki.
     """
     category_upper = category.upper()
-    filename = f"report_{category_upper}_{date}.csv"
-    reports_dir = get_reports_dir()
-    filepath = os.path.join(reports_dir, filename)
+    # report_X_DATA.csv albo skompresowany .csv.gz / .csv.zst
+    filepath = find_report(get_reports_dir(), f"report_{category_upper}_{date}")
     
-    if not os.path.isfile(filepath):
+    if filepath is None:
         # Zwracamy pustą listę, jeśli plik nie istnieje
         return []
 
     data: List[Dict[str, Any]] = []
-    with open(filepath, newline="", encoding="utf-8") as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            # Normalizacja kluczy: małe litery, usunięcie spacji
-            normalized = {k.strip().lower(): v for k, v in row.items()}
-
-            # Konwersja liczby wyświetleń do int – różne możliwe nazwy kolumn
-            views = None
-            for key in ["views_today", "view_count", "views", "view_count"]:
-                if key in normalized:
-                    try:
-                        views = int(normalized.pop(key))
-                    except (ValueError, TypeError):
-                        views = 0
-                    break
-            normalized["views_today"] = views if views is not None else 0
-
-            # Konwersja czasu trwania na sekundy z różnych kolumn
-            duration_seconds = None
-            # Pobierz dowolną kolumnę z czasem trwania
-            iso_dur = (
-                normalized.get("duration_seconds")
-                or normalized.get("duration")
-                or normalized.get("durationiso")
-                or normalized.get("duration_iso")
-                or normalized.get("duration")
-            )
-            
-            if iso_dur:
+    # Plik kolumnowy raportu (duration_seconds gotowe), inaczej CSV
+    for row in read_report_rows(filepath, with_text=True):
+        # Normalizacja kluczy: małe litery, usunięcie spacji
+        normalized = {k.strip().lower(): v for k, v in row.items()}
+
+        # Konwersja liczby wyświetleń do int – różne możliwe nazwy kolumn
+        views = None
+        for key in ["views_today", "view_count", "views", "view_count"]:
+            if key in normalized:
                 try:
-                    if isinstance(iso_dur, str) and iso_dur.startswith('PT'):
-                        # Parsowanie ISO 8601: PT1H33M7S, PT45S, PT1M5S
-                        pattern = r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?'
-                        match = re.match(pattern, iso_dur)
-                        if match:
-                            hours = int(match.group(1) or 0)
-                            minutes = int(match.group(2) or 0)
-                            seconds = int(match.group(3) or 0)
-                            duration_seconds = hours * 3600 + minutes * 60 + seconds
-                    else:
-                        duration_seconds = int(float(iso_dur))
+                    views = int(normalized.pop(key))
                 except (ValueError, TypeError):
-                    duration_seconds = None
-                
-                # Usuń wszystkie kolumny z czasem trwania
-                for key in ["duration_seconds", "duration", "durationiso", "duration_iso"]:
-                    normalized.pop(key, None)
+                    views = 0
+                break
+        normalized["views_today"] = views if views is not None else 0
+
+        # Konwersja czasu trwania na sekundy z różnych kolumn
+        duration_seconds = None
+        # Pobierz dowolną kolumnę z czasem trwania
+        iso_dur = (
+            normalized.get("duration_seconds")
+            or normalized.get("duration")
+            or normalized.get("durationiso")
+            or normalized.get("duration_iso")
+            or normalized.get("duration")
+        )
+        
+        if iso_dur:
+            try:
+                if isinstance(iso_dur, str) and iso_dur.startswith('PT'):
+                    # Parsowanie ISO 8601: PT1H33M7S, PT45S, PT1M5S
+                    pattern = r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?'
+                    match = re.match(pattern, iso_dur)
+                    if match:
+                        hours = int(match.group(1) or 0)
+                        minutes = int(match.group(2) or 0)
+                        seconds = int(match.group(3) or 0)
+                        duration_seconds = hours * 3600 + minutes * 60 + seconds
+                else:
+                    duration_seconds = int(float(iso_dur))
+            except (ValueError, TypeError):
+                duration_seconds = None
             
-            normalized["duration_seconds"] = duration_seconds
+            # Usuń wszystkie kolumny z czasem trwania
+            for key in ["duration_seconds", "duration", "durationiso", "duration_iso"]:
+                normalized.pop(key, None)
+        
+        normalized["duration_seconds"] = duration_seconds
 
-            # Przekopiuj inne istotne pola (title, channel, tags, description, video_id)
-            # Jeśli któreś z nich nie istnieje w pliku, ustaw pusty string
-            for field in ["title", "channel", "tags", "description", "video_id"]:
-                normalized[field] = normalized.get(field, "") or ""
-            
-            # Mapuj Channel_Name → channel
-            if "channel_name" in normalized:
-                # Użyj channel_name jako channel
-                normalized["channel"] = normalized.pop("channel_name")
-
-            # Ustal, czy film jest short
-            video_type_value = normalized.get("video_type", "") or ""
-            video_type_value = video_type_value.strip().lower()
-            duration_seconds = normalized.get("duration_seconds")
-
-            # 1. Reguła długości: jeśli mamy czas trwania i jest krótszy niż 10 minut, traktujemy jako Short
-            if duration_seconds is not None and duration_seconds < 600:
-                is_short = True
-            # 2. Wykorzystanie video_type, gdy czas trwania nie kwalifikuje się do krótkiej formy
-            elif "short" in video_type_value:
-                is_short = True
-            elif "long" in video_type_value:
-                is_short = False
-            else:
-                # 3. Fallback heurystyka: czas < 62 sekund lub tag #short/#shorts w tytule/tagach/opisie
-                text_concat = f"{normalized['title']} {normalized['tags']} {normalized['description']}".lower()
-                is_short = (
-                    duration_seconds is not None and duration_seconds < 62
-                ) or ("#short" in text_concat or "#shorts" in text_concat)
-
-            normalized["is_short"] = is_short
-
-            # Upewnij się, że zwracamy klucz video_id, title, channel, views_today, duration_seconds, is_short
-            record = {
-                "video_id": normalized["video_id"],
-                "title": normalized["title"],
-                "channel": normalized["channel"],
-                "views_today": normalized["views_today"],
-                "duration_seconds": normalized["duration_seconds"],
-                "is_short": normalized["is_short"],
-                # Zachowaj oryginalne pola dla dalszych operacji, jeśli będą potrzebne
-                "tags": normalized["tags"],
-                "description": normalized["description"],
-            }
-
-            data.append(record)
+        # Przekopiuj inne istotne pola (title, channel, tags, description, video_id)
+        # Jeśli któreś z nich nie istnieje w pliku, ustaw pusty string
+        for field in ["title", "channel", "tags", "description", "video_id"]:
+            normalized[field] = normalized.get(field, "") or ""
+        
+        # Mapuj Channel_Name → channel
+        if "channel_name" in normalized:
+            # Użyj channel_name jako channel
+            normalized["channel"] = normalized.pop("channel_name")
+
+        # Ustal, czy film jest short
+        video_type_value = normalized.get("video_type", "") or ""
+        video_type_value = video_type_value.strip().lower()
+        duration_seconds = normalized.get("duration_seconds")
+
+        # 1. Reguła długości: jeśli mamy czas trwania i jest krótszy niż 10 minut, traktujemy jako Short
+        if duration_seconds is not None and duration_seconds < 600:
+            is_short = True
+        # 2. Wykorzystanie video_type, gdy czas trwania nie kwalifikuje się do krótkiej formy
+        elif "short" in video_type_value:
+            is_short = True
+        elif "long" in video_type_value:
+            is_short = False
+        else:
+            # 3. Fallback heurystyka: czas < 62 sekund lub tag #short/#shorts w tytule/tagach/opisie
+            text_concat = f"{normalized['title']} {normalized['tags']} {normalized['description']}".lower()
+            is_short = (
+                duration_seconds is not None and duration_seconds < 62
+            ) or ("#short" in text_concat or "#shorts" in text_concat)
+
+        normalized["is_short"] = is_short
+
+        # Upewnij się, że zwracamy klucz video_id, title, channel, views_today, duration_seconds, is_short
+        record = {
+            "video_id": normalized["video_id"],
+            "title": normalized["title"],
+            "channel": normalized["channel"],
+            "views_today": normalized["views_today"],
+            "duration_seconds": normalized["duration_seconds"],
+            "is_short": normalized["is_short"],
+            # Zachowaj oryginalne pola dla dalszych operacji, jeśli będą potrzebne
+            "tags": normalized["tags"],
+            "description": normalized["description"],
+        }
+
+        data.append(record)
 
     return data
 
@@ -155,11 +149,12 @@ def build_daily_growth(category: str, date: str) -> List[Dict[str, Any]]:
     prev_date_obj = date_obj - timedelta(days=1)
     prev_date_str = prev_date_obj.isoformat()
 
-    # Wczytaj dane z poprzedniego dnia
-    prev_records = load_daily_report(category, prev_date_str)
-
-    # Zmapuj wyświetlenia z poprzedniego dnia po video_id
-    prev_views_map = {rec["video_id"]: rec["views_today"] for rec in prev_records}
+    # Wyświetlenia z poprzedniego dnia po video_id - z szeregu statystyk (jeden odczyt
+    # indeksu); dni sprzed szeregu czytane są jak dotąd z raportu
+    prev_views_map = get_stats_series().views_on(category, prev_date_str)
+    if not prev_views_map:
+        prev_records = load_daily_report(category, prev_date_str)
+        prev_views_map = {rec["video_id"]: rec["views_today"] for rec in prev_records}
 
     growth_records: List[Dict[str, Any]] = []
     for record in today_records:
@@ -196,20 +191,13 @@ def build_daily_growth(category: str, date: str) -> List[Dict[str, Any]]:
 
 def _available_dates_for_category(category: str, reports_dir: str = None) -> List[str]:
     if reports_dir is None:
-        # Fallback do lokalnego katalogu reports
-        import os
-        local_reports = "./hook-boost-web/reports"
-        if os.path.exists(local_reports):
-            reports_dir = local_reports
-        else:
-            reports_dir = "/mnt/volume/reports"
+        reports_dir = get_reports_dir()
     
-    pattern = os.path.join(reports_dir, f"report_{category.upper()}_*.csv")
-    files = sorted(glob.glob(pattern))
+    files = sorted(glob_reports(reports_dir, f"report_{category.upper()}_"))
     dates = []
     for f in files:
         try:
-            d = os.path.basename(f).split("_")[-1].replace(".csv","")
+            d = report_date(f)
             datetime.strptime(d, "%Y-%m-%d")
             dates.append(d)
         except Exception:
@@ -0,0 +1,8 @@
+from .pools import (
+    WorkerPoolFull, get_worker_pools, run_cpu, run_cpu_wait, run_io, run_io_wait, shutdown_worker_pools
+)
+
+__all__ = [
+    "WorkerPoolFull", "get_worker_pools", "run_cpu", "run_cpu_wait", "run_io", "run_io_wait",
+    "shutdown_worker_pools",
+]
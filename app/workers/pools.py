@@ -0,0 +1,191 @@
+try:
+    import asyncio
+    import functools
+    import logging
+    import multiprocessing
+    import threading
+    from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+    from concurrent.futures.process import BrokenProcessPool
+    from typing import Callable, Dict, Optional
+    from ..config.logging_setup import LOG_FORMAT
+except ImportError as e:
+    print(f"❌ Błąd importu w worker pools: {e}")
+    raise
+
+logger = logging.getLogger(__name__)
+
+# Co ile zadanie w tle sprawdza, czy w pełnej puli zwolnił się slot
+SLOT_WAIT_INTERVAL = 0.05
+
+
+class WorkerPoolFull(RuntimeError):
+    """Kolejka puli jest pełna - zadanie odrzucone zamiast czekać bez końca"""
+
+
+def _init_process_worker(level: int):
+    """Logowanie w procesie puli (na stderr, poziom jak w procesie głównym)"""
+    logging.basicConfig(level=level, format=LOG_FORMAT)
+
+
+class BoundedPool:
+    """
+    Executor z ograniczoną kolejką, wywoływany z pętli zdarzeń.
+
+    Naraz przyjmuje co najwyżej max_workers + queue_size zadań (wykonywane
+    i czekające); kolejne zgłoszenie kończy się WorkerPoolFull, więc zalew
+    ciężkich zapytań nie rośnie w pamięci, a handler może od razu odpowiedzieć.
+    Zadania w tle (scheduler) używają run_when_free - czekają na wolny slot
+    zamiast tracić pracę przez chwilowy tłok zapytań API.
+    Executor tworzony jest przy pierwszym zadaniu (start aplikacji go nie uruchamia).
+    """
+
+    def __init__(self, name: str, factory: Callable[[int], Executor], max_workers: int, queue_size: int):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.queue_size = max(0, queue_size)
+        self._factory = factory
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.queue_size)
+        self._in_flight = 0
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._factory(self.max_workers)
+                logger.debug("Pula %s uruchomiona: %s workerów", self.name, self.max_workers)
+            return self._executor
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Wykonuje fn(*args, **kwargs) w puli i czeka na wynik bez blokowania pętli"""
+        if not self._slots.acquire(blocking=False):
+            raise WorkerPoolFull(f"Pula {self.name} jest pełna ({self.max_workers} + {self.queue_size} zadań)")
+        return await self._submit(fn, *args, **kwargs)
+
+    async def run_when_free(self, fn: Callable, *args, **kwargs):
+        """Jak run, ale przy pełnej puli czeka (bez blokowania pętli) na wolny slot"""
+        # Odpytywanie zamiast blokującego acquire - anulowanie czekającego nie zajmuje slotu
+        while not self._slots.acquire(blocking=False):
+            await asyncio.sleep(SLOT_WAIT_INTERVAL)
+        return await self._submit(fn, *args, **kwargs)
+
+    async def _submit(self, fn: Callable, *args, **kwargs):
+        """Zleca zadanie na już zajętym slocie; slot zwalnia zakończenie zadania"""
+        with self._lock:
+            self._in_flight += 1
+        try:
+            future = self._get_executor().submit(functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            self._release()
+            raise
+        # Slot zwalnia zakończenie zadania w puli, nie anulowanie czekającego handlera
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            logger.error("Proces puli %s zakończył się awaryjnie - pula zostanie utworzona od nowa", self.name)
+            self.shutdown(wait=False)
+            raise
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def status(self) -> Dict:
+        return {
+            'running': self._executor is not None,
+            'max_workers': self.max_workers,
+            'queue_size': self.queue_size,
+            'in_flight': self._in_flight,
+        }
+
+
+class WorkerPools:
+    """
+    Wspólna warstwa wykonawcza dla handlerów API i zadań schedulera.
+
+    io  - wątki dla pracy plikowej (glob katalogu raportów, odczyt JSON, zapis CSV),
+    cpu - procesy dla analiz pandas (RankingAnalyzer, przetwarzanie trendów); funkcje
+          przekazywane do tej puli muszą być zdefiniowane na poziomie modułu.
+    Handler async woła `await run_io(...)` / `await run_cpu(...)`, więc jedno ciężkie
+    zapytanie nie zatrzymuje pętli zdarzeń dla pozostałych klientów. Zadania schedulera
+    wołają `run_io_wait` / `run_cpu_wait` - przy pełnej puli czekają, a nie są odrzucane.
+    """
+
+    def __init__(self, io_workers: int, cpu_workers: int, queue_size: int):
+        self.io = BoundedPool(
+            'io',
+            lambda workers: ThreadPoolExecutor(max_workers=workers, thread_name_prefix='io-worker'),
+            io_workers, queue_size
+        )
+        self.cpu = BoundedPool('cpu', self._create_process_pool, cpu_workers, queue_size)
+
+    @staticmethod
+    def _create_process_pool(workers: int) -> Executor:
+        try:
+            # spawn - proces główny ma wątki (scheduler, pule), fork mógłby skopiować zajęte blokady
+            return ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_process_worker,
+                initargs=(logging.getLogger().getEffectiveLevel(),)
+            )
+        except (OSError, NotImplementedError) as e:
+            # Środowisko bez procesów potomnych (np. brak sem_open) - analizy w wątkach
+            logger.warning("Pula procesów niedostępna (%s) - analizy w wątkach", e)
+            return ThreadPoolExecutor(max_workers=workers, thread_name_prefix='cpu-worker')
+
+    def shutdown(self, wait: bool = True):
+        """Zatrzymuje obie pule (kolejne zadanie utworzy je od nowa)"""
+        self.io.shutdown(wait=wait)
+        self.cpu.shutdown(wait=wait)
+
+    def status(self) -> Dict[str, Dict]:
+        return {'io': self.io.status(), 'cpu': self.cpu.status()}
+
+
+_pools: Optional[WorkerPools] = None
+_pools_lock = threading.Lock()
+
+
+def get_worker_pools() -> WorkerPools:
+    """Pule procesu (rozmiary z ustawień IO_WORKERS, CPU_WORKERS, WORKER_QUEUE_SIZE)"""
+    global _pools
+    if _pools is None:
+        with _pools_lock:
+            if _pools is None:
+                from ..config import settings
+                _pools = WorkerPools(settings.io_workers, settings.cpu_workers, settings.worker_queue_size)
+    return _pools
+
+
+async def run_io(fn: Callable, *args, **kwargs):
+    """Praca plikowa w puli wątków"""
+    return await get_worker_pools().io.run(fn, *args, **kwargs)
+
+
+async def run_cpu(fn: Callable, *args, **kwargs):
+    """Analiza pandas w puli procesów (fn i argumenty muszą dać się zserializować)"""
+    return await get_worker_pools().cpu.run(fn, *args, **kwargs)
+
+
+async def run_io_wait(fn: Callable, *args, **kwargs):
+    """run_io dla zadań w tle - przy pełnej puli czeka na slot zamiast WorkerPoolFull"""
+    return await get_worker_pools().io.run_when_free(fn, *args, **kwargs)
+
+
+async def run_cpu_wait(fn: Callable, *args, **kwargs):
+    """run_cpu dla zadań w tle - przy pełnej puli czeka na slot zamiast WorkerPoolFull"""
+    return await get_worker_pools().cpu.run_when_free(fn, *args, **kwargs)
+
+
+def shutdown_worker_pools(wait: bool = True):
+    if _pools is not None:
+        _pools.shutdown(wait=wait)
@@ -1,3 +1,4 @@
 from .client import YouTubeClient
+from .quota_planner import QuotaPlanner
 
-__all__ = ["YouTubeClient"] 
\ No newline at end of file
+__all__ = ["YouTubeClient", "QuotaPlanner"] 
\ No newline at end of file
@@ -1,17 +1,22 @@
 try:
     import asyncio
     import logging
-    from typing import Dict, List, Optional, Any
+    from typing import Dict, List, Optional, Any, Set, Union
     from datetime import datetime, timedelta
     import json
-    from pathlib import Path
-    from googleapiclient.discovery import build
     from googleapiclient.errors import HttpError
-    import time
-    import re
+    from concurrent.futures import ThreadPoolExecutor
+    import hashlib
+    import copy
+    import random
+    import socket
+    from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
     import pytz
-    
-    print("✅ Wszystkie importy w YouTube client udane")
+    from app.config import storage_locations
+    from app.youtube.video_cache import VideoCacheStore
+    from app.youtube.transport import HttpPool, build_service
+    from app.youtube.key_pool import ApiKeyPool, QuotaExhaustedError
+    from app.youtube.records import VideoRecord, VIDEO_FIELDS_MASK, VIDEO_STATISTICS_MASK, parse_statistics
 except ImportError as e:
     print(f"❌ Błąd importu w YouTube client: {e}")
     import traceback
@@ -24,39 +29,284 @@ logger = logging.getLogger(__name__)
 class YouTubeClient:
     """Klient YouTube Data API v3"""
     
-    def __init__(self, api_key: str, state_manager=None):
-        self.api_key = api_key
-        self.service = build('youtube', 'v3', developerKey=api_key)
-        self.quota_limit = 10000  # Dzienny limit
+    CHANNELS_PER_LOOKUP = 50  # Maks. liczba ID w jednym channels.list
+    REQUESTS_PER_BATCH = 50  # Maks. liczba zapytań w jednym batch HTTP
+    # Błędy przejściowe ponawiane z wykładniczym opóźnieniem
+    RETRYABLE_STATUSES = {500, 502, 503, 504}
+    RETRYABLE_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded', 'backendError'}
+    # Dzienny limit klucza - zapytanie przechodzi na kolejny klucz z puli
+    QUOTA_EXCEEDED_REASONS = {'quotaExceeded', 'dailyLimitExceeded'}
+    RETRY_BASE_DELAY = 1.0  # s, opóźnienie przed pierwszym ponowieniem (x2 przy kolejnych)
+    RETRY_MAX_DELAY = 32.0  # s
+    
+    def __init__(self, api_key: Union[str, List[str]], state_manager=None, max_concurrency: int = 8,
+                 metadata_ttl_hours: int = 168, stats_ttl_hours: int = 6,
+                 request_timeout: float = 30.0, max_retries: int = 4, hedge_after: float = 0.0,
+                 quota_limit_per_key: int = 10000):
+        # Pula kluczy: każde zapytanie trafia do klucza z największą pozostałą quota
+        self.key_pool = ApiKeyPool([api_key] if isinstance(api_key, str) else api_key,
+                                   state_manager, quota_limit_per_key)
+        self.api_key = self.key_pool.keys[0]
+        # Usługa budowana leniwie z dołączonego dokumentu discovery (bez sieci przy starcie).
+        # Zapytania budowane są z pierwszym kluczem, a klucz w URI podmieniany przy wysyłce.
+        self._service = None
         self.state_manager = state_manager
         
-        # Cache system
-        self.video_cache = {}
-        self.cache_file = Path("video_cache.json")
-        self.load_cache()
+        # Zapytania HTTP googleapiclient są blokujące - wykonujemy je w puli wątków,
+        # żeby nie zamrażać pętli zdarzeń FastAPI
+        self.max_concurrency = max(1, max_concurrency)
+        
+        # Warstwa zapytań: limit czasu na wywołanie, ponowienia, opcjonalne zapytania
+        # zapasowe (hedging) wysyłane, gdy odpowiedź nie przyszła po hedge_after sekundach
+        self.request_timeout = request_timeout
+        self.max_retries = max(0, max_retries)
+        self.hedge_after = hedge_after if hedge_after and hedge_after < request_timeout else 0.0
+        workers = self.max_concurrency * (2 if self.hedge_after else 1)
+        
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="youtube-api"
+        )
+        # httplib2.Http nie jest bezpieczny wątkowo - każde zapytanie wypożycza
+        # z puli własny obiekt, a połączenia keep-alive są używane ponownie
+        self._http_pool = HttpPool(workers, timeout=request_timeout)
+        
+        # Znaczniki ostatniego skanu playlist (zapisywane zbiorczo po przebiegu)
+        self._pending_watermarks: Dict[str, Dict] = {}
         
-    def load_cache(self):
-        """Ładuje cache z pliku"""
+        # Cache system (SQLite, zapis per wpis; stary video_cache.json importowany jednorazowo).
+        # Metadane (snippet, contentDetails) żyją długo, statystyki są odświeżane osobno.
+        self.metadata_ttl = metadata_ttl_hours * 3600
+        self.stats_ttl = stats_ttl_hours * 3600
+        # Cache na wolumenie danych (storage_locations.data), niezależnie od katalogu roboczego
+        self.cache_file = storage_locations.data / "video_cache.db"
+        self.video_cache = VideoCacheStore(self.cache_file, legacy_json=storage_locations.data / "video_cache.json")
+        logger.info("Załadowano cache: %s filmów", self.video_cache.count())
+    
+    @property
+    def service(self):
+        """Obiekt usługi YouTube Data API (budowany przy pierwszym użyciu)"""
+        if self._service is None:
+            self._service = build_service(self.api_key)
+        return self._service
+    
+    @service.setter
+    def service(self, value):
+        self._service = value
+    
+    @property
+    def quota_limit(self) -> int:
+        """Dzienny limit quota wszystkich kluczy"""
+        return self.key_pool.quota_limit
+    
+    def _run_request(self, request) -> Dict:
+        with self._http_pool.connection() as http:
+            return request.execute(http=http)
+    
+    @staticmethod
+    def _error_reasons(error: HttpError) -> Set[str]:
+        """Powody błędu z treści odpowiedzi YouTube API (errors[].reason)"""
         try:
-            if self.cache_file.exists():
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    self.video_cache = json.load(f)
-                logger.info(f"Załadowano cache: {len(self.video_cache)} filmów")
-            else:
-                self.video_cache = {}
-                logger.info("Utworzono nowy cache")
-        except Exception as e:
-            logger.error(f"Błąd podczas ładowania cache: {e}")
-            self.video_cache = {}
+            errors = json.loads(error.content.decode('utf-8'))['error'].get('errors', [])
+            return {e.get('reason') for e in errors}
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return set()
+    
+    def _is_retryable(self, error: Exception) -> bool:
+        """Czy błąd jest przejściowy (5xx, limit zapytań na sekundę, timeout, zerwane połączenie)"""
+        if isinstance(error, HttpError):
+            status = error.resp.status
+            if status in self.RETRYABLE_STATUSES or status == 429:
+                return True
+            if status == 403:
+                # quotaExceeded (dzienny limit) nie ma sensu ponawiać - tylko limity chwilowe
+                return bool(self._error_reasons(error) & self.RETRYABLE_REASONS)
+            return False
+        return isinstance(error, (asyncio.TimeoutError, TimeoutError, socket.timeout, ConnectionError))
+    
+    def _is_quota_exceeded(self, error: Optional[Exception]) -> bool:
+        """Czy klucz wyczerpał dzienny limit (403 quotaExceeded)"""
+        return (isinstance(error, HttpError) and error.resp.status == 403
+                and bool(self._error_reasons(error) & self.QUOTA_EXCEEDED_REASONS))
+    
+    @staticmethod
+    def _with_key(request, key: str):
+        """Kopia zapytania wysyłana z podanym kluczem API (parametr key w URI)"""
+        parsed = urlparse(request.uri)
+        params = [(k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True) if k != 'key']
+        params.append(('key', key))
+        routed = copy.copy(request)
+        routed.headers = dict(request.headers)
+        routed.uri = urlunparse(parsed._replace(query=urlencode(params)))
+        return routed
+    
+    def _track_future(self, future):
+        # Wynik przegranego zapytania zapasowego nie jest odbierany - nie loguj go jako błędu
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        return future
+    
+    async def _attempt(self, call, hedge_call=None):
+        """Jedna próba wywołania z limitem czasu i opcjonalnym zapytaniem zapasowym"""
+        loop = asyncio.get_running_loop()
+        primary = self._track_future(loop.run_in_executor(self._executor, call))
+        if not (self.hedge_after and hedge_call):
+            return await asyncio.wait_for(primary, self.request_timeout)
+        
+        done, _ = await asyncio.wait({primary}, timeout=self.hedge_after)
+        if done:
+            return primary.result()
+        
+        logger.debug("Brak odpowiedzi po %ss - wysyłam zapytanie zapasowe", self.hedge_after)
+        hedge = self._track_future(loop.run_in_executor(self._executor, hedge_call))
+        last_error = None
+        for future in asyncio.as_completed([primary, hedge], timeout=self.request_timeout - self.hedge_after):
+            try:
+                return await future
+            except asyncio.TimeoutError:
+                raise
+            except Exception as e:
+                last_error = e
+        raise last_error
     
-    def save_cache(self):
-        """Zapisuje cache do pliku"""
+    async def _with_retries(self, call, hedge_call=None, description: str = "zapytanie"):
+        """Wywołuje zapytanie, ponawiając błędy przejściowe z wykładniczym opóźnieniem i jitterem"""
+        attempt = 0
+        while True:
+            try:
+                return await self._attempt(call, hedge_call)
+            except Exception as e:
+                if attempt >= self.max_retries or not self._is_retryable(e):
+                    raise
+                delay = random.uniform(0, min(self.RETRY_MAX_DELAY, self.RETRY_BASE_DELAY * 2 ** attempt))
+                attempt += 1
+                logger.warning("%s: błąd przejściowy (%r), ponowienie %s/%s za %.2fs", description, e, attempt, self.max_retries, delay)
+                await asyncio.sleep(delay)
+    
+    async def _execute(self, request, cost: int = 1) -> Dict:
+        """
+        Wykonuje zapytanie googleapiclient w puli wątków (bez blokowania pętli).
+        
+        Zapytanie trafia do klucza z największą pozostałą quota; cost jednostek
+        zliczane jest do tego klucza przy każdym wysłaniu (ponowienie i zapytanie
+        zapasowe też zużywają quota). Przy quotaExceeded zapytanie jest powtarzane
+        z kolejnym kluczem.
+        """
+        tried = set()
+        last_error = None
+        while True:
+            key = self.key_pool.select(exclude=tried)
+            if key is None:
+                if last_error is not None:
+                    raise last_error
+                raise QuotaExhaustedError("Wszystkie klucze YouTube API wyczerpały dzienną quota")
+            routed = self._with_key(request, key)
+            
+            def send(request=routed, key=key):
+                self.key_pool.charge(key, cost)
+                return self._run_request(request)
+            
+            try:
+                return await self._with_retries(
+                    send,
+                    hedge_call=lambda: send(self._clone_request(routed)),
+                    description=getattr(request, 'methodId', None) or "zapytanie YouTube API"
+                )
+            except HttpError as e:
+                if not self._is_quota_exceeded(e):
+                    raise
+                self.key_pool.mark_exhausted(key)
+                tried.add(key)
+                last_error = e
+    
+    @staticmethod
+    def _clone_request(request):
+        """Kopia zapytania dla zapytania zapasowego (execute modyfikuje nagłówki)"""
+        clone = copy.copy(request)
+        clone.headers = dict(request.headers)
+        return clone
+    
+    @staticmethod
+    def _request_key(request) -> str:
+        """Klucz zapytania do cache ETagów: URI bez klucza API, z posortowanymi parametrami"""
+        parsed = urlparse(request.uri)
+        params = sorted((k, v) for k, v in parse_qsl(parsed.query) if k != 'key')
+        return hashlib.sha1(f"{parsed.path}?{urlencode(params)}".encode('utf-8')).hexdigest()
+    
+    async def _execute_conditional(self, request, cost: int = 1) -> Dict:
+        """
+        Wykonuje zapytanie z If-None-Match, jeśli znamy ETag poprzedniej odpowiedzi.
+        
+        Przy 304 Not Modified zwraca zapamiętaną odpowiedź (bez pobierania i parsowania treści).
+        """
+        key = self._request_key(request)
+        cached = self.video_cache.get_etag(key)
+        if cached:
+            request.headers['If-None-Match'] = cached[0]
         try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.video_cache, f, ensure_ascii=False, indent=2)
-            logger.info(f"Zapisano cache: {len(self.video_cache)} filmów")
-        except Exception as e:
-            logger.error(f"Błąd podczas zapisywania cache: {e}")
+            response = await self._execute(request, cost)
+        except HttpError as e:
+            if cached and e.resp.status == 304:
+                logger.debug("304 Not Modified - odpowiedź z cache ETag (%s)", key[:8])
+                self.video_cache.touch_etag(key)
+                return cached[1]
+            raise
+        if response.get('etag'):
+            self.video_cache.put_etag(key, response['etag'], response)
+        return response
+    
+    async def _execute_batch(self, requests: List) -> List[tuple]:
+        """
+        Wykonuje wiele niezależnych zapytań jednym wywołaniem HTTP (batch).
+        
+        Cały batch idzie z jednym kluczem (1 jednostka quota za zapytanie, przy każdym
+        wysłaniu batcha); zapytania odrzucone z quotaExceeded są wysyłane ponownie
+        z kolejnym kluczem.
+        
+        Returns:
+            Lista krotek (response, exception) w kolejności zapytań
+        """
+        results = [(None, None)] * len(requests)
+        pending = list(range(len(requests)))
+        tried = set()
+        while pending:
+            key = self.key_pool.select(exclude=tried)
+            if key is None:
+                if not tried:
+                    raise QuotaExhaustedError("Wszystkie klucze YouTube API wyczerpały dzienną quota")
+                break  # Pozostają błędy quotaExceeded z ostatniego klucza
+            routed = {i: self._with_key(requests[i], key) for i in pending}
+            
+            def run(routed=routed, key=key):
+                # Każda próba zbiera wyniki we własnym słowniku: wątek próby przerwanej
+                # limitem czasu (nadal działający w puli) nie nadpisze wyników ponowienia
+                attempt_results = {}
+                
+                def callback(request_id, response, exception):
+                    attempt_results[int(request_id)] = (response, exception)
+                
+                self.key_pool.charge(key, len(routed))
+                batch = self.service.new_batch_http_request(callback=callback)
+                for i, request in routed.items():
+                    batch.add(request, request_id=str(i))
+                with self._http_pool.connection() as http:
+                    batch.execute(http=http)
+                return attempt_results
+            
+            # Batch nie jest duplikowany (hedging) - do wyników trafia tylko zakończona próba
+            for i, result in (await self._with_retries(run, description="batch YouTube API")).items():
+                results[i] = result
+            
+            pending = [i for i in pending if self._is_quota_exceeded(results[i][1])]
+            if pending:
+                self.key_pool.mark_exhausted(key)
+                tried.add(key)
+        return results
+    
+    def close(self):
+        """Zamyka pulę wątków, połączenia HTTP i cache"""
+        self._executor.shutdown(wait=False)
+        self._http_pool.close()
+        self.video_cache.close()
     
     def _extract_channel_id(self, url: str) -> Optional[str]:
         """Wyciąga ID kanału z różnych formatów URL"""
@@ -98,48 +348,73 @@ class YouTubeClient:
         try:
             channel_id = self._extract_channel_id(channel_url)
             
+            channel = None
+            
             # Sprawdź czy to handle (@username)
             if channel_id.startswith('@'):
                 handle = channel_id[1:]  # Usuń @ z początku
-                logger.info(f"Wyszukiwanie kanału po handle: {handle}")
+                cached_id = self.state_manager.get_channel_id_for_handle(handle) if self.state_manager else None
                 
-                # Wyszukaj kanał po handle
-                request = self.service.search().list(
-                    part='snippet',
-                    q=handle,
-                    type='channel',
-                    maxResults=1
+                if cached_id:
+                    logger.info("Handle %s znany z cache: %s", handle, cached_id)
+                    channel_id = cached_id
+                else:
+                    # channels.list(forHandle=...) kosztuje 1 quota zamiast 100 za search.list
+                    logger.info("Wyszukiwanie kanału po handle: %s", handle)
+                    request = self.service.channels().list(
+                        part='snippet,statistics,contentDetails',
+                        forHandle=handle
+                    )
+                    response = await self._execute(request)  # channels.list = 1 quota
+                    
+                    if response.get('items'):
+                        channel = response['items'][0]
+                        channel_id = channel['id']
+                    else:
+                        # Fallback: wyszukaj kanał po nazwie
+                        logger.info("forHandle nie znalazł kanału, wyszukiwanie: %s", handle)
+                        request = self.service.search().list(
+                            part='snippet',
+                            q=handle,
+                            type='channel',
+                            maxResults=1
+                        )
+                        response = await self._execute(request, cost=100)  # search.list = 100 quota
+                        
+                        # Sprawdź czy znaleziono kanał
+                        if 'items' not in response or len(response['items']) == 0:
+                            logger.error("Nie znaleziono kanału dla handle: %s", handle)
+                            logger.error("Odpowiedź API: %s", response)
+                            raise ValueError(f"Nie znaleziono kanału YouTube dla: {handle}")
+                        
+                        # Pobierz channelId z wyniku wyszukiwania
+                        channel_id = response['items'][0]['snippet']['channelId']
+                    
+                    logger.info("Znaleziono channelId: %s dla handle: %s", channel_id, handle)
+                    if self.state_manager:
+                        self.state_manager.set_channel_id_for_handle(handle, channel_id)
+            
+            if channel is None:
+                # Pobierz szczegóły kanału
+                request = self.service.channels().list(
+                    part='snippet,statistics,contentDetails',
+                    id=channel_id
                 )
-                response = request.execute()
-                if self.state_manager:
-                    self.state_manager.add_quota_used(100)  # search.list = 100 quota
+                response = await self._execute(request)  # channels.list = 1 quota
                 
                 # Sprawdź czy znaleziono kanał
                 if 'items' not in response or len(response['items']) == 0:
-                    logger.error(f"Nie znaleziono kanału dla handle: {handle}")
-                    logger.error(f"Odpowiedź API: {response}")
-                    raise ValueError(f"Nie znaleziono kanału YouTube dla: {handle}")
+                    logger.error("Nie znaleziono szczegółów kanału dla ID: %s", channel_id)
+                    logger.error("Odpowiedź API: %s", response)
+                    raise ValueError("Nie znaleziono kanału YouTube")
                 
-                # Pobierz channelId z wyniku wyszukiwania
-                channel_id = response['items'][0]['snippet']['channelId']
-                logger.info(f"Znaleziono channelId: {channel_id} dla handle: {handle}")
-            
-            # Pobierz szczegóły kanału
-            request = self.service.channels().list(
-                part='snippet,statistics',
-                id=channel_id
-            )
-            response = request.execute()
-            if self.state_manager:
-                self.state_manager.add_quota_used(1)  # channels.list = 1 quota
+                channel = response['items'][0]
             
-            # Sprawdź czy znaleziono kanał
-            if 'items' not in response or len(response['items']) == 0:
-                logger.error(f"Nie znaleziono szczegółów kanału dla ID: {channel_id}")
-                logger.error(f"Odpowiedź API: {response}")
-                raise ValueError("Nie znaleziono kanału YouTube")
+            # Zapamiętaj playlistę uploadów - nocny raport nie musi jej już ustalać
+            uploads = channel.get('contentDetails', {}).get('relatedPlaylists', {}).get('uploads')
+            if uploads and self.state_manager:
+                self.state_manager.set_uploads_playlists({channel['id']: uploads})
             
-            channel = response['items'][0]
             return {
                 'id': channel['id'],
                 'title': channel['snippet']['title'],
@@ -153,23 +428,61 @@ class YouTubeClient:
             }
             
         except HttpError as e:
-            logger.error(f"Błąd YouTube API: {e}")
-            logger.error(f"Szczegóły błędu: {e.resp.status} {e.content}")
+            logger.error("Błąd YouTube API: %s", e)
+            logger.error("Szczegóły błędu: %s %s", e.resp.status, e.content)
             raise ValueError(f"Błąd YouTube API: {e}")
         except ValueError:
             # Przekaż błędy walidacji bez zmian
             raise
         except Exception as e:
-            logger.error(f"Błąd podczas pobierania informacji o kanale: {e}")
+            logger.error("Błąd podczas pobierania informacji o kanale: %s", e)
             raise ValueError(f"Błąd podczas pobierania informacji o kanale: {e}")
     
-    async def get_channel_videos(self, channel_id: str, days_back: int = 3) -> List[Dict]:
+    def _load_watermark(self, channel_id: str, start_date: datetime) -> Dict[str, datetime]:
+        """
+        Zwraca filmy zapamiętane przy poprzednim skanie kanału (video_id -> published_at).
+        
+        Znacznik jest użyteczny tylko, jeśli poprzedni skan obejmował całe obecne okno czasowe.
+        """
+        if not self.state_manager:
+            return {}
+        watermark = self.state_manager.get_watermark(channel_id)
+        if not watermark:
+            return {}
+        try:
+            if datetime.fromisoformat(watermark['since']) > start_date:
+                return {}
+            return {
+                video_id: datetime.fromisoformat(published_at)
+                for video_id, published_at in watermark.get('videos', [])
+            }
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning("Nieprawidłowy znacznik skanu dla kanału %s: %s", channel_id, e)
+            return {}
+    
+    def flush_watermarks(self):
+        """Zapisuje znaczniki skanu zebrane w tym przebiegu (jeden zapis na cały przebieg)"""
+        if self._pending_watermarks and self.state_manager:
+            pending, self._pending_watermarks = self._pending_watermarks, {}
+            self.state_manager.set_watermarks(pending)
+    
+    async def get_channel_videos(self, channel_id: str, days_back: int = 3,
+                                 uploads_playlist_id: Optional[str] = None,
+                                 defer_watermarks: bool = False,
+                                 refresh_stats: bool = True) -> List[Dict]:
         """
         Pobiera filmy z kanału YouTube z ostatnich N dni.
         
+        Playlista uploadów jest posortowana od najnowszych, więc stronicowanie kończy się
+        na pierwszym filmie starszym niż okno albo na filmie znanym z poprzedniego skanu
+        (znane filmy z okna są doklejane z zapamiętanego znacznika).
+        
         Args:
             channel_id: ID kanału YouTube
             days_back: Ile dni wstecz pobierać (domyślnie 3)
+            uploads_playlist_id: ID playlisty uploadów (jeśli znane - pomija channels.list)
+            defer_watermarks: Nie zapisuj znacznika od razu (zapis zbiorczy przez flush_watermarks)
+            refresh_stats: Odświeżaj nieaktualne statystyki znanych filmów (False = oszczędzanie quota)
         
         Returns:
             Lista filmów z kanału
@@ -179,33 +492,30 @@ class YouTubeClient:
             end_date = datetime.now(pytz.utc)
             start_date = end_date - timedelta(days=days_back)
             
-            print(f"📅 Pobieranie filmów z ostatnich {days_back} dni (od {start_date} do {end_date})")
+            logger.debug("📅 Pobieranie filmów z ostatnich %s dni (od %s do %s)", days_back, start_date, end_date)
             
             # Pobierz playlistę uploadów kanału
-            request = self.service.channels().list(
-                part='contentDetails',
-                id=channel_id
-            )
-            response = request.execute()
-            if self.state_manager:
-                self.state_manager.add_quota_used(1)  # channels.list = 1 quota
+            if not uploads_playlist_id:
+                uploads_playlist_id = (await self.get_uploads_playlists([channel_id])).get(channel_id)
             
-            if 'items' not in response or len(response['items']) == 0:
-                logger.error(f"Nie znaleziono kanału dla ID: {channel_id}")
+            if not uploads_playlist_id:
+                logger.error("Nie znaleziono kanału dla ID: %s", channel_id)
                 return []
             
-            uploads_playlist_id = response['items'][0]['contentDetails']['relatedPlaylists']['uploads']
-            
             # Pobierz filmy z playlisty
             videos = []
             video_ids = []  # Zbierz ID filmów do batch processing
+            in_range = []  # (video_id, published_at) z okna czasowego - nowy znacznik
+            known = self._load_watermark(channel_id, start_date)
             next_page_token = None
             total_checked = 0
             videos_in_range = 0
             
-            # Pobierz więcej filmów aby znaleźć shorts
-            max_pages = 5  # Zwiększ limit stron
+            # Górny limit stron - zwykle kończymy na pierwszej
+            max_pages = 5
             page_count = 0
+            reached_watermark = False
+            scan_complete = False
             
             while page_count < max_pages:
                 request = self.service.playlistItems().list(
@@ -214,12 +524,10 @@ class YouTubeClient:
                     maxResults=50,
                     pageToken=next_page_token
                 )
-                response = request.execute()
-                if self.state_manager:
-                    self.state_manager.add_quota_used(1)  # playlistItems.list = 1 quota
+                response = await self._execute_conditional(request)  # playlistItems.list = 1 quota
                 
                 if 'items' not in response:
-                    logger.error(f"Nieprawidłowa odpowiedź API dla playlisty: {response}")
+                    logger.error("Nieprawidłowa odpowiedź API dla playlisty: %s", response)
                     break
                 
                 page_count += 1
@@ -227,6 +535,12 @@ class YouTubeClient:
                 
                 for item in response['items']:
                     video_id = item['contentDetails']['videoId']
+                    
+                    # Film z poprzedniego skanu - starsze są już znane
+                    if video_id in known:
+                        reached_watermark = True
+                        break
+                    
                     published_at = datetime.fromisoformat(
                         item['snippet']['publishedAt'].replace('Z', '+00:00')
                     )
@@ -235,273 +549,410 @@ class YouTubeClient:
                     if published_at.tzinfo is None:
                         published_at = published_at.replace(tzinfo=pytz.utc)
                     
-                    # Sprawdź czy film jest z ostatnich N dni
-                    if published_at >= start_date:
-                        # Zbierz ID filmów do batch processing
-                        video_ids.append(video_id)
-                        videos_in_range += 1
+                    # Pierwszy film sprzed okna - dalej są tylko starsze
+                    if published_at < start_date:
+                        scan_complete = True
+                        break
+                    
+                    # Zbierz ID filmów do batch processing
+                    video_ids.append(video_id)
+                    in_range.append((video_id, published_at))
+                    videos_in_range += 1
                 
-                print(f"📄 Strona {page_count}: sprawdzono {len(response['items'])} filmów, w zakresie: {videos_in_range}")
+                logger.debug("📄 Strona %s: sprawdzono %s filmów, w zakresie: %s", page_count, len(response['items']), videos_in_range)
+                
+                if reached_watermark or scan_complete:
+                    break
                 
                 next_page_token = response.get('nextPageToken')
                 if not next_page_token:
+                    scan_complete = True
                     break
             
-            print(f"📊 Łącznie sprawdzono {total_checked} filmów, w zakresie czasowym: {videos_in_range}")
+            if reached_watermark:
+                # Doklej filmy z poprzedniego skanu, które wciąż mieszczą się w oknie
+                seen = set(video_ids)
+                for video_id, published_at in sorted(known.items(), key=lambda kv: kv[1], reverse=True):
+                    if published_at >= start_date and video_id not in seen:
+                        video_ids.append(video_id)
+                        in_range.append((video_id, published_at))
+                videos_in_range = len(video_ids)
+                scan_complete = True
+            
+            # Zapamiętaj znacznik tylko po pełnym skanie okna (limit stron mógł coś uciąć)
+            if scan_complete:
+                self._pending_watermarks[channel_id] = {
+                    'since': start_date.isoformat(),
+                    'pages': page_count,
+                    'videos': [[video_id, published_at.isoformat()] for video_id, published_at in in_range]
+                }
+                if not defer_watermarks:
+                    self.flush_watermarks()
+            
+            logger.debug("📊 Łącznie sprawdzono %s filmów, w zakresie czasowym: %s", total_checked, videos_in_range)
             
             # Pobierz szczegóły filmów za pomocą batch processing
             if video_ids:
-                logger.info(f"Pobieranie szczegółów {len(video_ids)} filmów (batch)")
-                video_details = await self._get_video_details_batch(video_ids)
+                logger.info("Pobieranie szczegółów %s filmów (batch)", len(video_ids))
+                video_details = await self._get_video_details_batch(video_ids, refresh_stats=refresh_stats)
                 videos.extend(video_details)
                 
                 # Sprawdź typy filmów
                 shorts_count = sum(1 for v in video_details if v.get('duration', '') and self._is_short_video(v.get('duration', '')))
                 long_count = len(video_details) - shorts_count
-                print(f"🎬 Znaleziono: {shorts_count} shorts, {long_count} long form")
+                logger.debug("🎬 Znaleziono: %s shorts, %s long form", shorts_count, long_count)
             else:
-                print("⚠️ Nie znaleziono filmów w zakresie czasowym")
+                logger.warning("Nie znaleziono filmów w zakresie czasowym")
             
             return videos
             
         except HttpError as e:
-            logger.error(f"Błąd YouTube API: {e}")
+            logger.error("Błąd YouTube API: %s", e)
             raise
         except Exception as e:
-            logger.error(f"Błąd podczas pobierania filmów: {e}")
+            logger.error("Błąd podczas pobierania filmów: %s", e)
             raise
+
+    async def get_uploads_playlists(self, channel_ids: List[str]) -> Dict[str, str]:
+        """
+        Ustala playlisty uploadów dla wielu kanałów.
+        
+        Playlista uploadów się nie zmienia, więc znane wartości bierzemy z cache
+        w StateManager i pytamy API tylko o brakujące kanały. channels.list przyjmuje
+        do 50 ID w jednym zapytaniu, a kolejne takie zapytania są łączone w jedno
+        wywołanie HTTP (batch). Każde zapytanie to 1 jednostka quota.
+        
+        Returns:
+            Słownik channel_id -> uploads_playlist_id (brak klucza = kanał nie znaleziony)
+        """
+        unique_ids = list(dict.fromkeys(cid for cid in channel_ids if cid))
+        
+        cached = {}
+        if self.state_manager:
+            for cid in unique_ids:
+                playlist_id = self.state_manager.get_uploads_playlist(cid)
+                if playlist_id:
+                    cached[cid] = playlist_id
+        unique_ids = [cid for cid in unique_ids if cid not in cached]
+        if not unique_ids:
+            return cached
+        
+        requests = [
+            self.service.channels().list(
+                part='contentDetails',
+                id=','.join(unique_ids[i:i + self.CHANNELS_PER_LOOKUP]),
+                maxResults=self.CHANNELS_PER_LOOKUP
+            )
+            for i in range(0, len(unique_ids), self.CHANNELS_PER_LOOKUP)
+        ]
+        
+        responses = []
+        if len(requests) == 1:
+            try:
+                responses.append((await self._execute(requests[0]), None))  # channels.list = 1 quota
+            except HttpError as e:
+                responses.append((None, e))
+        else:
+            for i in range(0, len(requests), self.REQUESTS_PER_BATCH):
+                chunk = requests[i:i + self.REQUESTS_PER_BATCH]
+                responses.extend(await self._execute_batch(chunk))  # 1 quota za każde channels.list w batchu
+        
+        playlists = {}
+        for response, error in responses:
+            if error is not None:
+                logger.error("Błąd channels.list (batch): %s", error)
+                continue
+            for item in (response or {}).get('items', []):
+                playlists[item['id']] = item['contentDetails']['relatedPlaylists']['uploads']
+        
+        if playlists and self.state_manager:
+            self.state_manager.set_uploads_playlists(playlists)
+        
+        logger.info("Ustalono playlisty uploadów: %s/%s kanałów (z cache: %s), zapytań: %s",
+                    len(playlists), len(unique_ids), len(cached), len(requests))
+        playlists.update(cached)
+        return playlists
+    
+    async def iter_channels_videos(self, channels: List[Dict], days_back: int = 3,
+                                   skip_stats_refresh: Optional[Set[str]] = None):
+        """
+        Pobiera filmy z wielu kanałów równolegle (maks. max_concurrency naraz).
+
+        Args:
+            channels: Lista kanałów (słowniki z kluczem 'id')
+            days_back: Ile dni wstecz pobierać
+            skip_stats_refresh: ID kanałów, dla których nie odświeżamy statystyk znanych filmów
+
+        Yields:
+            Krotki (index, channel, videos, error) w kolejności zakończenia pobierania
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        skip_stats = skip_stats_refresh or set()
+
+        # Jedno zbiorcze ustalenie playlist uploadów zamiast channels.list per kanał
+        try:
+            playlists = await self.get_uploads_playlists([channel['id'] for channel in channels])
+        except Exception as e:
+            logger.error("Błąd zbiorczego pobierania playlist uploadów: %s", e)
+            playlists = {}
+
+        async def fetch(index: int, channel: Dict):
+            async with semaphore:
+                try:
+                    videos = await self.get_channel_videos(
+                        channel['id'], days_back, uploads_playlist_id=playlists.get(channel['id']),
+                        defer_watermarks=True,
+                        refresh_stats=channel['id'] not in skip_stats
+                    )
+                    return index, channel, videos, None
+                except Exception as e:
+                    return index, channel, [], e
+
+        tasks = [asyncio.ensure_future(fetch(i, channel)) for i, channel in enumerate(channels)]
+        try:
+            for future in asyncio.as_completed(tasks):
+                yield await future
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.flush_watermarks()
+
+    async def get_videos_for_channels(self, channels: List[Dict], days_back: int = 3,
+                                      skip_stats_refresh: Optional[Set[str]] = None) -> List[Any]:
+        """
+        Pobiera filmy z wielu kanałów równolegle.
+
+        Returns:
+            Lista wyników w kolejności kanałów: lista filmów albo wyjątek
+        """
+        results: List[Any] = [None] * len(channels)
+        async for index, channel, videos, error in self.iter_channels_videos(channels, days_back, skip_stats_refresh):
+            results[index] = error if error else videos
+        return results
+
+    async def refresh_statistics(self, video_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Odświeża same statystyki filmów (part=statistics z maską fields).
+        
+        Odpowiedź zawiera tylko liczniki - bez opisów, tagów i miniatur. Zapytania po
+        50 ID są łączone w batch HTTP; każde to 1 jednostka quota.
+        
+        Returns:
+            Słownik video_id -> liczniki (view_count, like_count, ...)
+        """
+        unique_ids = list(dict.fromkeys(vid for vid in video_ids if vid))
+        if not unique_ids:
+            return {}
+        
+        requests = [
+            self.service.videos().list(
+                part='statistics',
+                id=','.join(unique_ids[i:i + 50]),
+                fields=VIDEO_STATISTICS_MASK
+            )
+            for i in range(0, len(unique_ids), 50)
+        ]
+        
+        responses = []
+        if len(requests) == 1:
+            try:
+                responses.append((await self._execute(requests[0]), None))  # videos.list = 1 quota
+            except HttpError as e:
+                responses.append((None, e))
+        else:
+            for i in range(0, len(requests), self.REQUESTS_PER_BATCH):
+                chunk = requests[i:i + self.REQUESTS_PER_BATCH]
+                responses.extend(await self._execute_batch(chunk))  # 1 quota za każde videos.list w batchu
+        
+        stats = {}
+        for response, error in responses:
+            if error is not None:
+                logger.error("Błąd odświeżania statystyk filmów: %s", error)
+                continue
+            for item in (response or {}).get('items', []):
+                stats[item['id']] = parse_statistics(item.get('statistics'))
+        
+        self.video_cache.put_stats_many(stats)
+        logger.info("Odświeżono statystyki %s/%s filmów, zapytań: %s", len(stats), len(unique_ids), len(requests))
+        return stats
+    
+    def _store_videos(self, videos: List[VideoRecord]):
+        """Zapisuje pobrane filmy do obu warstw cache (jedna transakcja na warstwę)"""
+        self.video_cache.put_many({video.id: video.to_dict() for video in videos})
+        self.video_cache.put_stats_many({
+            video.id: {key: video[key] for key in ('view_count', 'like_count', 'comment_count', 'favorite_count')}
+            for video in videos
+        })
+    
+    async def _fetch_videos(self, video_ids: List[str]) -> List[VideoRecord]:
+        """Jedno zapytanie videos.list (do 50 ID) z maską fields - tylko pola raportu"""
+        request = self.service.videos().list(
+            part='snippet,statistics,contentDetails',
+            id=','.join(video_ids),
+            fields=VIDEO_FIELDS_MASK
+        )
+        response = await self._execute_conditional(request)  # videos.list = 1 quota (do 50 filmów)
+        return [VideoRecord.from_api(item) for item in response.get('items', [])]
     
-    async def _get_video_details(self, video_id: str) -> Optional[Dict]:
+    async def _fetch_videos_bisect(self, video_ids: List[str]) -> List[VideoRecord]:
+        """
+        Pobiera filmy; gdy zapytanie mimo ponowień się nie uda, dzieli listę na pół.
+        
+        Zamiast 50 pojedynczych zapytań izoluje problematyczny film w ~2*log2(n) zapytaniach.
+        """
+        try:
+            return await self._fetch_videos(video_ids)
+        except Exception as e:
+            if len(video_ids) == 1:
+                logger.error("Błąd podczas pobierania filmu %s: %s", video_ids[0], e)
+                return []
+            logger.error("Błąd podczas pobierania batch %s filmów, dzielę na pół: %s", len(video_ids), e)
+            middle = len(video_ids) // 2
+            return (await self._fetch_videos_bisect(video_ids[:middle])
+                    + await self._fetch_videos_bisect(video_ids[middle:]))
+    
+    async def _get_video_details(self, video_id: str) -> Optional[VideoRecord]:
         """Pobiera szczegóły filmu z cache"""
-        # Sprawdź cache (ważny przez 24h)
-        if video_id in self.video_cache:
-            cache_data = self.video_cache[video_id]
-            cache_age = datetime.now().timestamp() - cache_data['timestamp']
-            
-            # Cache ważny przez 24h (86400 sekund)
-            if cache_age < 86400:
-                logger.debug(f"Pobrano z cache: {video_id}")
-                return cache_data['data']
-            else:
-                # Usuń przestarzały cache
-                del self.video_cache[video_id]
-                logger.debug(f"Usunięto przestarzały cache: {video_id}")
+        # Sprawdź cache metadanych; przy nieaktualnych statystykach odśwież tylko je
+        cached = self.video_cache.get(video_id, self.metadata_ttl)
+        if cached is not None:
+            video = VideoRecord.from_dict(cached)
+            stats = self.video_cache.get_stats_many([video_id], self.stats_ttl).get(video_id)
+            if stats is None:
+                stats = (await self.refresh_statistics([video_id])).get(video_id, {})
+            video.update_statistics(stats)
+            logger.debug("Pobrano z cache: %s", video_id)
+            return video
         
         # Pobierz z API
         try:
-            request = self.service.videos().list(
-                part='snippet,statistics,contentDetails',
-                id=video_id
-            )
-            response = request.execute()
-            if self.state_manager:
-                self.state_manager.add_quota_used(1)  # videos.list = 1 quota
-            
-            if 'items' not in response or len(response['items']) == 0:
-                logger.error(f"Nie znaleziono filmu dla ID: {video_id}")
+            videos = await self._fetch_videos([video_id])
+            if not videos:
+                logger.error("Nie znaleziono filmu dla ID: %s", video_id)
                 return None
             
-            video = response['items'][0]
-            video_data = {
-                'id': video['id'],
-                'title': video['snippet']['title'],
-                'description': video['snippet']['description'],
-                'published_at': video['snippet']['publishedAt'],
-                'tags': video['snippet'].get('tags', []),
-                'category_id': video['snippet']['categoryId'],
-                'view_count': int(video['statistics'].get('viewCount', 0)),
-                'like_count': int(video['statistics'].get('likeCount', 0)),
-                'comment_count': int(video['statistics'].get('commentCount', 0)),
-                'favorite_count': int(video['statistics'].get('favoriteCount', 0)),
-                'duration': video['contentDetails']['duration'],
-                'definition': video['contentDetails']['definition'],
-                'caption': video['contentDetails']['caption'],
-                'licensed_content': video['contentDetails']['licensedContent'],
-                'thumbnail': video['snippet']['thumbnails']['default']['url'],
-                'url': f"https://www.youtube.com/watch?v={video['id']}"
-            }
-            
             # Zapisz do cache
-            self.video_cache[video_id] = {
-                'data': video_data,
-                'timestamp': datetime.now().timestamp()
-            }
-            self.save_cache()
+            self._store_videos(videos)
             
-            logger.debug(f"Pobrano z API i zapisano do cache: {video_id}")
-            return video_data
+            logger.debug("Pobrano z API i zapisano do cache: %s", video_id)
+            return videos[0]
             
         except Exception as e:
-            logger.error(f"Błąd podczas pobierania szczegółów filmu {video_id}: {e}")
+            logger.error("Błąd podczas pobierania szczegółów filmu %s: %s", video_id, e)
             return None
 
-    async def _get_video_details_batch(self, video_ids: List[str]) -> List[Dict]:
+    async def _get_video_details_batch(self, video_ids: List[str], refresh_stats: bool = True) -> List[VideoRecord]:
         """Pobiera szczegóły wielu filmów za jednym razem (batch processing)"""
         if not video_ids:
             return []
         
-        # Sprawdź cache dla wszystkich filmów
-        cached_videos = []
-        uncached_ids = []
+        # Sprawdź cache metadanych; dla znanych filmów odśwież tylko nieaktualne statystyki
+        # (bez odświeżania - ostatnie znane statystyki, nawet nieaktualne)
+        cached = self.video_cache.get_many(video_ids, self.metadata_ttl)
+        stats_ttl = self.stats_ttl if refresh_stats else float('inf')
+        stats = self.video_cache.get_stats_many(cached.keys(), stats_ttl)
+        stale_stats_ids = [video_id for video_id in cached if video_id not in stats]
+        if stale_stats_ids and refresh_stats:
+            stats.update(await self.refresh_statistics(stale_stats_ids))
         
+        cached_videos = []
         for video_id in video_ids:
-            if video_id in self.video_cache:
-                cache_data = self.video_cache[video_id]
-                cache_age = datetime.now().timestamp() - cache_data['timestamp']
-                
-                # Cache ważny przez 24h
-                if cache_age < 86400:
-                    cached_videos.append(cache_data['data'])
-                    logger.debug(f"Pobrano z cache (batch): {video_id}")
-                else:
-                    # Usuń przestarzały cache
-                    del self.video_cache[video_id]
-                    uncached_ids.append(video_id)
-            else:
-                uncached_ids.append(video_id)
+            if video_id in cached:
+                video = VideoRecord.from_dict(cached[video_id])
+                video.update_statistics(stats.get(video_id, {}))
+                cached_videos.append(video)
+        uncached_ids = [video_id for video_id in video_ids if video_id not in cached]
         
         # Pobierz z API filmy, których nie ma w cache
         if uncached_ids:
-            logger.info(f"Pobieranie {len(uncached_ids)} filmów z API (batch)")
+            logger.info("Pobieranie %s filmów z API (batch)", len(uncached_ids))
             
             # YouTube API pozwala na max 50 ID w jednym zapytaniu
             batch_size = 50
             all_videos = []
+            fetched = []
             
             for i in range(0, len(uncached_ids), batch_size):
                 batch_ids = uncached_ids[i:i+batch_size]
                 
-                try:
-                    request = self.service.videos().list(
-                        part='snippet,statistics,contentDetails',
-                        id=','.join(batch_ids)
-                    )
-                    response = request.execute()
-                    if self.state_manager:
-                        self.state_manager.add_quota_used(1)  # Tylko 1 quota za 50 filmów!
-                    
-                    if 'items' in response:
-                        for video in response['items']:
-                            video_data = {
-                                'id': video['id'],
-                                'title': video['snippet']['title'],
-                                'description': video['snippet']['description'],
-                                'published_at': video['snippet']['publishedAt'],
-                                'tags': video['snippet'].get('tags', []),
-                                'category_id': video['snippet']['categoryId'],
-                                'view_count': int(video['statistics'].get('viewCount', 0)),
-                                'like_count': int(video['statistics'].get('likeCount', 0)),
-                                'comment_count': int(video['statistics'].get('commentCount', 0)),
-                                'favorite_count': int(video['statistics'].get('favoriteCount', 0)),
-                                'duration': video['contentDetails']['duration'],
-                                'definition': video['contentDetails']['definition'],
-                                'caption': video['contentDetails']['caption'],
-                                'licensed_content': video['contentDetails']['licensedContent'],
-                                'thumbnail': video['snippet']['thumbnails']['default']['url'],
-                                'url': f"https://www.youtube.com/watch?v={video['id']}"
-                            }
-                            
-                            # Zapisz do cache
-                            self.video_cache[video['id']] = {
-                                'data': video_data,
-                                'timestamp': datetime.now().timestamp()
-                            }
-                            
-                            all_videos.append(video_data)
-                    
-                    logger.debug(f"Pobrano batch {len(batch_ids)} filmów z API")
-                    
-                except Exception as e:
-                    logger.error(f"Błąd podczas pobierania batch filmów: {e}")
-                    # Fallback - pobierz pojedynczo
-                    for video_id in batch_ids:
-                        try:
-                            video_data = await self._get_video_details(video_id)
-                            if video_data:
-                                all_videos.append(video_data)
-                        except Exception as fallback_error:
-                            logger.error(f"Błąd fallback dla filmu {video_id}: {fallback_error}")
-            
-            # Zapisz cache po wszystkich batch requests
-            self.save_cache()
+                videos = await self._fetch_videos_bisect(batch_ids)
+                fetched.extend(videos)
+                all_videos.extend(videos)
+                logger.debug("Pobrano batch %s filmów z API", len(batch_ids))
+            
+            # Zapisz cache po wszystkich batch requests (jedna transakcja)
+            self._store_videos(fetched)
             
             # Połącz cached i nowe filmy
             return cached_videos + all_videos
         else:
-            logger.info(f"Wszystkie {len(video_ids)} filmów pobrane z cache")
+            logger.info("Wszystkie %s filmów pobrane z cache", len(video_ids))
             return cached_videos
     
     def get_quota_usage(self) -> Dict:
-        """Zwraca informacje o zużyciu quota"""
+        """Zwraca informacje o zużyciu quota (łącznie i per klucz API)"""
         if self.state_manager:
             quota_used = self.state_manager.get_quota_used()
             return {
                 'used': quota_used,
                 'limit': self.quota_limit,
-                'remaining': self.quota_limit - quota_used,
-                'percentage': (quota_used / self.quota_limit) * 100
+                'remaining': self.key_pool.remaining(),
+                'percentage': (quota_used / self.quota_limit) * 100,
+                'keys': self.key_pool.status()
             }
         else:
             return {
                 'used': 0,
                 'limit': self.quota_limit,
                 'remaining': self.quota_limit,
-                'percentage': 0
+                'percentage': 0,
+                'keys': self.key_pool.status()
             }
     
     def reset_quota(self):
         """Resetuje licznik quota (wywoływane codziennie)"""
         if self.state_manager:
             self.state_manager.reset_quota()
+        self.key_pool.reset()
         logger.info("Quota zostało zresetowane")
     
-    def cleanup_cache(self, max_age_hours: int = 24):
-        """Czyści przestarzały cache"""
+    def cleanup_cache(self, max_age_hours: Optional[int] = None):
+        """Czyści przestarzały cache (domyślnie wg TTL metadanych i statystyk)"""
         try:
-            current_time = datetime.now().timestamp()
-            max_age_seconds = max_age_hours * 3600
-            
-            # Znajdź przestarzałe wpisy
-            expired_keys = []
-            for video_id, cache_data in self.video_cache.items():
-                cache_age = current_time - cache_data['timestamp']
-                if cache_age > max_age_seconds:
-                    expired_keys.append(video_id)
+            # Usuń przestarzałe wpisy (indeks po znaczniku czasu)
+            metadata_age = max_age_hours * 3600 if max_age_hours is not None else self.metadata_ttl
+            stats_age = max_age_hours * 3600 if max_age_hours is not None else self.stats_ttl
+            removed = self.video_cache.delete_older_than(metadata_age)
+            removed += self.video_cache.delete_stats_older_than(stats_age)
+            removed += self.video_cache.delete_etags_older_than(metadata_age)
             
-            # Usuń przestarzałe wpisy
-            for video_id in expired_keys:
-                del self.video_cache[video_id]
+            if removed:
+                logger.info("Usunięto %s przestarzałych wpisów z cache", removed)
             
-            if expired_keys:
-                self.save_cache()
-                logger.info(f"Usunięto {len(expired_keys)} przestarzałych wpisów z cache")
-            
-            return len(expired_keys)
+            return removed
             
         except Exception as e:
-            logger.error(f"Błąd podczas czyszczenia cache: {e}")
+            logger.error("Błąd podczas czyszczenia cache: %s", e)
             return 0
     
     def get_cache_stats(self) -> Dict:
         """Zwraca statystyki cache"""
         try:
-            current_time = datetime.now().timestamp()
-            total_entries = len(self.video_cache)
-            expired_entries = 0
-            
-            for cache_data in self.video_cache.values():
-                cache_age = current_time - cache_data['timestamp']
-                if cache_age > 86400:  # 24h
-                    expired_entries += 1
+            total_entries = self.video_cache.count()
+            expired_entries = self.video_cache.count_older_than(self.metadata_ttl)
+            stats_entries = self.video_cache.count_stats()
+            expired_stats = self.video_cache.count_stats_older_than(self.stats_ttl)
             
             return {
                 'total_entries': total_entries,
                 'expired_entries': expired_entries,
                 'valid_entries': total_entries - expired_entries,
-                'cache_size_mb': self.cache_file.stat().st_size / (1024 * 1024) if self.cache_file.exists() else 0
+                'stats_entries': stats_entries,
+                'expired_stats_entries': expired_stats,
+                'cache_size_mb': self.video_cache.size_bytes() / (1024 * 1024)
             }
         except Exception as e:
-            logger.error(f"Błąd podczas pobierania statystyk cache: {e}")
+            logger.error("Błąd podczas pobierania statystyk cache: %s", e)
             return {'error': str(e)} 
 
     def _is_short_video(self, duration: str) -> bool:
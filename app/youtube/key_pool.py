@@ -0,0 +1,110 @@
+try:
+    import hashlib
+    import logging
+    import threading
+    from typing import Dict, Iterable, List, Optional
+except ImportError as e:
+    print(f"❌ Błąd importu w API key pool: {e}")
+    raise
+
+logger = logging.getLogger(__name__)
+
+
+class QuotaExhaustedError(Exception):
+    """Wszystkie klucze API wyczerpały dzienny limit quota"""
+
+
+class ApiKeyPool:
+    """
+    Pula kluczy YouTube Data API z osobnym dziennym limitem quota na klucz.
+
+    Każde zapytanie trafia do klucza z największą pozostałą quota; klucz, dla
+    którego API zwróciło quotaExceeded, jest pomijany do dziennego resetu.
+    Zużycie per klucz trzyma StateManager pod identyfikatorem klucza (skrót
+    SHA-1), więc same klucze nie trafiają do plików stanu ani do /status.
+    """
+
+    def __init__(self, api_keys: Iterable[str], state_manager=None, quota_limit_per_key: int = 10000):
+        self.keys: List[str] = list(dict.fromkeys(key for key in api_keys if key))
+        if not self.keys:
+            self.keys = ['']  # Brak klucza - zapytania i tak zwrócą błąd API
+        self.state_manager = state_manager
+        self.quota_limit_per_key = quota_limit_per_key
+        self._lock = threading.Lock()
+        self._exhausted = set()  # Wyczerpane klucze, gdy brak StateManager
+
+    @staticmethod
+    def key_id(key: str) -> str:
+        """Identyfikator klucza do zapisu stanu (bez ujawniania klucza)"""
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+
+    @staticmethod
+    def mask(key: str) -> str:
+        return f"…{key[-4:]}" if len(key) > 8 else "…"
+
+    @property
+    def quota_limit(self) -> int:
+        """Łączny dzienny limit wszystkich kluczy"""
+        return self.quota_limit_per_key * len(self.keys)
+
+    def used(self, key: str) -> int:
+        if not self.state_manager:
+            return 0
+        return self.state_manager.get_key_quota_used(self.key_id(key))
+
+    def is_exhausted(self, key: str) -> bool:
+        if self.state_manager:
+            return self.state_manager.is_key_exhausted(self.key_id(key))
+        return key in self._exhausted
+
+    def remaining(self, key: Optional[str] = None) -> int:
+        """Pozostała quota klucza (albo wszystkich kluczy łącznie)"""
+        if key is None:
+            return sum(self.remaining(k) for k in self.keys)
+        if self.is_exhausted(key):
+            return 0
+        return max(0, self.quota_limit_per_key - self.used(key))
+
+    def select(self, exclude: Iterable[str] = ()) -> Optional[str]:
+        """
+        Wybiera niewyczerpany klucz z największą pozostałą quota.
+
+        Licznik lokalny może się różnić od stanu w Google, więc klucz z zerową
+        pozostałą quota wciąż jest wybierany - o wyczerpaniu decyduje API.
+        """
+        excluded = set(exclude)
+        with self._lock:
+            candidates = [key for key in self.keys if key not in excluded and not self.is_exhausted(key)]
+            if not candidates:
+                return None
+            return max(candidates, key=lambda key: self.quota_limit_per_key - self.used(key))
+
+    def charge(self, key: str, amount: int):
+        """Zlicza quota zapytania do klucza (i do łącznego licznika)"""
+        if self.state_manager:
+            self.state_manager.add_quota_used(amount, key_id=self.key_id(key))
+
+    def mark_exhausted(self, key: str):
+        """Wyłącza klucz do dziennego resetu quota"""
+        logger.warning("Klucz API %s wyczerpał dzienną quota - przełączam na kolejny", self.mask(key))
+        if self.state_manager:
+            self.state_manager.mark_key_exhausted(self.key_id(key))
+        else:
+            self._exhausted.add(key)
+
+    def reset(self):
+        self._exhausted.clear()
+
+    def status(self) -> List[Dict]:
+        """Zużycie quota każdego klucza (klucze zamaskowane)"""
+        return [
+            {
+                'key': self.mask(key),
+                'key_id': self.key_id(key),
+                'used': self.used(key),
+                'limit': self.quota_limit_per_key,
+                'remaining': self.remaining(key),
+                'exhausted': self.is_exhausted(key),
+            }
+            for key in self.keys
+        ]
@@ -0,0 +1,209 @@
+try:
+    import logging
+    import math
+    from datetime import datetime, timedelta
+    from typing import Dict, List, Optional, Set, Tuple
+    import pytz
+except ImportError as e:
+    print(f"❌ Błąd importu w quota planner: {e}")
+    raise
+
+logger = logging.getLogger(__name__)
+
+
+class QuotaPlanner:
+    """
+    Planuje przebieg raportowania w jednostkach quota YouTube API.
+
+    Koszt kanału szacowany jest z historii skanów (liczba stron playlisty, filmy
+    w oknie czasowym) i z zawartości cache (metadane, świeżość statystyk). Gdy
+    budżet nie wystarcza, każda kategoria dostaje część proporcjonalną do swojego
+    kosztu, a w kategorii najpierw pomijane jest odświeżanie statystyk kanałów
+    o najniższym priorytecie, potem całe kanały.
+    """
+
+    UNKNOWN_CHANNEL_PAGES = 2  # Strony playlisty dla kanału bez historii skanów
+    VIDEOS_PER_REQUEST = 50
+
+    MODE_FULL = 'full'
+    MODE_NO_STATS = 'no_stats'
+    MODE_SKIP = 'skip'
+
+    def __init__(self, youtube_client, state_manager, reserve: int = 200):
+        self.youtube_client = youtube_client
+        self.state_manager = state_manager
+        self.reserve = reserve  # Jednostki zostawione na ręczne akcje (dodawanie kanałów itp.)
+
+    def _priority(self, channel: Dict) -> int:
+        """Priorytet kanału - większe kanały są ważniejsze dla raportu"""
+        return int(channel.get('subscriber_count', 0) or 0)
+
+    def estimate_channel(self, channel_id: str, days_back: int) -> Dict:
+        """
+        Szacuje koszt pobrania jednego kanału (bez zbiorczego channels.list).
+
+        Returns:
+            Słownik z liczbą zapytań: pages, details, stats oraz statystykami cache
+        """
+        start_date = datetime.now(pytz.utc) - timedelta(days=days_back)
+        watermark = self.state_manager.get_watermark(channel_id)
+
+        known_ids = []
+        if watermark:
+            pages = watermark.get('pages', 1)
+            for video_id, published_at in watermark.get('videos', []):
+                try:
+                    if datetime.fromisoformat(published_at) >= start_date:
+                        known_ids.append(video_id)
+                except (TypeError, ValueError):
+                    continue
+        else:
+            pages = self.UNKNOWN_CHANNEL_PAGES
+
+        cache = self.youtube_client.video_cache
+        cached = cache.get_many(known_ids, self.youtube_client.metadata_ttl)
+        fresh_stats = cache.get_stats_many(cached.keys(), self.youtube_client.stats_ttl)
+        stale_stats = len(cached) - len(fresh_stats)
+        missing = len(known_ids) - len(cached)
+
+        # Nowe filmy zakładamy dla kanałów bez historii i publikujących w oknie
+        expects_new = not watermark or bool(known_ids)
+        details = math.ceil(missing / self.VIDEOS_PER_REQUEST) if missing else int(expects_new)
+        stats = math.ceil(stale_stats / self.VIDEOS_PER_REQUEST)
+
+        return {
+            'pages': pages,
+            'details': details,
+            'stats': stats,
+            'known_videos': len(known_ids),
+            'cached_videos': len(cached),
+        }
+
+    def _cost(self, estimate: Dict, mode: str) -> int:
+        if mode == self.MODE_SKIP:
+            return 0
+        cost = estimate['pages'] + estimate['details']
+        if mode == self.MODE_FULL:
+            cost += estimate['stats']
+        return cost
+
+    def _degrade(self, entries: List[Dict], budget: int):
+        """Obniża tryb kanałów od najniższego priorytetu, aż koszt zmieści się w budżecie"""
+        def total():
+            return sum(entry['planned_cost'] for entry in entries)
+
+        for mode_from, mode_to in ((self.MODE_FULL, self.MODE_NO_STATS), (self.MODE_NO_STATS, self.MODE_SKIP)):
+            for entry in reversed(entries):
+                if total() <= budget:
+                    return
+                if entry['mode'] != mode_from:
+                    continue
+                if mode_to == self.MODE_NO_STATS and not entry['estimate']['stats']:
+                    continue  # Nic do zaoszczędzenia
+                entry['mode'] = mode_to
+                entry['planned_cost'] = self._cost(entry['estimate'], mode_to)
+
+    def plan(self, channels_by_category: Dict[str, List[Dict]], days_back: int,
+             available: Optional[int] = None) -> Dict:
+        """
+        Planuje przebieg dla wszystkich kategorii.
+
+        Args:
+            channels_by_category: Kanały w kategoriach (jak StateManager.get_channels())
+            days_back: Okno czasowe raportu
+            available: Dostępna quota (domyślnie: pozostała quota kluczy - rezerwa)
+
+        Returns:
+            Plan: koszt szacowany i planowany, budżety kategorii, tryb każdego kanału
+        """
+        quota_limit = self.youtube_client.quota_limit
+        quota_used = self.state_manager.get_quota_used()
+        if available is None:
+            # Pozostała quota wszystkich kluczy (wyczerpane klucze się nie liczą)
+            available = self.youtube_client.key_pool.remaining() - self.reserve
+        available = max(0, available)
+
+        # Ustalenie playlist uploadów - zbiorczo, 1 jednostka na 50 nieznanych kanałów
+        all_ids = [channel['id'] for channels in channels_by_category.values() for channel in channels]
+        unknown = {cid for cid in all_ids if not self.state_manager.get_uploads_playlist(cid)}
+        lookup_cost = math.ceil(len(unknown) / self.youtube_client.CHANNELS_PER_LOOKUP)
+        budget = max(0, available - lookup_cost)
+
+        categories = {}
+        known_videos = cached_videos = 0
+        for category, channels in channels_by_category.items():
+            entries = []
+            for channel in sorted(channels, key=self._priority, reverse=True):
+                estimate = self.estimate_channel(channel['id'], days_back)
+                known_videos += estimate['known_videos']
+                cached_videos += estimate['cached_videos']
+                cost = self._cost(estimate, self.MODE_FULL)
+                entries.append({
+                    'id': channel['id'],
+                    'title': channel.get('title', ''),
+                    'priority': self._priority(channel),
+                    'estimate': estimate,
+                    'estimated_cost': cost,
+                    'planned_cost': cost,
+                    'mode': self.MODE_FULL,
+                })
+            categories[category] = entries
+
+        estimated_total = sum(entry['estimated_cost'] for entries in categories.values() for entry in entries)
+        fits = estimated_total <= budget
+
+        category_plans = {}
+        for category, entries in categories.items():
+            category_cost = sum(entry['estimated_cost'] for entry in entries)
+            if fits or not estimated_total:
+                category_budget = category_cost
+            else:
+                # Budżet proporcjonalny do kosztu - żadna kategoria nie zostaje z niczym
+                category_budget = budget * category_cost // estimated_total
+                self._degrade(entries, category_budget)
+            category_plans[category] = {
+                'budget': category_budget,
+                'estimated_cost': category_cost,
+                'planned_cost': sum(entry['planned_cost'] for entry in entries),
+                'channels': entries,
+            }
+
+        planned_total = lookup_cost + sum(plan['planned_cost'] for plan in category_plans.values())
+        plan = {
+            'quota_limit': quota_limit,
+            'quota_used': quota_used,
+            'reserve': self.reserve,
+            'available': available,
+            'lookup_cost': lookup_cost,
+            'estimated_cost': lookup_cost + estimated_total,
+            'planned_cost': planned_total,
+            'fits': fits,
+            'cache_hit_rate': round(cached_videos / known_videos, 3) if known_videos else None,
+            'categories': category_plans,
+        }
+        logger.info("Plan quota: szacowany koszt %s, planowany %s, dostępne %s%s",
+                    plan['estimated_cost'], planned_total, available, '' if fits else ' (tryb oszczędny)')
+        return plan
+
+    @staticmethod
+    def apply(plan: Dict, channels_by_category: Dict[str, List[Dict]]) -> Tuple[Dict[str, List[Dict]], Set[str]]:
+        """
+        Zwraca kanały do pobrania w kolejności priorytetu (bez pominiętych)
+        oraz zbiór kanałów, dla których nie odświeżamy statystyk.
+        """
+        ordered = {}
+        skip_stats = set()
+        for category, channels in channels_by_category.items():
+            by_id = {channel['id']: channel for channel in channels}
+            category_plan = plan['categories'].get(category)
+            if not category_plan:
+                ordered[category] = list(channels)
+                continue
+            ordered[category] = []
+            for entry in category_plan['channels']:
+                if entry['mode'] == QuotaPlanner.MODE_SKIP or entry['id'] not in by_id:
+                    continue
+                if entry['mode'] == QuotaPlanner.MODE_NO_STATS:
+                    skip_stats.add(entry['id'])
+                ordered[category].append(by_id[entry['id']])
+        return ordered, skip_stats
@@ -0,0 +1,132 @@
+try:
+    from collections.abc import MutableMapping
+    from typing import Dict, Iterator, Optional
+except ImportError as e:
+    print(f"❌ Błąd importu w video records: {e}")
+    raise
+
+
+# Maski fields= dla videos.list - tylko pola zapisywane do raportu CSV (+ etag do If-None-Match)
+VIDEO_FIELDS_MASK = (
+    'etag,items(id,'
+    'snippet(title,description,publishedAt,tags,categoryId,thumbnails/default/url),'
+    'statistics(viewCount,likeCount,commentCount,favoriteCount),'
+    'contentDetails(duration,definition,caption,licensedContent))'
+)
+VIDEO_STATISTICS_MASK = 'items(id,statistics(viewCount,likeCount,commentCount,favoriteCount))'
+
+# Statystyki filmu: pole API -> klucz w rekordzie
+STATISTICS_FIELDS = {
+    'viewCount': 'view_count',
+    'likeCount': 'like_count',
+    'commentCount': 'comment_count',
+    'favoriteCount': 'favorite_count',
+}
+
+
+class VideoRecord(MutableMapping):
+    """
+    Zwarty rekord filmu (__slots__ zamiast słownika na każdy film).
+
+    Zachowuje się jak dict z dotychczasowymi kluczami ('title', 'view_count', ...),
+    więc CSVGenerator i reszta kodu używają go bez zmian. Pole 'url' jest wyliczane z ID.
+    """
+
+    __slots__ = (
+        'id', 'title', 'description', 'published_at', 'tags', 'category_id',
+        'view_count', 'like_count', 'comment_count', 'favorite_count',
+        'duration', 'definition', 'caption', 'licensed_content', 'thumbnail',
+        'channel_title', 'channel_id',
+    )
+    # Pola opcjonalne - dopisywane po pobraniu (informacje o kanale)
+    _OPTIONAL = ('channel_title', 'channel_id')
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, None)
+        for name, value in fields.items():
+            self[name] = value
+
+    @classmethod
+    def from_api(cls, item: Dict) -> 'VideoRecord':
+        """Parsuje element odpowiedzi videos.list (part=snippet,statistics,contentDetails)"""
+        snippet = item['snippet']
+        details = item['contentDetails']
+        statistics = item.get('statistics', {})
+        record = cls.__new__(cls)
+        record.id = item['id']
+        record.title = snippet['title']
+        record.description = snippet['description']
+        record.published_at = snippet['publishedAt']
+        record.tags = snippet.get('tags', [])
+        record.category_id = snippet['categoryId']
+        record.view_count = int(statistics.get('viewCount', 0))
+        record.like_count = int(statistics.get('likeCount', 0))
+        record.comment_count = int(statistics.get('commentCount', 0))
+        record.favorite_count = int(statistics.get('favoriteCount', 0))
+        record.duration = details['duration']
+        record.definition = details['definition']
+        record.caption = details['caption']
+        record.licensed_content = details['licensedContent']
+        record.thumbnail = snippet['thumbnails']['default']['url']
+        record.channel_title = None
+        record.channel_id = None
+        return record
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'VideoRecord':
+        """Tworzy rekord z dict (np. wpisu cache); nieznane klucze są pomijane"""
+        return cls(**{key: value for key, value in data.items() if key in cls.__slots__})
+
+    def update_statistics(self, statistics: Dict):
+        """Nadpisuje liczniki (view_count, like_count, ...)"""
+        for key, value in statistics.items():
+            setattr(self, key, value)
+
+    def to_dict(self) -> Dict:
+        return dict(self.items())
+
+    @property
+    def url(self) -> str:
+        return f"https://www.youtube.com/watch?v={self.id}"
+
+    def _keys(self):
+        for name in self.__slots__:
+            if name in self._OPTIONAL and getattr(self, name) is None:
+                continue
+            yield name
+        yield 'url'
+
+    def __getitem__(self, key: str):
+        if key == 'url':
+            return self.url
+        if key not in self.__slots__ or (key in self._OPTIONAL and getattr(self, key) is None):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value):
+        if key == 'url':
+            return  # wyliczane z ID
+        if key not in self.__slots__:
+            raise KeyError(f"Nieznane pole rekordu filmu: {key}")
+        setattr(self, key, value)
+
+    def __delitem__(self, key: str):
+        if key not in self._OPTIONAL:
+            raise KeyError(f"Nie można usunąć pola rekordu filmu: {key}")
+        setattr(self, key, None)
+
+    def __iter__(self) -> Iterator[str]:
+        return self._keys()
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._keys())
+
+    def __repr__(self) -> str:
+        return f"VideoRecord(id={self.id!r}, title={self.title!r})"
+
+
+def parse_statistics(statistics: Optional[Dict]) -> Dict:
+    """Zamienia statistics z API na liczniki rekordu"""
+    statistics = statistics or {}
+    return {key: int(statistics.get(field, 0)) for field, key in STATISTICS_FIELDS.items()}
@@ -0,0 +1,101 @@
+try:
+    import json
+    import logging
+    import queue
+    import threading
+    from contextlib import contextmanager
+    from functools import lru_cache
+    from typing import Dict, Iterator, Optional
+except ImportError as e:
+    print(f"❌ Błąd importu w YouTube transport: {e}")
+    raise
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def load_discovery_document(service_name: str = 'youtube', version: str = 'v3') -> Dict:
+    """
+    Zwraca dokument discovery dołączony do googleapiclient (bez zapytań sieciowych).
+
+    Dokument jest parsowany raz na proces i współdzielony przez wszystkich klientów.
+    """
+    from googleapiclient.discovery_cache import get_static_doc  # Ciężki import - dopiero przy pierwszym użyciu
+
+    document = get_static_doc(service_name, version)
+    if document is None:
+        raise RuntimeError(f"Brak statycznego dokumentu discovery dla {service_name} {version}")
+    return json.loads(document)
+
+
+def build_service(developer_key: str, service_name: str = 'youtube', version: str = 'v3'):
+    """Buduje obiekt usługi z zapamiętanego dokumentu discovery"""
+    from googleapiclient.discovery import build_from_document
+
+    return build_from_document(load_discovery_document(service_name, version), developerKey=developer_key)
+
+
+class HttpPool:
+    """
+    Pula obiektów httplib2.Http z utrzymywanymi połączeniami (keep-alive).
+
+    httplib2.Http nie jest bezpieczny wątkowo, więc każde zapytanie wypożycza
+    z puli osobny obiekt na czas wykonania. Pula rośnie leniwie do `size`;
+    oddane obiekty zachowują otwarte połączenia dla kolejnych zapytań.
+    """
+
+    def __init__(self, size: int, timeout: Optional[float] = None):
+        self.size = max(1, size)
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _create(self):
+        from googleapiclient.http import build_http
+
+        http = build_http()
+        if self.timeout is not None:
+            http.timeout = self.timeout
+        return http
+
+    def acquire(self):
+        """Wypożycza obiekt HTTP (czeka, jeśli wszystkie są zajęte)"""
+        try:
+            # LIFO - ostatnio użyte połączenie najpewniej jest wciąż otwarte
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return self._create()
+        return self._idle.get()
+
+    def release(self, http):
+        self._idle.put(http)
+
+    @contextmanager
+    def connection(self) -> Iterator:
+        http = self.acquire()
+        try:
+            yield http
+        finally:
+            self.release(http)
+
+    @property
+    def created(self) -> int:
+        """Liczba utworzonych obiektów HTTP"""
+        return self._created
+
+    def close(self):
+        """Zamyka połączenia wolnych obiektów HTTP"""
+        while True:
+            try:
+                http = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                http.close()
+            except Exception as e:
+                logger.debug("Błąd zamykania połączenia HTTP: %s", e)
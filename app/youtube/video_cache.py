@@ -0,0 +1,204 @@
+try:
+    import json
+    import logging
+    import sqlite3
+    import threading
+    from datetime import datetime
+    from pathlib import Path
+    from typing import Dict, Iterable, Optional, Tuple
+except ImportError as e:
+    print(f"❌ Błąd importu w video cache: {e}")
+    raise
+
+logger = logging.getLogger(__name__)
+
+
+class VideoCacheStore:
+    """
+    Cache szczegółów filmów w SQLite (tryb WAL).
+
+    Dwie warstwy z osobnymi znacznikami czasu: metadane filmu (tabela videos,
+    zmieniają się rzadko) i statystyki (tabela video_stats, odświeżane często).
+    Każdy wpis czytany i zapisywany jest osobno, a indeksy po znaczniku czasu
+    pozwalają usuwać przestarzałe wpisy bez przeglądania całego cache.
+    Tabela etags trzyma ETag i odpowiedź dla zapytań warunkowych (If-None-Match).
+    """
+
+    TABLES = ('videos', 'video_stats')
+
+    def __init__(self, db_path: Path, legacy_json: Optional[Path] = None):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        is_new = not self.db_path.exists()
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for table in self.TABLES:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "video_id TEXT PRIMARY KEY, data TEXT NOT NULL, timestamp REAL NOT NULL)"
+            )
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_timestamp ON {table}(timestamp)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS etags ("
+            "request_key TEXT PRIMARY KEY, etag TEXT NOT NULL, data TEXT NOT NULL, timestamp REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_etags_timestamp ON etags(timestamp)")
+        self._conn.commit()
+
+        # Jednorazowy import starego video_cache.json
+        if is_new and legacy_json is not None and Path(legacy_json).exists():
+            self.import_json(Path(legacy_json))
+
+    def import_json(self, json_path: Path) -> int:
+        """Importuje wpisy ze starego formatu {video_id: {'data': ..., 'timestamp': ...}}"""
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+            rows = [
+                (video_id, json.dumps(entry['data'], ensure_ascii=False), float(entry['timestamp']))
+                for video_id, entry in legacy.items()
+                if isinstance(entry, dict) and 'data' in entry and 'timestamp' in entry
+            ]
+            with self._lock:
+                self._conn.executemany("INSERT OR REPLACE INTO videos VALUES (?, ?, ?)", rows)
+                self._conn.commit()
+            logger.info("Zaimportowano %s filmów z %s", len(rows), json_path)
+            return len(rows)
+        except Exception as e:
+            logger.error("Błąd podczas importu cache z %s: %s", json_path, e)
+            return 0
+
+    def _select(self, table: str, video_ids: Iterable[str], max_age: float) -> Dict[str, Dict]:
+        ids = list(video_ids)
+        if not ids:
+            return {}
+        min_timestamp = datetime.now().timestamp() - max_age
+        found = {}
+        with self._lock:
+            # SQLite ogranicza liczbę parametrów - pytamy partiami
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT video_id, data FROM {table} WHERE timestamp >= ? AND video_id IN ({placeholders})",
+                    [min_timestamp, *chunk]
+                ).fetchall()
+                for video_id, data in rows:
+                    found[video_id] = json.loads(data)
+        return found
+
+    def _upsert(self, table: str, entries: Dict[str, Dict], timestamp: Optional[float]):
+        if not entries:
+            return
+        timestamp = timestamp if timestamp is not None else datetime.now().timestamp()
+        rows = [
+            (video_id, json.dumps(data, ensure_ascii=False), timestamp)
+            for video_id, data in entries.items()
+        ]
+        with self._lock:
+            self._conn.executemany(f"INSERT OR REPLACE INTO {table} VALUES (?, ?, ?)", rows)
+            self._conn.commit()
+
+    def _delete_older_than(self, table: str, max_age: float) -> int:
+        min_timestamp = datetime.now().timestamp() - max_age
+        with self._lock:
+            cursor = self._conn.execute(f"DELETE FROM {table} WHERE timestamp < ?", (min_timestamp,))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def _count(self, table: str, older_than: Optional[float] = None) -> int:
+        with self._lock:
+            if older_than is None:
+                return self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            min_timestamp = datetime.now().timestamp() - older_than
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM {table} WHERE timestamp < ?", (min_timestamp,)
+            ).fetchone()[0]
+
+    def get(self, video_id: str, max_age: float) -> Optional[Dict]:
+        """Zwraca dane filmu, jeśli wpis jest młodszy niż max_age sekund"""
+        return self.get_many([video_id], max_age).get(video_id)
+
+    def get_many(self, video_ids: Iterable[str], max_age: float) -> Dict[str, Dict]:
+        """Zwraca ważne wpisy dla podanych filmów (video_id -> dane)"""
+        return self._select('videos', video_ids, max_age)
+
+    def put(self, video_id: str, data: Dict, timestamp: Optional[float] = None):
+        """Zapisuje jeden film"""
+        self.put_many({video_id: data}, timestamp)
+
+    def put_many(self, videos: Dict[str, Dict], timestamp: Optional[float] = None):
+        """Zapisuje wiele filmów w jednej transakcji"""
+        self._upsert('videos', videos, timestamp)
+
+    def get_stats_many(self, video_ids: Iterable[str], max_age: float) -> Dict[str, Dict]:
+        """Zwraca świeże statystyki filmów (video_id -> liczniki)"""
+        return self._select('video_stats', video_ids, max_age)
+
+    def put_stats_many(self, stats: Dict[str, Dict], timestamp: Optional[float] = None):
+        """Zapisuje statystyki wielu filmów w jednej transakcji"""
+        self._upsert('video_stats', stats, timestamp)
+
+    def delete_older_than(self, max_age: float) -> int:
+        """Usuwa metadane starsze niż max_age sekund, zwraca liczbę usuniętych"""
+        return self._delete_older_than('videos', max_age)
+
+    def delete_stats_older_than(self, max_age: float) -> int:
+        """Usuwa statystyki starsze niż max_age sekund, zwraca liczbę usuniętych"""
+        return self._delete_older_than('video_stats', max_age)
+
+    def get_etag(self, request_key: str) -> Optional[Tuple[str, Dict]]:
+        """Zwraca (etag, odpowiedź) zapamiętane dla zapytania"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, data FROM etags WHERE request_key = ?", (request_key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def put_etag(self, request_key: str, etag: str, response: Dict):
+        """Zapamiętuje ETag i odpowiedź zapytania"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO etags VALUES (?, ?, ?, ?)",
+                (request_key, etag, json.dumps(response, ensure_ascii=False), datetime.now().timestamp())
+            )
+            self._conn.commit()
+
+    def touch_etag(self, request_key: str):
+        """Odświeża znacznik czasu wpisu po odpowiedzi 304"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE etags SET timestamp = ? WHERE request_key = ?",
+                (datetime.now().timestamp(), request_key)
+            )
+            self._conn.commit()
+
+    def delete_etags_older_than(self, max_age: float) -> int:
+        """Usuwa ETagi nieużywane dłużej niż max_age sekund"""
+        return self._delete_older_than('etags', max_age)
+
+    def count(self) -> int:
+        return self._count('videos')
+
+    def count_older_than(self, max_age: float) -> int:
+        return self._count('videos', max_age)
+
+    def count_stats(self) -> int:
+        return self._count('video_stats')
+
+    def count_stats_older_than(self, max_age: float) -> int:
+        return self._count('video_stats', max_age)
+
+    def size_bytes(self) -> int:
+        """Rozmiar bazy na dysku (łącznie z plikiem WAL)"""
+        wal = self.db_path.with_name(self.db_path.name + '-wal')
+        return sum(path.stat().st_size for path in (self.db_path, wal) if path.exists())
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
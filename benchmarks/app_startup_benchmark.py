@@ -0,0 +1,82 @@
+"""
+Benchmark startu aplikacji (app.main).
+
+Mierzy w osobnych procesach:
+- czas importu app.main (moduły ciężkie - pandas, googleapiclient.discovery -
+  ładowane są dopiero przy pierwszym użyciu),
+- czas od uruchomienia uvicorn do pierwszej odpowiedzi 200 z /health
+  (generowanie brakujących rankingów idzie w tle i nie blokuje startu).
+
+Uruchomienie: python benchmarks/app_startup_benchmark.py
+"""
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+ROUNDS = 5
+
+IMPORT_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import app.main
+heavy = [name for name in ('pandas', 'googleapiclient.discovery') if name in sys.modules]
+print(time.perf_counter() - start, ','.join(heavy) or '-')
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def measure_import(env):
+    output = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout.split()
+    return float(output[-2]), output[-1]
+
+
+def measure_first_health(env) -> float:
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while True:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                if server.poll() is not None:
+                    raise RuntimeError("uvicorn zakończył się przed odpowiedzią /health")
+                time.sleep(0.01)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    workdir = Path(tempfile.mkdtemp())
+    env = dict(os.environ, PYTHONPATH=str(ROOT), DATA_DIR=str(workdir / "data"),
+               REPORTS_DIR=str(workdir / "reports"), LOG_LEVEL="WARNING")
+
+    imports, heavy = zip(*(measure_import(env) for _ in range(ROUNDS)))
+    health = [measure_first_health(env) for _ in range(ROUNDS)]
+
+    print(f"przebiegi: {ROUNDS} (mediana)")
+    print(f"import app.main:          {statistics.median(imports) * 1000:8.1f} ms  (załadowane ciężkie moduły: {heavy[0]})")
+    print(f"uvicorn -> /health 200:   {statistics.median(health) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark pamięci zapisu raportu CSV kategorii.
+
+Porównuje szczyt alokacji (tracemalloc) dla:
+- dotychczasowej ścieżki: wszystkie filmy kategorii w liście -> lista wierszy
+  -> DataFrame -> to_csv,
+- zapisu strumieniowego: filmy kanału dopisywane do pliku zaraz po pobraniu
+  (w pamięci jest tylko bieżący kanał).
+Oba pliki są porównywane bajt w bajt.
+
+Uruchomienie: python benchmarks/csv_report_memory_benchmark.py
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+VIDEOS_PER_CHANNEL = 50
+CATEGORY_SIZES = (1_000, 10_000, 50_000)
+
+
+def channel_videos(channel: int):
+    return [
+        {
+            'id': f"c{channel:05d}v{i:03d}",
+            'channel_title': f"Kanał {channel}",
+            'channel_id': f"UC{channel:022d}",
+            'published_at': f"2026-10-{10 + i % 5:02d}T{i % 24:02d}:15:00Z",
+            'title': f"Film {i} kanału {channel}, odcinek \"{i}\"",
+            'description': "Opis filmu " * 20,
+            'tags': ['podcast', 'wywiad', f"tag{i}"],
+            'duration': 'PT3M' if i % 2 else 'PT1H2M',
+            'view_count': i * 1000,
+            'like_count': i * 10,
+            'comment_count': i,
+            'favorite_count': 0,
+            'definition': 'hd',
+            'caption': 'false',
+            'licensed_content': True,
+            'category_id': '22',
+            'thumbnail': f"https://i.ytimg.com/vi/c{channel:05d}v{i:03d}/default.jpg",
+        }
+        for i in range(VIDEOS_PER_CHANNEL)
+    ]
+
+
+def pandas_report(generator, channels: int, path: Path):
+    import pandas as pd
+
+    videos = [video for channel in range(channels) for video in channel_videos(channel)]
+    rows = [generator.video_row(video) for video in videos]
+    pd.DataFrame(rows, columns=generator.columns).to_csv(path, index=False, encoding='utf-8')
+
+
+def streamed_report(generator, channels: int) -> str:
+    with generator.open_report('BENCH') as report:
+        for channel in range(channels):
+            report.add_videos(channel_videos(channel))
+        return report.finalize()
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, peak / 1024 / 1024, elapsed * 1000
+
+
+def main():
+    workdir = Path(tempfile.mkdtemp())
+    os.environ['REPORTS_DIR'] = str(workdir)
+    import pandas  # noqa: F401 - import poza pomiarem
+    from app.storage.csv_generator import CSVGenerator
+    generator = CSVGenerator()
+
+    print(f"{'filmy':>8} {'pandas MB':>10} {'stream MB':>10} {'pandas ms':>10} {'stream ms':>10}  identyczne")
+    for size in CATEGORY_SIZES:
+        channels = size // VIDEOS_PER_CHANNEL
+        legacy = workdir / "legacy.csv"
+        _, legacy_peak, legacy_ms = measure(lambda: pandas_report(generator, channels, legacy))
+        path, stream_peak, stream_ms = measure(lambda: streamed_report(generator, channels))
+        identical = legacy.read_bytes() == Path(path).read_bytes()
+        print(f"{size:>8} {legacy_peak:>10.1f} {stream_peak:>10.1f} {legacy_ms:>10.0f} {stream_ms:>10.0f}  {identical}")
+
+
+if __name__ == "__main__":
+    main()
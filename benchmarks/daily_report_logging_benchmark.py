@@ -0,0 +1,101 @@
+"""
+Benchmark daily_report_task z różnymi ustawieniami logowania.
+
+Raport dla 300 kanałów (atrapa YouTube API z testów, ciepły cache filmów)
+liczony przy:
+  - LOG_LEVEL=DEBUG, synchroniczny StreamHandler (zapis w pętli zdarzeń),
+  - LOG_LEVEL=DEBUG przez QueueHandler/QueueListener (setup_logging),
+  - LOG_LEVEL=INFO przez kolejkę (ustawienie domyślne),
+  - logowanie wyłączone (CRITICAL).
+Strumień logów trafia do pliku tymczasowego, żeby koszt zapisu był realny.
+
+Uruchomienie: python benchmarks/daily_report_logging_benchmark.py
+"""
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tests"))
+
+CHANNELS = 300
+VIDEOS_PER_CHANNEL = 12
+ROUNDS = 7
+
+
+def make_scheduler(work_dir: Path):
+    os.environ["DATA_DIR"] = str(work_dir / "data")
+    os.environ["REPORTS_DIR"] = str(work_dir / "reports")
+    os.chdir(work_dir)
+
+    from app.scheduler.task_scheduler import TaskScheduler
+    from conftest import FakeYouTubeService
+
+    channel_ids = [f"UC{i:022d}" for i in range(CHANNELS)]
+    scheduler = TaskScheduler()
+    scheduler.youtube_client.service = FakeYouTubeService({cid: VIDEOS_PER_CHANNEL for cid in channel_ids})
+    for i, channel_id in enumerate(channel_ids):
+        scheduler.state_manager.add_channel({
+            'id': channel_id,
+            'title': f"Kanał {i}",
+            'url': f"https://www.youtube.com/channel/{channel_id}",
+            'subscriber_count': i * 100,
+        }, f"category_{i % 3}")
+    return scheduler
+
+
+def configure(mode: str, log_file: Path):
+    from app.config.logging_setup import setup_logging, stop_logging
+
+    stop_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    if mode == 'sync-debug':
+        handler = logging.FileHandler(log_file)
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        root.addHandler(handler)
+        root.setLevel(logging.DEBUG)
+    else:
+        level = {'queue-debug': 'DEBUG', 'queue-info': 'INFO', 'off': 'CRITICAL'}[mode]
+        # Konsola do /dev/null - liczy się koszt zapisu do pliku, nie terminala
+        stderr, sys.stderr = sys.stderr, open(os.devnull, 'w')
+        try:
+            setup_logging(level, str(log_file))
+        finally:
+            sys.stderr = stderr
+
+def main():
+    work_dir = Path(tempfile.mkdtemp())
+    log_file = work_dir / "bench.log"
+    configure('off', log_file)
+    scheduler = make_scheduler(work_dir)
+    asyncio.run(scheduler.daily_report_task())  # rozgrzanie cache filmów i playlist
+
+    modes = ('sync-debug', 'queue-debug', 'queue-info', 'off')
+    times = {mode: [] for mode in modes}
+    for _ in range(ROUNDS):
+        # Tryby na przemian - wolniejsze i szybsze przebiegi dysku rozkładają się równo
+        for mode in modes:
+            configure(mode, log_file)
+            begin = time.perf_counter()
+            asyncio.run(scheduler.daily_report_task())
+            times[mode].append((time.perf_counter() - begin) * 1000)
+
+    print(f"kanały: {CHANNELS}, filmy na kanał: {VIDEOS_PER_CHANNEL}, przebiegi: {ROUNDS} (mediana)")
+    for mode in modes:
+        print(f"{mode:12s} {statistics.median(times[mode]):8.1f} ms")
+
+    from app.config.logging_setup import stop_logging
+    stop_logging()
+
+
+if __name__ == "__main__":
+    main()
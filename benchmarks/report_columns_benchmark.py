@@ -0,0 +1,84 @@
+"""
+Benchmark wczytywania raportu dziennego: CSV vs plik kolumnowy.
+
+Dla raportów różnej wielkości (zapisanych przez CSVGenerator, więc z plikiem
+kolumnowym obok) mierzy medianę czasu:
+- pd.read_csv          - dotychczasowy odczyt w RankingAnalyzer / CSVProcessor / loaderze,
+- read_report          - cały raport z pliku kolumnowego (z duration_seconds, is_short, ...),
+- read_report(kolumny) - tylko kolumny potrzebne RankingAnalyzer,
+- CSV + kolumny        - odczyt bez pliku kolumnowego (read_csv + add_derived_columns),
+- load_daily_report    - rekordy trendów z pliku kolumnowego i bez niego,
+- DictReader           - same wiersze CSV, od których zaczynał dotychczasowy load_daily_report.
+
+Uruchomienie: python benchmarks/report_columns_benchmark.py
+"""
+import csv
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from csv_report_memory_benchmark import VIDEOS_PER_CHANNEL, channel_videos  # noqa: E402
+
+REPORT_SIZES = (1_000, 10_000, 50_000)
+ROUNDS = 5
+RANKING_COLUMNS = ['Video_ID', 'Title', 'Channel_Name', 'View_Count', 'Thumbnail_URL', 'Date_of_Publishing']
+
+
+def median_ms(fn) -> float:
+    times = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def dict_reader_rows(path):
+    """Dotychczasowy odczyt load_daily_report (same wiersze, bez normalizacji)"""
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def main():
+    workdir = Path(tempfile.mkdtemp())
+    os.environ['REPORTS_DIR'] = str(workdir)
+    import pandas as pd
+    from app.storage.csv_generator import CSVGenerator
+    from app.storage import report_columns
+    from app.trend.utils.report_loader import load_daily_report
+    generator = CSVGenerator()
+    sidecar_format = 'parquet' if report_columns.parquet_available() else 'npz'
+
+    print(f"plik kolumnowy: {sidecar_format}, mediana z {ROUNDS} prób [ms]")
+    print(f"{'filmy':>8} {'read_csv':>9} {'kolumny':>9} {'wybrane':>9} {'CSV+kol.':>9}"
+          f" {'daily kol.':>11} {'daily CSV':>10} {'DictReader':>11}")
+    for size in REPORT_SIZES:
+        category = f"BENCH{size}"
+        with generator.open_report(category) as report:
+            for channel in range(size // VIDEOS_PER_CHANNEL):
+                report.add_videos(channel_videos(channel))
+            path = Path(report.finalize())
+        sidecar = report_columns.find_sidecar(path)
+        date = path.stem.split('_')[-1]
+
+        read_csv = median_ms(lambda: pd.read_csv(path))
+        columns = median_ms(lambda: report_columns.read_report(path))
+        selected = median_ms(lambda: report_columns.read_report(path, columns=RANKING_COLUMNS))
+        daily_columns = median_ms(lambda: load_daily_report(category, date))
+
+        # Bez pliku kolumnowego (np. raporty sprzed zmiany)
+        os.utime(sidecar, ns=(0, 0))
+        fallback = median_ms(lambda: report_columns.read_report(path))
+        daily_csv = median_ms(lambda: load_daily_report(category, date))
+        dict_reader = median_ms(lambda: dict_reader_rows(path))
+        print(f"{size:>8} {read_csv:>9.1f} {columns:>9.1f} {selected:>9.1f} {fallback:>9.1f}"
+              f" {daily_columns:>11.1f} {daily_csv:>10.1f} {dict_reader:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Benchmark startu klienta YouTube.
+
+Mierzy czas konstrukcji YouTubeClient (dawniej: build() z dokumentem discovery
+przy każdej konstrukcji, teraz: leniwa usługa z zapamiętanego dokumentu) oraz
+koszt pierwszego i kolejnego zbudowania usługi.
+
+Uruchomienie: python benchmarks/startup_benchmark.py
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+ROUNDS = 20
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    from googleapiclient.discovery import build
+    from app.youtube.client import YouTubeClient
+    from app.youtube.transport import build_service
+
+    os.chdir(tempfile.mkdtemp())
+
+    legacy = sum(timed(lambda: build('youtube', 'v3', developerKey='bench')) for _ in range(ROUNDS)) / ROUNDS
+
+    clients = []
+    construct = sum(timed(lambda: clients.append(YouTubeClient('bench'))) for _ in range(ROUNDS)) / ROUNDS
+    first_service = timed(lambda: clients[0].service)
+    next_service = sum(timed(lambda: build_service('bench')) for _ in range(ROUNDS)) / ROUNDS
+    for client in clients:
+        client.close()
+
+    print(f"build('youtube', 'v3') przy każdej konstrukcji: {legacy:8.2f} ms")
+    print(f"YouTubeClient() (usługa leniwa):                {construct:8.2f} ms")
+    print(f"pierwsze użycie .service (parsowanie dokumentu): {first_service:8.2f} ms")
+    print(f"kolejne build_service (dokument w pamięci):     {next_service:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
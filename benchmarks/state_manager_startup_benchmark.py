@@ -0,0 +1,80 @@
+"""
+Benchmark startu StateManager dla 10 000 kanałów.
+
+Porównuje zimny start z pełną walidacją channels.json (regexy, budowa indeksów
+ID/URL) ze startem ze zwalidowanego snapshotu (zgodny skrót SHA-256 w
+channels_snapshot.json). Wyjście print() jest kierowane do /dev/null, ale jego
+formatowanie i zapis wliczają się w czas.
+
+Uruchomienie: python benchmarks/state_manager_startup_benchmark.py
+"""
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+CHANNELS = 10_000
+CATEGORIES = 20
+ROUNDS = 5
+
+
+def synthetic_channels() -> dict:
+    data = {f"category_{c}": [] for c in range(CATEGORIES)}
+    for i in range(CHANNELS):
+        channel_id = f"UC{i:022d}"
+        data[f"category_{i % CATEGORIES}"].append({
+            'id': channel_id,
+            'title': f"Kanał {i}",
+            'description': "Opis kanału " * 5,
+            'subscriber_count': i * 10,
+            'video_count': 100,
+            'view_count': i * 1000,
+            'thumbnail': f"https://yt3.ggpht.com/{channel_id}.jpg",
+            'published_at': '2020-01-01T00:00:00Z',
+            'url': f"https://www.youtube.com/channel/{channel_id}",
+        })
+    return data
+
+
+def start(data_dir: str) -> float:
+    from app.storage.state_manager import StateManager
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        begin = time.perf_counter()
+        StateManager(data_dir=data_dir)
+        return (time.perf_counter() - begin) * 1000
+
+
+def main():
+    data_dir = Path(tempfile.mkdtemp())
+    (data_dir / "channels.json").write_text(
+        json.dumps(synthetic_channels(), ensure_ascii=False, indent=2), encoding='utf-8'
+    )
+    snapshot_file = data_dir / "channels_snapshot.json"
+
+    cold = []
+    for _ in range(ROUNDS):
+        if snapshot_file.exists():
+            snapshot_file.unlink()
+        cold.append(start(str(data_dir)))
+    warm = [start(str(data_dir)) for _ in range(ROUNDS)]
+    raw = (data_dir / "channels.json").read_bytes()
+    decode = []
+    for _ in range(ROUNDS):
+        begin = time.perf_counter()
+        json.loads(raw)
+        decode.append((time.perf_counter() - begin) * 1000)
+
+    print(f"kanały: {CHANNELS}, kategorie: {CATEGORIES}")
+    print(f"start z pełną walidacją:          {min(cold):8.1f} ms")
+    print(f"start ze zwalidowanego snapshotu: {min(warm):8.1f} ms")
+    print(f"samo json.loads channels.json:    {min(decode):8.1f} ms ({len(raw) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
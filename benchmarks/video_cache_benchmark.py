@@ -0,0 +1,84 @@
+"""
+Benchmark zapisu pojedynczego filmu do cache w zależności od jego rozmiaru.
+
+Porównuje stary video_cache.json (pełny zapis pliku po każdym filmie)
+z VideoCacheStore (SQLite WAL, zapis per wpis).
+
+Uruchomienie: python benchmarks/video_cache_benchmark.py
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.youtube.video_cache import VideoCacheStore
+
+SIZES = [1_000, 10_000, 50_000]
+SAMPLES = 20
+
+
+def sample_video(i: int) -> dict:
+    return {
+        'id': f"vid{i:08d}",
+        'title': f"Film testowy numer {i}",
+        'description': "Opis filmu " * 20,
+        'published_at': '2025-01-01T00:00:00Z',
+        'tags': ['polityka', 'wywiad', 'podcast'],
+        'category_id': '22',
+        'view_count': i * 10,
+        'like_count': i,
+        'comment_count': i // 10,
+        'favorite_count': 0,
+        'duration': 'PT12M3S',
+        'definition': 'hd',
+        'caption': 'false',
+        'licensed_content': True,
+        'thumbnail': f"https://i.ytimg.com/vi/vid{i:08d}/default.jpg",
+        'url': f"https://www.youtube.com/watch?v=vid{i:08d}",
+    }
+
+
+def bench_json(size: int, workdir: Path) -> float:
+    cache_file = workdir / "video_cache.json"
+    now = datetime.now().timestamp()
+    cache = {f"vid{i:08d}": {'data': sample_video(i), 'timestamp': now} for i in range(size)}
+    start = time.perf_counter()
+    for n in range(SAMPLES):
+        i = size + n
+        cache[f"vid{i:08d}"] = {'data': sample_video(i), 'timestamp': now}
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False, indent=2)
+    return (time.perf_counter() - start) / SAMPLES
+
+
+def bench_sqlite(size: int, workdir: Path) -> float:
+    store = VideoCacheStore(workdir / f"video_cache_{size}.db")
+    store.put_many({f"vid{i:08d}": sample_video(i) for i in range(size)})
+    start = time.perf_counter()
+    for n in range(SAMPLES):
+        i = size + n
+        store.put(f"vid{i:08d}", sample_video(i))
+    elapsed = (time.perf_counter() - start) / SAMPLES
+    store.close()
+    return elapsed
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        print(f"{'wpisów':>8} | {'JSON [ms/zapis]':>16} | {'SQLite [ms/zapis]':>18}")
+        print("-" * 48)
+        for size in SIZES:
+            json_ms = bench_json(size, workdir) * 1000
+            sqlite_ms = bench_sqlite(size, workdir) * 1000
+            print(f"{size:>8} | {json_ms:>16.2f} | {sqlite_ms:>18.3f}")
+            os.remove(workdir / "video_cache.json")
+
+
+if __name__ == "__main__":
+    main()
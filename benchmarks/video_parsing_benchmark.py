@@ -0,0 +1,108 @@
+"""
+Micro-benchmark parsowania odpowiedzi videos.list.
+
+Porównuje pełną odpowiedź (part=snippet,statistics,contentDetails) parsowaną do
+słownika z 16 kluczami z odpowiedzią przyciętą maską fields= i parsowaną do
+VideoRecord. Dane: zapisana odpowiedź z 50 filmami (benchmarks/data).
+
+Uruchomienie: python benchmarks/video_parsing_benchmark.py
+"""
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.youtube.records import VideoRecord
+
+RESPONSE_FILE = Path(__file__).resolve().parent / "data" / "videos_list_response.json"
+ROUNDS = 200  # 200 odpowiedzi x 50 filmów = 10 000 filmów
+
+
+def apply_video_mask(response: dict) -> dict:
+    """Odtwarza to, co zwraca API dla VIDEO_FIELDS_MASK"""
+    items = []
+    for item in response['items']:
+        snippet = item['snippet']
+        details = item['contentDetails']
+        items.append({
+            'id': item['id'],
+            'snippet': {
+                'publishedAt': snippet['publishedAt'],
+                'title': snippet['title'],
+                'description': snippet['description'],
+                'thumbnails': {'default': {'url': snippet['thumbnails']['default']['url']}},
+                'tags': snippet.get('tags', []),
+                'categoryId': snippet['categoryId'],
+            },
+            'contentDetails': {key: details[key] for key in ('duration', 'definition', 'caption', 'licensedContent')},
+            'statistics': item['statistics'],
+        })
+    return {'items': items}
+
+
+def parse_to_dict(video: dict) -> dict:
+    """Dotychczasowe parsowanie do słownika"""
+    return {
+        'id': video['id'],
+        'title': video['snippet']['title'],
+        'description': video['snippet']['description'],
+        'published_at': video['snippet']['publishedAt'],
+        'tags': video['snippet'].get('tags', []),
+        'category_id': video['snippet']['categoryId'],
+        'view_count': int(video['statistics'].get('viewCount', 0)),
+        'like_count': int(video['statistics'].get('likeCount', 0)),
+        'comment_count': int(video['statistics'].get('commentCount', 0)),
+        'favorite_count': int(video['statistics'].get('favoriteCount', 0)),
+        'duration': video['contentDetails']['duration'],
+        'definition': video['contentDetails']['definition'],
+        'caption': video['contentDetails']['caption'],
+        'licensed_content': video['contentDetails']['licensedContent'],
+        'thumbnail': video['snippet']['thumbnails']['default']['url'],
+        'url': f"https://www.youtube.com/watch?v={video['id']}"
+    }
+
+
+def bench(payload: bytes, parse) -> tuple:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        response = json.loads(payload)
+    decode = time.perf_counter() - start
+
+    response = json.loads(payload)
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        parsed = [parse(item) for item in response['items']]
+    parse_time = time.perf_counter() - start
+
+    # Pamięć samych rekordów (odpowiedź już zdekodowana)
+    responses = [json.loads(payload) for _ in range(ROUNDS)]
+    tracemalloc.start()
+    parsed = [parse(item) for response in responses for item in response['items']]
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return decode, parse_time, memory / len(parsed)
+
+
+def main():
+    full = json.loads(RESPONSE_FILE.read_text(encoding='utf-8'))
+    full_payload = json.dumps(full, ensure_ascii=False, indent=2).encode('utf-8')
+    lean_payload = json.dumps(apply_video_mask(full), ensure_ascii=False, indent=2).encode('utf-8')
+    videos = len(full['items']) * ROUNDS
+
+    rows = [
+        ("pełna odpowiedź + dict", full_payload, parse_to_dict),
+        ("fields= + VideoRecord", lean_payload, VideoRecord.from_api),
+    ]
+    print(f"{'wariant':<24} | {'bajty/odp.':>10} | {'decode [µs/film]':>16} | {'parse [µs/film]':>15} | {'pamięć [B/film]':>15}")
+    print("-" * 92)
+    for name, payload, parse in rows:
+        decode, parse_time, memory = bench(payload, parse)
+        print(f"{name:<24} | {len(payload):>10} | {decode / videos * 1e6:>16.2f} | "
+              f"{parse_time / videos * 1e6:>15.2f} | {memory:>15.0f}")
+
+
+if __name__ == "__main__":
+    main()
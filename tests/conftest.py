@@ -0,0 +1,325 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, urlencode, urlparse
+
+import httplib2
+import pytest
+import pytz
+from googleapiclient.errors import HttpError
+
+_session_dirs = None
+
+
+def pytest_configure(config):
+    """Aplikacja importowana w testach (app.main) pisze dane, raporty i log do katalogu tymczasowego, nie do repozytorium"""
+    global _session_dirs
+    _session_dirs = tempfile.mkdtemp(prefix="hook-boost-tests-")
+    os.environ["DATA_DIR"] = os.path.join(_session_dirs, "data")
+    os.environ["REPORTS_DIR"] = os.path.join(_session_dirs, "reports")
+    os.environ["LOG_FILE"] = os.path.join(_session_dirs, "logs", "app.log")
+
+
+def pytest_unconfigure(config):
+    if _session_dirs:
+        shutil.rmtree(_session_dirs, ignore_errors=True)
+
+
+class FakeRequest:
+    """Imituje googleapiclient.http.HttpRequest"""
+
+    def __init__(self, service, resource, params):
+        self.service = service
+        self.resource = resource
+        self.params = params
+        self.headers = {}
+        query = urlencode(sorted((k, str(v)) for k, v in params.items() if v is not None))
+        self.uri = f"https://youtube.googleapis.com/youtube/v3/{resource}?{query}&key=test-key"
+
+    def execute(self, http=None, num_retries=0):
+        key = parse_qs(urlparse(self.uri).query).get('key', [''])[0]
+        return self.service.handle(self.resource, self.params, self.headers, key=key)
+
+
+class FakeResource:
+    def __init__(self, service, name):
+        self.service = service
+        self.name = name
+
+    def list(self, **params):
+        return FakeRequest(self.service, self.name, params)
+
+
+class FakeBatch:
+    """Imituje googleapiclient.http.BatchHttpRequest"""
+
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id=None):
+        self.requests.append((request_id, request))
+
+    def execute(self, http=None):
+        self.service.batches.append(len(self.requests))
+        for request_id, request in self.requests:
+            try:
+                self.callback(request_id, request.execute(), None)
+            except Exception as e:
+                self.callback(request_id, None, e)
+
+
+class FakeYouTubeService:
+    """
+    Minimalna atrapa YouTube Data API v3.
+
+    channels: słownik channel_id -> liczba filmów (najnowsze pierwsze, co 6h)
+    handles: słownik handle -> channel_id rozpoznawany przez forHandle
+    exhausted_keys: klucze API, dla których zwracany jest 403 quotaExceeded
+    """
+
+    def __init__(self, channels, delay=0.0, handles=None):
+        self.delay = delay
+        self.handles = handles or {}
+        self.calls = []
+        self.batches = []
+        self.not_modified = 0
+        self.fault = None  # fault(resource, params) - może rzucić wyjątek lub spowolnić odpowiedź
+        self.exhausted_keys = set()
+        self.keys_used = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        now = datetime.now(pytz.utc)
+        self.uploads = {}
+        for channel_id, count in channels.items():
+            self.uploads[channel_id] = [
+                (f"{channel_id[-4:]}v{i:03d}", now - timedelta(hours=6 * i + 1))
+                for i in range(count)
+            ]
+
+    def channels(self):
+        return FakeResource(self, 'channels')
+
+    def playlistItems(self):
+        return FakeResource(self, 'playlistItems')
+
+    def videos(self):
+        return FakeResource(self, 'videos')
+
+    def search(self):
+        return FakeResource(self, 'search')
+
+    def new_batch_http_request(self, callback=None):
+        return FakeBatch(self, callback)
+
+    def count_calls(self, resource):
+        return sum(1 for name, _ in self.calls if name == resource)
+
+    def handle(self, resource, params, headers=None, key=None):
+        with self._lock:
+            self.calls.append((resource, params))
+            self.keys_used.append(key)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                time.sleep(self.delay)
+            if key in self.exhausted_keys:
+                raise http_error(403, 'quotaExceeded')
+            if self.fault:
+                self.fault(resource, params)
+            response = getattr(self, f"_{resource}")(params)
+            etag = hashlib.md5(json.dumps(response, sort_keys=True).encode('utf-8')).hexdigest()
+            if headers and headers.get('If-None-Match') == etag:
+                with self._lock:
+                    self.not_modified += 1
+                raise HttpError(httplib2.Response({'status': 304}), b'')
+            return dict(response, etag=etag)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _channels(self, params):
+        if 'forHandle' in params:
+            found = self.handles.get(params['forHandle'].lstrip('@').lower())
+            ids = [found] if found else []
+        else:
+            ids = params['id'].split(',')
+        return {'items': [
+            {
+                'id': channel_id,
+                'snippet': {
+                    'title': f"Kanał {channel_id}",
+                    'description': '',
+                    'publishedAt': '2020-01-01T00:00:00Z',
+                    'thumbnails': {'default': {'url': f"https://yt3.ggpht.com/{channel_id}.jpg"}},
+                },
+                'statistics': {'subscriberCount': '1000', 'videoCount': str(len(self.uploads[channel_id])), 'viewCount': '5000'},
+                'contentDetails': {'relatedPlaylists': {'uploads': 'UU' + channel_id[2:]}},
+            }
+            for channel_id in ids if channel_id in self.uploads
+        ]}
+
+    def _search(self, params):
+        return {'items': []}
+
+    def _playlistItems(self, params):
+        channel_id = 'UC' + params['playlistId'][2:]
+        items = self.uploads[channel_id]
+        start = int(params.get('pageToken') or 0)
+        page = items[start:start + params.get('maxResults', 50)]
+        response = {'items': [
+            {
+                'snippet': {'publishedAt': published.strftime('%Y-%m-%dT%H:%M:%SZ')},
+                'contentDetails': {'videoId': video_id},
+            }
+            for video_id, published in page
+        ]}
+        if start + len(page) < len(items):
+            response['nextPageToken'] = str(start + len(page))
+        return response
+
+    def _videos(self, params):
+        published = {
+            video_id: when
+            for uploads in self.uploads.values()
+            for video_id, when in uploads
+        }
+        items = []
+        for video_id in params['id'].split(','):
+            if video_id not in published:
+                continue
+            items.append({
+                'id': video_id,
+                'snippet': {
+                    'title': f"Film {video_id}",
+                    'description': f"Opis {video_id}",
+                    'publishedAt': published[video_id].strftime('%Y-%m-%dT%H:%M:%SZ'),
+                    'tags': ['tag'],
+                    'categoryId': '22',
+                    'thumbnails': {'default': {'url': f"https://i.ytimg.com/vi/{video_id}/default.jpg"}},
+                },
+                'statistics': {'viewCount': '100', 'likeCount': '10', 'commentCount': '1', 'favoriteCount': '0'},
+                'contentDetails': {
+                    'duration': 'PT12M3S',
+                    'definition': 'hd',
+                    'caption': 'false',
+                    'licensedContent': True,
+                },
+            })
+        return {'items': items}
+
+
+def http_error(status, reason=''):
+    """HttpError jak z googleapiclient (treść w formacie błędów YouTube API)"""
+    content = json.dumps({'error': {'code': status, 'message': reason, 'errors': [{'reason': reason}]}})
+    return HttpError(httplib2.Response({'status': status}), content.encode('utf-8'))
+
+
+class FakeStateManager:
+    """Atrapa StateManager zliczająca quota i trzymająca metadane kanałów w pamięci"""
+
+    def __init__(self):
+        self._lock = threading.Lock()  # quota zliczana w wątkach klienta (każda próba zapytania)
+        self.quota_used = 0
+        self.keys_quota = {}
+        self.exhausted_keys = set()
+        self.uploads_playlists = {}
+        self.handles = {}
+        self.watermarks = {}
+        self.watermark_saves = 0
+
+    def add_quota_used(self, amount: int, key_id=None):
+        with self._lock:
+            self.quota_used += amount
+            if key_id:
+                self.keys_quota[key_id] = self.keys_quota.get(key_id, 0) + amount
+
+    def get_key_quota_used(self, key_id):
+        return self.keys_quota.get(key_id, 0)
+
+    def is_key_exhausted(self, key_id):
+        return key_id in self.exhausted_keys
+
+    def mark_key_exhausted(self, key_id):
+        self.exhausted_keys.add(key_id)
+
+    def get_quota_used(self) -> int:
+        return self.quota_used
+
+    def get_uploads_playlist(self, channel_id):
+        return self.uploads_playlists.get(channel_id)
+
+    def set_uploads_playlists(self, playlists):
+        self.uploads_playlists.update(playlists)
+
+    def get_channel_id_for_handle(self, handle):
+        return self.handles.get(handle.lstrip('@').lower())
+
+    def set_channel_id_for_handle(self, handle, channel_id):
+        self.handles[handle.lstrip('@').lower()] = channel_id
+
+    def flush_quota(self):
+        pass
+
+    def get_watermark(self, channel_id):
+        return self.watermarks.get(channel_id)
+
+    def set_watermarks(self, watermarks):
+        self.watermarks.update(watermarks)
+        self.watermark_saves += 1
+
+
+@pytest.fixture
+def youtube_client_factory(data_dir):
+    """Tworzy YouTubeClient podpięty pod atrapę API (cache w katalogu tymczasowym)"""
+    from app.youtube.client import YouTubeClient
+
+    clients = []
+
+    def factory(service, max_concurrency=4, state_manager=None, api_keys="test-key", **options):
+        client = YouTubeClient(api_keys, state_manager or FakeStateManager(),
+                               max_concurrency=max_concurrency, **options)
+        client.RETRY_BASE_DELAY = 0.001
+        client.service = service
+        clients.append(client)
+        return client
+
+    yield factory
+    for client in clients:
+        client.close()
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Katalog danych aplikacji (storage_locations.data) przełączony na katalog tymczasowy"""
+    from app.config import storage_locations
+
+    path = tmp_path / "data"
+    path.mkdir()
+    monkeypatch.setenv("DATA_DIR", str(path))
+    storage_locations.invalidate('data')
+    yield path
+    monkeypatch.undo()
+    storage_locations.invalidate('data')
+
+
+@pytest.fixture
+def reports_dir(tmp_path, monkeypatch):
+    """Katalog raportów aplikacji (settings.reports_path) przełączony na katalog tymczasowy"""
+    from app.config import storage_locations
+
+    path = tmp_path / "reports"
+    path.mkdir()
+    monkeypatch.setenv("REPORTS_DIR", str(path))
+    storage_locations.invalidate('reports')
+    yield path
+    monkeypatch.undo()
+    storage_locations.invalidate('reports')
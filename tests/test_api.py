@@ -2,10 +2,15 @@ import pytest
 from fastapi.testclient import TestClient
 from app.main import app
 
-client = TestClient(app)
 
+@pytest.fixture(scope="module")
+def client():
+    """Klient z uruchomionym lifespan (scheduler i router trendów rejestrowane przy starcie)"""
+    with TestClient(app) as test_client:
+        yield test_client
 
-def test_health_check():
+
+def test_health_check(client):
     """Test health check endpoint"""
     response = client.get("/health")
     assert response.status_code == 200
@@ -14,7 +19,7 @@ def test_health_check():
     assert "version" in data
 
 
-def test_status_endpoint():
+def test_status_endpoint(client):
     """Test status endpoint"""
     response = client.get("/api/v1/status")
     assert response.status_code == 200
@@ -25,7 +30,7 @@ def test_status_endpoint():
     assert "quota_usage" in data
 
 
-def test_channels_endpoint():
+def test_channels_endpoint(client):
     """Test channels endpoint"""
     response = client.get("/api/v1/channels")
     assert response.status_code == 200
@@ -33,7 +38,7 @@ def test_channels_endpoint():
     assert isinstance(data, dict)
 
 
-def test_add_channel_invalid_url():
+def test_add_channel_invalid_url(client):
     """Test adding channel with invalid URL"""
     response = client.post("/api/v1/channels", json={
         "url": "invalid_url",
@@ -42,7 +47,7 @@ def test_add_channel_invalid_url():
     assert response.status_code == 400
 
 
-def test_generate_report_no_channels():
+def test_generate_report_no_channels(client):
     """Test generating report when no channels exist"""
     response = client.post("/api/v1/reports/generate", json={
         "category": None,
@@ -51,7 +56,7 @@ def test_generate_report_no_channels():
     assert response.status_code == 404
 
 
-def test_reports_list():
+def test_reports_list(client):
     """Test reports list endpoint"""
     response = client.get("/api/v1/reports/list")
     assert response.status_code == 200
@@ -60,7 +65,7 @@ def test_reports_list():
     assert isinstance(data["reports"], list)
 
 
-def test_scheduler_control():
+def test_scheduler_control(client):
     """Test scheduler control endpoints"""
     # Start scheduler
     response = client.post("/api/v1/scheduler/start")
@@ -68,4 +73,27 @@ def test_scheduler_control():
     
     # Stop scheduler
     response = client.post("/api/v1/scheduler/stop")
-    assert response.status_code == 200 
\ No newline at end of file
+    assert response.status_code == 200 
+
+def test_download_compressed_report(client, reports_dir, monkeypatch):
+    """Raport .csv.gz idzie z Content-Encoding albo rozpakowany, gdy klient nie przyjmuje gzip"""
+    import gzip
+
+    plain = "Video_ID,Title\nvid1,Film\n".encode()
+    (reports_dir / "report_NEWS_2026-10-14.csv.gz").write_bytes(gzip.compress(plain))
+
+    response = client.get("/api/v1/reports/download/report_NEWS_2026-10-14.csv",
+                          headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert 'filename="report_NEWS_2026-10-14.csv"' in response.headers["content-disposition"]
+    assert response.content == plain
+
+    response = client.get("/api/v1/reports/download/report_NEWS_2026-10-14.csv.gz",
+                          headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert response.content == plain
+
+    listed = client.get("/api/v1/reports/list").json()["reports"]
+    assert [report["filename"] for report in listed] == ["report_NEWS_2026-10-14.csv.gz"]
@@ -0,0 +1,338 @@
+import asyncio
+import csv
+import os
+from datetime import datetime
+
+import pytest
+
+from app.scheduler.task_scheduler import TaskScheduler
+from app.storage.csv_generator import CSVGenerator
+from app.storage import report_columns
+from conftest import FakeYouTubeService
+
+
+def make_video(i, **overrides):
+    video = {
+        'id': f"vid{i:04d}",
+        'channel_title': f"Kanał {i % 3}",
+        'channel_id': f"UC{i % 3:022d}",
+        'published_at': f"2026-10-{10 + i % 5:02d}T{i % 24:02d}:15:00Z",
+        'title': f"Film {i}",
+        'description': "Opis",
+        'tags': ['a', 'b'],
+        'duration': 'PT3M' if i % 2 else 'PT1H2M',
+        'view_count': i * 100,
+        'like_count': i,
+        'comment_count': 0,
+        'favorite_count': 0,
+        'definition': 'hd',
+        'caption': 'false',
+        'licensed_content': bool(i % 2),
+        'category_id': '22',
+        'thumbnail': f"https://i.ytimg.com/vi/vid{i:04d}/default.jpg",
+    }
+    video.update(overrides)
+    return video
+
+
+def test_streamed_report_matches_pandas_output(reports_dir):
+    """Strumieniowy zapis daje bajt w bajt ten sam plik co DataFrame.to_csv"""
+    import pandas as pd
+
+    videos = [make_video(i) for i in range(20)]
+    videos += [
+        make_video(20, title='Tytuł, z przecinkiem i "cudzysłowem"', description="linia 1\nlinia 2\r\nlinia 3"),
+        make_video(21, title='', tags=[], caption=None, description=' spacje '),
+        make_video(22, title='Zażółć gęślą jaźń 🎬', channel_title='"Kanał"'),
+    ]
+    generator = CSVGenerator()
+
+    path = generator.generate_csv(videos, 'news')
+
+    expected = reports_dir / "expected.csv"
+    pd.DataFrame([generator.video_row(v) for v in videos], columns=generator.columns).to_csv(
+        expected, index=False, encoding='utf-8'
+    )
+    assert path.endswith("report_NEWS_2026-10-14.csv")
+    assert open(path, 'rb').read() == expected.read_bytes()
+    assert not list(reports_dir.glob("*.partial"))
+
+
+def test_failed_report_leaves_no_file(reports_dir):
+    """Błąd w trakcie zapisu nie zostawia ani raportu, ani pliku tymczasowego"""
+    generator = CSVGenerator()
+
+    try:
+        with generator.open_report('news') as report:
+            report.add_videos([make_video(1)])
+            report.add_videos([{'id': 'broken'}])  # Brak published_at
+    except KeyError:
+        pass
+
+    assert list(reports_dir.iterdir()) == []
+
+
+def test_reports_streamed_in_channel_order(reports_dir, youtube_client_factory):
+    """Kanały kończące się w dowolnej kolejności trafiają do raportu w kolejności listy"""
+    ids = [f"UC{i:022d}" for i in range(6)]
+    service = FakeYouTubeService({cid: 4 for cid in ids})
+    slow_playlist = 'UU' + ids[0][2:]
+
+    def slow_first_channel(resource, params):
+        if resource == 'playlistItems' and params['playlistId'] == slow_playlist:
+            import time
+            time.sleep(0.1)
+
+    service.fault = slow_first_channel
+    client = youtube_client_factory(service, max_concurrency=6)
+    scheduler = TaskScheduler.__new__(TaskScheduler)
+    scheduler.youtube_client = client
+    scheduler.csv_generator = CSVGenerator()
+    scheduler.state_manager = client.state_manager
+    channels = {
+        'news': [{'id': cid, 'title': f"Kanał {n}"} for n, cid in enumerate(ids[:4])],
+        'sport': [{'id': cid, 'title': f"Kanał {n}"} for n, cid in enumerate(ids[4:], start=4)],
+    }
+
+    reports = asyncio.run(scheduler.stream_category_reports(channels, days_back=3))
+
+    assert {category: report['videos'] for category, report in reports.items()} == {'news': 16, 'sport': 8}
+    with open(reports['news']['path'], encoding='utf-8', newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert [row['Channel_Name'] for row in rows] == [f"Kanał {n}" for n in range(4) for _ in range(4)]
+    assert not list(reports_dir.glob("*.partial"))
+
+
+@pytest.mark.parametrize('sidecar_format', ['parquet', 'npz'])
+def test_report_columns_sidecar(reports_dir, monkeypatch, sidecar_format):
+    """Plik kolumnowy (budowany z zapisywanych wierszy) daje ten sam DataFrame co CSV"""
+    import pandas as pd
+    from pandas.testing import assert_frame_equal
+
+    if sidecar_format == 'parquet':
+        pytest.importorskip('pyarrow')
+    monkeypatch.setattr(report_columns, 'parquet_available', lambda: sidecar_format == 'parquet')
+    videos = [make_video(i) for i in range(10)] + [
+        make_video(10, duration='P0D', view_count=None),
+        # Pola, które pd.read_csv czyta jako brak wartości / inny typ kolumny
+        make_video(11, title='None', description='', tags=[], category_id='', caption=''),
+        # Licznik bez wartości i licznik nie-liczbowy (kolumna wczytywana wtedy z raportu)
+        make_video(12, favorite_count=None, like_count='n/d'),
+    ]
+    path = CSVGenerator().generate_csv(videos, 'news')
+
+    sidecar = report_columns.find_sidecar(path)
+    assert sidecar is not None and sidecar.name == f"report_NEWS_2026-10-14.columns.{sidecar_format}"
+    df = report_columns.read_report(path)
+    assert_frame_equal(df, report_columns.add_derived_columns(pd.read_csv(path)))
+    assert df['duration_seconds'].tolist()[:2] == [3720, 180]
+    assert df['is_short'].tolist()[:2] == [False, True]
+    assert df['duration_seconds'].iloc[10] == report_columns.UNKNOWN
+    assert df['View_Count'].dtype == 'int64' and df['View_Count'].iloc[10] == 0
+    assert df['Topic_Categories'].dtype == 'float64' and df['Has_Captions'].dtype == object
+    assert df['Title'].isna().tolist() == [False] * 11 + [True, False]
+    assert df['Favorite_Count'].dtype == 'float64' and df['Like_Count'].iloc[12] == 0
+    assert df['published_ts'].iloc[1] == int(datetime.fromisoformat(videos[1]['published_at']).timestamp())
+    assert report_columns.read_report(path, columns=['Video_ID', 'is_short', 'missing']).columns.tolist() == ['Video_ID', 'is_short']
+
+    # Raport nadpisany po zapisie kolumn - czytelnicy wracają do CSV
+    os.utime(sidecar, ns=(0, 0))
+    assert report_columns.find_sidecar(path) is None
+    assert_frame_equal(report_columns.read_report(path), df)
+
+
+def test_report_writer_memory_flat(reports_dir):
+    """Pamięć zapisu raportu nie rośnie z liczbą wierszy - poprzednie porcje nie zostają w buforach"""
+    import tracemalloc
+
+    batch = [make_video(i, description="Opis filmu " * 100, tags=['tag'] * 30) for i in range(200)]
+    report = CSVGenerator().open_report('news')
+    try:
+        report.add_videos(batch)
+        tracemalloc.start()
+        report.add_videos(batch)
+        after_one = tracemalloc.get_traced_memory()[0]
+        for _ in range(20):
+            report.add_videos(batch)
+        after_many = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        path = report.finalize()
+    finally:
+        report.abort()
+
+    # 20 porcji tekstu to ~5 MB - w pamięci zostaje najwyżej drobny narzut
+    assert after_many - after_one < 256 * 1024, after_many - after_one
+    df = report_columns.read_report(path, columns=['Video_ID', 'View_Count', 'is_short'])
+    assert len(df) == 22 * 200
+
+
+def test_report_written_without_pandas(tmp_path):
+    """Zapis raportu z plikiem kolumnowym .npz (bez pyarrow, jak z requirements.txt) nie ładuje pandas"""
+    import json
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    root = Path(__file__).resolve().parent.parent
+    script = (
+        "import json, sys\n"
+        "sys.modules['pyarrow'] = None\n"
+        "sys.path.insert(0, 'tests')\n"
+        "from test_csv_generator import make_video\n"
+        "from app.storage.csv_generator import CSVGenerator\n"
+        "from app.storage.report_columns import find_sidecar\n"
+        "path = CSVGenerator().generate_csv([make_video(i) for i in range(5)], 'news')\n"
+        "print(json.dumps({'sidecar': str(find_sidecar(path)), 'pandas': 'pandas' in sys.modules}))\n"
+    )
+    env = dict(os.environ, PYTHONPATH=str(root), DATA_DIR=str(tmp_path / "data"),
+               REPORTS_DIR=str(tmp_path / "reports"), LOG_LEVEL="WARNING")
+    result = subprocess.run([sys.executable, "-c", script], cwd=root, env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    written = json.loads(result.stdout.strip().splitlines()[-1])
+    assert written['sidecar'] == str(tmp_path / "reports" / "report_NEWS_2026-10-14.columns.npz")
+    assert not written['pandas']
+
+
+def test_daily_report_loader_same_with_sidecar(reports_dir):
+    """load_daily_report zwraca te same rekordy z pliku kolumnowego i z samego CSV"""
+    from app.trend.utils.report_loader import load_daily_report
+
+    videos = [make_video(i) for i in range(10)] + [make_video(10, duration='', title='#shorts')]
+    path = CSVGenerator().generate_csv(videos, 'news')
+
+    with_sidecar = load_daily_report('news', '2026-10-14')
+    report_columns.find_sidecar(path).unlink()
+    assert load_daily_report('news', '2026-10-14') == with_sidecar
+    assert [r['duration_seconds'] for r in with_sidecar][:2] == [3720, 180]
+    assert with_sidecar[-1]['duration_seconds'] is None and with_sidecar[-1]['is_short']
+
+
+def test_compressed_report_read_transparently(reports_dir, monkeypatch):
+    """Raport .csv.gz ma te same bajty po rozpakowaniu i czytelnicy trendów widzą go jak zwykły CSV"""
+    import gzip
+    from app.config import settings
+    from app.trend.utils.report_loader import load_daily_report, _available_dates_for_category
+
+    videos = [make_video(i) for i in range(10)]
+    plain_path = CSVGenerator().generate_csv(videos, 'news')
+    plain_bytes = open(plain_path, 'rb').read()
+    plain_records = load_daily_report('news', '2026-10-14')
+
+    monkeypatch.setattr(settings, 'report_compression', 'gzip')
+    path = CSVGenerator().generate_csv(videos, 'news')
+
+    assert path.endswith("report_NEWS_2026-10-14.csv.gz")
+    assert gzip.decompress(open(path, 'rb').read()) == plain_bytes
+    # Poprzednia, nieskompresowana wersja raportu została zastąpiona
+    assert sorted(p.name for p in reports_dir.glob("report_NEWS_*.csv*")) == ["report_NEWS_2026-10-14.csv.gz"]
+    assert report_columns.find_sidecar(path) is not None
+    assert load_daily_report('news', '2026-10-14') == plain_records
+    assert _available_dates_for_category('news') == ['2026-10-14']
+
+
+def test_compact_reports_store_text_once(reports_dir, monkeypatch):
+    """W trybie kompaktowym opisy i tagi są w magazynie raz, a czytelnicy tekstów dostają je po skrócie"""
+    from app.analysis import NameExtractor
+    from app.config import settings
+    from app.storage.text_store import get_text_store
+    from app.trend.utils.report_loader import load_daily_report
+
+    videos = [make_video(i, description=f"Rozmowa z Janem Kowalskim {i % 2}") for i in range(10)]
+    CSVGenerator().generate_csv(videos, 'news')
+    inline_records = load_daily_report('news', '2026-10-14')
+
+    monkeypatch.setattr(settings, 'report_compact_text', True)
+    path = CSVGenerator().generate_csv(videos, 'news')
+    CSVGenerator().generate_csv(videos, 'sport')
+
+    with open(path, encoding='utf-8', newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert 'Description' not in rows[0] and 'Tags' not in rows[0]
+    assert len({row['Description_Hash'] for row in rows}) == 2
+    # Dwa opisy i jeden zestaw tagów, mimo 20 wierszy w dwóch raportach
+    assert get_text_store().count() == 3
+    assert report_columns.read_report(path)['Description_Hash'].tolist() == [row['Description_Hash'] for row in rows]
+    assert load_daily_report('news', '2026-10-14') == inline_records
+    assert "Janem Kowalskim" in NameExtractor().extract_from_video_data(rows[0])
+
+
+def test_daily_growth_from_stats_series(reports_dir):
+    """Raporty dopisują obserwacje do szeregu, a przyrost dnia liczy się bez raportu z poprzedniego dnia"""
+    from app.storage.stats_series import get_stats_series
+    from app.trend.utils.report_loader import build_daily_growth
+
+    day_one = [make_video(i, published_at="2026-10-14T08:00:00Z") for i in range(4)]
+    day_two = [make_video(i, published_at="2026-10-14T08:00:00Z", view_count=i * 100 + 50) for i in range(4)]
+    day_two.append(make_video(4, published_at="2026-10-15T09:00:00Z", view_count=10))
+    CSVGenerator().generate_csv(day_one, 'news')
+    CSVGenerator().generate_csv(day_two, 'news')
+
+    series = get_stats_series()
+    assert series.views_on('news', '2026-10-14') == {f"vid{i:04d}": i * 100 for i in range(4)}
+    assert series.latest_before(['vid0001', 'vid0004'], '2026-10-15') == {'vid0001': ('2026-10-14', 100)}
+    assert series.growth('news', '2026-10-14', '2026-10-15')['vid0002'] == 50
+
+    # Poprzedni dzień czytany z szeregu - raport z 14.10 nie jest potrzebny
+    for path in reports_dir.glob("report_NEWS_2026-10-14.*"):
+        path.unlink()
+    growth = {record['video_id']: record for record in build_daily_growth('news', '2026-10-15')}
+    assert growth['vid0003']['views_yesterday'] == 300 and growth['vid0003']['delta'] == 50
+    assert growth['vid0004']['views_yesterday'] == 0 and growth['vid0004']['delta'] == 10
+
+
+def test_stats_series_keeps_video_in_each_category(tmp_path):
+    """Film z raportów dwóch kategorii tego samego dnia ma obserwację w każdej z nich"""
+    from app.storage.stats_series import StatsSeriesStore
+
+    series = StatsSeriesStore(tmp_path / "stats_series.db")
+    series.record('news', '2026-10-14', [('vid0001', 100, 1, 1)])
+    series.record('sport', '2026-10-14', [('vid0001', 120, 1, 1)])
+    series.record('news', '2026-10-14', [('vid0001', 110, 1, 1)])  # ponowny raport dnia
+
+    assert series.views_on('news', '2026-10-14') == {'vid0001': 110}
+    assert series.views_on('sport', '2026-10-14') == {'vid0001': 120}
+    assert series.latest_before(['vid0001'], '2026-10-15', 'sport') == {'vid0001': ('2026-10-14', 120)}
+    assert series.latest_before(['vid0001'], '2026-10-15') == {'vid0001': ('2026-10-14', 120)}
+    assert series.count() == 2
+    series.close()
+
+
+def test_stats_series_migrates_old_key(tmp_path):
+    """Baza z kluczem (video_id, date) dostaje kategorię w kluczu bez utraty obserwacji"""
+    import sqlite3
+    from app.storage.stats_series import StatsSeriesStore
+
+    path = tmp_path / "stats_series.db"
+    conn = sqlite3.connect(str(path))
+    conn.execute(
+        "CREATE TABLE observations (video_id TEXT NOT NULL, date TEXT NOT NULL, category TEXT NOT NULL, "
+        "views INTEGER NOT NULL, likes INTEGER NOT NULL, comments INTEGER NOT NULL, "
+        "PRIMARY KEY (video_id, date)) WITHOUT ROWID"
+    )
+    conn.execute("INSERT INTO observations VALUES ('vid0001', '2026-10-14', 'NEWS', 100, 1, 1)")
+    conn.commit()
+    conn.close()
+
+    series = StatsSeriesStore(path)
+    series.record('sport', '2026-10-14', [('vid0001', 120, 1, 1)])
+
+    assert series.views_on('news', '2026-10-14') == {'vid0001': 100}
+    assert series.views_on('sport', '2026-10-14') == {'vid0001': 120}
+    series.close()
+
+
+def test_summary_report_not_recorded_in_stats_series(reports_dir):
+    """Raport podsumowujący nie dopisuje obserwacji - filmy są w szeregu z raportów kategorii"""
+    from app.storage.stats_series import get_stats_series
+
+    videos = [make_video(i, published_at="2026-10-14T08:00:00Z") for i in range(3)]
+    CSVGenerator().generate_csv(videos, 'news')
+    series = get_stats_series()
+    assert series.count() == 3
+
+    CSVGenerator().generate_summary_csv({'news': videos})
+
+    assert list(reports_dir.glob("report_SUMMARY_*.csv"))
+    assert series.count() == 3
+    assert series.dates('news') == ['2026-10-14']
@@ -0,0 +1,63 @@
+import asyncio
+
+from app.youtube.quota_planner import QuotaPlanner
+from conftest import FakeYouTubeService
+
+
+def channel_id(i: int) -> str:
+    return f"UC{i:022d}"
+
+
+def scanned_client(youtube_client_factory, count=4):
+    """Klient po jednym skanie - znane playlisty, watermarki i cache filmów"""
+    ids = [channel_id(i) for i in range(count)]
+    service = FakeYouTubeService({cid: 8 for cid in ids})
+    client = youtube_client_factory(service)
+    channels = [{'id': cid, 'title': cid, 'subscriber_count': (i + 1) * 1000} for i, cid in enumerate(ids)]
+    asyncio.run(client.get_videos_for_channels(channels, days_back=3))
+    return client, service, channels
+
+
+def test_plan_fits_with_warm_cache(youtube_client_factory):
+    """Po skanie koszt to strony playlist i nowe filmy - bez pobierania znanych metadanych"""
+    client, _, channels = scanned_client(youtube_client_factory)
+    planner = QuotaPlanner(client, client.state_manager)
+
+    plan = planner.plan({'news': channels}, days_back=3)
+
+    assert plan['fits']
+    assert plan['lookup_cost'] == 0
+    assert plan['cache_hit_rate'] == 1.0
+    entries = plan['categories']['news']['channels']
+    assert [entry['id'] for entry in entries] == [c['id'] for c in reversed(channels)]
+    assert all(entry['mode'] == QuotaPlanner.MODE_FULL for entry in entries)
+    assert all(entry['estimated_cost'] == 2 for entry in entries)  # 1 strona + 1 zapytanie o nowe filmy
+
+
+def test_tight_budget_degrades_lowest_priority_first(youtube_client_factory):
+    """Przy braku quota najpierw znikają statystyki, potem kanały o najniższym priorytecie"""
+    client, service, channels = scanned_client(youtube_client_factory)
+    client.stats_ttl = 0  # każdy kanał ma statystyki do odświeżenia
+    planner = QuotaPlanner(client, client.state_manager)
+    categories = {'news': channels[:2], 'music': channels[2:]}
+
+    plan = planner.plan(categories, days_back=3, available=4)
+
+    assert not plan['fits']
+    for category in ('news', 'music'):
+        category_plan = plan['categories'][category]
+        assert category_plan['planned_cost'] <= category_plan['budget']
+        high, low = category_plan['channels']
+        assert high['priority'] > low['priority']
+        assert high['mode'] == QuotaPlanner.MODE_NO_STATS
+        assert low['mode'] == QuotaPlanner.MODE_SKIP
+
+    plan = planner.plan(categories, days_back=3, available=10)
+    ordered, skip_stats = QuotaPlanner.apply(plan, categories)
+    assert skip_stats == {channels[0]['id'], channels[2]['id']}
+    assert [c['id'] for c in ordered['news']] == [channels[1]['id'], channels[0]['id']]
+
+    service.calls.clear()
+    low_id = channels[0]['id']
+    asyncio.run(client.get_channel_videos(low_id, days_back=3, refresh_stats=False))
+    assert not [params for name, params in service.calls if name == 'videos' and params['part'] == 'statistics']
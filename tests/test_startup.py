@@ -0,0 +1,61 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Restart lub nowy worker na Railway ma odpowiadać na /health w ciągu 1-2 s
+STARTUP_BUDGET_SECONDS = 2.0
+
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from app.main import app
+imported = time.perf_counter() - start
+heavy = [name for name in ('pandas', 'googleapiclient.discovery', 'app.trend.routers.router') if name in sys.modules]
+from fastapi.testclient import TestClient
+with TestClient(app) as client:
+    status = client.get('/health').status_code
+    ready = time.perf_counter() - start
+print(json.dumps({'import': imported, 'ready': ready, 'status': status, 'heavy': heavy}))
+"""
+
+
+def test_startup_within_budget(tmp_path):
+    """Import app.main i pierwsze 200 z /health mieszczą się w budżecie, bez ładowania pandas"""
+    # Proces startuje w tmp_path, więc .env repozytorium nie jest wczytywany
+    env = dict(os.environ, PYTHONPATH=str(ROOT), DATA_DIR=str(tmp_path / "data"),
+               REPORTS_DIR=str(tmp_path / "reports"), LOG_LEVEL="WARNING")
+    env.setdefault("SECRET_KEY", "test")
+    result = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], cwd=tmp_path, env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    startup = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert startup['status'] == 200
+    assert startup['heavy'] == []
+    assert startup['ready'] < STARTUP_BUDGET_SECONDS, startup
+
+
+def test_warm_up_generates_missing_ranking(reports_dir):
+    """Rozgrzewka po starcie tworzy ranking kategorii, która ma raporty, ale nie ma rankingu"""
+    import asyncio
+    from app.main import warm_up_rankings
+    from app.storage.csv_generator import CSVGenerator
+    from test_csv_generator import make_video
+
+    class ChannelsOnly:
+        def get_channels(self):
+            return {'news': [{'id': 'UC0', 'title': 'Kanał 0'}]}
+
+    CSVGenerator().generate_csv([make_video(i) for i in range(6)], 'news')
+    assert not list(reports_dir.glob("ranking_NEWS_*.json"))
+
+    asyncio.run(warm_up_rankings(ChannelsOnly()))
+
+    rankings = list(reports_dir.glob("ranking_NEWS_*.json"))
+    assert len(rankings) == 1
+    ranking = json.loads(rankings[0].read_text(encoding='utf-8'))
+    assert ranking['csv_reports_count'] == 1
@@ -0,0 +1,226 @@
+import json
+
+import pytest
+
+from app.storage.state_manager import StateManager
+
+
+def test_channel_metadata_persisted(tmp_path):
+    """Playlisty uploadów i handle przetrwają restart StateManager"""
+    manager = StateManager(data_dir=str(tmp_path))
+    manager.set_uploads_playlists({'UC123': 'UU123'})
+    manager.set_channel_id_for_handle('@MojKanal', 'UC123')
+
+    reloaded = StateManager(data_dir=str(tmp_path))
+
+    assert reloaded.get_uploads_playlist('UC123') == 'UU123'
+    assert reloaded.get_channel_id_for_handle('mojkanal') == 'UC123'
+    assert reloaded.get_uploads_playlist('UC999') is None
+
+
+def test_quota_buffered_and_recovered_from_wal(tmp_path, monkeypatch):
+    """Quota liczona w pamięci; po awarii odtwarzana z dziennika z błędem < quota_flush_units"""
+    manager = StateManager(data_dir=str(tmp_path), quota_flush_units=50)
+    writes = []
+    original_write = manager._safe_write_file
+    monkeypatch.setattr(manager, '_safe_write_file', lambda path, data: writes.append(path) or original_write(path, data))
+
+    for _ in range(120):
+        manager.add_quota_used(1)
+
+    assert writes == []  # żadnego pełnego zapisu (fsync) per wywołanie
+    assert manager.get_quota_used() == 120
+
+    # "Awaria" - nowa instancja bez flush_quota()
+    recovered = StateManager(data_dir=str(tmp_path), quota_flush_units=50)
+    assert 120 - 50 < recovered.get_quota_used() <= 120
+
+    manager.flush_quota()
+    assert not manager.quota_wal_file.exists()
+    assert StateManager(data_dir=str(tmp_path)).get_quota_used() == 120
+
+
+def test_quota_per_key_recovered_from_wal(tmp_path):
+    """Zużycie i wyczerpanie kluczy API przetrwa restart (także bez flush_quota())"""
+    manager = StateManager(data_dir=str(tmp_path), quota_flush_units=10)
+    for _ in range(30):
+        manager.add_quota_used(1, key_id='a')
+    manager.add_quota_used(10, key_id='b')
+    manager.mark_key_exhausted('b')
+
+    recovered = StateManager(data_dir=str(tmp_path), quota_flush_units=10)
+    assert recovered.get_key_quota_used('a') == 30
+    assert recovered.get_key_quota_used('b') == 10
+    assert recovered.get_quota_used() == 40
+    assert recovered.is_key_exhausted('b')
+
+    recovered.reset_quota()
+    assert recovered.get_keys_quota() == {}
+    assert not recovered.is_key_exhausted('b')
+
+
+def make_channel(i: int) -> dict:
+    return {
+        'id': f"UC{i:022d}",
+        'title': f"Kanał {i}",
+        'url': f"https://www.youtube.com/channel/UC{i:022d}",
+        'subscriber_count': 1000 * i,
+    }
+
+
+def test_sqlite_backend_migrates_json_state(tmp_path):
+    """Pierwszy start SQLiteStateManager importuje kanały, quota i stan systemu z plików JSON"""
+    from app.storage.sqlite_state_manager import SQLiteStateManager
+
+    legacy = StateManager(data_dir=str(tmp_path))
+    legacy.add_channel(make_channel(1), 'news')
+    legacy.add_channel(make_channel(2), 'music')
+    legacy.add_category('empty')
+    legacy.add_quota_used(7, key_id='a')
+    legacy.flush_quota()
+    legacy.update_system_state('total_reports_generated', 3)
+    legacy.set_uploads_playlists({make_channel(1)['id']: 'UU1'})
+
+    manager = SQLiteStateManager(data_dir=str(tmp_path))
+
+    assert manager.get_channels() == legacy.get_channels()
+    assert list(manager.channels_data) == ['news', 'music', 'empty']
+    assert manager.get_quota_used() == 7
+    assert manager.get_key_quota_used('a') == 7
+    assert manager.get_system_state()['total_reports_generated'] == 3
+    assert manager.get_uploads_playlist(make_channel(1)['id']) == 'UU1'
+    manager.close()
+
+
+def test_sqlite_backend_single_row_updates(tmp_path, monkeypatch):
+    """Zmiany kanałów i stanu to transakcje w bazie - bez przepisywania plików JSON"""
+    from app.storage.state_manager import create_state_manager
+
+    manager = create_state_manager('sqlite', data_dir=str(tmp_path))
+    writes = []
+    monkeypatch.setattr('app.storage.state_manager.StateManager._safe_write_file',
+                        lambda self, path, data: writes.append(path))
+
+    for i in range(1, 4):
+        manager.add_channel(make_channel(i), 'news')
+    with pytest.raises(ValueError, match='already exists'):
+        manager.add_channel(make_channel(2), 'music')
+    manager.remove_channel(make_channel(1)['id'], 'news')
+    manager.add_category('music')
+    manager.update_system_state('last_report_date', '2026-01-01')
+    assert writes == []
+
+    manager.close()
+    reloaded = create_state_manager('sqlite', data_dir=str(tmp_path))
+    assert [c['id'] for c in reloaded.get_channels()['news']] == [make_channel(2)['id'], make_channel(3)['id']]
+    assert reloaded.get_channels()['music'] == []
+    assert reloaded.get_system_state()['last_report_date'] == '2026-01-01'
+    assert make_channel(3)['id'] in reloaded.channel_id_map
+
+    with pytest.raises(ValueError):
+        reloaded.remove_category('news')
+    assert reloaded.remove_category('news', force=True)['channels_count'] == 2
+    assert 'news' not in reloaded.get_channels()
+    reloaded.close()
+
+
+def test_unchanged_channels_snapshot_skips_validation(tmp_path, monkeypatch):
+    """Niezmieniony channels.json jest ładowany bez walidacji; zmiana z zewnątrz ją wymusza"""
+    manager = StateManager(data_dir=str(tmp_path))
+    for i in range(1, 4):
+        manager.add_channel(make_channel(i), 'news')
+
+    validated = []
+    original = StateManager._validate_youtube_url
+    monkeypatch.setattr(StateManager, '_validate_youtube_url',
+                        lambda self, url: validated.append(url) or original(self, url))
+
+    reloaded = StateManager(data_dir=str(tmp_path))
+    assert validated == []
+    assert reloaded.get_channels() == manager.get_channels()
+    assert set(reloaded.channel_id_map) == set(manager.channel_id_map)
+    assert set(reloaded.channel_url_map) == set(manager.channel_url_map)
+
+    # Ręczna edycja pliku - skrót się nie zgadza, pełna walidacja usuwa duplikat
+    data = json.loads(manager.channels_file.read_text(encoding='utf-8'))
+    data['music'] = [make_channel(1)]
+    manager.channels_file.write_text(json.dumps(data), encoding='utf-8')
+    edited = StateManager(data_dir=str(tmp_path))
+    assert len(validated) == 4
+    assert 'music' in edited.get_channels() and edited.get_channels()['music'] == []
+
+
+def test_leader_lock_held_by_one_instance(tmp_path):
+    """Blokadę lidera trzyma jeden właściciel; po zwolnieniu przejmuje ją kolejny"""
+    from app.storage.file_lock import InterProcessLock
+
+    first = InterProcessLock(tmp_path / "scheduler.lock")
+    second = InterProcessLock(tmp_path / "scheduler.lock")
+
+    assert first.try_acquire()
+    assert not second.try_acquire()
+    first.release()
+    assert second.try_acquire() and second.held
+    second.release()
+
+
+def test_workers_share_channels_and_quota(tmp_path):
+    """Dwa StateManager na jednym katalogu danych (dwa workery) widzą wzajemnie swoje zmiany"""
+    worker_a = StateManager(data_dir=str(tmp_path), quota_flush_units=10)
+    worker_b = StateManager(data_dir=str(tmp_path), quota_flush_units=10)
+
+    worker_a.add_channel(make_channel(1), 'news')
+    worker_b.add_channel(make_channel(2), 'news')
+    assert [c['id'] for c in worker_a.get_channels()['news']] == [make_channel(1)['id'], make_channel(2)['id']]
+    with pytest.raises(ValueError):
+        worker_a.add_channel(make_channel(2), 'news')
+
+    for _ in range(25):
+        worker_a.add_quota_used(1, key_id='a')
+        worker_b.add_quota_used(2, key_id='a')
+    worker_a.flush_quota()
+    worker_b.flush_quota()
+    worker_a.flush_quota()
+
+    assert worker_a.get_quota_used() == worker_b.get_quota_used() == 75
+    assert worker_a.get_key_quota_used('a') == 75
+    assert StateManager(data_dir=str(tmp_path)).get_quota_used() == 75
+
+
+def test_workers_share_channel_metadata_and_system_state(tmp_path):
+    """Zapisy metadanych kanałów i stanu systemu jednego workera nie nadpisują zmian drugiego"""
+    worker_a = StateManager(data_dir=str(tmp_path), quota_flush_units=10)
+    worker_b = StateManager(data_dir=str(tmp_path), quota_flush_units=10)
+
+    worker_a.set_uploads_playlists({'UC_a': 'UU_a'})
+    worker_b.set_channel_id_for_handle('@kanal_b', 'UC_b')
+    worker_a.set_watermarks({'UC_a': {'last_video_id': 'vid_a'}})
+    worker_b.set_watermarks({'UC_b': {'last_video_id': 'vid_b'}})
+    worker_a.update_system_state('last_report_date', '2024-01-02')
+    worker_b.update_system_state('total_reports_generated', 3)
+
+    reloaded = StateManager(data_dir=str(tmp_path))
+    assert reloaded.get_uploads_playlist('UC_a') == 'UU_a'
+    assert reloaded.get_channel_id_for_handle('@kanal_b') == 'UC_b'
+    assert reloaded.get_watermark('UC_a') == {'last_video_id': 'vid_a'}
+    assert reloaded.get_watermark('UC_b') == {'last_video_id': 'vid_b'}
+    assert reloaded.get_system_state()['last_report_date'] == '2024-01-02'
+    assert reloaded.get_system_state()['total_reports_generated'] == 3
+    assert worker_b.get_uploads_playlist('UC_a') == 'UU_a'
+
+
+def test_persist_quota_keeps_other_workers_units(tmp_path):
+    """Zapis quota po raporcie jednego workera nie gubi jednostek drugiego (w pliku i w dzienniku)"""
+    worker_a = StateManager(data_dir=str(tmp_path), quota_flush_units=10)
+    worker_b = StateManager(data_dir=str(tmp_path), quota_flush_units=10)
+
+    worker_b.add_quota_used(30, key_id='b')  # trafia do dziennika
+    worker_b.flush_quota()                   # i do quota_state.json
+    worker_b.add_quota_used(15, key_id='b')  # tylko dziennik
+    worker_a.add_quota_used(7, key_id='a')   # niezalogowane w pamięci workera A
+
+    assert worker_a.persist_quota() == 52
+    assert worker_a.get_key_quota_used('b') == 45
+    reloaded = StateManager(data_dir=str(tmp_path))
+    assert reloaded.get_quota_used() == 52
+    assert reloaded.get_key_quota_used('a') == 7
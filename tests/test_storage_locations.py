@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+
+from app.config import storage as storage_module
+from app.config.storage import StorageLocations
+
+
+def make_locations(tmp_path, monkeypatch):
+    for variable in ("DATA_DIR", "REPORTS_DIR", "RAILWAY_VOLUME_MOUNT_PATH", "RAILWAY_VOLUME_PATH"):
+        monkeypatch.delenv(variable, raising=False)
+    monkeypatch.setattr(storage_module, "DEFAULT_VOLUME", str(tmp_path / "missing-volume"))
+    settings = SimpleNamespace(data_dir=str(tmp_path / "data"), reports_dir=str(tmp_path / "reports"))
+    return StorageLocations(settings)
+
+
+def test_reports_path_probed_once(tmp_path, monkeypatch):
+    """Katalog jest sprawdzany przy pierwszym użyciu, kolejne odczyty nie dotykają dysku"""
+    locations = make_locations(tmp_path, monkeypatch)
+    monkeypatch.setenv("RAILWAY_VOLUME_MOUNT_PATH", str(tmp_path / "volume"))
+    probes = []
+    original = StorageLocations._is_writable
+    monkeypatch.setattr(StorageLocations, "_is_writable",
+                        staticmethod(lambda path: probes.append(path) or original(path)))
+
+    for _ in range(5):
+        assert locations.reports == tmp_path / "volume" / "reports"
+    assert probes == [tmp_path / "volume" / "reports"]
+    assert locations.status()['reports'] == str(tmp_path / "volume" / "reports")
+
+    locations.invalidate('reports')
+    assert locations.reports == tmp_path / "volume" / "reports"
+    assert len(probes) == 2
+
+
+def test_unwritable_volume_falls_back_to_local(tmp_path, monkeypatch):
+    """Wolumen tylko do odczytu - używany jest lokalny katalog z ustawień"""
+    locations = make_locations(tmp_path, monkeypatch)
+    blocker = tmp_path / "volume"
+    blocker.write_text("not a directory")
+    monkeypatch.setenv("RAILWAY_VOLUME_PATH", str(blocker))
+
+    assert locations.data == tmp_path / "data"
+    assert (tmp_path / "data").is_dir()
+
+
+def test_volume_ranks_above_default_local_dirs(tmp_path, monkeypatch):
+    """DATA_DIR=data / REPORTS_DIR=reports (domyślne lokalne) nie przesłaniają wolumenu, jawna ścieżka tak"""
+    locations = make_locations(tmp_path, monkeypatch)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("RAILWAY_VOLUME_MOUNT_PATH", str(tmp_path / "volume"))
+    monkeypatch.setenv("DATA_DIR", "data")
+    monkeypatch.setenv("REPORTS_DIR", "reports")
+
+    assert locations.data == tmp_path / "volume" / "data"
+    assert locations.reports == tmp_path / "volume" / "reports"
+
+    monkeypatch.setenv("REPORTS_DIR", str(tmp_path / "custom"))
+    locations.invalidate()
+    assert locations.reports == tmp_path / "custom"
+    assert locations.data == tmp_path / "volume" / "data"
@@ -0,0 +1,31 @@
+import json
+from datetime import datetime
+
+from app.youtube.video_cache import VideoCacheStore
+
+
+def test_entries_expire_and_cleanup(tmp_path):
+    """Wpisy starsze niż TTL nie są zwracane i są usuwane przez cleanup"""
+    store = VideoCacheStore(tmp_path / "cache.db")
+    now = datetime.now().timestamp()
+    store.put('fresh', {'id': 'fresh'}, timestamp=now)
+    store.put('old', {'id': 'old'}, timestamp=now - 2 * 86400)
+
+    assert store.get_many(['fresh', 'old', 'missing'], 86400) == {'fresh': {'id': 'fresh'}}
+    assert store.count() == 2
+    assert store.count_older_than(86400) == 1
+    assert store.delete_older_than(86400) == 1
+    assert store.count() == 1
+    store.close()
+
+
+def test_legacy_json_imported_once(tmp_path):
+    """Stary video_cache.json jest importowany przy tworzeniu bazy"""
+    legacy = tmp_path / "video_cache.json"
+    legacy.write_text(json.dumps({
+        'abc': {'data': {'id': 'abc', 'title': 'Żółw'}, 'timestamp': datetime.now().timestamp()}
+    }), encoding='utf-8')
+
+    store = VideoCacheStore(tmp_path / "cache.db", legacy_json=legacy)
+    assert store.get('abc', 86400) == {'id': 'abc', 'title': 'Żółw'}
+    store.close()
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.scheduler.task_scheduler import TaskScheduler
+from app.storage.csv_generator import CSVGenerator
+from app.workers import pools
+from app.workers.pools import BoundedPool, WorkerPoolFull
+from conftest import FakeYouTubeService
+
+
+def test_pool_rejects_tasks_beyond_queue():
+    """Pula przyjmuje max_workers + queue_size zadań, kolejne odrzuca od razu"""
+    pool = BoundedPool('test', lambda workers: ThreadPoolExecutor(max_workers=workers), max_workers=1, queue_size=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(WorkerPoolFull):
+            await pool.run(release.wait)
+        assert pool.status()['in_flight'] == 2
+        release.set()
+        assert await asyncio.gather(*running) == [True, True]
+        # Po zakończeniu zadań sloty wracają do puli
+        assert await pool.run(lambda: 'ok') == 'ok'
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+
+
+def test_scheduled_report_waits_for_full_pool(reports_dir, youtube_client_factory, monkeypatch):
+    """Zadanie schedulera przy pełnej puli czeka na slot - raport powstaje, API dalej dostaje odmowę"""
+    monkeypatch.setattr(pools, '_pools', pools.WorkerPools(io_workers=1, cpu_workers=1, queue_size=0))
+    ids = [f"UC{i:022d}" for i in range(2)]
+    client = youtube_client_factory(FakeYouTubeService({cid: 4 for cid in ids}))
+    scheduler = TaskScheduler.__new__(TaskScheduler)
+    scheduler.youtube_client = client
+    scheduler.csv_generator = CSVGenerator()
+    scheduler.state_manager = client.state_manager
+    channels = {'news': [{'id': cid, 'title': f"Kanał {n}"} for n, cid in enumerate(ids)]}
+    release = threading.Event()
+
+    async def scenario():
+        # Jedyny slot puli io zajęty przez długie zapytanie API
+        busy = asyncio.ensure_future(pools.run_io(release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(WorkerPoolFull):
+            await pools.run_io(lambda: 'rejected')
+        asyncio.get_running_loop().call_later(0.2, release.set)
+        reports = await scheduler.stream_category_reports(channels, days_back=3)
+        assert await busy is True
+        return reports
+
+    try:
+        reports = asyncio.run(scenario())
+    finally:
+        pools._pools.shutdown()
+
+    assert reports['news']['videos'] == 8
+    assert reports['news']['path'] is not None
+    assert list(reports_dir.glob("report_NEWS_*.csv"))
+
+
+def write_reports(reports_dir, rows):
+    header = "Channel_Name,Date_of_Publishing,Title,View_Count,Video_Type,Video_ID,Thumbnail_URL\n"
+    for day in ('2026-10-14', '2026-10-15'):
+        lines = [
+            f"Kanał {i % 50},{day} 12:00,Film {i},{i * 7},{'shorts' if i % 3 else 'longform'},vid{i},https://i.ytimg.com/{i}.jpg\n"
+            for i in range(rows)
+        ]
+        (reports_dir / f"report_BENCH_{day}.csv").write_text(header + ''.join(lines), encoding='utf-8')
+
+
+def test_health_stays_responsive_during_ranking_regeneration(reports_dir):
+    """Regeneracja rankingu (pandas) idzie w puli procesów - /health odpowiada bez czekania"""
+    from app.main import app
+
+    write_reports(reports_dir, rows=15000)
+    result = {}
+    latencies = []
+
+    with TestClient(app) as client:
+        def regenerate():
+            result['response'] = client.post("/trend/rankings/bench/regenerate").json()
+
+        worker = threading.Thread(target=regenerate)
+        worker.start()
+        while worker.is_alive():
+            start = time.perf_counter()
+            assert client.get("/health").status_code == 200
+            latencies.append(time.perf_counter() - start)
+            time.sleep(0.02)
+        worker.join()
+
+    assert result['response']['status'] == 'regenerated'
+    assert list(reports_dir.glob("ranking_BENCH_*.json"))
+    assert len(latencies) >= 5
+    assert max(latencies) < 0.5, latencies
@@ -0,0 +1,356 @@
+import asyncio
+import time
+
+import pytest
+
+from app.youtube.key_pool import QuotaExhaustedError
+from app.youtube.records import VIDEO_FIELDS_MASK, VIDEO_STATISTICS_MASK
+from conftest import FakeYouTubeService, http_error
+
+
+def channel_id(i: int) -> str:
+    return f"UC{i:022d}"
+
+
+def test_channels_fetched_concurrently_with_limit(youtube_client_factory):
+    """Kanały pobierane są równolegle, ale nie więcej niż max_concurrency naraz"""
+    ids = [channel_id(i) for i in range(8)]
+    service = FakeYouTubeService({cid: 3 for cid in ids}, delay=0.02)
+    client = youtube_client_factory(service, max_concurrency=3)
+
+    results = asyncio.run(client.get_videos_for_channels([{'id': cid} for cid in ids], days_back=3))
+
+    assert len(results) == len(ids)
+    for cid, videos in zip(ids, results):
+        assert {v['id'][:4] for v in videos} == {cid[-4:]}
+    assert 1 < service.max_in_flight <= 3
+    # Połączenia HTTP są wypożyczane z puli, nie tworzone per zapytanie
+    assert 1 < client._http_pool.created <= 3
+
+
+def test_event_loop_not_blocked_during_fetch(youtube_client_factory):
+    """Pętla zdarzeń obsługuje inne zadania podczas pobierania"""
+    service = FakeYouTubeService({channel_id(1): 2}, delay=0.05)
+    client = youtube_client_factory(service)
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await client.get_channel_videos(channel_id(1), days_back=3)
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(scenario()) > 5
+
+
+def test_channel_lookups_are_batched(youtube_client_factory):
+    """N kanałów = ceil(N/50) zapytań channels.list w jednym batchu HTTP"""
+    ids = [channel_id(i) for i in range(120)]
+    service = FakeYouTubeService({cid: 1 for cid in ids})
+    client = youtube_client_factory(service, max_concurrency=8)
+
+    results = asyncio.run(client.get_videos_for_channels([{'id': cid} for cid in ids], days_back=3))
+
+    assert all(len(videos) == 1 for videos in results)
+    assert service.count_calls('channels') == 3
+    assert service.batches == [3]
+    # Quota: 3 x channels.list + 120 x playlistItems.list + 120 x videos.list
+    assert client.state_manager.quota_used == 3 + 120 + 120
+
+
+def test_uploads_playlists_cached_between_runs(youtube_client_factory):
+    """Drugi przebieg nie wywołuje channels.list - playlisty są w cache"""
+    ids = [channel_id(i) for i in range(5)]
+    service = FakeYouTubeService({cid: 1 for cid in ids})
+    client = youtube_client_factory(service)
+    channels = [{'id': cid} for cid in ids]
+
+    asyncio.run(client.get_videos_for_channels(channels, days_back=3))
+    assert service.count_calls('channels') == 1
+
+    asyncio.run(client.get_videos_for_channels(channels, days_back=3))
+    assert service.count_calls('channels') == 1
+
+
+def test_handle_resolved_with_for_handle_and_cached(youtube_client_factory):
+    """@handle rozwiązywany przez forHandle (1 quota), bez search.list, a potem z cache"""
+    cid = channel_id(7)
+    service = FakeYouTubeService({cid: 2}, handles={'mojkanal': cid})
+    client = youtube_client_factory(service)
+
+    info = asyncio.run(client.get_channel_info("https://www.youtube.com/@MojKanal"))
+
+    assert info['id'] == cid
+    assert service.count_calls('search') == 0
+    assert client.state_manager.quota_used == 1
+    assert client.state_manager.get_channel_id_for_handle('mojkanal') == cid
+    assert client.state_manager.get_uploads_playlist(cid) == 'UU' + cid[2:]
+
+    asyncio.run(client.get_channel_info("https://www.youtube.com/@MojKanal"))
+    assert service.count_calls('search') == 0
+    assert client.state_manager.quota_used == 2
+
+
+def test_scan_stops_at_window_start(youtube_client_factory):
+    """Stronicowanie kończy się na pierwszym filmie sprzed okna (1 strona zamiast 2)"""
+    cid = channel_id(3)
+    service = FakeYouTubeService({cid: 60})  # co 6h -> 12 filmów w 3 dniach
+    client = youtube_client_factory(service)
+
+    videos = asyncio.run(client.get_channel_videos(cid, days_back=3))
+
+    assert len(videos) == 12
+    assert service.count_calls('playlistItems') == 1
+
+
+def test_scan_stops_at_watermark_and_merges_known_videos(youtube_client_factory):
+    """Drugi skan kończy się na znanym filmie i dokleja zapamiętane filmy z okna"""
+    from datetime import datetime
+    import pytz
+
+    ids = [channel_id(i) for i in range(3)]
+    service = FakeYouTubeService({cid: 8 for cid in ids})
+    client = youtube_client_factory(service)
+    channels = [{'id': cid} for cid in ids]
+
+    first = asyncio.run(client.get_videos_for_channels(channels, days_back=3))
+    assert client.state_manager.watermark_saves == 1
+    assert set(client.state_manager.watermarks) == set(ids)
+
+    service.uploads[ids[0]].insert(0, ('newv999', datetime.now(pytz.utc)))
+    second = asyncio.run(client.get_videos_for_channels(channels, days_back=3))
+
+    assert {v['id'] for v in second[0]} == {'newv999'} | {v['id'] for v in first[0]}
+    assert {v['id'] for v in second[1]} == {v['id'] for v in first[1]}
+    assert client.state_manager.watermark_saves == 2
+
+
+def test_stale_statistics_refreshed_without_metadata(youtube_client_factory):
+    """Po wygaśnięciu statystyk pobierane jest tylko part=statistics z maską fields"""
+    cid = channel_id(5)
+    service = FakeYouTubeService({cid: 4})
+    client = youtube_client_factory(service)
+
+    first = asyncio.run(client.get_channel_videos(cid, days_back=3))
+    assert len(first) == 4
+
+    client.stats_ttl = 0  # statystyki od razu nieaktualne, metadane wciąż ważne
+    service.calls.clear()
+    second = asyncio.run(client.get_channel_videos(cid, days_back=3))
+
+    video_calls = [params for name, params in service.calls if name == 'videos']
+    assert len(video_calls) == 1
+    assert video_calls[0]['part'] == 'statistics'
+    assert video_calls[0]['fields'] == VIDEO_STATISTICS_MASK
+    assert {v['id'] for v in second} == {v['id'] for v in first}
+    assert all(v['view_count'] == 100 and v['title'] for v in second)
+
+
+def test_video_details_use_fields_mask_and_lean_records(youtube_client_factory):
+    """videos.list z maską fields, wynik to VideoRecord zgodny z dotychczasowym dict"""
+    cid = channel_id(6)
+    service = FakeYouTubeService({cid: 2})
+    client = youtube_client_factory(service)
+
+    videos = asyncio.run(client.get_channel_videos(cid, days_back=3))
+
+    video_calls = [params for name, params in service.calls if name == 'videos']
+    assert video_calls[0]['fields'] == VIDEO_FIELDS_MASK
+    video = videos[0]
+    assert video.get('url') == f"https://www.youtube.com/watch?v={video['id']}"
+    assert video.get('channel_title', '') == ''
+    video['channel_title'] = 'Kanał'
+    assert video.to_dict()['channel_title'] == 'Kanał'
+    assert video['duration'] == 'PT12M3S' and video['view_count'] == 100
+
+
+def test_unchanged_pages_served_from_etag_cache(youtube_client_factory):
+    """Niezmienione strony playlisty i filmów: If-None-Match -> 304 -> odpowiedź z cache"""
+    cid = channel_id(8)
+    service = FakeYouTubeService({cid: 3})
+    client = youtube_client_factory(service)
+
+    first = asyncio.run(client.get_channel_videos(cid, days_back=3))
+    client.video_cache.delete_older_than(-1)  # wymuś ponowne videos.list
+    second = asyncio.run(client.get_channel_videos(cid, days_back=3))
+
+    assert service.not_modified == 2  # playlistItems + videos
+    assert {v['id'] for v in second} == {v['id'] for v in first}
+    assert all(v['title'] for v in second)
+
+
+def test_client_construction_does_not_build_service(data_dir, monkeypatch):
+    """Konstrukcja klienta nie buduje usługi - dokument discovery ładowany przy pierwszym użyciu"""
+    from app.youtube import client as client_module
+
+    built = []
+    monkeypatch.setattr(client_module, 'build_service', lambda key: built.append(key) or object())
+    client = client_module.YouTubeClient("test-key")
+    try:
+        assert built == []
+        client.service
+        client.service
+        assert built == ["test-key"]
+    finally:
+        client.close()
+
+
+def test_transient_errors_retried_with_backoff(youtube_client_factory):
+    """5xx i rateLimitExceeded są ponawiane, quotaExceeded nie"""
+    cid = channel_id(9)
+    service = FakeYouTubeService({cid: 2})
+    errors = [http_error(503), http_error(403, 'rateLimitExceeded')]
+
+    def fault(resource, params):
+        if resource == 'playlistItems' and errors:
+            raise errors.pop(0)
+
+    service.fault = fault
+    client = youtube_client_factory(service)
+
+    videos = asyncio.run(client.get_channel_videos(cid, days_back=3))
+    assert len(videos) == 2
+    assert service.count_calls('playlistItems') == 3
+    # Każda próba (także ponowiona) zużywa quota
+    assert client.state_manager.get_quota_used() == len(service.calls)
+
+    def quota_exceeded(resource, params):
+        raise http_error(403, 'quotaExceeded')
+
+    service.fault = quota_exceeded
+    calls_before = service.count_calls('channels')
+    assert asyncio.run(client.get_uploads_playlists([channel_id(10)])) == {}
+    assert service.count_calls('channels') == calls_before + 1
+    assert client.state_manager.get_quota_used() == len(service.calls)
+
+
+def test_failing_video_batch_is_bisected(youtube_client_factory):
+    """Błędny batch dzielony na pół zamiast pobierania filmów pojedynczo"""
+    cid = channel_id(11)
+    service = FakeYouTubeService({cid: 8})
+    poison = service.uploads[cid][5][0]
+
+    def fault(resource, params):
+        if resource == 'videos' and poison in params['id'].split(','):
+            raise http_error(400, 'badRequest')
+
+    service.fault = fault
+    client = youtube_client_factory(service)
+
+    videos = asyncio.run(client.get_channel_videos(cid, days_back=3))
+
+    assert len(videos) == 7 and poison not in {v['id'] for v in videos}
+    assert service.count_calls('videos') == 7  # 8 -> 4+4 -> 2+2 -> 1+1
+    assert client.state_manager.get_quota_used() == len(service.calls)
+
+
+def test_slow_request_hedged(youtube_client_factory):
+    """Wolne zapytanie dostaje zapytanie zapasowe - wygrywa szybsza odpowiedź"""
+    cid = channel_id(12)
+    service = FakeYouTubeService({cid: 1})
+    slow = {'playlistItems': 1}
+
+    def fault(resource, params):
+        if slow.get(resource):
+            slow[resource] -= 1
+            time.sleep(1.0)
+
+    service.fault = fault
+    client = youtube_client_factory(service, hedge_after=0.05)
+
+    start = time.perf_counter()
+    videos = asyncio.run(client.get_channel_videos(cid, days_back=3))
+
+    assert len(videos) == 1
+    assert time.perf_counter() - start < 0.8
+    assert service.count_calls('playlistItems') == 2
+    # Zapytanie zapasowe też jest zliczane
+    assert client.state_manager.get_quota_used() == len(service.calls)
+
+
+def test_timed_out_batch_does_not_overwrite_retry_results(youtube_client_factory):
+    """Batch przerwany limitem czasu kończy się w tle - wyniki pochodzą tylko z udanego ponowienia"""
+    ids = [channel_id(i) for i in range(13, 16)]
+    service = FakeYouTubeService({cid: 1 for cid in ids})
+    slow = {'channels': 1}
+
+    def fault(resource, params):
+        if slow.get(resource):
+            slow[resource] -= 1
+            time.sleep(0.4)
+            raise http_error(500)
+
+    service.fault = fault
+    client = youtube_client_factory(service, request_timeout=0.1)
+    requests = [client.service.channels().list(part='contentDetails', id=cid) for cid in ids]
+
+    results = asyncio.run(client._execute_batch(requests))
+    time.sleep(0.6)  # przerwana próba kończy się i dostaje swoje odpowiedzi
+
+    assert [error for _, error in results] == [None, None, None]
+    assert [response['items'][0]['id'] for response, _ in results] == ids
+    # Obie próby wysłały cały batch i obie są zliczone
+    assert len(service.batches) == 2
+    assert client.state_manager.get_quota_used() == len(service.calls) == 6
+
+
+def test_requests_routed_to_key_with_most_remaining_quota(youtube_client_factory):
+    """Zapytania rozkładają się równo na klucze; zużycie per klucz widoczne w get_quota_usage"""
+    ids = [channel_id(i) for i in range(30, 36)]
+    service = FakeYouTubeService({cid: 4 for cid in ids})
+    client = youtube_client_factory(service, api_keys=['key-a', 'key-b', 'key-c'])
+
+    asyncio.run(client.get_videos_for_channels([{'id': cid} for cid in ids], days_back=3))
+
+    per_key = [service.keys_used.count(key) for key in ('key-a', 'key-b', 'key-c')]
+    assert sum(per_key) == len(service.keys_used)
+    assert max(per_key) - min(per_key) <= 1
+    usage = client.get_quota_usage()
+    assert usage['limit'] == 30000
+    assert sum(key['used'] for key in usage['keys']) == usage['used']
+    assert all('key-' not in key['key'] for key in usage['keys'])  # klucze zamaskowane
+
+
+def test_quota_exceeded_fails_over_to_next_key(youtube_client_factory):
+    """quotaExceeded wyłącza klucz do resetu, a zapytanie (także w batchu) idzie z kolejnym"""
+    ids = [channel_id(i) for i in range(40, 100)]  # 60 kanałów -> batch dwóch channels.list
+    service = FakeYouTubeService({cid: 2 for cid in ids})
+    client = youtube_client_factory(service, api_keys=['key-a', 'key-b'])
+    service.exhausted_keys.add('key-a')
+
+    playlists = asyncio.run(client.get_uploads_playlists(ids))
+    videos = asyncio.run(client.get_channel_videos(ids[0], days_back=3))
+
+    assert len(playlists) == 60
+    assert len(videos) == 2
+    assert service.keys_used.count('key-a') <= 2  # tylko pierwsze odrzucone zapytania
+    status = {key['key_id']: key for key in client.get_quota_usage()['keys']}
+    assert status[client.key_pool.key_id('key-a')]['exhausted']
+    assert not status[client.key_pool.key_id('key-b')]['exhausted']
+
+    service.exhausted_keys.add('key-b')
+    assert asyncio.run(client.refresh_statistics([ids[1][-4:] + 'v000'])) == {}
+    assert client.key_pool.remaining() == 0
+    with pytest.raises(QuotaExhaustedError):
+        asyncio.run(client.refresh_statistics([ids[1][-4:] + 'v001']))
+    # Batch wysłany ponownie z kolejnym kluczem zużywa quota przy każdym wysłaniu
+    assert client.state_manager.get_quota_used() == len(service.calls)
+
+
+@pytest.mark.parametrize('value', ['key-a, key-b,key-c', '["key-a", "key-b", "key-c"]'])
+def test_api_keys_from_env_list(monkeypatch, value):
+    """YOUTUBE_API_KEYS przyjmuje listę po przecinkach i listę JSON"""
+    from app.config.settings import Settings
+
+    monkeypatch.setenv("SECRET_KEY", "test")
+    monkeypatch.setenv("YOUTUBE_API_KEYS", value)
+    assert Settings(_env_file=None).youtube_api_keys == ['key-a', 'key-b', 'key-c']
+    monkeypatch.setenv("YOUTUBE_API_KEYS", "")
+    assert Settings(_env_file=None).youtube_api_keys == []